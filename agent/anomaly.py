@@ -28,7 +28,7 @@ import structlog
 
 from agent.inventory import Inventory
 from agent.tools.base import ToolResult
-from agent.tools.docker_tools import _run_on_server
+from agent.tools.docker_tools import _run_batch_on_server
 
 logger = structlog.get_logger()
 
@@ -127,7 +127,7 @@ async def run_anomaly_scan(inventory: Inventory) -> AnomalyReport:
     start = time.monotonic()
     baselines = load_baselines()
     report = AnomalyReport()
-    tasks: dict[str, Any] = {}
+    per_server: dict[str, dict[str, str]] = {}
 
     servers = inventory.server_names
     report.checked_servers = len(servers)
@@ -138,36 +138,26 @@ async def run_anomaly_scan(inventory: Inventory) -> AnomalyReport:
         except KeyError:
             continue
 
-        # Gather data points for anomaly detection
-        tasks[f"{srv}:disk"] = _run_on_server(
-            inventory, srv,
-            "df -BM / --output=used,avail | tail -1",
-        )
-        tasks[f"{srv}:mem"] = _run_on_server(
-            inventory, srv,
-            "free -m | awk '/^Mem:/{print $3\"/\"$2}'",
-        )
-        tasks[f"{srv}:uptime_seconds"] = _run_on_server(
-            inventory, srv,
-            "cat /proc/uptime | cut -d' ' -f1",
-        )
-        tasks[f"{srv}:connections"] = _run_on_server(
-            inventory, srv,
-            "ss -s 2>/dev/null | head -3",
-        )
-        tasks[f"{srv}:containers"] = _run_on_server(
-            inventory, srv,
-            "docker ps -a --format '{{.Names}}|{{.Status}}|{{.RunningFor}}' 2>/dev/null || echo ''",
-        )
-        tasks[f"{srv}:proc_count"] = _run_on_server(
-            inventory, srv,
-            "ps aux --no-headers 2>/dev/null | wc -l",
-        )
-
-    # Run all in parallel
-    keys = list(tasks.keys())
-    results = await asyncio.gather(*[tasks[k] for k in keys])
-    data = dict(zip(keys, results))
+        # Gather data points for anomaly detection (one batched exec per server)
+        per_server[srv] = {
+            "disk": "df -BM / --output=used,avail | tail -1",
+            "mem": "free -m | awk '/^Mem:/{print $3\"/\"$2}'",
+            "uptime_seconds": "cat /proc/uptime | cut -d' ' -f1",
+            "connections": "ss -s 2>/dev/null | head -3",
+            "containers": "docker ps -a --format '{{.Names}}|{{.Status}}|{{.RunningFor}}' 2>/dev/null || echo ''",
+            "proc_count": "ps aux --no-headers 2>/dev/null | wc -l",
+        }
+
+    # Run all servers in parallel
+    names = list(per_server)
+    batches = await asyncio.gather(*[
+        _run_batch_on_server(inventory, srv, per_server[srv]) for srv in names
+    ])
+    data = {
+        f"{srv}:{label}": result
+        for srv, batch in zip(names, batches)
+        for label, result in batch.items()
+    }
 
     now = time.time()
     new_baselines: dict[str, Any] = {}
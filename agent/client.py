@@ -1,27 +1,35 @@
 """Anthropic API client and conversation loop.
 
-Manages the message history, sends requests to the Claude API with
-tool definitions, and processes tool_use responses by dispatching
-through the tool registry.
+Manages the message history, streams responses from the Claude API with
+tool definitions, and processes tool_use blocks by dispatching them
+through the tool registry as soon as each one is complete.
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
+import time
+from collections.abc import Callable
 from typing import Any
 
 import anthropic
 import structlog
 
+from agent.compaction import Digest, build_digest, summary_message, transcript
 from agent.config import AgentConfig
+from agent.model_router import ModelRouter
+from agent.tools.base import model_view
 from agent.tools.registry import ToolRegistry
+from agent.tools.tool_output import offload
 
 logger = structlog.get_logger()
 
 # Max characters to keep per tool result in message history.
 # The user still sees the full output — this only affects what we
 # send back to the API on subsequent turns to control token usage.
+# Longer results are kept in the tool output store and replaced by a
+# preview plus a handle the model can read further with read_tool_output.
 _MAX_TOOL_RESULT_CHARS = 2000
 
 _RATE_LIMIT_MAX_RETRIES = 3
@@ -31,6 +39,22 @@ _RATE_LIMIT_BASE_DELAY = 2.0  # seconds
 # English text averages ~4 chars/token; JSON/code is closer to 3.
 _CHARS_PER_TOKEN = 3.5
 
+_CACHE_BREAKPOINT = {"type": "ephemeral"}
+
+_COMPACTION_PROMPT = """\
+You condense the early part of an infrastructure troubleshooting session so \
+the assistant can continue it without the full transcript. You are given a \
+draft summary and the transcript. Reply with only these sections, each item \
+on its own line starting with "- ", keeping concrete values (hosts, paths, \
+percentages, error messages) and dropping narration:
+
+Servers touched: <comma-separated server names>
+Operator requests:
+Actions taken:
+Findings:
+Conclusions:
+"""
+
 
 class CancelledByUser(Exception):
     """Raised when the user cancels the current operation."""
@@ -53,15 +77,40 @@ class ConversationClient:
             registry: Tool registry for dispatch and schema generation.
             system_prompt: The assembled system prompt.
             ui: UI instance (TerminalUI or DaemonUI) — must implement
-                get_input, display_response, display_tool_call,
-                display_tool_result, display_error, display_goodbye.
+                get_input, display_response, display_response_delta,
+                display_tool_call, display_tool_result, display_error,
+                display_goodbye.
         """
         self._config = config
         self._registry = registry
         self._system_prompt = system_prompt
         self._ui = ui
-        self._client = anthropic.Anthropic()
+        self._client = anthropic.AsyncAnthropic()
         self._messages: list[dict[str, Any]] = []
+        # Estimated tokens per message, parallel to _messages, and their sum.
+        # Kept up to date on every append/pop so trimming never re-serializes
+        # the whole history.
+        self._token_counts: list[int] = []
+        self._history_tokens = 0
+        # Ratio of the API's real count to the estimate (exact_token_counts)
+        self._token_scale = 1.0
+        # System prompt + tool schema tokens, per attached tool set
+        self._overhead_tokens: dict[frozenset[str] | None, int] = {}
+        self._calibrate = config.exact_token_counts
+        self._compactions: list[dict[str, Any]] = []
+        self._prompt_cache = config.prompt_cache
+        # Schemas are built once per set of attached tool families and
+        # reused, keeping the request prefix byte-identical between calls,
+        # which prompt caching needs.
+        self._selection = registry.selection
+        self._tool_sets: dict[frozenset[str] | None, list[dict[str, Any]]] = {}
+        self._system: str | list[dict[str, Any]] = system_prompt
+        if self._prompt_cache:
+            self._system = [
+                {"type": "text", "text": system_prompt, "cache_control": _CACHE_BREAKPOINT},
+            ]
+        # Fast or main model for each API call (fast_model)
+        self._models = ModelRouter(config)
         self._cancel_event: asyncio.Event | None = None
 
     async def run(self) -> None:
@@ -81,7 +130,9 @@ class ConversationClient:
             if not user_input:
                 continue
 
-            self._messages.append({"role": "user", "content": user_input})
+            self._append_message({"role": "user", "content": user_input})
+            self._select_tools(user_input)
+            self._models.start_turn(user_input)
 
             await self._process_response()
 
@@ -94,29 +145,102 @@ class ConversationClient:
         Args:
             message: The user's message text.
         """
-        self._messages.append({"role": "user", "content": message})
+        self._append_message({"role": "user", "content": message})
+        self._select_tools(message)
+        self._models.start_turn(message)
         await self._process_response()
 
     async def cleanup(self) -> None:
-        """Clean up resources like SSH connection pools."""
-        from agent.tools.docker_tools import close_ssh_pool
+        """Release process-wide resources like the SSH connection pool.
+
+        Call once at process exit — not between daemon sessions, so the
+        next session reuses warm connections.
+        """
+        from agent.tools.ssh_pool import close_ssh_pool
         await close_ssh_pool()
 
     def reset(self) -> None:
         """Clear conversation history (called between daemon sessions)."""
         self._messages.clear()
+        self._token_counts.clear()
+        self._history_tokens = 0
+        self._compactions.clear()
+        self._registry.clear_deltas()
+        if self._selection is not None:
+            self._selection.reset()
 
     def get_messages(self) -> list[dict[str, Any]]:
         """Return a copy of the current message history."""
         return list(self._messages)
 
-    def restore_messages(self, messages: list[dict[str, Any]]) -> None:
+    def get_compactions(self) -> list[dict[str, Any]]:
+        """Return a copy of the record of history compactions this session."""
+        return list(self._compactions)
+
+    def restore_messages(
+        self,
+        messages: list[dict[str, Any]],
+        compactions: list[dict[str, Any]] | None = None,
+    ) -> None:
         """Replace the message history with a previously saved one.
 
         Used by the daemon to resume a session from disk.
         """
-        self._messages.clear()
-        self._messages.extend(messages)
+        self.reset()
+        for message in messages:
+            self._append_message(message)
+        self._compactions.extend(compactions or [])
+        if self._selection is not None:
+            # Tools already used must stay defined for the history to be valid
+            for message in messages:
+                content = message.get("content")
+                if isinstance(content, str):
+                    self._selection.select(content)
+                elif isinstance(content, list):
+                    self._selection.activate_for_tools(
+                        b.get("name", "") for b in content
+                        if isinstance(b, dict) and b.get("type") == "tool_use"
+                    )
+
+    def _select_tools(self, message: str) -> None:
+        """Attach the tool families a user message calls for."""
+        if self._selection is not None:
+            self._selection.select(message)
+
+    def _tool_set_key(self) -> frozenset[str] | None:
+        """Key of the attached tool set (None when routing is off)."""
+        return frozenset(self._selection.active) if self._selection is not None else None
+
+    def _current_tools(self) -> list[dict[str, Any]]:
+        """Schemas for the attached families, with a cache breakpoint on the last."""
+        key = self._tool_set_key()
+        tools = self._tool_sets.get(key)
+        if tools is None:
+            tools = self._registry.get_schemas(key)
+            if self._prompt_cache and tools:
+                tools[-1] = {**tools[-1], "cache_control": _CACHE_BREAKPOINT}
+            self._tool_sets[key] = tools
+        return tools
+
+    def _append_message(self, message: dict[str, Any]) -> None:
+        """Append to the history, recording the message's token estimate."""
+        self._insert_message(len(self._messages), message)
+
+    def _insert_message(self, index: int, message: dict[str, Any]) -> None:
+        """Insert into the history, recording the message's token estimate."""
+        tokens = _message_tokens(message)
+        self._messages.insert(index, message)
+        self._token_counts.insert(index, tokens)
+        self._history_tokens += tokens
+
+    def _pop_message(self, index: int = -1) -> dict[str, Any]:
+        """Remove a message from the history and its token estimate."""
+        self._history_tokens -= self._token_counts.pop(index)
+        return self._messages.pop(index)
+
+    def _history_estimate(self) -> int:
+        """Estimated input tokens of the history, calibrated if enabled."""
+        return int(self._history_tokens * self._token_scale)
 
     def set_cancel_event(self, event: asyncio.Event) -> None:
         """Set an external cancellation event.
@@ -138,6 +262,13 @@ class ConversationClient:
         max_tool_iterations safety limit.  Checks for cancellation
         between each iteration.
         """
+        try:
+            await self._tool_rounds()
+        finally:
+            self._models.end_turn()
+
+    async def _tool_rounds(self) -> None:
+        """Run API rounds and their tool calls until the turn ends."""
         iterations = 0
 
         while iterations < self._config.max_tool_iterations:
@@ -148,69 +279,45 @@ class ConversationClient:
                 logger.info("operation_cancelled", iteration=iterations)
                 raise CancelledByUser()
 
+            self._models.start_round()
             try:
-                response = await self._api_call_with_retry()
+                response, tool_results = await self._stream_round()
             except CancelledByUser:
                 raise
             except anthropic.APIError as e:
+                if self._models.escalate("api_error"):
+                    # Retry the round on the main model
+                    logger.warning("fast_model_api_error", error=str(e))
+                    continue
                 self._ui.display_error(f"API error: {e}")
                 logger.error("api_error", error=str(e))
                 # Remove the last user message so they can retry
-                self._messages.pop()
+                self._pop_message()
                 return
 
             # Append assistant response to history.
             # Convert content blocks to plain dicts to avoid pydantic
             # serialization issues when they're passed back in subsequent
             # API calls.
-            assistant_content = response.content
             serialized_content = [
                 block.model_dump() if hasattr(block, "model_dump") else block
-                for block in assistant_content
+                for block in response.content
             ]
-            self._messages.append({"role": "assistant", "content": serialized_content})
+            self._append_message({"role": "assistant", "content": serialized_content})
+            self._models.observe_response(response)
 
-            # If Claude is done talking (no more tool calls), display and return
-            if response.stop_reason == "end_turn":
-                for block in assistant_content:
-                    if hasattr(block, "text"):
-                        self._ui.display_response(block.text)
+            # Text was displayed while streaming; nothing left to run
+            if response.stop_reason == "end_turn" or not tool_results:
                 return
 
-            # Process tool calls
-            tool_results: list[dict[str, Any]] = []
-            for block in assistant_content:
-                if block.type == "tool_use":
-                    # Check cancellation before each tool execution
-                    if self._is_cancelled():
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": "Operation cancelled by user.",
-                            "is_error": True,
-                        })
-                        continue
-
-                    self._ui.display_tool_call(block.name, block.input)
-                    result = await self._registry.dispatch(block.name, block.input)
-                    self._ui.display_tool_result(block.name, result)
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": _truncate_tool_result(json.dumps(result)),
-                    })
-                elif hasattr(block, "text") and block.text:
-                    # Claude may include thinking text alongside tool calls
-                    self._ui.display_response(block.text)
-
             # If cancelled during tool execution, stop the loop
             if self._is_cancelled():
                 # Still append the partial results so history stays valid
-                self._messages.append({"role": "user", "content": tool_results})
+                self._append_message({"role": "user", "content": tool_results})
                 raise CancelledByUser()
 
             # Append tool results for the next iteration
-            self._messages.append({"role": "user", "content": tool_results})
+            self._append_message({"role": "user", "content": tool_results})
 
         # Safety: hit max iterations
         self._ui.display_error(
@@ -219,8 +326,176 @@ class ConversationClient:
         )
         logger.warning("max_tool_iterations_reached", limit=self._config.max_tool_iterations)
 
-    def _trim_history(self) -> None:
-        """Drop oldest message pairs when the conversation exceeds the token budget.
+    async def _stream_round(self) -> tuple[Any, list[dict[str, Any]]]:
+        """Stream one API response, running its tool calls as they arrive.
+
+        Each read-only tool_use block is handed to a worker as soon as its
+        input JSON is complete, so the first tool is already running while
+        Claude is still writing the rest of the turn. A mutating block,
+        and everything after it, waits for the complete message: if the
+        stream fails, the turn is dropped, and only reads may have run.
+
+        Returns:
+            The final message and its tool_result blocks, in call order.
+        """
+        queue: asyncio.Queue[Any] = asyncio.Queue()
+        worker = asyncio.ensure_future(self._run_tool_calls(queue))
+        queued: set[str] = set()
+        held = False
+
+        def _on_tool_use(block: Any) -> None:
+            nonlocal held
+            tool = self._registry.get_tool(block.name)
+            held = held or (tool is not None and tool.mutates)
+            if not held:
+                queued.add(block.id)
+                queue.put_nowait(block)
+
+        try:
+            response = await self._api_call_with_retry(_on_tool_use)
+        except BaseException:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+            raise
+
+        # Held blocks, and any cut off by max_tokens (no stop event): the
+        # API still expects a result for every tool_use in the turn.
+        for block in response.content:
+            if block.type == "tool_use" and block.id not in queued:
+                queue.put_nowait(block)
+        queue.put_nowait(None)
+        return response, await worker
+
+    async def _run_tool_calls(self, queue: asyncio.Queue[Any]) -> list[dict[str, Any]]:
+        """Run queued tool_use blocks concurrently until the None sentinel.
+
+        At most ``max_parallel_tools`` calls run at once. A mutating tool
+        waits for every call before it and holds back the calls after
+        it, so "restart, then check" in one turn keeps its order.
+
+        Returns:
+            tool_result blocks in the order the calls were made.
+        """
+        limit = asyncio.Semaphore(self._config.max_parallel_tools)
+        tasks: list[asyncio.Task[dict[str, Any]]] = []
+        barrier: asyncio.Task[dict[str, Any]] | None = None
+        try:
+            while (block := await queue.get()) is not None:
+                tool = self._registry.get_tool(block.name)
+                if tool is not None and tool.mutates:
+                    after = list(tasks)
+                else:
+                    after = [barrier] if barrier is not None else []
+                task = asyncio.ensure_future(self._run_tool_call_after(after, block, limit))
+                if tool is not None and tool.mutates:
+                    barrier = task
+                tasks.append(task)
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _run_tool_call_after(
+        self,
+        after: list[asyncio.Task[dict[str, Any]]],
+        block: Any,
+        limit: asyncio.Semaphore,
+    ) -> dict[str, Any]:
+        """Run one tool call once ``after`` have finished and a slot is free."""
+        if after:
+            await asyncio.wait(after)
+        async with limit:
+            return await self._run_tool_call(block)
+
+    async def _run_tool_call(self, block: Any) -> dict[str, Any]:
+        """Execute one tool_use block and build its tool_result."""
+        # Check cancellation before each tool execution
+        if self._is_cancelled():
+            return _cancelled_result(block.id)
+        if self._selection is not None:
+            # Called from the prompt's tool list without being attached
+            self._selection.activate_for_tools([block.name])
+        tool = self._registry.get_tool(block.name)
+        if tool is not None and tool.mutates and self._models.hold_mutation(block.name):
+            return {
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "content": "Not run: changes are decided by the main model. "
+                "Call the tool again if it is still needed.",
+                "is_error": True,
+            }
+
+        self._ui.display_tool_call(block.name, block.input)
+        result = await self._dispatch_cancellable(block.name, block.input)
+        if result is None:
+            return _cancelled_result(block.id)
+        failed = bool(result.get("error")) and not result.get("output")
+        self._models.observe_tool(block.name, failed)
+        self._ui.display_tool_result(block.name, result)
+        # Compact payload for the model when the tool provides one; the
+        # UI above got the full report
+        if "data" in result and self._config.compact_tool_results:
+            content = json.dumps(model_view(result), separators=(",", ":"), ensure_ascii=False)
+        else:
+            content = json.dumps({k: v for k, v in result.items() if k != "data"})
+        if len(content) > _MAX_TOOL_RESULT_CHARS:
+            if block.name == "read_tool_output":
+                # Already a bounded slice of a stored output
+                pass
+            elif self._config.tool_output_store:
+                content = json.dumps(offload(
+                    result, _MAX_TOOL_RESULT_CHARS, compact=self._config.compact_tool_results,
+                ))
+            else:
+                content = _truncate_tool_result(content)
+        return {
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": content,
+        }
+
+    async def _dispatch_cancellable(
+        self, tool_name: str, tool_input: dict[str, Any],
+    ) -> dict[str, Any] | None:
+        """Dispatch a tool call, aborting it if the cancel event fires.
+
+        Cancelling the dispatch task propagates into the SSH pool, which
+        kills the tool's remote processes rather than leaving them running.
+
+        Returns:
+            The tool result, or None if the call was cancelled.
+        """
+        if self._cancel_event is None:
+            return await self._registry.dispatch(tool_name, tool_input)
+
+        task = asyncio.ensure_future(self._registry.dispatch(tool_name, tool_input))
+        cancel_future = asyncio.ensure_future(self._cancel_event.wait())
+        try:
+            await asyncio.wait({task, cancel_future}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            cancel_future.cancel()
+        if task.done():
+            return task.result()
+
+        logger.info("tool_call_cancelled", tool=tool_name)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return None
+
+    async def _trim_history(self) -> None:
+        """Shrink the history when the conversation exceeds the token budget.
+
+        With ``compact_history`` the oldest turns are first replaced by a
+        summary (see ``_compact_history``); messages are only dropped if
+        that is not enough.
 
         Preserves the most recent messages so Claude keeps context for the
         current task.  Always keeps at least the last user message + the
@@ -232,10 +507,16 @@ class ConversationClient:
         - user (tool_results) + assistant
         """
         budget = self._config.max_conversation_tokens
-        est = _estimate_tokens(self._messages)
+        est = self._history_estimate()
         if est <= budget:
             return
 
+        # Outputs leaving the history can no longer be the base of a delta
+        self._registry.clear_deltas()
+        if self._config.compact_history:
+            await self._compact_history()
+            est = self._history_estimate()
+
         # Keep removing the oldest pair until we're under budget.
         # Never remove the last 2 messages (current turn).
         removed = 0
@@ -243,14 +524,14 @@ class ConversationClient:
             # Remove from the front: one user + one assistant = 2 messages
             if len(self._messages) <= 2:
                 break
-            self._messages.pop(0)
+            self._pop_message(0)
             removed += 1
             # If the new front is an assistant message, remove it too
             # to keep user/assistant alternation valid
             if self._messages and self._messages[0].get("role") == "assistant":
-                self._messages.pop(0)
+                self._pop_message(0)
                 removed += 1
-            est = _estimate_tokens(self._messages)
+            est = self._history_estimate()
 
         if removed:
             logger.info(
@@ -260,45 +541,129 @@ class ConversationClient:
                 est_tokens=est,
             )
 
-    async def _api_call_with_retry(self) -> anthropic.types.Message:
-        """Call the Anthropic API with retry on rate limit errors.
+    async def _compact_history(self) -> None:
+        """Replace the oldest turns with a summary message.
+
+        Compacts down to about half the budget in one go, so the new
+        prefix stays stable (and cacheable) for a while rather than being
+        rewritten every round. The span always ends just before an
+        assistant message, which the summary (a user message) then
+        precedes, so tool_use/tool_result pairs are never split.
+        """
+        budget = self._config.max_conversation_tokens
+        summary_room = budget // 4
+        target = budget // 2
+
+        cut = 0
+        remaining = self._history_tokens
+        for i in range(1, len(self._messages) - 1):
+            remaining -= self._token_counts[i - 1]
+            if self._messages[i].get("role") != "assistant":
+                continue
+            cut = i
+            if remaining * self._token_scale + summary_room <= target:
+                break
+        if not cut:
+            return
 
-        The synchronous Anthropic SDK call is run in a thread executor so
-        the asyncio event loop stays responsive — this allows the daemon
-        to detect client disconnection (cancel) while waiting for the API.
+        span = self._messages[:cut]
+        text, mode = await self._summarize(span, int(summary_room * _CHARS_PER_TOKEN))
+        removed_tokens = sum(self._token_counts[:cut])
+        for _ in range(cut):
+            self._pop_message(0)
+        self._insert_message(0, summary_message(text))
+
+        record = {
+            "at": time.time(),
+            "mode": mode,
+            "removed_messages": cut,
+            "removed_tokens": removed_tokens,
+            "summary_tokens": self._token_counts[0],
+        }
+        self._compactions.append(record)
+        logger.info("history_compacted", remaining=len(self._messages), **record)
+
+    async def _summarize(
+        self, span: list[dict[str, Any]], max_chars: int,
+    ) -> tuple[str, str]:
+        """Summary text for ``span`` and how it was made ("digest" or "model").
+
+        The digest is built from the span's tool calls and results. If
+        ``compaction_model`` is set, that model rewrites it with the
+        transcript in view; its reply is parsed back into the same
+        sections, and the digest is kept if the reply doesn't fit them.
         """
-        self._trim_history()
-        loop = asyncio.get_running_loop()
-
-        def _sync_create() -> anthropic.types.Message:
-            return self._client.messages.create(
-                model=self._config.model,
-                max_tokens=self._config.max_tokens,
-                system=self._system_prompt,
-                tools=self._registry.get_schemas(),
-                messages=self._messages,
+        def _mutates(name: str) -> bool:
+            tool = self._registry.get_tool(name)
+            return tool is not None and tool.mutates
+
+        digest = build_digest(span, _mutates)
+        text = digest.render(max_chars)
+        if not self._config.compaction_model:
+            return text, "digest"
+
+        try:
+            response = await self._client.messages.create(
+                model=self._config.compaction_model,
+                max_tokens=1024,
+                system=_COMPACTION_PROMPT,
+                messages=[{
+                    "role": "user",
+                    "content": f"Draft summary:\n{text}\n\nTranscript:\n{transcript(span)}",
+                }],
             )
+        except anthropic.APIError as e:
+            logger.warning("compaction_model_failed", error=str(e))
+            return text, "digest"
+        reply = "\n".join(b.text for b in response.content if b.type == "text")
+        written = Digest.parse(reply)
+        if not (written.findings or written.actions or written.conclusions):
+            return text, "digest"
+        # The model may drop what the digest has exactly
+        for server in digest.servers:
+            written.add("servers", server)
+        written.requests = written.requests or digest.requests
+        written.actions = written.actions or digest.actions
+        return written.render(max_chars), "model"
+
+    async def _api_call_with_retry(
+        self, on_tool_use: Callable[[Any], None],
+    ) -> anthropic.types.Message:
+        """Stream a response from the Anthropic API, retrying on rate limits.
+
+        Text deltas are sent to the UI as they arrive and ``on_tool_use``
+        is called with each tool_use block once its input is complete.
+        The stream runs as a task raced against the cancel event;
+        cancelling it closes the HTTP stream immediately.
+        """
+        await self._trim_history()
+        messages = (
+            _with_cache_breakpoint(self._messages) if self._prompt_cache else self._messages
+        )
+        tool_set = self._tool_set_key()
+        tools = self._current_tools()
 
         for attempt in range(_RATE_LIMIT_MAX_RETRIES + 1):
+            started = time.monotonic()
+            stream_task = asyncio.ensure_future(self._stream(messages, tools, on_tool_use))
             try:
-                api_future = loop.run_in_executor(None, _sync_create)
-
-                # Race the API call against the cancel event (if set)
+                # Race the stream against the cancel event (if set)
                 if self._cancel_event is not None:
                     cancel_future = asyncio.ensure_future(self._cancel_event.wait())
-                    done, pending = await asyncio.wait(
-                        {asyncio.ensure_future(api_future), cancel_future},
-                        return_when=asyncio.FIRST_COMPLETED,
-                    )
-                    for p in pending:
-                        p.cancel()
+                    try:
+                        await asyncio.wait(
+                            {stream_task, cancel_future},
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                    finally:
+                        cancel_future.cancel()
                     if self._cancel_event.is_set():
                         raise CancelledByUser()
-                    return done.pop().result()
-                else:
-                    return await api_future
-            except CancelledByUser:
-                raise
+                response = await stream_task
+                self._models.record(response, time.monotonic() - started)
+                if self._calibrate:
+                    await self._calibrate_tokens(response, tool_set)
+                return response
             except anthropic.RateLimitError:
                 if attempt >= _RATE_LIMIT_MAX_RETRIES:
                     raise
@@ -313,9 +678,89 @@ class ConversationClient:
                     f"(attempt {attempt + 1}/{_RATE_LIMIT_MAX_RETRIES})"
                 )
                 await asyncio.sleep(delay)
+            finally:
+                if not stream_task.done():
+                    stream_task.cancel()
+                    await asyncio.gather(stream_task, return_exceptions=True)
         # unreachable, but keeps type checkers happy
         raise RuntimeError("retry loop exited unexpectedly")
 
+    async def _calibrate_tokens(
+        self, response: anthropic.types.Message, tool_set: frozenset[str] | None,
+    ) -> None:
+        """Scale the history estimate to the API's real count for the last call.
+
+        The response's usage gives the exact input tokens of the request
+        that was just sent; subtracting the system prompt and tool schemas
+        (counted once per tool set with the token-counting endpoint) leaves the
+        history's true size. Runs before the response is appended, so the
+        cached per-message estimates still cover exactly what was sent.
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None or not self._history_tokens:
+            return
+        if tool_set not in self._overhead_tokens:
+            try:
+                counted = await self._client.messages.count_tokens(
+                    model=self._config.model,
+                    system=self._system,
+                    tools=self._tool_sets[tool_set],
+                    messages=[{"role": "user", "content": "."}],
+                )
+            except anthropic.APIError as e:
+                logger.warning("token_count_failed", error=str(e))
+                self._calibrate = False
+                return
+            self._overhead_tokens[tool_set] = counted.input_tokens
+        sent = (
+            usage.input_tokens
+            + (getattr(usage, "cache_read_input_tokens", None) or 0)
+            + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+        )
+        history = sent - self._overhead_tokens[tool_set]
+        if history > 0:
+            self._token_scale = history / self._history_tokens
+            logger.debug(
+                "token_estimate_calibrated",
+                estimated=self._history_tokens, actual=history,
+                scale=round(self._token_scale, 3),
+            )
+
+    async def _stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        on_tool_use: Callable[[Any], None],
+    ) -> anthropic.types.Message:
+        """Consume one streamed response, forwarding text and finished blocks."""
+        async with self._client.messages.stream(
+            model=self._models.model,
+            max_tokens=self._config.max_tokens,
+            system=self._system,
+            tools=tools,
+            messages=messages,
+        ) as stream:
+            async for event in stream:
+                if event.type == "text":
+                    self._ui.display_response_delta(event.text)
+                elif event.type == "content_block_stop":
+                    block = event.content_block
+                    if block.type == "tool_use":
+                        on_tool_use(block)
+                    elif block.type == "text" and block.text:
+                        self._ui.display_response(block.text)
+            return await stream.get_final_message()
+
+
+def _cancelled_result(tool_use_id: str) -> dict[str, Any]:
+    """tool_result for a call that was cancelled before it finished."""
+    return {
+        "type": "tool_result",
+        "tool_use_id": tool_use_id,
+        "content": "Operation cancelled by user.",
+        "is_error": True,
+    }
+
 
 def _truncate_tool_result(content: str) -> str:
     """Truncate a tool result string for message history.
@@ -333,22 +778,43 @@ def _truncate_tool_result(content: str) -> str:
     )
 
 
-def _estimate_tokens(messages: list[dict[str, Any]]) -> int:
-    """Rough token estimate for a message list.
+def _with_cache_breakpoint(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Copy of ``messages`` with a cache breakpoint on the last content block.
 
-    Counts total characters across all message content and divides by the
+    Everything up to the newest message is what the next round of the
+    same turn will resend, so the breakpoint makes that prefix a cache
+    read on the following call. The stored history is not modified —
+    breakpoints would otherwise pile up past the API's limit of four.
+    """
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last.get("content")
+    if isinstance(content, str):
+        blocks: list[Any] = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        blocks = list(content)
+    else:
+        return messages
+    blocks[-1] = {**blocks[-1], "cache_control": _CACHE_BREAKPOINT}
+    return [*messages[:-1], {**last, "content": blocks}]
+
+
+def _message_tokens(message: dict[str, Any]) -> int:
+    """Rough token estimate for one message.
+
+    Counts the characters of the message content and divides by the
     average chars-per-token ratio.  Not exact, but good enough for
     deciding when to trim.
     """
-    total_chars = 0
-    for msg in messages:
-        content = msg.get("content", "")
-        if isinstance(content, str):
-            total_chars += len(content)
-        elif isinstance(content, list):
-            for block in content:
-                if isinstance(block, dict):
-                    total_chars += len(json.dumps(block, default=str))
-                elif isinstance(block, str):
-                    total_chars += len(block)
-    return int(total_chars / _CHARS_PER_TOKEN)
+    chars = 0
+    content = message.get("content", "")
+    if isinstance(content, str):
+        chars += len(content)
+    elif isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict):
+                chars += len(json.dumps(block, default=str))
+            elif isinstance(block, str):
+                chars += len(block)
+    return int(chars / _CHARS_PER_TOKEN)
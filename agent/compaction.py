@@ -0,0 +1,247 @@
+"""Compaction of old conversation turns into a structured summary.
+
+When the history outgrows ``max_conversation_tokens`` the oldest turns
+are replaced by one summary message instead of being dropped, so an
+investigation keeps what it already learned: which servers were
+touched, what the operator asked, what was changed and what the tools
+found. The summary is built deterministically from the tool calls and
+results in the span; a model can optionally rewrite it.
+
+A later compaction folds the previous summary back in — it is parsed
+into a :class:`Digest` and extended with the newer turns.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+SUMMARY_HEADER = "[Earlier in this session, summarized to fit the context budget]"
+
+_SECTIONS = (
+    ("servers", "Servers touched"),
+    ("requests", "Operator requests"),
+    ("actions", "Actions taken"),
+    ("findings", "Findings"),
+    ("conclusions", "Conclusions"),
+)
+
+# Most recent entries kept per section
+_LIMITS = {"requests": 10, "actions": 20, "findings": 25, "conclusions": 6}
+_ITEM_CHARS = 200
+
+# Lines worth keeping from tool output
+_FLAGGED = re.compile(r"⚠|✗|\b(CRITICAL|WARN(ING)?|ERROR|FAIL(ED|URE)?|OOM)\b", re.IGNORECASE)
+
+
+def _clip(text: str, limit: int = _ITEM_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+@dataclass
+class Digest:
+    """Structured summary of compacted turns."""
+
+    servers: list[str] = field(default_factory=list)
+    requests: list[str] = field(default_factory=list)
+    actions: list[str] = field(default_factory=list)
+    findings: list[str] = field(default_factory=list)
+    conclusions: list[str] = field(default_factory=list)
+
+    def add(self, section: str, item: str) -> None:
+        """Add an item to a section, skipping empties and duplicates."""
+        item = item if section == "servers" else _clip(item)
+        items: list[str] = getattr(self, section)
+        if item and item not in items:
+            items.append(item)
+            limit = _LIMITS.get(section)
+            if limit is not None and len(items) > limit:
+                del items[0]
+
+    def render(self, max_chars: int | None = None) -> str:
+        """Summary text, dropping the oldest items until it fits ``max_chars``."""
+        text = self._render()
+        while max_chars is not None and len(text) > max_chars:
+            longest = max(
+                (name for name, _ in _SECTIONS if name != "servers"),
+                key=lambda name: len(getattr(self, name)),
+            )
+            items = getattr(self, longest)
+            if not items:
+                break
+            del items[0]
+            text = self._render()
+        return text
+
+    def _render(self) -> str:
+        lines = [SUMMARY_HEADER]
+        if self.servers:
+            lines.append(f"Servers touched: {', '.join(self.servers)}")
+        for name, title in _SECTIONS[1:]:
+            items = getattr(self, name)
+            if items:
+                lines.append(f"{title}:")
+                lines.extend(f"- {item}" for item in items)
+        return "\n".join(lines)
+
+    @classmethod
+    def parse(cls, text: str) -> Digest:
+        """Rebuild a digest from a rendered summary."""
+        digest = cls()
+        titles = {title: name for name, title in _SECTIONS}
+        section: str | None = None
+        for line in text.splitlines():
+            line = line.strip()
+            if line.startswith("Servers touched:"):
+                for server in line.split(":", 1)[1].split(","):
+                    digest.add("servers", server.strip())
+            elif line.endswith(":") and line[:-1] in titles:
+                section = titles[line[:-1]]
+            elif line.startswith("- ") and section is not None:
+                digest.add(section, line[2:])
+        return digest
+
+
+def summary_text(message: dict[str, Any]) -> str | None:
+    """Text of a compaction summary message, or None for any other message."""
+    content = message.get("content")
+    if message.get("role") != "user" or not isinstance(content, list) or len(content) != 1:
+        return None
+    block = content[0]
+    if isinstance(block, dict) and block.get("type") == "text":
+        text = block.get("text", "")
+        if text.startswith(SUMMARY_HEADER):
+            return text
+    return None
+
+
+def summary_message(text: str) -> dict[str, Any]:
+    """User message carrying a summary.
+
+    List content keeps it out of the session's turn count and preview.
+    """
+    return {"role": "user", "content": [{"type": "text", "text": text}]}
+
+
+def build_digest(
+    messages: list[dict[str, Any]],
+    mutates: Callable[[str], bool] = lambda name: False,
+) -> Digest:
+    """Summarize a span of messages from its tool calls and results.
+
+    Args:
+        messages: The span being compacted (may start with a previous summary).
+        mutates: Whether a tool name changes state (its calls are actions,
+            everything else is a finding).
+    """
+    digest = Digest()
+    calls: dict[str, dict[str, Any]] = {}
+    for message in messages:
+        previous = summary_text(message)
+        if previous is not None:
+            digest = Digest.parse(previous)
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            if message.get("role") == "user":
+                digest.add("requests", content)
+            continue
+        if not isinstance(content, list):
+            continue
+        texts: list[str] = []
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            kind = block.get("type")
+            if kind == "tool_use":
+                calls[block.get("id", "")] = block
+                server = (block.get("input") or {}).get("server")
+                if isinstance(server, str) and server:
+                    digest.add("servers", server)
+            elif kind == "tool_result":
+                call = calls.get(block.get("tool_use_id", ""))
+                if call is not None:
+                    _add_result(digest, call, block, mutates(call.get("name", "")))
+            elif kind == "text" and message.get("role") == "assistant" and block.get("text"):
+                texts.append(block["text"])
+        if texts:
+            digest.add("conclusions", texts[-1])
+    return digest
+
+
+def _describe_call(call: dict[str, Any]) -> str:
+    args = " ".join(
+        f"{k}={v}" for k, v in (call.get("input") or {}).items()
+        if isinstance(v, (str, int, float, bool))
+    )
+    return f"{call.get('name', '?')} {args}".strip()
+
+
+def _add_result(
+    digest: Digest, call: dict[str, Any], block: dict[str, Any], mutating: bool,
+) -> None:
+    raw = block.get("content", "")
+    if isinstance(raw, list):
+        raw = " ".join(b.get("text", "") for b in raw if isinstance(b, dict))
+    try:
+        result = json.loads(raw)
+    except (TypeError, ValueError):
+        # Truncated in history: no longer valid JSON
+        result = {"output": str(raw).replace("\\n", "\n")}
+    if not isinstance(result, dict):
+        result = {"output": str(result)}
+    output = str(result.get("output") or "")
+    data = result.get("data")
+    if not output and isinstance(data, dict):
+        if "issues" in data:
+            # Compact payload: its issues are the flagged lines
+            issues = [i for i in data["issues"] or [] if isinstance(i, dict)]
+            output = "\n".join(f"{i.get('sev', '')} {i.get('msg', '')}" for i in issues) or "no issues"
+        else:
+            # e.g. a delta against the previous identical call
+            output = json.dumps(data, ensure_ascii=False)
+    error = str(result.get("error") or "")
+    failed = block.get("is_error") or (error and not output) or result.get("exit_code", 0) not in (0, None)
+
+    if mutating:
+        outcome = f"failed: {error or output}" if failed else "ok"
+        digest.add("actions", f"{_describe_call(call)} -> {outcome}")
+        return
+
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    flagged = [line for line in lines if _FLAGGED.search(line)]
+    if failed:
+        detail = f"error: {error or output}"
+    elif flagged:
+        detail = "; ".join(flagged[:3])
+    elif lines:
+        detail = lines[0]
+    else:
+        detail = "no output"
+    digest.add("findings", f"{_describe_call(call)}: {detail}")
+
+
+def transcript(messages: list[dict[str, Any]], result_chars: int = 1500) -> str:
+    """Plain-text rendering of a span, for a model to summarize."""
+    out: list[str] = []
+    for message in messages:
+        role = message.get("role", "?")
+        content = message.get("content")
+        if isinstance(content, str):
+            out.append(f"{role}: {content}")
+            continue
+        for block in content if isinstance(content, list) else []:
+            if not isinstance(block, dict):
+                continue
+            kind = block.get("type")
+            if kind == "text":
+                out.append(f"{role}: {block.get('text', '')}")
+            elif kind == "tool_use":
+                out.append(f"tool call: {_describe_call(block)}")
+            elif kind == "tool_result":
+                out.append(f"tool result: {str(block.get('content', ''))[:result_chars]}")
+    return "\n".join(out)
@@ -31,12 +31,170 @@ class AgentConfig(BaseModel):
     audit_log_path: str = "./logs/audit.jsonl"
     approval_mode: ApprovalMode = ApprovalMode.INTERACTIVE
     socket_path: str = "/run/bastion-agent/agent.sock"
+    fast_model: str = Field(
+        default="",
+        description="Model for turns that read as quick questions (status checks, "
+        "listings, client replies), e.g. a Haiku model. A fast turn moves to `model` "
+        "when it calls a diagnosis tool, a tool fails or it runs long. Empty uses "
+        "`model` for every turn.",
+    )
+    fast_model_max_iterations: int = Field(
+        default=3, ge=1, le=50,
+        description="API rounds a turn may run on fast_model before moving to `model`.",
+    )
     max_conversation_tokens: int = Field(
         default=25000, ge=1000, le=200000,
-        description="Approximate input token budget. Oldest messages are "
-        "dropped when the conversation exceeds this limit.",
+        description="Approximate input token budget. When the conversation exceeds "
+        "it, the oldest turns are summarized (compact_history); oldest messages are "
+        "only dropped if that is not enough or compaction is off.",
+    )
+    max_parallel_tools: int = Field(
+        default=4, ge=1, le=32,
+        description="Tool calls from one assistant turn that may run at once. "
+        "1 runs them one after another.",
+    )
+    tool_routing: bool = Field(
+        default=True,
+        description="Send only core tools plus the families (cPanel, WordPress, web, "
+        "MySQL, game) a message calls for; the model can attach others with load_tools.",
+    )
+    prompt_cache: bool = Field(
+        default=True,
+        description="Mark the system prompt, tool schemas and conversation prefix "
+        "as cacheable so repeat API calls reuse them instead of re-processing.",
+    )
+    compact_history: bool = Field(
+        default=True,
+        description="When over max_conversation_tokens, replace the oldest turns "
+        "with a summary of servers, findings and actions instead of dropping them.",
+    )
+    compaction_model: str = Field(
+        default="",
+        description="Model that rewrites the compaction summary from the transcript "
+        "(e.g. a Haiku model). Empty builds it from tool results only.",
+    )
+    exact_token_counts: bool = Field(
+        default=False,
+        description="Calibrate the history token estimate against the API's real "
+        "input token counts (one token-counting request per client, then the "
+        "usage reported with each response).",
+    )
+    compact_tool_results: bool = Field(
+        default=True,
+        description="Send the model the compact JSON summary (issues, metrics, entities) "
+        "of tools that provide one instead of their formatted report.",
+    )
+    tool_delta_window: int = Field(
+        default=600, ge=0, le=86400,
+        description="When a polling tool (docker_ps, mysql_processlist, "
+        "pterodactyl_server_status) is called again with the same input within this "
+        "many seconds, send the model only the rows that changed (needs "
+        "compact_tool_results). 0 disables.",
+    )
+    tool_output_store: bool = Field(
+        default=True,
+        description="Keep tool outputs too long for the history in a local store and "
+        "send the model a preview plus a handle it can page through with read_tool_output.",
+    )
+    tool_output_memory_mb: int = Field(
+        default=64, ge=1, le=4096,
+        description="Memory for stored tool outputs; least recently read ones spill to disk.",
+    )
+    tool_output_disk_mb: int = Field(
+        default=256, ge=0, le=65536,
+        description="Disk for spilled tool outputs in the state directory (0 = memory only).",
     )
     sessions_dir: str = "./sessions"
+    tool_cache: bool = Field(
+        default=True,
+        description="Reuse results of read-only tools called again with identical "
+        "input within the tool's TTL. Mutating tools invalidate the server's entries.",
+    )
+    ssh_idle_ttl: int = Field(
+        default=900, ge=30, le=86400,
+        description="Close pooled SSH connections idle for longer than this (seconds).",
+    )
+    ssh_max_connections: int = Field(
+        default=100, ge=1, le=1000,
+        description="Global cap on pooled SSH connections; least recently used "
+        "idle connections are evicted beyond it.",
+    )
+    ssh_prewarm: bool = Field(
+        default=False,
+        description="Open SSH connections to the inventory at daemon/monitor "
+        "startup so the first tool call hits a warm connection.",
+    )
+    ssh_prewarm_roles: list[str] = Field(
+        default_factory=list,
+        description="Only pre-warm servers with these roles (empty = all SSH servers).",
+    )
+    ssh_prewarm_concurrency: int = Field(
+        default=10, ge=1, le=200,
+        description="Maximum number of SSH handshakes in flight while pre-warming.",
+    )
+    ssh_health_interval: int = Field(
+        default=60, ge=5, le=3600,
+        description="How often the background task probes idle pooled connections "
+        "and reopens broken ones (seconds).",
+    )
+    ssh_breaker_threshold: int = Field(
+        default=1, ge=1, le=20,
+        description="Consecutive failed connects (each already retried) before a "
+        "host's circuit breaker opens and calls to it fail fast.",
+    )
+    ssh_breaker_cooldown: int = Field(
+        default=60, ge=5, le=3600,
+        description="Seconds an open breaker waits before a single reconnect "
+        "probe (half-open) is allowed.",
+    )
+    ssh_adaptive_timeouts: bool = Field(
+        default=True,
+        description="Derive per-host command timeouts from recorded latency "
+        "(p99 x ssh_timeout_factor, p95 while history is short) instead of fixed "
+        "defaults, so hung commands on fast hosts fail fast and slow hosts get "
+        "longer. History is kept in the state directory.",
+    )
+    ssh_timeout_factor: float = Field(
+        default=3.0, ge=1.0, le=20.0,
+        description="Multiplier applied to a command's observed latency quantile "
+        "to get its learned timeout.",
+    )
+    ssh_timeout_min: int = Field(
+        default=5, ge=1, le=300,
+        description="Lower bound for a learned command timeout (seconds).",
+    )
+    ssh_timeout_max: int = Field(
+        default=120, ge=5, le=3600,
+        description="Upper bound for a learned command timeout (seconds). A tool "
+        "call as a whole is still capped by command_timeout.",
+    )
+    ssh_broker: bool = Field(
+        default=False,
+        description="The daemon serves its SSH connections to other bastion "
+        "processes (monitor, anomaly-monitor, run) running as the same user over an "
+        "owner-only unix socket; they use it when the daemon is running and connect "
+        "directly otherwise. Brokered commands must pass the server's role allowlist "
+        "and are audited.",
+    )
+    ssh_broker_socket: str = Field(
+        default="",
+        description="Broker socket path (empty = ssh-broker.sock next to socket_path).",
+    )
+    host_facts_ttl: int = Field(
+        default=86400, ge=0, le=30 * 86400,
+        description="How long per-host facts (CPU count, installed panels and "
+        "tools, log paths) are reused before the host is probed again (seconds). "
+        "0 disables the facts cache; `bastion facts --refresh` re-probes on demand.",
+    )
+    domain_index: bool = Field(
+        default=True,
+        description="Keep a domain -> cPanel account -> server index of the webhost "
+        "servers in the state directory so site tools can take just a domain.",
+    )
+    domain_index_interval: int = Field(
+        default=1800, ge=60, le=86400,
+        description="How often the daemon re-indexes each cPanel server (seconds).",
+    )
 
 
 class RolePermissions(BaseModel):
@@ -71,6 +229,17 @@ class ServerDefinition(BaseModel):
         description="Basic auth credentials for metrics URL (user:password). "
         "If the value starts with '$', it is read from that environment variable.",
     )
+    max_sessions: int = Field(
+        default=8, ge=1, le=64,
+        description="Max concurrent SSH channels on this host's pooled connection. "
+        "Keep below the server's sshd MaxSessions (OpenSSH default 10); extra "
+        "commands queue FIFO until a channel frees up.",
+    )
+    adaptive_sessions: bool = Field(
+        default=False,
+        description="Adjust the channel limit AIMD-style (up to max_sessions) from "
+        "observed channel-open failures and latency.",
+    )
 
     @field_validator("key_path")
     @classmethod
@@ -0,0 +1,415 @@
+"""Domain → cPanel account → server index for the fleet.
+
+Site-level tools need to know which server and which cPanel user own a
+domain before they can do anything, and asking ``whmapi1`` for every
+lookup costs a round trip (or the operator has to know the answer).
+The index is built from ``listaccts`` and ``get_domain_info`` on every
+cPanel server — both fetched in one batched exec per server — kept in
+SQLite in the state directory and refreshed in the background by the
+daemon, so a lookup is a local query.
+
+Neither a hit nor a miss is trusted blindly: a hit from a server not
+indexed within the refresh interval is re-checked by refreshing that
+server (the domain may have migrated), and a miss refreshes the stale
+servers once and retries; otherwise tools fall back to asking the
+server directly. Servers dropped from the inventory are purged on
+refresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agent.inventory import Inventory
+from agent.tools.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+_STATE_DIR = Path(os.environ.get("BASTION_STATE_DIR", "./state"))
+INDEX_FILE = _STATE_DIR / "domain_index.sqlite3"
+
+_DEFAULT_INTERVAL = 1800
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT NOT NULL,
+    server TEXT NOT NULL,
+    user TEXT NOT NULL,
+    docroot TEXT NOT NULL DEFAULT '',
+    domain_type TEXT NOT NULL DEFAULT '',
+    main_domain TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (domain, server)
+);
+CREATE INDEX IF NOT EXISTS domains_server ON domains (server);
+CREATE TABLE IF NOT EXISTS accounts (
+    server TEXT NOT NULL,
+    user TEXT NOT NULL,
+    main_domain TEXT NOT NULL DEFAULT '',
+    plan TEXT NOT NULL DEFAULT '',
+    suspended INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (server, user)
+);
+CREATE TABLE IF NOT EXISTS servers (
+    server TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+_BATCH = {
+    "accounts": "whmapi1 listaccts --output=json",
+    "domains": "whmapi1 get_domain_info --output=json",
+}
+
+
+@dataclass(frozen=True)
+class DomainOwner:
+    """Where a domain lives and who owns it."""
+
+    domain: str
+    server: str
+    user: str
+    docroot: str
+    domain_type: str
+    main_domain: str
+    refreshed_at: float
+
+
+def cpanel_servers(inventory: Inventory) -> list[str]:
+    """Inventory servers running cPanel (``webhost`` role or a ``cpanel`` service)."""
+    names: list[str] = []
+    for name in inventory.server_names:
+        defn = inventory.get_server(name).definition
+        if defn.role in ("webhost", "cpanel") or "cpanel" in defn.services:
+            names.append(name)
+    return names
+
+
+def normalize_domain(domain: str) -> str:
+    """Lowercase a domain (or URL) and drop scheme, port, path and trailing dot."""
+    domain = domain.strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/", 1)[0].split("@")[-1].split(":", 1)[0]
+    return domain.rstrip(".")
+
+
+def parse_accounts(raw_json: str) -> list[dict[str, Any]]:
+    """Accounts from ``whmapi1 listaccts`` output (empty on bad JSON)."""
+    try:
+        accounts = json.loads(raw_json).get("data", {}).get("acct", [])
+    except (json.JSONDecodeError, AttributeError):
+        return []
+    return [
+        {
+            "user": a["user"],
+            "main_domain": normalize_domain(a.get("domain") or ""),
+            "plan": a.get("plan") or "",
+            "suspended": 1 if str(a.get("suspended", 0)) not in ("0", "", "False") else 0,
+        }
+        for a in accounts if isinstance(a, dict) and a.get("user")
+    ]
+
+
+def parse_domains(raw_json: str) -> list[dict[str, str]]:
+    """Domains from ``whmapi1 get_domain_info`` output (empty on bad JSON)."""
+    try:
+        domains = json.loads(raw_json).get("data", {}).get("domains", [])
+    except (json.JSONDecodeError, AttributeError):
+        return []
+    return [
+        {
+            "domain": normalize_domain(d["domain"]),
+            "user": d["user"],
+            "docroot": d.get("docroot") or "",
+            "domain_type": d.get("domain_type") or "",
+            "main_domain": normalize_domain(d.get("parent_domain") or ""),
+        }
+        for d in domains if isinstance(d, dict) and d.get("domain") and d.get("user")
+    ]
+
+
+class DomainIndex:
+    """SQLite-backed domain ownership index for the cPanel servers."""
+
+    def __init__(
+        self, *, path: Path | str = ":memory:", interval: float = _DEFAULT_INTERVAL,
+        enabled: bool = True,
+    ) -> None:
+        self.path = path
+        self.interval = interval
+        self.enabled = enabled
+        self._db: sqlite3.Connection | None = None
+        self._flights = SingleFlight()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), timeout=5)
+            self._db.executescript(_SCHEMA)
+            if self.path != ":memory:":
+                # The daemon refreshes while CLI runs read
+                self._db.execute("PRAGMA journal_mode=WAL")
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ── Queries ──────────────────────────────────────────────────
+
+    def lookup(self, domain: str) -> DomainOwner | None:
+        """Owner of ``domain`` (or its ``www.``-less form), most recently indexed first."""
+        if not self.enabled:
+            return None
+        name = normalize_domain(domain)
+        candidates = [name]
+        if name.startswith("www."):
+            candidates.append(name[4:])
+        try:
+            for candidate in candidates:
+                row = self._conn().execute(
+                    "SELECT d.domain, d.server, d.user, d.docroot, d.domain_type, "
+                    "d.main_domain, s.refreshed_at FROM domains d "
+                    "JOIN servers s ON s.server = d.server "
+                    "WHERE d.domain = ? ORDER BY s.refreshed_at DESC LIMIT 1",
+                    (candidate,),
+                ).fetchone()
+                if row is not None:
+                    return DomainOwner(*row)
+        except sqlite3.Error as e:
+            logger.warning("domain_index_query_failed", error=str(e))
+        return None
+
+    def refreshed_at(self, server: str) -> float | None:
+        """When ``server`` was last indexed (None if never)."""
+        try:
+            row = self._conn().execute(
+                "SELECT refreshed_at FROM servers WHERE server = ?", (server,),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def is_fresh(self, server: str) -> bool:
+        """Whether ``server`` was indexed within the refresh interval."""
+        refreshed = self.refreshed_at(server)
+        return (
+            self.enabled and refreshed is not None
+            and time.time() - refreshed <= self.interval
+        )
+
+    def accounts(self, server: str) -> list[str]:
+        """cPanel usernames indexed for ``server``."""
+        rows = self._conn().execute(
+            "SELECT user FROM accounts WHERE server = ? ORDER BY user", (server,),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def domain_map(self, server: str) -> dict[str, str]:
+        """Domain → cPanel user for every domain indexed on ``server``."""
+        rows = self._conn().execute(
+            "SELECT domain, user FROM domains WHERE server = ? ORDER BY domain", (server,),
+        ).fetchall()
+        return dict(rows)
+
+    def stats(self) -> dict[str, int]:
+        conn = self._conn()
+        return {
+            "servers": conn.execute("SELECT COUNT(*) FROM servers").fetchone()[0],
+            "accounts": conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0],
+            "domains": conn.execute("SELECT COUNT(*) FROM domains").fetchone()[0],
+        }
+
+    # ── Refresh ──────────────────────────────────────────────────
+
+    def prune(self, servers: list[str]) -> int:
+        """Delete everything indexed for servers not in ``servers``.
+
+        Returns:
+            Number of servers purged.
+        """
+        conn = self._conn()
+        indexed = conn.execute(
+            "SELECT server FROM servers UNION SELECT server FROM domains "
+            "UNION SELECT server FROM accounts"
+        ).fetchall()
+        gone = sorted(r[0] for r in indexed if r[0] not in servers)
+        if not gone:
+            return 0
+        with conn:
+            for table in ("servers", "domains", "accounts"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE server = ?", [(s,) for s in gone],
+                )
+        logger.info("domain_index_pruned", servers=gone)
+        return len(gone)
+
+    def store(
+        self, server: str, host: str,
+        accounts: list[dict[str, Any]], domains: list[dict[str, str]],
+    ) -> None:
+        """Replace everything indexed for ``server`` in one transaction."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM accounts WHERE server = ?", (server,))
+            conn.execute("DELETE FROM domains WHERE server = ?", (server,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?, ?)",
+                [(server, a["user"], a["main_domain"], a["plan"], a["suspended"])
+                 for a in accounts],
+            )
+            rows = [
+                (d["domain"], server, d["user"], d["docroot"], d["domain_type"],
+                 d["main_domain"])
+                for d in domains
+            ]
+            # listaccts alone still knows each account's main domain
+            known = {d["domain"] for d in domains}
+            rows.extend(
+                (a["main_domain"], server, a["user"], "", "main", "")
+                for a in accounts if a["main_domain"] and a["main_domain"] not in known
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO domains VALUES (?, ?, ?, ?, ?, ?)", rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO servers VALUES (?, ?, ?)",
+                (server, host, time.time()),
+            )
+
+    async def refresh_server(self, inventory: Inventory, server: str) -> bool:
+        """Re-index one server; concurrent refreshes of it share one fetch.
+
+        Returns:
+            True if the server was indexed, False if fetching either
+            list failed (the previous entries are kept and stay stale).
+        """
+        return await self._flights.do(server, lambda: self._refresh(inventory, server))
+
+    async def _refresh(self, inventory: Inventory, server: str) -> bool:
+        from agent.tools.docker_tools import _run_batch_on_server
+
+        try:
+            host = inventory.get_server(server).definition.host
+        except KeyError:
+            return False
+        results = await _run_batch_on_server(inventory, server, _BATCH, timeout=60)
+        accounts_result, domains_result = results["accounts"], results["domains"]
+        # Half an answer would replace the server's rows with a partial
+        # copy marked fresh: keep the previous entries instead
+        if not (accounts_result.success and domains_result.success):
+            logger.warning(
+                "domain_index_refresh_failed", server=server,
+                error=accounts_result.error or domains_result.error,
+            )
+            return False
+        accounts = parse_accounts(accounts_result.output)
+        domains = parse_domains(domains_result.output)
+        try:
+            self.store(server, host, accounts, domains)
+        except sqlite3.Error as e:
+            logger.warning("domain_index_store_failed", server=server, error=str(e))
+            return False
+        logger.info(
+            "domain_index_refreshed", server=server,
+            accounts=len(accounts), domains=len(domains),
+        )
+        return True
+
+    async def refresh(self, inventory: Inventory, *, stale_only: bool = False) -> int:
+        """Re-index the cPanel servers (only stale ones if ``stale_only``).
+
+        Entries for servers no longer in the inventory are purged first.
+
+        Returns:
+            Number of servers successfully indexed.
+        """
+        current = cpanel_servers(inventory)
+        try:
+            self.prune(current)
+        except sqlite3.Error as e:
+            logger.warning("domain_index_prune_failed", error=str(e))
+        servers = [s for s in current if not (stale_only and self.is_fresh(s))]
+        if not servers:
+            return 0
+        results = await asyncio.gather(
+            *[self.refresh_server(inventory, s) for s in servers],
+            return_exceptions=True,
+        )
+        return sum(1 for r in results if r is True)
+
+    async def run(self, inventory: Inventory) -> None:
+        """Keep the index fresh until cancelled (daemon background task)."""
+        while True:
+            try:
+                await self.refresh(inventory, stale_only=True)
+            except Exception:
+                logger.exception("domain_index_loop_error")
+            await asyncio.sleep(max(60.0, self.interval / 2))
+
+    async def resolve(self, inventory: Inventory, domain: str) -> DomainOwner | None:
+        """Owner of ``domain`` from a fresh index entry.
+
+        A hit from a stale server refreshes that server and looks again;
+        a miss refreshes the stale servers once and retries. A domain
+        only found on servers that could not be refreshed is a miss.
+        """
+        if not self.enabled:
+            return None
+        owner = self.lookup(domain)
+        if owner is not None and self.is_fresh(owner.server):
+            return owner
+        if owner is not None and await self.refresh_server(inventory, owner.server):
+            owner = self.lookup(domain)
+            if owner is not None and self.is_fresh(owner.server):
+                return owner
+        if await self.refresh(inventory, stale_only=True):
+            owner = self.lookup(domain)
+            if owner is not None and self.is_fresh(owner.server):
+                return owner
+        return None
+
+
+# ── Process-wide index ───────────────────────────────────────────
+
+_index = DomainIndex()
+
+
+def get_domain_index() -> DomainIndex:
+    """The process-wide index used by tools."""
+    return _index
+
+
+def configure_domain_index(
+    *, path: Path | str = INDEX_FILE, interval: float | None = None,
+    enabled: bool | None = None,
+) -> DomainIndex:
+    """Apply settings (e.g. from AgentConfig) and open the persisted index.
+
+    Until this is called the process-wide index lives in memory only.
+    """
+    if path != _index.path:
+        _index.close()
+        _index.path = path
+    if interval is not None:
+        _index.interval = interval
+    if enabled is not None:
+        _index.enabled = enabled
+    return _index
+
+
+async def resolve_domain(inventory: Inventory, domain: str) -> DomainOwner | None:
+    """Owner of ``domain`` from the process-wide index (see ``DomainIndex.resolve``)."""
+    return await _index.resolve(inventory, domain)
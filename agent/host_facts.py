@@ -0,0 +1,339 @@
+"""Per-host facts discovered once and cached in the state directory.
+
+Many tools start by discovering things about a host that almost never
+change: how many CPUs it has, whether cPanel, docker or wp-cli are
+installed, which of five candidate log files exists. Done per call, that
+is a round trip (or five) before any real work. ``get_host_facts`` runs
+one probe script per host, keeps the result for ``ttl`` seconds (across
+restarts, in ``host_facts.json``) and lets tools skip the discovery.
+
+Facts are hints, not guarantees: a path the probe did not look at is
+reported as unknown (``None``) and callers fall back to checking it
+themselves. ``bastion facts --refresh`` re-probes on demand, e.g. after
+installing cPanel on a host.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agent.inventory import Inventory
+from agent.tools.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+_STATE_DIR = Path(os.environ.get("BASTION_STATE_DIR", "./state"))
+FACTS_FILE = _STATE_DIR / "host_facts.json"
+
+_DEFAULT_TTL = 86400
+
+# Binaries whose presence decides which checks make sense on a host.
+_PROBE_BINARIES: tuple[str, ...] = ("docker", "whmapi1", "wp", "mysql", "nginx", "httpd")
+
+# Paths tools otherwise discover one ``test -f`` at a time.
+_PROBE_PATHS: tuple[str, ...] = (
+    # Web server logs (access, error, cPanel domlogs directories)
+    "/var/log/apache2/access_log",
+    "/etc/httpd/logs/access_log",
+    "/var/log/httpd/access_log",
+    "/usr/local/apache/logs/access_log",
+    "/var/log/nginx/access.log",
+    "/var/log/apache2/error_log",
+    "/etc/httpd/logs/error_log",
+    "/var/log/httpd/error_log",
+    "/usr/local/apache/logs/error_log",
+    "/var/log/nginx/error.log",
+    "/var/log/apache2/domlogs",
+    "/etc/httpd/domlogs",
+    # MySQL slow query logs
+    "/var/log/mysql/slow-query.log",
+    "/var/lib/mysql/slow-query.log",
+    "/var/log/mariadb/slow-query.log",
+    "/var/log/mysql/mysql-slow.log",
+    # Backups
+    "/backup",
+    "/backup/cpbackup/daily",
+    "/backup/cpbackup/weekly",
+    "/backup/cpbackup/monthly",
+    "/var/cpanel/backups/config",
+    "/usr/local/jetapps/etc/jetbackup5",
+    "/srv/pterodactyl/backups",
+    "/srv/pelican/backups",
+    "/var/lib/automysqlbackup",
+    # Panels
+    "/usr/local/cpanel/cpanel.config",
+    "/etc/pterodactyl/config.yml",
+)
+
+
+def _probe_script() -> str:
+    """Shell script printing ``key=value`` lines for every fact."""
+    binaries = " ".join(_PROBE_BINARIES)
+    paths = " ".join(shlex.quote(p) for p in _PROBE_PATHS)
+    wings_key = r"s/^[[:space:]]*{key}:[[:space:]]*//p"
+    return "; ".join([
+        'echo "nproc=$(nproc 2>/dev/null)"',
+        '[ -r /etc/os-release ] && (. /etc/os-release; echo "os=$PRETTY_NAME")',
+        f'for b in {binaries}; do command -v "$b" >/dev/null 2>&1 && echo "bin=$b"; done',
+        'echo "cgroup=$(stat -fc %T /sys/fs/cgroup 2>/dev/null)"',
+        "[ -x /usr/local/cpanel/cpanel ]"
+        ' && echo "cpanel=$(/usr/local/cpanel/cpanel -V 2>/dev/null)"',
+        "[ -f /etc/pterodactyl/config.yml ]"
+        " && echo \"wings_data=$(sed -n '" + wings_key.format(key="data")
+        + "' /etc/pterodactyl/config.yml | head -n1)\""
+        " && echo \"wings_backups=$(sed -n '" + wings_key.format(key="backup_directory")
+        + "' /etc/pterodactyl/config.yml | head -n1)\"",
+        f'for p in {paths}; do [ -e "$p" ] && echo "path=$p"; done',
+        "true",
+    ])
+
+
+@dataclass
+class HostFacts:
+    """What the probe found on one host.
+
+    ``binaries`` and ``paths`` hold only what exists; ``probed_paths``
+    records what was looked at, so absence is only claimed for those.
+    """
+
+    host: str
+    gathered_at: float
+    nproc: int | None = None
+    os: str = ""
+    cgroup_version: int | None = None
+    cpanel_version: str = ""
+    wings_data: str = ""
+    wings_backups: str = ""
+    binaries: list[str] = field(default_factory=list)
+    paths: list[str] = field(default_factory=list)
+    probed_paths: list[str] = field(default_factory=list)
+
+    def has(self, binary: str) -> bool | None:
+        """Whether ``binary`` is on the host's PATH (None if not probed)."""
+        if binary not in _PROBE_BINARIES:
+            return None
+        return binary in self.binaries
+
+    def exists(self, path: str) -> bool | None:
+        """Whether ``path`` exists (None if the probe can't tell).
+
+        A path under a probed directory that was missing is known not
+        to exist either.
+        """
+        if path in self.probed_paths:
+            return path in self.paths
+        parent = path.rstrip("/").rsplit("/", 1)[0]
+        if parent in self.probed_paths and parent not in self.paths:
+            return False
+        return None
+
+    @property
+    def is_cpanel(self) -> bool:
+        return bool(self.cpanel_version) or "/usr/local/cpanel/cpanel.config" in self.paths
+
+    @property
+    def is_wings(self) -> bool:
+        return "/etc/pterodactyl/config.yml" in self.paths
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> HostFacts | None:
+        try:
+            return cls(**data)
+        except TypeError:
+            return None  # layout changed — probe again
+
+
+def parse_probe_output(host: str, output: str) -> HostFacts:
+    """Build HostFacts from the probe script's ``key=value`` lines."""
+    facts = HostFacts(host=host, gathered_at=time.time(), probed_paths=list(_PROBE_PATHS))
+    for line in output.splitlines():
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        value = value.strip()
+        if key == "nproc":
+            facts.nproc = int(value) if value.isdigit() else None
+        elif key == "os":
+            facts.os = value
+        elif key == "bin":
+            facts.binaries.append(value)
+        elif key == "cgroup":
+            if value == "cgroup2fs":
+                facts.cgroup_version = 2
+            elif value == "tmpfs":
+                facts.cgroup_version = 1
+        elif key == "cpanel":
+            facts.cpanel_version = value
+        elif key == "wings_data":
+            facts.wings_data = value.strip("'\"")
+        elif key == "wings_backups":
+            facts.wings_backups = value.strip("'\"")
+        elif key == "path":
+            facts.paths.append(value)
+    return facts
+
+
+class HostFactsStore:
+    """Host facts keyed by server name, persisted as JSON."""
+
+    def __init__(self, *, path: Path | None = None, ttl: float = _DEFAULT_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._facts: dict[str, HostFacts] = {}
+        self._flights = SingleFlight()
+        self.probes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def cached(self, server: str, host: str) -> HostFacts | None:
+        """Fresh facts for ``server`` if it still points at ``host``."""
+        facts = self._facts.get(server)
+        if facts is None or facts.host != host:
+            return None
+        if time.time() - facts.gathered_at > self.ttl:
+            return None
+        return facts
+
+    async def get(
+        self, inventory: Inventory, server: str, *, refresh: bool = False,
+    ) -> HostFacts | None:
+        """Facts for ``server``, probing the host if they are missing or stale.
+
+        Returns:
+            The facts, or None if disabled, the server is unknown or the
+            probe failed (callers then discover things themselves).
+        """
+        if not self.enabled and not refresh:
+            return None
+        try:
+            host = inventory.get_server(server).definition.host
+        except KeyError:
+            return None
+        if not refresh:
+            facts = self.cached(server, host)
+            if facts is not None:
+                return facts
+        return await self._flights.do(server, lambda: self._probe(inventory, server, host))
+
+    async def _probe(self, inventory: Inventory, server: str, host: str) -> HostFacts | None:
+        from agent.tools.docker_tools import _run_on_server
+
+        self.probes += 1
+        result = await _run_on_server(
+            inventory, server, f"sh -c {shlex.quote(_probe_script())}",
+        )
+        if not result.success or not result.output.strip():
+            logger.warning(
+                "host_facts_probe_failed", server=server,
+                error=result.error or f"exit {result.exit_code}",
+            )
+            return None
+        facts = parse_probe_output(host, result.output)
+        self._facts[server] = facts
+        logger.info(
+            "host_facts_gathered", server=server, nproc=facts.nproc,
+            binaries=facts.binaries, cpanel=facts.cpanel_version or None,
+        )
+        self.save()
+        return facts
+
+    def forget(self, server: str | None = None) -> None:
+        """Drop cached facts for one server (or all) so the next call probes."""
+        if server is None:
+            self._facts.clear()
+        else:
+            self._facts.pop(server, None)
+        self.save()
+
+    def load(self) -> None:
+        """Load persisted facts (missing or corrupt file = none)."""
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for server, raw in data.get("hosts", {}).items():
+            facts = HostFacts.from_dict(raw) if isinstance(raw, dict) else None
+            if facts is not None:
+                self._facts[server] = facts
+
+    def save(self) -> None:
+        """Persist all facts atomically."""
+        if self.path is None:
+            return
+        data = {
+            "saved_at": time.time(),
+            "hosts": {server: f.to_dict() for server, f in self._facts.items()},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2))
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning("host_facts_save_failed", path=str(self.path), error=str(e))
+
+
+# ── Process-wide store ───────────────────────────────────────────
+
+_store = HostFactsStore()
+
+
+def get_host_facts_store() -> HostFactsStore:
+    """The process-wide store used by tools."""
+    return _store
+
+
+def configure_host_facts(
+    *, path: Path | None = FACTS_FILE, ttl: float | None = None,
+) -> HostFactsStore:
+    """Apply settings (e.g. from AgentConfig) and load persisted facts."""
+    if ttl is not None:
+        _store.ttl = ttl
+    if path != _store.path:
+        _store.path = path
+        _store.load()
+    return _store
+
+
+async def get_host_facts(
+    inventory: Inventory, server: str, *, refresh: bool = False,
+) -> HostFacts | None:
+    """Facts for ``server`` from the process-wide store (see ``HostFactsStore.get``)."""
+    return await _store.get(inventory, server, refresh=refresh)
+
+
+async def first_existing(
+    inventory: Inventory, server: str, candidates: Iterable[str],
+) -> str | None:
+    """First of ``candidates`` that exists on the server, or None.
+
+    Answers from the host's facts where it can; only paths the probe
+    didn't cover cost a ``test -f`` round trip.
+    """
+    from agent.tools.docker_tools import _run_on_server
+
+    facts = await get_host_facts(inventory, server)
+    for path in candidates:
+        known = facts.exists(path) if facts is not None else None
+        if known is None:
+            check = await _run_on_server(inventory, server, f"test -f {path}")
+            known = check.exit_code == 0
+        if known:
+            return path
+    return None
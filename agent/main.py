@@ -5,6 +5,8 @@ from __future__ import annotations
 import asyncio
 import os
 import sys
+from pathlib import Path
+from typing import Any
 
 import click
 import structlog
@@ -48,6 +50,84 @@ def _asyncssh_available() -> bool:
     return result.returncode == 0
 
 
+def _broker_socket_path(agent_cfg) -> str:
+    """Where the daemon's SSH broker listens (next to the daemon socket by default)."""
+    if agent_cfg.ssh_broker_socket:
+        return agent_cfg.ssh_broker_socket
+    return str(Path(agent_cfg.socket_path).with_name("ssh-broker.sock"))
+
+
+def _configure_state(agent_cfg) -> None:
+    """Apply AgentConfig to the process-wide SSH pool, caches and indexes."""
+    _configure_ssh_pool(agent_cfg)
+    _configure_indexes(agent_cfg)
+
+
+def _configure_ssh_pool(agent_cfg) -> None:
+    """Apply AgentConfig's SSH pool limits, breaker and timeout settings to the shared pool."""
+    from agent.tools.latency import configure_latency
+    from agent.tools.ssh_pool import configure_ssh_pool
+
+    configure_ssh_pool(
+        idle_ttl=agent_cfg.ssh_idle_ttl,
+        max_connections=agent_cfg.ssh_max_connections,
+        health_interval=agent_cfg.ssh_health_interval,
+        breaker_threshold=agent_cfg.ssh_breaker_threshold,
+        breaker_cooldown=agent_cfg.ssh_breaker_cooldown,
+        broker_socket=_broker_socket_path(agent_cfg) if agent_cfg.ssh_broker else "",
+    )
+    configure_latency(
+        enabled=agent_cfg.ssh_adaptive_timeouts,
+        factor=agent_cfg.ssh_timeout_factor,
+        min_timeout=agent_cfg.ssh_timeout_min,
+        max_timeout=agent_cfg.ssh_timeout_max,
+    )
+
+
+def _configure_indexes(agent_cfg) -> None:
+    """Apply AgentConfig to the state-directory caches.
+
+    Covers the host-facts cache, the domain and WordPress indexes and
+    the tool output store.
+    """
+    from agent.domain_index import configure_domain_index
+    from agent.host_facts import configure_host_facts
+    from agent.tools.tool_output import OUTPUT_DIR, configure_output_store
+    from agent.wp_index import configure_wp_index
+
+    configure_host_facts(ttl=agent_cfg.host_facts_ttl)
+    configure_domain_index(
+        enabled=agent_cfg.domain_index,
+        interval=agent_cfg.domain_index_interval,
+    )
+    configure_wp_index()
+    configure_output_store(
+        path=OUTPUT_DIR if agent_cfg.tool_output_disk_mb else None,
+        memory_bytes=agent_cfg.tool_output_memory_mb * 1024 * 1024,
+        disk_bytes=agent_cfg.tool_output_disk_mb * 1024 * 1024,
+    )
+
+
+async def _prewarm_ssh(agent_cfg, inventory) -> None:
+    """Open pooled SSH connections to the inventory if ``ssh_prewarm`` is on.
+
+    Honours ``ssh_prewarm_roles`` as a filter; failures are logged by
+    the pool and otherwise ignored — tools report them on first use.
+    """
+    if not agent_cfg.ssh_prewarm:
+        return
+
+    from agent.tools.ssh_pool import get_ssh_pool
+
+    roles = set(agent_cfg.ssh_prewarm_roles)
+    servers = [
+        inventory.get_server(name) for name in inventory.server_names
+    ]
+    if roles:
+        servers = [s for s in servers if s.definition.role in roles]
+    await get_ssh_pool().warm_up(servers, concurrency=agent_cfg.ssh_prewarm_concurrency)
+
+
 def _build_core(config_path: str):
     """Build the core agent components (config, inventory, registry, prompt).
 
@@ -142,6 +222,7 @@ def _build_core(config_path: str):
     agent_cfg, servers_cfg, permissions_cfg = load_all_config(config_path)
     inventory = Inventory(servers_cfg, permissions_cfg)
     audit = AuditLogger(agent_cfg.audit_log_path)
+    _configure_state(agent_cfg)
 
     # Build tool registry and register all tools
     registry = ToolRegistry(agent_cfg, inventory, audit)
@@ -270,6 +351,16 @@ def _build_core(config_path: str):
     from agent.tools.self_update import SelfUpdate
     registry.register(SelfUpdate())
 
+    # Paging through large stored tool outputs
+    if agent_cfg.tool_output_store:
+        from agent.tools.tool_output import ReadToolOutput
+        registry.register(ReadToolOutput())
+
+    # Per-message tool family selection
+    if registry.selection is not None:
+        from agent.tools.router import LoadTools
+        registry.register(LoadTools(registry))
+
     # Register SSH tools if asyncssh is available
     if _asyncssh_available():
         from agent.tools.remote import RunRemoteCommand
@@ -341,13 +432,23 @@ def run(config_dir: str | None, log_level: str | None) -> None:
         logger.exception("startup_failed")
         sys.exit(1)
 
+    async def _session() -> None:
+        # One event loop for the whole session so pooled SSH
+        # connections stay valid until cleanup closes them.
+        from agent.tools.ssh_pool import get_ssh_pool
+
+        get_ssh_pool().start_maintenance()
+        try:
+            await client.run()
+        finally:
+            await client.cleanup()
+
     audit.log_session_start()
     try:
-        asyncio.run(client.run())
+        asyncio.run(_session())
     except KeyboardInterrupt:
         click.echo("\nSession interrupted.")
     finally:
-        asyncio.run(client.cleanup())
         audit.log_session_end()
         audit.close()
         logger.info("session_ended")
@@ -423,7 +524,7 @@ def daemon(config_dir: str | None, log_level: str | None, socket_path: str | Non
         sys.exit(1)
 
     try:
-        agent_cfg, servers_cfg, _inv, registry, system_prompt, audit = _build_core(config_path)
+        agent_cfg, servers_cfg, inventory, registry, system_prompt, audit = _build_core(config_path)
     except FileNotFoundError as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
@@ -436,19 +537,47 @@ def daemon(config_dir: str | None, log_level: str | None, socket_path: str | Non
     agent_cfg = agent_cfg.model_copy(update={"approval_mode": "auto_deny"})
 
     sock = socket_path or agent_cfg.socket_path
-    asyncio.run(_run_daemon(agent_cfg, registry, system_prompt, audit, servers_cfg, sock))
+    asyncio.run(_run_daemon(
+        agent_cfg, registry, system_prompt, audit, servers_cfg, sock, inventory,
+    ))
 
 
-async def _run_daemon(agent_cfg, registry, system_prompt, audit, servers_cfg, socket_path: str):
+async def _run_daemon(
+    agent_cfg, registry, system_prompt, audit, servers_cfg, socket_path: str, inventory=None,
+):
     """Async entry point for daemon mode."""
     import signal
 
     from agent.client import CancelledByUser, ConversationClient
+    from agent.domain_index import get_domain_index
     from agent.sessions import SessionStore
+    from agent.tools.ssh_broker import SSHBroker
+    from agent.tools.ssh_pool import configure_ssh_pool, get_ssh_pool
     from agent.ui.daemon import DaemonUI
 
     ui = DaemonUI(socket_path)
     await ui.start()
+    # The SSH pool lives for the whole daemon process, not per session.
+    # The daemon is the broker, so its own pool connects directly.
+    configure_ssh_pool(broker_socket="")
+    pool = get_ssh_pool()
+    pool.start_maintenance()
+    broker: SSHBroker | None = None
+    if agent_cfg.ssh_broker and inventory is not None:
+        broker = SSHBroker(pool, inventory, _broker_socket_path(agent_cfg), audit)
+        try:
+            await broker.start()
+        except OSError as e:
+            logger.warning("ssh_broker_start_failed", error=str(e))
+            broker = None
+    if inventory is not None:
+        # Warm in the background: the socket accepts clients right away and
+        # an early tool call simply waits on the host's in-flight connect.
+        prewarm_task = asyncio.ensure_future(_prewarm_ssh(agent_cfg, inventory))
+        prewarm_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    index_task: asyncio.Task[None] | None = None
+    if inventory is not None and agent_cfg.domain_index:
+        index_task = asyncio.ensure_future(get_domain_index().run(inventory))
     client = ConversationClient(agent_cfg, registry, system_prompt, ui)
     client.set_cancel_event(ui.cancelled_event)
     store = SessionStore(agent_cfg.sessions_dir)
@@ -505,7 +634,7 @@ async def _run_daemon(agent_cfg, registry, system_prompt, audit, servers_cfg, so
             if resume_id:
                 try:
                     messages, created_at = store.load(resume_id)
-                    client.restore_messages(messages)
+                    client.restore_messages(messages, store.load_compactions(resume_id))
                     session_id = resume_id
                     ui.display_info(f"Resumed session {session_id} ({len(messages)} messages)")
                     logger.info("session_resumed", session_id=session_id)
@@ -515,7 +644,10 @@ async def _run_daemon(agent_cfg, registry, system_prompt, audit, servers_cfg, so
             # Process the first message (even on resume, the client sends a real message)
             if first_message and first_message not in ("/quit", "/exit"):
                 await _process_with_cancel(first_message)
-                store.save(session_id, client.get_messages(), created_at=created_at)
+                store.save(
+                    session_id, client.get_messages(), created_at=created_at,
+                    compactions=client.get_compactions(),
+                )
                 ui.display_done()
                 await ui.flush()
             elif first_message in ("/quit", "/exit"):
@@ -533,7 +665,10 @@ async def _run_daemon(agent_cfg, registry, system_prompt, audit, servers_cfg, so
                 if not message:
                     continue
                 await _process_with_cancel(message)
-                store.save(session_id, client.get_messages(), created_at=created_at)
+                store.save(
+                    session_id, client.get_messages(), created_at=created_at,
+                    compactions=client.get_compactions(),
+                )
                 ui.display_done()
                 await ui.flush()
         except Exception:
@@ -541,14 +676,24 @@ async def _run_daemon(agent_cfg, registry, system_prompt, audit, servers_cfg, so
         finally:
             # Save final state before cleanup
             if client.get_messages():
-                store.save(session_id, client.get_messages(), created_at=created_at)
+                store.save(
+                    session_id, client.get_messages(), created_at=created_at,
+                    compactions=client.get_compactions(),
+                )
                 ui.display_info(f"Session saved: {session_id}")
             ui.display_goodbye()
             await ui.flush()
             client.reset()
             audit.log_session_end()
+            logger.info("ssh_pool_stats", **pool.stats())
 
     await ui.stop()
+    if index_task is not None:
+        index_task.cancel()
+        await asyncio.gather(index_task, return_exceptions=True)
+    if broker is not None:
+        await broker.stop()
+    await client.cleanup()
     audit.close()
     logger.info("daemon_exited")
 
@@ -659,18 +804,31 @@ def monitor(config_dir: str | None, target_server: str, quiet: bool, discord_web
     config_path = config_dir or os.environ.get("BASTION_AGENT_CONFIG", "./config")
 
     try:
-        _, servers_cfg, permissions_cfg = load_all_config(config_path)
+        agent_cfg, servers_cfg, permissions_cfg = load_all_config(config_path)
     except Exception as e:
         click.echo(f"Config error: {e}", err=True)
         sys.exit(2)
 
+    _configure_state(agent_cfg)
+
     from agent.inventory import Inventory
     from agent.tools.health import run_health_check
+    from agent.tools.ssh_pool import close_ssh_pool, read_only_calls
 
     inventory = Inventory(servers_cfg, permissions_cfg)
 
+    async def _check() -> Any:
+        try:
+            if target_server == "all":
+                await _prewarm_ssh(agent_cfg, inventory)
+            # Health checks only read: identical probes may share an exec
+            with read_only_calls():
+                return await run_health_check(inventory, target_server)
+        finally:
+            await close_ssh_pool()
+
     try:
-        result = asyncio.run(run_health_check(inventory, target_server))
+        result = asyncio.run(_check())
     except KeyboardInterrupt:
         sys.exit(130)
 
@@ -759,21 +917,23 @@ def anomaly_monitor(config_dir: str | None, loop_seconds: int, discord_webhook:
     config_path = config_dir or os.environ.get("BASTION_AGENT_CONFIG", "./config")
 
     try:
-        _, servers_cfg, permissions_cfg = load_all_config(config_path)
+        agent_cfg, servers_cfg, permissions_cfg = load_all_config(config_path)
     except Exception as e:
         click.echo(f"Config error: {e}", err=True)
         sys.exit(2)
 
+    _configure_state(agent_cfg)
+
     from agent.anomaly import run_anomaly_scan
     from agent.inventory import Inventory
+    from agent.tools.ssh_pool import close_ssh_pool, get_ssh_pool, read_only_calls
 
     inventory = Inventory(servers_cfg, permissions_cfg)
 
-    def _run_once() -> int:
-        try:
-            report = asyncio.run(run_anomaly_scan(inventory))
-        except KeyboardInterrupt:
-            sys.exit(130)
+    async def _run_once() -> int:
+        # The scan only reads: identical probes may share an exec
+        with read_only_calls():
+            report = await run_anomaly_scan(inventory)
 
         if report.has_issues or not quiet:
             click.echo(report.format())
@@ -792,17 +952,120 @@ def anomaly_monitor(config_dir: str | None, loop_seconds: int, discord_webhook:
 
         return 1 if report.has_issues else 0
 
+    async def _main() -> int:
+        # Single event loop across iterations so the SSH pool keeps
+        # its connections between scans instead of re-handshaking.
+        try:
+            await _prewarm_ssh(agent_cfg, inventory)
+            if loop_seconds <= 0:
+                return await _run_once()
+            get_ssh_pool().start_maintenance()
+            while True:
+                await _run_once()
+                await asyncio.sleep(loop_seconds)
+        finally:
+            await close_ssh_pool()
+
     if loop_seconds > 0:
-        import time
         click.echo(f"Anomaly monitor running every {loop_seconds}s. Ctrl-C to stop.")
         try:
-            while True:
-                _run_once()
-                time.sleep(loop_seconds)
+            asyncio.run(_main())
         except KeyboardInterrupt:
             click.echo("\nStopped.")
     else:
-        sys.exit(_run_once())
+        try:
+            sys.exit(asyncio.run(_main()))
+        except KeyboardInterrupt:
+            sys.exit(130)
+
+
+@cli.command()
+@click.option(
+    "--config-dir",
+    type=click.Path(exists=True, file_okay=False, resolve_path=True),
+    default=None,
+    help="Path to configuration directory.",
+)
+@click.option(
+    "--server", "-s",
+    "target_server",
+    type=str,
+    default="all",
+    help="Server to show, or 'all' (default: all).",
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    default=False,
+    help="Re-probe the hosts instead of using cached facts.",
+)
+def facts(config_dir: str | None, target_server: str, refresh: bool) -> None:
+    """Show cached host facts, probing hosts that have none.
+
+    Facts (CPU count, OS, installed tools, panel versions, log paths)
+    are gathered once per host and reused by tools until they expire.
+    Use --refresh after changing what is installed on a host.
+
+    Examples:
+
+      bastion facts                  # all servers
+
+      bastion facts -s web-01 --refresh
+    """
+    config_path = config_dir or os.environ.get("BASTION_AGENT_CONFIG", "./config")
+
+    try:
+        agent_cfg, servers_cfg, permissions_cfg = load_all_config(config_path)
+    except Exception as e:
+        click.echo(f"Config error: {e}", err=True)
+        sys.exit(2)
+
+    _configure_state(agent_cfg)
+
+    from agent.host_facts import get_host_facts
+    from agent.inventory import Inventory
+    from agent.tools.ssh_pool import close_ssh_pool
+
+    inventory = Inventory(servers_cfg, permissions_cfg)
+    if target_server == "all":
+        names = inventory.server_names
+    elif target_server in inventory.server_names:
+        names = [target_server]
+    else:
+        click.echo(f"Unknown server: {target_server}", err=True)
+        sys.exit(2)
+
+    async def _gather() -> list[Any]:
+        try:
+            return await asyncio.gather(*[
+                get_host_facts(inventory, name, refresh=refresh) for name in names
+            ])
+        finally:
+            await close_ssh_pool()
+
+    try:
+        results = asyncio.run(_gather())
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    failed = False
+    for name, host_facts in zip(names, results):
+        click.echo(f"## {name}")
+        if host_facts is None:
+            click.echo("  ✗ probe failed (or facts disabled)")
+            failed = True
+            continue
+        click.echo(f"  CPUs: {host_facts.nproc or '?'}")
+        click.echo(f"  OS: {host_facts.os or '?'}")
+        click.echo(f"  cgroup: v{host_facts.cgroup_version or '?'}")
+        click.echo(f"  Tools: {', '.join(host_facts.binaries) or 'none'}")
+        if host_facts.cpanel_version:
+            click.echo(f"  cPanel: {host_facts.cpanel_version}")
+        if host_facts.wings_data:
+            click.echo(f"  Wings data: {host_facts.wings_data}")
+        click.echo(f"  Paths found: {len(host_facts.paths)}/{len(host_facts.probed_paths)}")
+
+    sys.exit(1 if failed else 0)
 
 
 @cli.command(name="add-server")
@@ -1082,6 +1345,7 @@ async def _send_message(
 
     async def _read_events() -> None:
         """Read and display events until a 'done', 'cancelled', or 'goodbye' event."""
+        streaming = False
         while True:
             try:
                 line = await reader.readline()
@@ -1096,6 +1360,16 @@ async def _send_message(
                 continue
 
             etype = event.get("type", "")
+            if etype == "response_delta":
+                click.echo(event.get("text", ""), nl=False)
+                streaming = True
+                continue
+            if streaming:
+                # End the streamed line; a following response repeats it
+                click.echo()
+                streaming = False
+                if etype == "response":
+                    continue
             if etype == "response":
                 click.echo(event.get("text", ""))
             elif etype == "tool_call":
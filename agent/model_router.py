@@ -0,0 +1,218 @@
+"""Per-turn choice between a fast model and the main model.
+
+Many turns are quick: "is gameserver-01 up?", "list the containers on
+web-02", turning a finding into a customer reply. They don't need the
+large model's latency. With ``fast_model`` set, a turn whose message
+reads as a quick question starts on the fast model and every other turn
+uses ``model``.
+
+Requests to change something (restart, kill, delete, update...) are
+never fast turns, and a mutating tool the fast model calls anyway is
+not run: the turn escalates and ``model`` decides whether to call it
+again. A fast turn also escalates to ``model`` for the rest of the turn
+when:
+
+- it calls a deep diagnosis tool (site, WordPress, game server, log
+  correlation...),
+- a tool call fails,
+- it runs past ``fast_model_max_iterations`` tool rounds,
+- a response is cut off at ``max_tokens`` or the fast model's API call
+  fails.
+
+Every API call is logged with its tier, latency and token usage, and a
+per-turn summary records which tiers ran and why a turn escalated, so
+the policy can be tuned from the logs.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from agent.config import AgentConfig
+
+logger = structlog.get_logger()
+
+FAST = "fast"
+DEEP = "deep"
+
+# Messages longer than this are treated as investigations
+_FAST_MAX_CHARS = 300
+
+_QUICK_PATTERNS = (
+    r"^(is|are|does|do|did|can|has|have)\b", r"\bup\b", r"\bonline\b", r"\brunning\b",
+    r"\bstatus\b", r"\blist\b", r"\bshow\b", r"\bhow many\b", r"\bwhich\b",
+    r"\bwhat('s| is| are)\b", r"\buptime\b", r"\bdisk (space|usage)\b", r"\bping\b",
+    r"\b(reply|respond|write|explain)\b.*\b(client|customer)\b", r"\breword\b",
+    r"\brewrite\b", r"\bsummar(y|i[sz]e)\b", r"\bhandoff\b",
+)
+
+_DEEP_PATTERNS = (
+    r"\bwhy\b", r"\bslow", r"\blag", r"rubber.?band", r"\btps\b", r"diagnos", r"investigat",
+    r"root cause", r"debug", r"\bfix", r"crash", r"elementor", r"\berrors?\b", r"\b5\d\d\b",
+    r"broken", r"not (working|loading)", r"intermittent", r"performance", r"leak",
+    r"\bhack", r"malware", r"attack", r"compromis", r"incident", r"outage", r"\bcorrelat",
+    r"\boptimi[sz]e", r"\bmigrat", r"\bupgrade",
+    # Changes
+    r"\b(re)?start", r"\bstop", r"\bkill", r"\bdelete", r"\bremov",
+    r"\brepair", r"\bupdat", r"\binstall", r"\bclean", r"\bpurge", r"\breboot",
+    r"\bflush", r"\bclear\b", r"\bdeploy", r"\brollback", r"\broll back", r"\bsuspend",
+    r"\b(en|dis)able", r"\bchange", r"\bset\b", r"\bedit", r"\bwhitelist", r"\bblock",
+)
+
+# Tools whose results need the main model to interpret
+DEEP_TOOLS = frozenset({
+    "diagnose_site", "page_debug", "wp_deep_performance", "wp_elementor_diagnose",
+    "wp_performance", "wp_security_scan", "wp_file_integrity", "game_server_diagnose",
+    "mod_conflict_check", "log_correlate", "incident_timeline", "incident_report",
+    "blast_radius", "security_audit", "what_changed", "mysql_slow_queries",
+    "access_log_analysis", "resource_rightsizing",
+})
+
+
+def classify(message: str) -> str:
+    """Tier a user message calls for: ``fast`` or ``deep``."""
+    text = message.strip().lower()
+    if len(text) > _FAST_MAX_CHARS or any(re.search(p, text) for p in _DEEP_PATTERNS):
+        return DEEP
+    if any(re.search(p, text) for p in _QUICK_PATTERNS):
+        return FAST
+    return DEEP
+
+
+@dataclass
+class TierStats:
+    """Totals for one tier across the process."""
+
+    calls: int = 0
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+@dataclass
+class _Turn:
+    tier: str = DEEP
+    intent: str = DEEP
+    round_tier: str = DEEP
+    rounds: int = 0
+    escalated: str = ""
+    tiers_used: list[str] = field(default_factory=list)
+
+
+class ModelRouter:
+    """Picks the model for each API call of a turn.
+
+    Args:
+        config: Agent configuration (``model``, ``fast_model``,
+            ``fast_model_max_iterations``).
+    """
+
+    def __init__(self, config: AgentConfig) -> None:
+        self._models = {FAST: config.fast_model or config.model, DEEP: config.model}
+        self.enabled = bool(config.fast_model) and config.fast_model != config.model
+        self.max_fast_rounds = config.fast_model_max_iterations
+        self.stats: dict[str, TierStats] = {FAST: TierStats(), DEEP: TierStats()}
+        self._turn = _Turn()
+
+    @property
+    def tier(self) -> str:
+        """The tier the next API call uses."""
+        return self._turn.tier
+
+    @property
+    def model(self) -> str:
+        """The model the next API call uses."""
+        return self._models[self._turn.tier]
+
+    def start_turn(self, message: str) -> str:
+        """Choose the starting tier for a new user message."""
+        intent = classify(message) if self.enabled else DEEP
+        self._turn = _Turn(tier=intent, intent=intent)
+        return intent
+
+    def start_round(self) -> None:
+        """Note the start of an API round, escalating a fast turn that ran long."""
+        self._turn.rounds += 1
+        if self._turn.rounds > self.max_fast_rounds:
+            self.escalate("max_fast_iterations")
+        self._turn.round_tier = self._turn.tier
+        self._turn.tiers_used.append(self._turn.tier)
+
+    def hold_mutation(self, tool_name: str) -> bool:
+        """Whether a mutating tool call must not run because the fast model made it.
+
+        Escalates the turn; the main model sees the call was not run and
+        decides itself whether to make it.
+        """
+        if self._turn.round_tier != FAST:
+            return False
+        self.escalate(f"mutating_tool:{tool_name}")
+        return True
+
+    def observe_tool(self, tool_name: str, failed: bool) -> None:
+        """Escalate a fast turn that needs deep diagnosis or hit a failure."""
+        if tool_name in DEEP_TOOLS:
+            self.escalate(f"deep_tool:{tool_name}")
+        elif failed:
+            self.escalate(f"tool_failed:{tool_name}")
+
+    def observe_response(self, response: Any) -> None:
+        """Escalate a fast turn whose response was cut off."""
+        if getattr(response, "stop_reason", None) == "max_tokens":
+            self.escalate("max_tokens")
+
+    def escalate(self, reason: str) -> bool:
+        """Move the rest of the turn to the main model.
+
+        Returns:
+            Whether the turn was on the fast tier (and so changed tier).
+        """
+        if self._turn.tier != FAST:
+            return False
+        self._turn.tier = DEEP
+        self._turn.escalated = reason
+        logger.info("model_escalated", reason=reason, round=self._turn.rounds)
+        return True
+
+    def record(self, response: Any, latency: float) -> None:
+        """Log one API call's latency and token usage under its tier."""
+        # Tools run while the response streams and may already have
+        # escalated the turn: the call belongs to the tier it started on
+        tier = self._turn.round_tier
+        usage = getattr(response, "usage", None)
+        stats = self.stats[tier]
+        stats.calls += 1
+        stats.latency_s += latency
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+        stats.cache_read_input_tokens += cache_read
+        logger.info(
+            "api_usage",
+            tier=tier,
+            model=self._models[tier],
+            latency_s=round(latency, 3),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_input_tokens=cache_read,
+            cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+        )
+
+    def end_turn(self) -> None:
+        """Log how the turn was routed."""
+        if not self.enabled or not self._turn.tiers_used:
+            return
+        logger.info(
+            "model_turn",
+            intent=self._turn.intent,
+            rounds=self._turn.rounds,
+            tiers=self._turn.tiers_used,
+            escalated=self._turn.escalated or None,
+        )
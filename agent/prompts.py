@@ -104,6 +104,13 @@ def build_system_prompt(inventory: Inventory, registry: ToolRegistry) -> str:
         tool_lines.append(f"- **{name}**{param_str}: {desc}")
 
     tool_section = "\n".join(tool_lines)
+    if registry.selection is not None and registry.selection.families:
+        tool_section += (
+            "\n\nSpecialized tool families ("
+            + ", ".join(registry.selection.families)
+            + ") are attached when a request calls for them. If a tool listed "
+            "above is not available to call, use load_tools to attach its family."
+        )
 
     return _SYSTEM_TEMPLATE.format(
         server_inventory=server_section,
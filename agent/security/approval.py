@@ -35,6 +35,10 @@ ALWAYS_REQUIRE_APPROVAL: dict[str, Any] = {
     "self_update": lambda inp: inp.get("action") == "update",
 }
 
+# Tool calls from one turn run concurrently and may need approval at the
+# same time; the operator is asked about one at a time.
+_prompt_lock = asyncio.Lock()
+
 
 def requires_approval(
     tool_name: str,
@@ -101,8 +105,12 @@ async def request_approval(
         return False
 
     # Interactive mode — prompt the operator
-    con = console or Console()
+    async with _prompt_lock:
+        return await _prompt(tool_name, tool_input, console or Console())
+
 
+async def _prompt(tool_name: str, tool_input: dict, con: Console) -> bool:
+    """Show the approval panel and read the operator's answer."""
     detail_lines = [f"  {k}: {v}" for k, v in tool_input.items()]
     detail_text = "\n".join(detail_lines)
 
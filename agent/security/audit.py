@@ -60,12 +60,25 @@ class AuditLogger:
         """Log that a tool call is being attempted."""
         self._logger.info("tool_attempt", tool=tool_name, input=tool_input)
 
-    def log_success(self, tool_name: str, tool_input: dict, result: dict) -> None:
-        """Log a successful tool execution."""
+    def log_success(
+        self,
+        tool_name: str,
+        tool_input: dict,
+        result: dict,
+        reaped: int = 0,
+        cached: bool = False,
+    ) -> None:
+        """Log a successful tool execution.
+
+        ``cached`` marks a result served from the registry's result
+        cache instead of being re-run.
+        """
         # Truncate large results to avoid bloating the log
         truncated = _truncate_result(result)
+        extra: dict[str, Any] = {"cached": True} if cached else {}
         self._logger.info(
-            "tool_success", tool=tool_name, input=tool_input, result=truncated
+            "tool_success", tool=tool_name, input=tool_input, result=truncated,
+            **_reaped(reaped), **extra,
         )
 
     def log_denied(self, tool_name: str, tool_input: dict, reason: str) -> None:
@@ -74,16 +87,28 @@ class AuditLogger:
             "tool_denied", tool=tool_name, input=tool_input, reason=reason
         )
 
-    def log_error(self, tool_name: str, tool_input: dict, error: str) -> None:
+    def log_error(
+        self, tool_name: str, tool_input: dict, error: str, reaped: int = 0,
+    ) -> None:
         """Log a tool execution error."""
         self._logger.error(
-            "tool_error", tool=tool_name, input=tool_input, error=error
+            "tool_error", tool=tool_name, input=tool_input, error=error,
+            **_reaped(reaped),
+        )
+
+    def log_timeout(self, tool_name: str, tool_input: dict, reaped: int = 0) -> None:
+        """Log a tool execution timeout.
+
+        ``reaped`` is how many remote processes were killed because of it.
+        """
+        self._logger.warning(
+            "tool_timeout", tool=tool_name, input=tool_input, **_reaped(reaped)
         )
 
-    def log_timeout(self, tool_name: str, tool_input: dict) -> None:
-        """Log a tool execution timeout."""
+    def log_cancelled(self, tool_name: str, tool_input: dict, reaped: int = 0) -> None:
+        """Log a tool call aborted by the operator."""
         self._logger.warning(
-            "tool_timeout", tool=tool_name, input=tool_input
+            "tool_cancelled", tool=tool_name, input=tool_input, **_reaped(reaped)
         )
 
     def close(self) -> None:
@@ -97,6 +122,11 @@ class AuditLogger:
         self.close()
 
 
+def _reaped(count: int) -> dict[str, int]:
+    """``reaped_processes`` field, only present when something was killed."""
+    return {"reaped_processes": count} if count else {}
+
+
 def _truncate_result(result: dict, max_len: int = 2000) -> dict:
     """Truncate string values in a result dict to prevent log bloat."""
     truncated = {}
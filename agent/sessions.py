@@ -52,6 +52,7 @@ class SessionStore:
         messages: list[dict[str, Any]],
         *,
         created_at: float | None = None,
+        compactions: list[dict[str, Any]] | None = None,
     ) -> Path:
         """Persist a conversation to disk.
 
@@ -59,6 +60,8 @@ class SessionStore:
             session_id: Unique session identifier.
             messages: The full message history list.
             created_at: Original creation timestamp (preserved across saves).
+            compactions: Record of history compactions (when old turns
+                were replaced by a summary).
 
         Returns:
             Path to the saved session file.
@@ -72,6 +75,7 @@ class SessionStore:
             "turns": sum(1 for m in messages if m.get("role") == "user" and isinstance(m.get("content"), str)),
             "preview": preview,
             "messages": messages,
+            "compactions": compactions or [],
         }
         path = self._dir / f"{session_id}.json"
         tmp = path.with_suffix(".tmp")
@@ -101,6 +105,17 @@ class SessionStore:
         logger.info("session_loaded", session_id=session_id, turns=len(messages))
         return messages, created_at
 
+    def load_compactions(self, session_id: str) -> list[dict[str, Any]]:
+        """Load a session's compaction record (empty for older session files).
+
+        Raises:
+            FileNotFoundError: If the session does not exist.
+        """
+        path = self._dir / f"{session_id}.json"
+        with open(path) as f:
+            data = json.load(f)
+        return data.get("compactions", [])
+
     def list_sessions(self, limit: int = 20) -> list[SessionMeta]:
         """List saved sessions, most recent first.
 
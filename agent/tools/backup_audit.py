@@ -12,6 +12,7 @@ import re
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from agent.host_facts import HostFacts, get_host_facts
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -224,6 +225,11 @@ def _format_backup_section(
                 )
 
 
+def _absent(facts: HostFacts | None, path: str) -> bool:
+    """Whether the host's facts say ``path`` doesn't exist (no facts = unknown)."""
+    return facts is not None and facts.exists(path) is False
+
+
 def _parse_size_bytes(size_str: str) -> int | None:
     """Parse a human-readable size string into bytes.
 
@@ -366,6 +372,8 @@ class BackupAudit(BaseTool):
             return ToolResult(error=str(e), exit_code=1)
 
         data: dict[str, Any] = {}
+        # Known-absent paths and tools are skipped rather than probed
+        facts = await get_host_facts(self._inventory, server)
 
         # Always check storage space on backup-relevant partitions
         storage_result = await _run_on_server(
@@ -377,15 +385,15 @@ class BackupAudit(BaseTool):
         tasks: list[tuple[str, Any]] = []
 
         if backup_type in ("cpanel", "all"):
-            tasks.append(("cpanel", self._audit_cpanel(server)))
-            tasks.append(("cpanel_config", self._audit_cpanel_config(server)))
-            tasks.append(("jetbackup", self._audit_jetbackup(server)))
+            tasks.append(("cpanel", self._audit_cpanel(server, facts)))
+            tasks.append(("cpanel_config", self._audit_cpanel_config(server, facts)))
+            tasks.append(("jetbackup", self._audit_jetbackup(server, facts)))
 
         if backup_type in ("pterodactyl", "all"):
-            tasks.append(("pterodactyl", self._audit_pterodactyl(server)))
+            tasks.append(("pterodactyl", self._audit_pterodactyl(server, facts)))
 
         if backup_type in ("mysql", "all"):
-            tasks.append(("mysql", self._audit_mysql(server)))
+            tasks.append(("mysql", self._audit_mysql(server, facts)))
 
         # Run all audit checks in parallel
         if tasks:
@@ -405,7 +413,9 @@ class BackupAudit(BaseTool):
         report = _build_backup_report(server, data)
         return ToolResult(output=report, exit_code=0)
 
-    async def _audit_cpanel(self, server: str) -> dict[str, Any]:
+    async def _audit_cpanel(
+        self, server: str, facts: HostFacts | None = None,
+    ) -> dict[str, Any]:
         """Check cPanel backup directories for recent backups."""
         # Try multiple common cPanel backup paths
         paths = [
@@ -419,6 +429,8 @@ class BackupAudit(BaseTool):
         found_any = False
 
         for path in paths:
+            if _absent(facts, path):
+                continue
             result = await _run_on_server(
                 self._inventory, server, f"ls -lht {path}"
             )
@@ -436,15 +448,20 @@ class BackupAudit(BaseTool):
         # Return the 5 most recent entries (ls -lt sorts by time)
         return {"files": all_files[:5]}
 
-    async def _audit_cpanel_config(self, server: str) -> str:
+    async def _audit_cpanel_config(
+        self, server: str, facts: HostFacts | None = None,
+    ) -> str:
         """Retrieve cPanel backup configuration."""
         # Try whmapi1 first, fall back to config file
-        result = await _run_on_server(
-            self._inventory, server, "whmapi1 backup_config_get"
-        )
-        if result.success and result.output.strip():
-            return result.output
+        if facts is None or facts.has("whmapi1"):
+            result = await _run_on_server(
+                self._inventory, server, "whmapi1 backup_config_get"
+            )
+            if result.success and result.output.strip():
+                return result.output
 
+        if _absent(facts, "/var/cpanel/backups/config"):
+            return "cPanel backup config not found"
         result = await _run_on_server(
             self._inventory, server, "cat /var/cpanel/backups/config"
         )
@@ -453,8 +470,12 @@ class BackupAudit(BaseTool):
 
         return "cPanel backup config not found"
 
-    async def _audit_jetbackup(self, server: str) -> dict[str, Any]:
+    async def _audit_jetbackup(
+        self, server: str, facts: HostFacts | None = None,
+    ) -> dict[str, Any]:
         """Check if JetBackup 5 is installed and get basic status."""
+        if _absent(facts, "/usr/local/jetapps/etc/jetbackup5"):
+            return {"installed": False}
         result = await _run_on_server(
             self._inventory, server, "ls /usr/local/jetapps/etc/jetbackup5/"
         )
@@ -462,15 +483,21 @@ class BackupAudit(BaseTool):
             return {"installed": True, "details": result.output}
         return {"installed": False}
 
-    async def _audit_pterodactyl(self, server: str) -> dict[str, Any]:
+    async def _audit_pterodactyl(
+        self, server: str, facts: HostFacts | None = None,
+    ) -> dict[str, Any]:
         """Check Pterodactyl/Wings backup directory."""
-        # Try standard Wings backup path, then fallback
+        # Try Wings' configured backup path, the standard one, then fallback
         paths = [
             "/srv/pterodactyl/backups",
             "/srv/pelican/backups",
         ]
+        if facts is not None and facts.wings_backups and facts.wings_backups not in paths:
+            paths.insert(0, facts.wings_backups)
 
         for path in paths:
+            if _absent(facts, path):
+                continue
             result = await _run_on_server(
                 self._inventory, server, f"ls -lhS {path}"
             )
@@ -480,6 +507,9 @@ class BackupAudit(BaseTool):
                     entry["name"] = f"{path}/{entry['name']}"
                 return {"files": parsed[:5]}
 
+        if facts is not None and facts.has("docker") is False:
+            return {"not_found": True}
+
         # Also check Docker volumes for backup data
         result = await _run_on_server(
             self._inventory, server,
@@ -494,7 +524,9 @@ class BackupAudit(BaseTool):
 
         return {"not_found": True}
 
-    async def _audit_mysql(self, server: str) -> dict[str, Any]:
+    async def _audit_mysql(
+        self, server: str, facts: HostFacts | None = None,
+    ) -> dict[str, Any]:
         """Check MySQL/MariaDB backup status."""
         data: dict[str, Any] = {}
 
@@ -517,7 +549,7 @@ class BackupAudit(BaseTool):
 
         if result.success and result.output.strip():
             data["files"] = _parse_ls_output(result.output)
-        else:
+        elif not _absent(facts, "/var/lib/automysqlbackup"):
             # Try automysqlbackup directory
             result = await _run_on_server(
                 self._inventory, server, "ls -lht /var/lib/automysqlbackup/"
@@ -526,6 +558,12 @@ class BackupAudit(BaseTool):
                 data["files"] = _parse_ls_output(result.output)
             else:
                 data["files"] = []
+        else:
+            data["files"] = []
+
+        if facts is not None and facts.has("mysql") is False:
+            data["binlog"] = "unable to query (mysql not accessible or not installed)"
+            return data
 
         # Check if binary logging is enabled (for point-in-time recovery)
         binlog_result = await _run_on_server(
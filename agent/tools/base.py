@@ -9,13 +9,17 @@ from __future__ import annotations
 
 import re
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 # Matches ANSI CSI sequences (\x1b[...letter) and OSC sequences (\x1b]...BEL)
 _ANSI_RE = re.compile(r"\x1b(?:\[[0-9;]*[A-Za-z]|\][^\x07]*\x07)")
 
 
+# Severity markers the report builders put in front of flagged lines
+_SEVERITY = {"✗": "critical", "⚠": "warning"}
+
+
 def _strip_ansi(text: str) -> str:
     """Remove ANSI escape codes and carriage returns from text."""
     return _ANSI_RE.sub("", text).replace("\r", "")
@@ -23,11 +27,20 @@ def _strip_ansi(text: str) -> str:
 
 @dataclass(frozen=True)
 class ToolResult:
-    """Structured result from a tool execution."""
+    """Structured result from a tool execution.
+
+    ``output`` is the report the operator sees. Tools whose report is
+    mostly layout (headings, icons, aligned tables) can also set
+    ``data``: a compact JSON-able summary of the same facts, sent to
+    the model instead of ``output``. By convention it uses the keys
+    ``issues`` (see :func:`parse_issue`), ``metrics`` (name -> value) and
+    ``entities`` (one dict per server, container, site...).
+    """
 
     output: str = ""
     error: str = ""
     exit_code: int = 0
+    data: dict[str, Any] | None = field(default=None, hash=False)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to a dict suitable for returning to the model.
@@ -39,6 +52,8 @@ class ToolResult:
         if self.error:
             result["error"] = _strip_ansi(self.error)
         result["exit_code"] = self.exit_code
+        if self.data is not None:
+            result["data"] = self.data
         return result
 
     @property
@@ -47,6 +62,39 @@ class ToolResult:
         return self.exit_code == 0 and not self.error
 
 
+def parse_issue(line: str, **context: Any) -> dict[str, Any]:
+    """Structured issue from a flagged report line like ``"⚠ Disk /: 91% used"``.
+
+    Args:
+        line: The report line; a leading ✗ or ⚠ sets the severity.
+        **context: Extra keys identifying what the issue is about
+            (e.g. ``server="web-01"``).
+
+    Returns:
+        Dict with ``sev`` (critical, warning or info), ``msg`` and the context.
+    """
+    line = line.strip()
+    sev = _SEVERITY.get(line[:1], "info")
+    if line[:1] in _SEVERITY:
+        line = line[1:].strip()
+    return {"sev": sev, "msg": line, **context}
+
+
+def model_view(result: dict[str, Any]) -> dict[str, Any]:
+    """The part of a tool result dict sent to the model.
+
+    Results with a ``data`` payload send it in place of the rendered
+    ``output``; others are sent as they are.
+    """
+    if "data" not in result:
+        return result
+    view: dict[str, Any] = {"data": result["data"]}
+    if result.get("error"):
+        view["error"] = result["error"]
+    view["exit_code"] = result.get("exit_code", 0)
+    return view
+
+
 class BaseTool(ABC):
     """Abstract base class for all agent tools."""
 
@@ -76,6 +124,34 @@ class BaseTool(ABC):
             ToolResult with output/error and exit code.
         """
 
+    @property
+    def cache_ttl(self) -> float:
+        """Seconds a successful result may be reused for identical input.
+
+        0 (the default) disables caching. Only read-only tools whose
+        output is still useful a little stale should set this.
+        """
+        return 0
+
+    @property
+    def mutates(self) -> bool:
+        """Whether the tool changes server state.
+
+        Calls to a mutating tool invalidate cached results for the
+        server they name (or for every server if they name none).
+        """
+        return False
+
+    @property
+    def delta(self) -> bool:
+        """Whether a repeat call may send the model only what changed.
+
+        For polling tools whose output is a table or list of rows
+        (containers, processes, resource readings). See
+        :mod:`agent.tools.result_delta`.
+        """
+        return False
+
     def to_schema(self) -> dict[str, Any]:
         """Generate the Anthropic API tool schema for this tool."""
         return {
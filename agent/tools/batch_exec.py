@@ -0,0 +1,165 @@
+"""Batched remote execution: many labelled commands in one SSH exec.
+
+Collectors like the health sweep or security audit used to open one
+channel and one exec per command. On a high-latency link that is N
+round trips. Here the commands are packed into a single ``sh`` script
+that runs them concurrently on the remote side, each under its own
+``timeout``, and prints a framed record per command:
+
+    <boundary> <index> <exit status> <start ns> <end ns>
+    <base64 stdout>
+    <base64 stderr>
+
+Command output is base64-encoded, so nothing a command prints can be
+mistaken for a frame header. ``parse_batch_output`` maps the records
+back to labels; ``SSHPool.run_batch`` turns them into ToolResults.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import secrets
+import shlex
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from agent.tools.base import ToolResult
+
+# Exit statuses coreutils ``timeout`` uses for TERM and the -k KILL.
+_TIMEOUT_EXIT_CODES = frozenset({124, 137})
+
+# Grace period between TERM and KILL for a timed-out command.
+_KILL_AFTER = 2
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """Result of one command from a batched exec."""
+
+    label: str
+    stdout: str
+    stderr: str
+    exit_status: int
+    elapsed_ms: int | None
+    timed_out: bool = False
+
+    def to_tool_result(self, timeout: float) -> ToolResult:
+        """Convert to the ToolResult shape tools already consume."""
+        if self.timed_out:
+            return ToolResult(
+                output=self.stdout.rstrip(),
+                error=f"Timed out ({timeout:g}s)",
+                exit_code=1,
+            )
+        return ToolResult(
+            output=self.stdout.rstrip(),
+            error=self.stderr.rstrip(),
+            exit_code=self.exit_status,
+        )
+
+
+def new_boundary() -> str:
+    """Random frame marker for one batch."""
+    return f"BASTION-{secrets.token_hex(8)}"
+
+
+def per_command_timeouts(timeout: float | Sequence[float], count: int) -> list[float]:
+    """Expand a shared timeout, or check a per-command list, to ``count`` entries."""
+    if isinstance(timeout, (int, float)):
+        return [timeout] * count
+    if len(timeout) != count:
+        raise ValueError(f"expected {count} timeouts, got {len(timeout)}")
+    return list(timeout)
+
+
+def build_batch_script(
+    commands: list[str], timeout: float | Sequence[float], boundary: str,
+) -> str:
+    """Build the ``sh`` script that runs ``commands`` and frames their output.
+
+    Each command runs in the remote user's login shell (as a plain SSH
+    exec would), in the background, under ``timeout -k``. The script
+    waits for all of them, then prints frames in index order.
+    ``timeout`` is shared or given per command.
+    """
+    timeouts = per_command_timeouts(timeout, len(commands))
+    lines = [
+        'T=$(mktemp -d 2>/dev/null || mktemp -d -t bastion) || exit 97',
+        "trap 'rm -rf \"$T\"' EXIT",
+        'now() { date +%s%N 2>/dev/null || echo 0; }',
+        'SH="${SHELL:-/bin/sh}"',
+    ]
+    for i, cmd in enumerate(commands):
+        lines.append(
+            f'( s=$(now); timeout -k {_KILL_AFTER} {timeouts[i]:g} "$SH" -c {shlex.quote(cmd)} '
+            f'>"$T/{i}.o" 2>"$T/{i}.e" </dev/null; '
+            f'echo "$? $s $(now)" >"$T/{i}.r" ) &'
+        )
+    indices = " ".join(str(i) for i in range(len(commands)))
+    lines += [
+        "wait",
+        f"for i in {indices}; do",
+        f"  printf '%s %s %s\\n' {boundary} \"$i\" \"$(cat \"$T/$i.r\" 2>/dev/null || echo '255 0 0')\"",
+        "  base64 <\"$T/$i.o\" 2>/dev/null | tr -d '\\n'; echo",
+        "  base64 <\"$T/$i.e\" 2>/dev/null | tr -d '\\n'; echo",
+        "done",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _b64(text: str) -> str:
+    try:
+        return base64.b64decode(text.strip(), validate=True).decode("utf-8", errors="replace")
+    except (binascii.Error, ValueError):
+        return ""
+
+
+def parse_batch_output(
+    output: str, labels: list[str], boundary: str, timeout: float | Sequence[float],
+) -> dict[str, BatchItem]:
+    """Parse framed batch output back into per-label results.
+
+    Labels with no frame (e.g. the script died early) are omitted;
+    the caller decides how to report them.
+    """
+    timeouts = per_command_timeouts(timeout, len(labels))
+    items: dict[str, BatchItem] = {}
+    lines = output.splitlines()
+    i = 0
+    while i < len(lines):
+        parts = lines[i].split()
+        if len(parts) < 3 or parts[0] != boundary:
+            i += 1
+            continue
+        try:
+            idx = int(parts[1])
+            rc = int(parts[2])
+        except ValueError:
+            i += 1
+            continue
+        elapsed_ms: int | None = None
+        if len(parts) >= 5:
+            try:
+                start, end = int(parts[3]), int(parts[4])
+                if start and end >= start:
+                    elapsed_ms = (end - start) // 1_000_000
+            except ValueError:
+                pass
+        stdout = _b64(lines[i + 1]) if i + 1 < len(lines) else ""
+        stderr = _b64(lines[i + 2]) if i + 2 < len(lines) else ""
+        i += 3
+        if not 0 <= idx < len(labels):
+            continue
+        timed_out = rc in _TIMEOUT_EXIT_CODES and (
+            elapsed_ms is None or elapsed_ms >= timeouts[idx] * 1000
+        )
+        items[labels[idx]] = BatchItem(
+            label=labels[idx],
+            stdout=stdout,
+            stderr=stderr,
+            exit_status=rc,
+            elapsed_ms=elapsed_ms,
+            timed_out=timed_out,
+        )
+    return items
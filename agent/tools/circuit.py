@@ -0,0 +1,105 @@
+"""Per-host circuit breaker for SSH connections.
+
+Without it, a dead host costs every fleet sweep the full connect
+timeout times the pool's retries — roughly 30s for one box that
+everyone already knows is down. The breaker remembers that:
+
+- **closed** — normal; connects are attempted.
+- **open** — the host failed to connect ``threshold`` times in a row.
+  Calls fail immediately with "unreachable since …" until
+  ``cooldown`` has passed.
+- **half-open** — one trial connect (a single attempt, no retries) is
+  in flight; everyone else still fails fast. Success closes the
+  breaker, failure re-opens it for another cooldown.
+
+The pool's maintenance task runs the half-open trial in the
+background so a recovered host is re-admitted before a tool needs it;
+without maintenance the first call after the cooldown is the trial.
+"""
+
+from __future__ import annotations
+
+import time
+from enum import Enum
+
+
+class BreakerState(str, Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Connection-level circuit breaker for one host."""
+
+    def __init__(self, threshold: int = 1, cooldown: float = 60.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.last_error = ""
+        self.down_since: float | None = None  # wall clock, for display
+        self._opened_at = 0.0  # monotonic
+
+    def allow(self) -> bool:
+        """Whether a connect may be attempted now.
+
+        When an open breaker's cooldown has passed, the caller that gets
+        True becomes the half-open trial and must report back with
+        ``record_success`` or ``record_failure``.
+        """
+        if self.state is BreakerState.CLOSED:
+            return True
+        if self.state is BreakerState.OPEN and self.probe_due():
+            self.state = BreakerState.HALF_OPEN
+            return True
+        return False
+
+    def probe_due(self) -> bool:
+        """Whether an open breaker's cooldown has passed."""
+        return (
+            self.state is BreakerState.OPEN
+            and time.monotonic() - self._opened_at >= self.cooldown
+        )
+
+    @property
+    def is_trial(self) -> bool:
+        """Whether the current attempt is the half-open trial."""
+        return self.state is BreakerState.HALF_OPEN
+
+    def abandon_trial(self) -> None:
+        """The half-open trial was cancelled: re-open, with a probe due now."""
+        if self.state is BreakerState.HALF_OPEN:
+            self.state = BreakerState.OPEN
+
+    def record_success(self) -> None:
+        """A connect succeeded: close the breaker."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.last_error = ""
+        self.down_since = None
+
+    def record_failure(self, error: str) -> bool:
+        """A connect failed. Returns True if this opened the breaker."""
+        self.failures += 1
+        self.last_error = error
+        if self.down_since is None:
+            self.down_since = time.time()
+        was_open = self.state is BreakerState.OPEN
+        if self.state is BreakerState.HALF_OPEN or self.failures >= self.threshold:
+            self.state = BreakerState.OPEN
+            self._opened_at = time.monotonic()
+        return self.state is BreakerState.OPEN and not was_open
+
+    def describe(self, name: str) -> str:
+        """Operator-facing message for a call rejected while open."""
+        since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.down_since or time.time()))
+        retry_in = max(0, int(self.cooldown - (time.monotonic() - self._opened_at)))
+        msg = f"Host {name!r} unreachable since {since}"
+        if self.last_error:
+            msg += f" ({self.last_error})"
+        if self.state is BreakerState.HALF_OPEN:
+            return msg + " — reconnect probe in progress."
+        return msg + f" — skipping; next reconnect probe in {retry_in}s."
@@ -10,6 +10,7 @@ import asyncio
 from dataclasses import dataclass
 from typing import Any
 
+from agent.host_facts import get_host_facts
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -552,6 +553,12 @@ async def _detect_config_type(
     server: str,
 ) -> str:
     """Auto-detect the server type by probing for known config files."""
+    facts = await get_host_facts(inventory, server)
+    if facts is not None:
+        if facts.is_cpanel:
+            return "cpanel"
+        return "pterodactyl" if facts.is_wings else "general"
+
     cpanel_result = await _run_on_server(
         inventory, server, "test -f /usr/local/cpanel/cpanel.config && echo cpanel"
     )
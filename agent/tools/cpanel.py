@@ -9,8 +9,10 @@ from __future__ import annotations
 
 import json
 import re
+import time
 from typing import Any
 
+from agent.domain_index import DomainOwner, resolve_domain
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -26,6 +28,10 @@ class CpanelListAccounts(BaseTool):
     def name(self) -> str:
         return "cpanel_list_accounts"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 120
+
     @property
     def description(self) -> str:
         return "List cPanel accounts on a WHM server with domain, plan, and disk usage."
@@ -61,6 +67,10 @@ class CpanelAccountInfo(BaseTool):
     def name(self) -> str:
         return "cpanel_account_info"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 60
+
     @property
     def description(self) -> str:
         return "Get details for a cPanel account: domain, disk, bandwidth, plan, email count."
@@ -97,6 +107,10 @@ class CpanelSSLStatus(BaseTool):
     def name(self) -> str:
         return "cpanel_ssl_status"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 300
+
     @property
     def description(self) -> str:
         return "Check SSL certificates on a cPanel server: expiry, coverage, AutoSSL status."
@@ -290,26 +304,66 @@ class CpanelDomainLookup(BaseTool):
     def name(self) -> str:
         return "cpanel_domain_lookup"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 120
+
     @property
     def description(self) -> str:
-        return "Find which cPanel account owns a domain, including addon/sub/parked domains."
+        return (
+            "Find which server and cPanel account own a domain, including "
+            "addon/sub/parked domains. Answered from the fleet's domain index; "
+            "server is only needed for domains the index doesn't know."
+        )
 
     @property
     def parameters(self) -> dict[str, Any]:
         return {
             "properties": {
-                "server": {"type": "string", "description": "Server name."},
+                "server": {
+                    "type": "string",
+                    "description": "Server name (optional; asked directly when given "
+                    "and the index has no answer).",
+                },
                 "domain": {"type": "string", "description": "Domain to look up."},
             },
-            "required": ["server", "domain"],
+            "required": ["domain"],
         }
 
-    async def execute(self, *, server: str, domain: str, **kwargs: Any) -> ToolResult:
+    async def execute(
+        self, *, domain: str, server: str | None = None, **kwargs: Any,
+    ) -> ToolResult:
         """Look up domain ownership."""
+        owner = await resolve_domain(self._inventory, domain)
+        if owner is not None and server in (None, owner.server):
+            return ToolResult(output=_format_owner(owner))
+        if server is None:
+            return ToolResult(
+                error=f"{domain} is not in the domain index. Specify server.",
+                exit_code=1,
+            )
         cmd = f"whmapi1 getdomainowner domain={domain} --output=json"
         return await _run_on_server(self._inventory, server, cmd)
 
 
+def _format_owner(owner: DomainOwner) -> str:
+    """Format a domain index entry."""
+    age = int((time.time() - owner.refreshed_at) / 60)
+    lines = [
+        f"Domain: {owner.domain}",
+        f"Server: {owner.server}",
+        f"User: {owner.user}",
+    ]
+    if owner.domain_type:
+        lines.append(f"Type: {owner.domain_type}")
+    if owner.main_domain:
+        lines.append(f"Parent domain: {owner.main_domain}")
+    if owner.docroot:
+        lines.append(f"Document root: {owner.docroot}")
+    lines.append(f"(from domain index, refreshed {age}m ago)")
+    return "\n".join(lines)
+
+
 class CpanelListDomains(BaseTool):
     """List all domains for a cPanel account."""
 
@@ -320,6 +374,10 @@ class CpanelListDomains(BaseTool):
     def name(self) -> str:
         return "cpanel_list_domains"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 120
+
     @property
     def description(self) -> str:
         return "List all domains (main, addon, sub, parked) for a cPanel account."
@@ -380,6 +438,10 @@ class CpanelDiskQuota(BaseTool):
     def name(self) -> str:
         return "cpanel_disk_quota"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 60
+
     @property
     def description(self) -> str:
         return "Check disk quota usage, inode count, and find large files for a cPanel account."
@@ -436,6 +498,10 @@ class CpanelPhpVersion(BaseTool):
     def name(self) -> str:
         return "cpanel_php_version"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 120
+
     @property
     def description(self) -> str:
         return "Check PHP version, handler, and key limits (memory, upload, exec time) for an account."
@@ -13,6 +13,7 @@ import json
 from dataclasses import dataclass
 from typing import Any
 
+from agent.domain_index import get_domain_index, resolve_domain
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -353,9 +354,25 @@ async def _collect_cpanel_data(
     server: str,
     include_domains: bool,
 ) -> ImpactData:
-    """Collect cPanel hosting data: accounts, domains, traffic."""
+    """Collect cPanel hosting data: accounts, domains, traffic.
+
+    Accounts and domains come from the domain index when it has a
+    fresh copy of the server; only the traffic estimate is fetched.
+    """
     data = ImpactData(errors=[])
 
+    index = get_domain_index()
+    if index.is_fresh(server):
+        data.accounts = index.accounts(server)
+        data.account_count = len(data.accounts)
+        if include_domains:
+            data.domain_map = index.domain_map(server)
+            data.domain_count = len(data.domain_map)
+        traffic_result = await _run_on_server(inventory, server, _CPANEL_TRAFFIC_CMD)
+        if traffic_result.success:
+            data.traffic_estimate = traffic_result.output.strip()
+        return data
+
     # Run account list and count in parallel
     coros = [
         _run_on_server(inventory, server, _CPANEL_ACCOUNT_LIST_CMD),
@@ -550,7 +567,14 @@ class CustomerImpact(BaseTool):
             "properties": {
                 "server": {
                     "type": "string",
-                    "description": "Server name from the inventory.",
+                    "description": "Server name from the inventory (optional if domain is given).",
+                },
+                "domain": {
+                    "type": "string",
+                    "description": (
+                        "A domain on the affected server; the server is looked "
+                        "up from the domain index when server is omitted."
+                    ),
                 },
                 "affected_service": {
                     "type": "string",
@@ -570,18 +594,28 @@ class CustomerImpact(BaseTool):
                     "default": True,
                 },
             },
-            "required": ["server", "affected_service"],
+            "required": ["affected_service"],
         }
 
     async def execute(
         self,
         *,
-        server: str,
         affected_service: str,
+        server: str | None = None,
+        domain: str | None = None,
         include_domains: bool = True,
         **kwargs: Any,
     ) -> ToolResult:
         """Collect data and build a customer impact report."""
+        if server is None:
+            owner = await resolve_domain(self._inventory, domain) if domain else None
+            if owner is None:
+                return ToolResult(
+                    error="Specify server (or a domain known to the domain index).",
+                    exit_code=1,
+                )
+            server = owner.server
+
         # Validate server exists in inventory
         try:
             self._inventory.get_server(server)
@@ -9,6 +9,7 @@ from __future__ import annotations
 
 from typing import Any
 
+from agent.host_facts import first_existing
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -24,6 +25,10 @@ class MySQLStatus(BaseTool):
     def name(self) -> str:
         return "mysql_status"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 30
+
     @property
     def description(self) -> str:
         return "MySQL status: uptime, connections, threads, queries/sec, buffer pool usage."
@@ -72,6 +77,10 @@ class MySQLProcessList(BaseTool):
     def name(self) -> str:
         return "mysql_processlist"
 
+    @property
+    def delta(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "Show active MySQL queries and connections. Flags long-running queries."
@@ -130,18 +139,15 @@ class MySQLSlowQueries(BaseTool):
     ) -> ToolResult:
         """Read slow query log."""
         # Common slow query log locations
-        for path in [
+        path = await first_existing(self._inventory, server, [
             "/var/log/mysql/slow-query.log",
             "/var/lib/mysql/slow-query.log",
             "/var/log/mariadb/slow-query.log",
             "/var/log/mysql/mysql-slow.log",
-        ]:
-            check = await _run_on_server(
-                self._inventory, server, f"test -f {path}",
-            )
-            if check.exit_code == 0:
-                cmd = f"tail -n {lines} {path}"
-                return await _run_on_server(self._inventory, server, cmd)
+        ])
+        if path is not None:
+            cmd = f"tail -n {lines} {path}"
+            return await _run_on_server(self._inventory, server, cmd)
 
         return ToolResult(
             error="Slow query log not found. It may be disabled.",
@@ -159,6 +165,10 @@ class MySQLDatabaseSizes(BaseTool):
     def name(self) -> str:
         return "mysql_database_sizes"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 120
+
     @property
     def description(self) -> str:
         return "Show MySQL database sizes sorted by size. Identifies large databases."
@@ -255,6 +265,10 @@ class MySQLTableRepair(BaseTool):
     def name(self) -> str:
         return "mysql_table_repair"
 
+    @property
+    def mutates(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "Repair corrupted MySQL tables. DESTRUCTIVE — requires operator approval."
@@ -285,6 +299,10 @@ class MySQLTableOptimize(BaseTool):
     def name(self) -> str:
         return "mysql_table_optimize"
 
+    @property
+    def mutates(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "Optimize MySQL tables to reclaim space and rebuild indexes. REQUIRES APPROVAL."
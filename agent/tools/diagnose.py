@@ -15,6 +15,7 @@ import json
 import re
 from typing import Any
 
+from agent.domain_index import resolve_domain
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -44,25 +45,42 @@ class DiagnoseSite(BaseTool):
             "properties": {
                 "server": {
                     "type": "string",
-                    "description": "Webhost server to diagnose from.",
+                    "description": (
+                        "Webhost server to diagnose from. Optional: looked up "
+                        "from the domain index when omitted."
+                    ),
                 },
                 "domain": {
                     "type": "string",
                     "description": "Domain name to diagnose (e.g. 'example.com').",
                 },
             },
-            "required": ["server", "domain"],
+            "required": ["domain"],
         }
 
-    async def execute(self, *, server: str, domain: str, **kwargs: Any) -> ToolResult:
+    async def execute(
+        self, *, domain: str, server: str | None = None, **kwargs: Any,
+    ) -> ToolResult:
         """Run parallel diagnosis for a domain."""
-        # Phase 1: Identify the account owner and docroot
-        owner_result = await _run_on_server(
-            self._inventory, server,
-            f"whmapi1 getdomainowner domain={domain} --output=json",
-        )
-        username = _extract_owner(owner_result.output if owner_result.success else "")
-        docroot = f"/home/{username}/public_html" if username else None
+        # Phase 1: Identify the server, account owner and docroot —
+        # from the domain index when it knows the domain
+        owner = await resolve_domain(self._inventory, domain)
+        if owner is not None and server in (None, owner.server):
+            server = owner.server
+            username: str | None = owner.user
+            docroot = owner.docroot or f"/home/{owner.user}/public_html"
+        elif server is None:
+            return ToolResult(
+                error=f"{domain} is not in the domain index. Specify server.",
+                exit_code=1,
+            )
+        else:
+            owner_result = await _run_on_server(
+                self._inventory, server,
+                f"whmapi1 getdomainowner domain={domain} --output=json",
+            )
+            username = _extract_owner(owner_result.output if owner_result.success else "")
+            docroot = f"/home/{username}/public_html" if username else None
 
         # Phase 2: Run all checks in parallel
         checks: dict[str, Any] = {}
@@ -11,6 +11,18 @@ from typing import Any
 
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
+from agent.tools.singleflight import SingleFlight
+from agent.tools.ssh_pool import (  # noqa: F401 — close_ssh_pool re-exported
+    close_ssh_pool,
+    coalescing_allowed,
+    get_ssh_pool,
+)
+from agent.tools.stream import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_LINES,
+    CommandStream,
+    drain_stderr,
+)
 
 
 class DockerPs(BaseTool):
@@ -23,6 +35,14 @@ class DockerPs(BaseTool):
     def name(self) -> str:
         return "docker_ps"
 
+    @property
+    def delta(self) -> bool:
+        return True
+
+    @property
+    def cache_ttl(self) -> float:
+        return 15
+
     @property
     def description(self) -> str:
         return "List Docker containers on a server. Set all=true for stopped too."
@@ -108,57 +128,142 @@ class DockerLogs(BaseTool):
             cmd += f" --since {since}"
         cmd += f" {container}"
 
-        return await _run_on_server(self._inventory, server, cmd)
-
+        # Streamed with a byte budget so a chatty container can't pull
+        # megabytes onto the bastion only to be truncated later.
+        return await _stream_on_server(self._inventory, server, cmd, tail=True).collect()
 
-_ssh_pool: Any = None
 
+async def _run_on_server(inventory: Inventory, server: str, command: str) -> ToolResult:
+    """Run a command locally or remotely depending on the server.
 
-def get_ssh_pool() -> Any:
-    """Get or create the global SSH connection pool.
-
-    Returns None if asyncssh is not available.
+    Remote commands go through the shared SSH connection pool,
+    avoiding a fresh SSH handshake for every command. Identical
+    commands already running on the same server are joined rather
+    than run again, locally as in the pool.
     """
-    global _ssh_pool
-    if _ssh_pool is not None:
-        return _ssh_pool
     try:
-        from agent.tools.ssh_pool import SSHPool
-        _ssh_pool = SSHPool()
-        return _ssh_pool
-    except Exception:
-        return None
+        server_info = inventory.get_server(server)
+    except KeyError as e:
+        return ToolResult(error=str(e), exit_code=1)
 
+    if server == "localhost" or not server_info.definition.ssh:
+        return await _run_local_shared(command)
 
-async def close_ssh_pool() -> None:
-    """Close the global SSH pool. Call at session end."""
-    global _ssh_pool
-    if _ssh_pool is not None:
-        await _ssh_pool.close_all()
-        _ssh_pool = None
+    return await get_ssh_pool().run(server_info, command)
 
 
-async def _run_on_server(inventory: Inventory, server: str, command: str) -> ToolResult:
-    """Run a command locally or remotely depending on the server.
+async def _run_batch_on_server(
+    inventory: Inventory, server: str, commands: dict[str, str], timeout: int = 30,
+) -> dict[str, ToolResult]:
+    """Run labelled commands on a server, batched into one SSH exec.
 
-    Uses the SSH connection pool for remote servers when available,
-    avoiding a fresh SSH handshake for every command.
+    Remote servers get a single round trip via ``SSHPool.run_batch``;
+    localhost runs each command as ``_run_on_server`` would.
+
+    Returns:
+        Dict of label -> ToolResult.
     """
     try:
         server_info = inventory.get_server(server)
     except KeyError as e:
-        return ToolResult(error=str(e), exit_code=1)
+        return {k: ToolResult(error=str(e), exit_code=1) for k in commands}
 
     if server == "localhost" or not server_info.definition.ssh:
-        return await _run_local(command)
-
-    # Try pooled connection first
-    pool = get_ssh_pool()
-    if pool is not None:
-        return await pool.run(server_info, command)
+        keys = list(commands)
+        results = await asyncio.gather(*[_run_local_shared(commands[k]) for k in keys])
+        return dict(zip(keys, results))
+
+    return await get_ssh_pool().run_batch(server_info, commands, timeout=timeout)
+
+
+def _stream_on_server(
+    inventory: Inventory,
+    server: str,
+    command: str,
+    *,
+    timeout: int = 30,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_lines: int = DEFAULT_MAX_LINES,
+    tail: bool = False,
+) -> CommandStream:
+    """Stream a command's stdout locally or remotely depending on the server.
+
+    The streaming counterpart of ``_run_on_server``: output is yielded
+    line by line and the command is stopped once the budget is used up.
+    Pass ``tail`` for sources whose newest lines come last, so the
+    budget drops the oldest ones instead.
+    """
+    try:
+        server_info = inventory.get_server(server)
+    except KeyError as e:
+        return CommandStream.failed(str(e))
 
-    from agent.tools.remote import run_remote_command
-    return await run_remote_command(server_info, command)
+    budget: dict[str, Any] = {
+        "timeout": timeout, "max_bytes": max_bytes, "max_lines": max_lines, "tail": tail,
+    }
+    if server == "localhost" or not server_info.definition.ssh:
+        return _LocalCommandStream(command, **budget)
+
+    return get_ssh_pool().run_stream(server_info, command, **budget)
+
+
+class _LocalCommandStream(CommandStream):
+    """CommandStream over a local subprocess (no shell, like ``_run_local``)."""
+
+    def __init__(self, command: str, **kwargs: Any) -> None:
+        super().__init__(command, **kwargs)
+        self._proc: asyncio.subprocess.Process | None = None
+        self._stderr_task: asyncio.Task[str] | None = None
+
+    async def _open(self) -> None:
+        import shlex
+        args = shlex.split(self.command)
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=max(self.max_bytes + 1, 64 * 1024),
+            )
+        except FileNotFoundError:
+            self.error = f"Command not found: {args[0]}"
+            return
+        self._stderr_task = asyncio.ensure_future(drain_stderr(self._proc.stderr))
+
+    async def _readline(self) -> str:
+        try:
+            line = await self._proc.stdout.readline()
+        except ValueError:
+            # A single line longer than the whole budget
+            self.truncated = True
+            return ""
+        return line.decode("utf-8", errors="replace")
+
+    async def _wait(self) -> None:
+        self.exit_status = await self._proc.wait()
+        if self._stderr_task is not None:
+            self.stderr = await self._stderr_task
+
+    async def _close(self, abort: bool) -> None:
+        if self._stderr_task is not None and not self._stderr_task.done():
+            self._stderr_task.cancel()
+        if self._proc is not None and abort and self._proc.returncode is None:
+            self._proc.kill()
+            # Reading resumes a paused pipe; wait() only returns after EOF
+            await self._proc.stdout.read()
+            await self._proc.wait()
+
+
+# Local counterpart of the pool's coalescing: one run per identical
+# read-only command in flight on the bastion.
+_local_flights = SingleFlight()
+
+
+async def _run_local_shared(command: str) -> ToolResult:
+    """``_run_local``, joining an identical read-only command that is already running."""
+    if not coalescing_allowed():
+        return await _run_local(command)
+    return await _local_flights.do(command, lambda: _run_local(command))
 
 
 async def _run_local(command: str) -> ToolResult:
@@ -172,10 +277,17 @@ async def _run_local(command: str) -> ToolResult:
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
-        stdout, stderr = await proc.communicate()
     except FileNotFoundError:
         return ToolResult(error=f"Command not found: {args[0]}", exit_code=127)
 
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        # Timed out or cancelled by the operator — don't leave it running
+        if proc.returncode is None:
+            proc.kill()
+        raise
+
     return ToolResult(
         output=stdout.decode("utf-8", errors="replace").rstrip(),
         error=stderr.decode("utf-8", errors="replace").rstrip(),
@@ -66,7 +66,7 @@ class ReadFile(BaseTool):
         if server == "localhost":
             return await self._read_local(path, lines)
 
-        # Remote read via SSH (lazy import to avoid hard dep on asyncssh)
+        # Remote read via the shared SSH pool (lazy import to avoid hard dep on asyncssh)
         try:
             server_info = self._inventory.get_server(server)
         except KeyError as e:
@@ -11,13 +11,12 @@ CS2, Valheim, etc.)
 
 from __future__ import annotations
 
-import asyncio
 import re
 from typing import Any
 
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
-from agent.tools.docker_tools import _run_on_server
+from agent.tools.docker_tools import _run_batch_on_server
 
 
 class GameServerDiagnose(BaseTool):
@@ -58,90 +57,51 @@ class GameServerDiagnose(BaseTool):
     async def execute(self, *, server: str, container: str, **kwargs: Any) -> ToolResult:
         """Run deep game server diagnostics."""
         # Phase 1: Gather all data in parallel
-        checks: dict[str, Any] = {
+        checks: dict[str, str] = {
             # Container resource usage (CPU, memory, I/O, network)
-            "stats": _run_on_server(
-                self._inventory, server,
+            "stats": (
                 f"docker stats --no-stream --format "
                 f"'{{{{.CPUPerc}}}}|{{{{.MemUsage}}}}|{{{{.MemPerc}}}}|"
-                f"{{{{.NetIO}}}}|{{{{.BlockIO}}}}|{{{{.PIDs}}}}' {container}",
+                f"{{{{.NetIO}}}}|{{{{.BlockIO}}}}|{{{{.PIDs}}}}' {container}"
             ),
             # CPU throttling — the #1 cause of rubberbanding
-            "throttling": _run_on_server(
-                self._inventory, server,
-                f"docker exec {container} cat /sys/fs/cgroup/cpu.stat 2>/dev/null",
-            ),
+            "throttling": f"docker exec {container} cat /sys/fs/cgroup/cpu.stat 2>/dev/null",
             # Cgroup v1 fallback
-            "throttling_v1": _run_on_server(
-                self._inventory, server,
-                f"docker exec {container} cat /sys/fs/cgroup/cpu/cpu.stat 2>/dev/null",
-            ),
+            "throttling_v1": f"docker exec {container} cat /sys/fs/cgroup/cpu/cpu.stat 2>/dev/null",
             # Memory limit vs usage (OOM risk)
-            "mem_limit": _run_on_server(
-                self._inventory, server,
-                f"docker exec {container} cat /sys/fs/cgroup/memory.max 2>/dev/null",
-            ),
-            "mem_current": _run_on_server(
-                self._inventory, server,
-                f"docker exec {container} cat /sys/fs/cgroup/memory.current 2>/dev/null",
-            ),
+            "mem_limit": f"docker exec {container} cat /sys/fs/cgroup/memory.max 2>/dev/null",
+            "mem_current": f"docker exec {container} cat /sys/fs/cgroup/memory.current 2>/dev/null",
             # Swap usage (instant lag if swapping)
-            "mem_swap": _run_on_server(
-                self._inventory, server,
-                f"docker exec {container} cat /sys/fs/cgroup/memory.swap.current 2>/dev/null",
-            ),
+            "mem_swap": f"docker exec {container} cat /sys/fs/cgroup/memory.swap.current 2>/dev/null",
             # I/O wait on the host
-            "iowait": _run_on_server(
-                self._inventory, server, "top -bn1 -1",
-            ),
+            "iowait": "top -bn1 -1",
             # Disk latency
-            "iostat": _run_on_server(
-                self._inventory, server, "iostat -x 1 2",
-            ),
+            "iostat": "iostat -x 1 2",
             # Network retransmissions (packet loss from server side)
-            "tcp_retrans": _run_on_server(
-                self._inventory, server, "ss -ti",
-            ),
+            "tcp_retrans": "ss -ti",
             # Network interface errors/drops
-            "net_errors": _run_on_server(
-                self._inventory, server, "ip -s link",
-            ),
+            "net_errors": "ip -s link",
             # Process list inside container (thread count, CPU per process)
-            "processes": _run_on_server(
-                self._inventory, server,
-                f"docker exec {container} ps aux --sort=-%cpu",
-            ),
+            "processes": f"docker exec {container} ps aux --sort=-%cpu",
             # Container logs (last 100 lines for error/warning/lag detection)
-            "logs": _run_on_server(
-                self._inventory, server,
-                f"docker logs --tail 100 {container} 2>&1",
-            ),
+            "logs": f"docker logs --tail 100 {container} 2>&1",
             # Host load average and CPU count
-            "uptime": _run_on_server(self._inventory, server, "uptime"),
-            "nproc": _run_on_server(self._inventory, server, "nproc"),
+            "uptime": "uptime",
+            "nproc": "nproc",
             # Other containers on the same host (noisy neighbors)
-            "all_containers": _run_on_server(
-                self._inventory, server,
-                "docker stats --no-stream --format '{{.Name}}|{{.CPUPerc}}|{{.MemPerc}}'",
-            ),
+            "all_containers": "docker stats --no-stream --format '{{.Name}}|{{.CPUPerc}}|{{.MemPerc}}'",
             # Container inspect for resource limits
-            "inspect": _run_on_server(
-                self._inventory, server,
+            "inspect": (
                 f"docker inspect --format "
                 f"'{{{{.HostConfig.CpuQuota}}}}|{{{{.HostConfig.CpuPeriod}}}}|"
                 f"{{{{.HostConfig.Memory}}}}|{{{{.HostConfig.MemorySwap}}}}|"
-                f"{{{{.State.StartedAt}}}}|{{{{.RestartCount}}}}' {container}",
+                f"{{{{.State.StartedAt}}}}|{{{{.RestartCount}}}}' {container}"
             ),
             # OOM kills in dmesg
-            "dmesg_oom": _run_on_server(
-                self._inventory, server,
-                "dmesg -T --level=err,crit,alert,emerg --nopager",
-            ),
+            "dmesg_oom": "dmesg -T --level=err,crit,alert,emerg --nopager",
         }
 
-        keys = list(checks.keys())
-        results = await asyncio.gather(*[checks[k] for k in keys])
-        data = dict(zip(keys, results))
+        data = await _run_batch_on_server(self._inventory, server, checks)
 
         # Phase 2: Analyze and build report
         return ToolResult(output=_build_game_report(container, data))
@@ -10,10 +10,12 @@ from __future__ import annotations
 
 import asyncio
 import re
+import time
 from typing import Any
 
+from agent.host_facts import HostFacts, get_host_facts
 from agent.inventory import Inventory, ServerInfo
-from agent.tools.base import BaseTool, ToolResult
+from agent.tools.base import BaseTool, ToolResult, parse_issue
 
 
 # Thresholds for flagging issues
@@ -32,6 +34,10 @@ class HealthCheck(BaseTool):
     def name(self) -> str:
         return "health_check"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 30
+
     @property
     def description(self) -> str:
         return (
@@ -69,7 +75,8 @@ async def run_health_check(inventory: Inventory, server: str = "all") -> ToolRes
         server: Server name or 'all'.
 
     Returns:
-        ToolResult with the health report.
+        ToolResult with the health report, and per-server issues and
+        readings as ``data`` for the model.
     """
     if server == "all":
         servers = [inventory.get_server(n) for n in inventory.server_names]
@@ -81,43 +88,62 @@ async def run_health_check(inventory: Inventory, server: str = "all") -> ToolRes
 
     # Check all servers in parallel
     results = await asyncio.gather(
-        *[_check_server(s) for s in servers],
+        *[_check_server(s, inventory) for s in servers],
         return_exceptions=True,
     )
 
     sections: list[str] = []
+    issues: list[dict[str, Any]] = []
+    entities: list[dict[str, Any]] = []
     any_issues = False
     for srv, result in zip(servers, results):
         if isinstance(result, Exception):
             sections.append(f"## {srv.name}\n  ✗ Error: {result}")
+            issues.append(parse_issue(f"✗ Error: {result}", server=srv.name))
+            entities.append({"server": srv.name, "ok": False})
             any_issues = True
         else:
-            report, has_issues = result
+            report, has_issues, summary = result
             sections.append(f"## {srv.name}\n{report}")
+            issues.extend(dict(i, server=srv.name) for i in summary["issues"])
+            entities.append({"server": srv.name, "ok": not has_issues, **summary["metrics"]})
             if has_issues:
                 any_issues = True
 
     return ToolResult(
         output="\n\n".join(sections),
         exit_code=1 if any_issues else 0,
+        data={"issues": issues, "entities": entities},
     )
 
 
-async def _check_server(server_info: ServerInfo) -> tuple[str, bool]:
+async def _check_server(
+    server_info: ServerInfo, inventory: Inventory | None = None,
+) -> tuple[str, bool, dict[str, Any]]:
     """Run all health checks for a single server.
 
+    CPU count and cPanel version come from the host's cached facts
+    when available instead of being asked for on every sweep.
+
     Returns:
-        Tuple of (report_text, has_issues).
+        Tuple of (report_text, has_issues, summary) — see ``_analyze``.
     """
     is_local = not server_info.definition.ssh
     role = server_info.definition.role
+    facts: HostFacts | None = None
+    if inventory is not None:
+        facts = await get_host_facts(inventory, server_info.name)
 
     commands: dict[str, str] = {
         "uptime": "uptime",
         "disk": "df -h",
         "memory": "free -m",
-        "nproc": "nproc",
     }
+    known: dict[str, str] = {}
+    if facts is not None and facts.nproc:
+        known["nproc"] = str(facts.nproc)
+    else:
+        commands["nproc"] = "nproc"
 
     # Docker checks for servers with docker
     if "docker" in server_info.definition.services:
@@ -160,12 +186,16 @@ async def _check_server(server_info: ServerInfo) -> tuple[str, bool]:
         if "exim" in server_info.definition.services:
             commands["mail_queue"] = "exim -bpc"
         # cPanel update status
-        commands["cpanel_version"] = "/usr/local/cpanel/cpanel -V"
+        if facts is not None:
+            known["cpanel_version"] = facts.cpanel_version
+        else:
+            commands["cpanel_version"] = "/usr/local/cpanel/cpanel -V"
 
     if is_local:
         raw = await _run_local_parallel(commands)
     else:
         raw = await _run_remote_parallel(server_info, commands)
+    raw.update(known)
 
     return _analyze(server_info, raw)
 
@@ -173,22 +203,30 @@ async def _check_server(server_info: ServerInfo) -> tuple[str, bool]:
 async def _run_local_parallel(commands: dict[str, str]) -> dict[str, str]:
     """Run commands locally in parallel."""
 
+    from agent.tools.latency import get_latency_tracker
+
+    latency = get_latency_tracker()
+
     async def _run_one(label: str, cmd: str) -> tuple[str, str]:
         args = cmd.split()
+        timeout = latency.timeout_for("localhost", cmd, 10)
         try:
+            start = time.monotonic()
             proc = await asyncio.create_subprocess_exec(
                 *args,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
             stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=10,
+                proc.communicate(), timeout=timeout,
             )
+            latency.record("localhost", cmd, time.monotonic() - start)
             out = stdout.decode("utf-8", errors="replace").rstrip()
             if proc.returncode != 0 and not out and stderr:
                 return label, f"ERROR:{stderr.decode('utf-8', errors='replace').rstrip()}"
             return label, out
         except asyncio.TimeoutError:
+            latency.record_timeout("localhost", cmd, timeout, 10)
             return label, "ERROR:timed out"
         except Exception as e:
             return label, f"ERROR:{e}"
@@ -202,62 +240,28 @@ async def _run_local_parallel(commands: dict[str, str]) -> dict[str, str]:
 async def _run_remote_parallel(
     server_info: ServerInfo, commands: dict[str, str],
 ) -> dict[str, str]:
-    """Run commands on a remote server, reusing one SSH connection."""
-    try:
-        import asyncssh
-    except ImportError:
-        return {k: "ERROR:asyncssh not available" for k in commands}
-
-    defn = server_info.definition
-    if not defn.key_path:
-        return {k: f"ERROR:no SSH key for {server_info.name}" for k in commands}
-
-    try:
-        conn = await asyncio.wait_for(
-            asyncssh.connect(
-                defn.host,
-                username=defn.user,
-                client_keys=[defn.key_path],
-                known_hosts=defn.known_hosts_path,
-            ),
-            timeout=10,
-        )
-    except asyncio.TimeoutError:
-        return {k: f"ERROR:SSH connect timeout ({defn.host})" for k in commands}
-    except Exception as e:
-        return {k: f"ERROR:SSH failed: {e}" for k in commands}
-
-    async def _run_one(label: str, cmd: str) -> tuple[str, str]:
-        try:
-            result = await asyncio.wait_for(conn.run(cmd, check=False), timeout=15)
-            out = (result.stdout or "").rstrip()
-            err = (result.stderr or "").rstrip()
-            if result.exit_status != 0 and not out and err:
-                return label, f"ERROR:{err}"
-            return label, out
-        except asyncio.TimeoutError:
-            return label, "ERROR:timed out"
-        except Exception as e:
-            return label, f"ERROR:{e}"
+    """Run commands on a remote server as one batched SSH exec."""
+    from agent.tools.ssh_pool import get_ssh_pool
 
-    try:
-        async with conn:
-            pairs = await asyncio.gather(
-                *[_run_one(lbl, cmd) for lbl, cmd in commands.items()]
-            )
-    except Exception as e:
-        return {k: f"ERROR:{e}" for k in commands}
+    results = await get_ssh_pool().run_batch(server_info, commands, timeout=15)
 
-    return dict(pairs)
+    raw: dict[str, str] = {}
+    for label, result in results.items():
+        if result.exit_code != 0 and not result.output and result.error:
+            raw[label] = f"ERROR:{result.error}"
+        else:
+            raw[label] = result.output
+    return raw
 
 
 def _analyze(
     server_info: ServerInfo, raw: dict[str, str],
-) -> tuple[str, bool]:
+) -> tuple[str, bool, dict[str, Any]]:
     """Analyze raw outputs and produce summary with flags.
 
     Returns:
-        Tuple of (report_text, has_issues).
+        Tuple of (report_text, has_issues, summary), where summary holds
+        the same issues and readings as ``{"issues": [...], "metrics": {...}}``.
     """
     lines: list[str] = []
     issues: list[str] = []
@@ -391,7 +395,34 @@ def _analyze(
         report_lines = ["✓ All clear"]
         report_lines.extend(lines)
 
-    return "\n".join(report_lines), has_issues
+    summary = {
+        "issues": [parse_issue(i) for i in issues],
+        "metrics": _readings(lines),
+    }
+    return "\n".join(report_lines), has_issues, summary
+
+
+_UPTIME_RE = re.compile(r"up\s+(.*?),\s+\d+\s+users?,\s+load average:\s*(.*)")
+
+
+def _readings(lines: list[str]) -> dict[str, Any]:
+    """Readings from report lines like ``"Mail queue: 12"``, keyed by name.
+
+    "OK" lines are left out — a check without an issue passed.
+    """
+    readings: dict[str, Any] = {}
+    for line in lines:
+        key, _, value = line.partition(": ")
+        value = value.strip()
+        if value in ("OK", "all healthy"):
+            continue
+        match = _UPTIME_RE.search(value) if key == "Uptime" else None
+        if match:
+            readings["up"] = " ".join(match.group(1).split())
+            readings["load"] = match.group(2).replace(",", "").strip()
+        else:
+            readings[key.lower().replace(" ", "_")] = value
+    return readings
 
 
 def _analyze_webhost(
@@ -29,6 +29,10 @@ class InfrastructurePulse(BaseTool):
     def name(self) -> str:
         return "infrastructure_pulse"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 30
+
     @property
     def description(self) -> str:
         return (
@@ -0,0 +1,321 @@
+"""Per-host command latency histograms and the timeouts derived from them.
+
+A fixed timeout is wrong both ways: a hung command on a fast host
+holds the caller for the full 15-30s, while a heavy ``du`` on a
+slow-but-healthy host hits 15s every sweep. The transport records how
+long each (host, command class) takes and, once there is enough
+history, uses ``quantile × factor`` instead of the caller's timeout,
+clamped to ``[min_timeout, max_timeout]``. The quantile is p95 until a
+class has ``_FULL_HISTORY`` samples and p99 after, so a single outlier
+in a short history doesn't set the timeout.
+
+A command that times out is recorded as having taken the caller's
+default timeout at most, so repeated timeouts can't ratchet the
+learned value up to ``max_timeout``.
+
+Histograms use fixed log-spaced buckets, decay by halving once they
+hold ``_DECAY_AT`` samples (so they follow a host that got faster or
+slower) and persist to the state directory so a restart doesn't
+throw the history away.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shlex
+import time
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+_STATE_DIR = Path(os.environ.get("BASTION_STATE_DIR", "./state"))
+LATENCY_FILE = _STATE_DIR / "ssh_latency.json"
+
+# Bucket upper bounds (seconds); one extra overflow bucket follows.
+_BUCKETS: tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, 300,
+)
+_DECAY_AT = 2000
+_DEFAULT_MIN_SAMPLES = 50
+# Below this many samples p99 is the few slowest calls: use p95
+_FULL_HISTORY = 200
+_QUANTILE = 0.99
+_SHORT_HISTORY_QUANTILE = 0.95
+
+# Commands whose first word says little: classify by the subcommand too.
+_SUBCOMMAND_TOOLS = frozenset({
+    "docker", "systemctl", "wp", "git", "kubectl", "apt", "yum", "dnf",
+    "journalctl", "mysqladmin", "whmapi1", "uapi", "php",
+})
+_ENV_ASSIGN_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+
+# Commands that run another command, with their options that take a value
+_WRAPPERS: dict[str, frozenset[str]] = {
+    "sudo": frozenset({"-u", "-g", "-h", "-p", "-C", "-D", "-r", "-t", "-U"}),
+    "runuser": frozenset({"-u", "-g", "-G", "-l", "-s", "-w"}),
+    "timeout": frozenset({"-s", "-k", "--signal", "--kill-after"}),
+    "nice": frozenset({"-n", "--adjustment"}),
+    "ionice": frozenset({"-c", "-n", "-p", "--class", "--classdata"}),
+    "env": frozenset({"-u", "-C", "--unset", "--chdir"}),
+    "nohup": frozenset(),
+    "stdbuf": frozenset({"-i", "-o", "-e"}),
+}
+_SHELLS = frozenset({"sh", "bash", "dash"})
+_CONTROL_CHARS = set("();<>|&")
+
+
+def _tokens(command: str) -> list[str]:
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    try:
+        return list(lexer)
+    except ValueError:
+        # Unbalanced quotes: classify on the raw words
+        return command.split()
+
+
+def _unwrap(words: list[str]) -> list[str]:
+    """Drop env assignments and wrappers (with their options) before the real command."""
+    while words:
+        head = words[0].rsplit("/", 1)[-1]
+        if _ENV_ASSIGN_RE.match(words[0]):
+            words = words[1:]
+        elif head in _WRAPPERS:
+            takes_value = _WRAPPERS[head]
+            words = words[1:]
+            while words and words[0].startswith("-"):
+                option = words.pop(0)
+                if option == "--":
+                    break
+                if option in takes_value and words:
+                    words.pop(0)
+            if head == "timeout" and words:
+                words = words[1:]  # the duration
+        else:
+            return words
+    return words
+
+
+def command_class(command: str) -> str:
+    """Class for a command line, e.g. ``docker logs``, ``wp db`` or ``du``.
+
+    Classifies the command that does the work: ``sudo``/``runuser``/
+    ``timeout``/``nice`` wrappers with their options, env assignments and
+    leading ``cd ... &&`` are skipped, and ``sh -c '...'`` is classified by
+    the script inside. Arguments (paths, container names) are dropped so
+    history is shared between calls that do the same kind of work.
+    """
+    segment: list[str] = []
+    for token in [*_tokens(command), ";"]:
+        if not set(token) <= _CONTROL_CHARS:
+            segment.append(token)
+            continue
+        words = _unwrap(segment)
+        segment = []
+        if not words or words[0] == "cd":
+            continue
+        head = words[0].rsplit("/", 1)[-1]
+        if head in _SHELLS and "-c" in words[1:-1]:
+            return command_class(words[words.index("-c") + 1])
+        if head in _SUBCOMMAND_TOOLS:
+            for word in words[1:]:
+                if not word.startswith("-"):
+                    return f"{head} {word}"
+        return head
+    return "?"
+
+
+class LatencyHistogram:
+    """Counts of observed latencies in fixed log-spaced buckets."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.max_seen = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def add(self, seconds: float) -> None:
+        for i, bound in enumerate(_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.max_seen = max(self.max_seen, seconds)
+        if self.total >= _DECAY_AT:
+            self.counts = [c // 2 for c in self.counts]
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        total = self.total
+        if not total:
+            return None
+        threshold = q * total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return _BUCKETS[i] if i < len(_BUCKETS) else self.max_seen
+        return self.max_seen
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"counts": self.counts, "max": self.max_seen}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LatencyHistogram | None:
+        counts = data.get("counts")
+        if not isinstance(counts, list) or len(counts) != len(_BUCKETS) + 1:
+            return None  # bucket layout changed — start fresh
+        hist = cls()
+        hist.counts = [int(c) for c in counts]
+        hist.max_seen = float(data.get("max", 0.0))
+        return hist
+
+
+class LatencyTracker:
+    """Latency histograms keyed by (host, command class)."""
+
+    def __init__(
+        self,
+        *,
+        path: Path | None = None,
+        factor: float = 3.0,
+        min_timeout: float = 5,
+        max_timeout: float = 120,
+        min_samples: int = _DEFAULT_MIN_SAMPLES,
+        enabled: bool = True,
+    ) -> None:
+        self.path = path
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self._hists: dict[str, dict[str, LatencyHistogram]] = {}
+        self._dirty = False
+
+    def record(self, host: str, command: str, seconds: float) -> None:
+        """Record how long a command took on a host."""
+        cls = command_class(command)
+        hist = self._hists.setdefault(host, {}).get(cls)
+        if hist is None:
+            hist = self._hists[host][cls] = LatencyHistogram()
+        hist.add(seconds)
+        self._dirty = True
+
+    def record_timeout(
+        self, host: str, command: str, timeout: float, default: float,
+    ) -> None:
+        """Record a command that timed out after ``timeout``.
+
+        The sample is capped at the caller's ``default``: a learned
+        timeout fed back in would push the class towards ``max_timeout``
+        with every hung call. A host that needs longer than the default
+        still earns it, since ``default × factor`` exceeds the default.
+        """
+        self.record(host, command, min(timeout, default))
+
+    def timeout_for(self, host: str, command: str, default: float) -> float:
+        """Timeout for ``command`` on ``host``: learned from history, else ``default``."""
+        if not self.enabled:
+            return default
+        hist = self._hists.get(host, {}).get(command_class(command))
+        if hist is None or hist.total < self.min_samples:
+            return default
+        q = _QUANTILE if hist.total >= _FULL_HISTORY else _SHORT_HISTORY_QUANTILE
+        observed = hist.quantile(q) or 0.0
+        learned = min(self.max_timeout, max(self.min_timeout, observed * self.factor))
+        return round(learned, 1)
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, float | int | None]]]:
+        """Per-host, per-class sample count and p50/p99 (for stats/debugging)."""
+        return {
+            host: {
+                cls: {
+                    "samples": h.total,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(_QUANTILE),
+                }
+                for cls, h in classes.items()
+            }
+            for host, classes in self._hists.items()
+        }
+
+    def load(self) -> None:
+        """Load persisted histograms (missing or corrupt file = no history)."""
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for host, classes in data.get("hosts", {}).items():
+            for cls, raw in classes.items():
+                hist = LatencyHistogram.from_dict(raw)
+                if hist is not None:
+                    self._hists.setdefault(host, {})[cls] = hist
+
+    def save(self) -> None:
+        """Persist histograms if anything changed since the last save."""
+        if self.path is None or not self._dirty:
+            return
+        data = {
+            "saved_at": time.time(),
+            "hosts": {
+                host: {cls: h.to_dict() for cls, h in classes.items()}
+                for host, classes in self._hists.items()
+            },
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data))
+            tmp.replace(self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning("latency_save_failed", path=str(self.path), error=str(e))
+
+
+# ── Process-wide tracker ─────────────────────────────────────────
+
+_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """The process-wide tracker used by the SSH pool and local runners."""
+    return _tracker
+
+
+def configure_latency(
+    *,
+    path: Path | None = LATENCY_FILE,
+    enabled: bool | None = None,
+    factor: float | None = None,
+    min_timeout: float | None = None,
+    max_timeout: float | None = None,
+) -> LatencyTracker:
+    """Apply settings (e.g. from AgentConfig) and load persisted history.
+
+    Updates the process-wide tracker in place, so a pool already
+    holding it picks the settings up too.
+    """
+    updates = {
+        "enabled": enabled,
+        "factor": factor,
+        "min_timeout": min_timeout,
+        "max_timeout": max_timeout,
+    }
+    for key, value in updates.items():
+        if value is not None:
+            setattr(_tracker, key, value)
+    if path != _tracker.path:
+        _tracker.path = path
+        _tracker.load()
+    return _tracker
@@ -21,6 +21,10 @@ class RunLocalCommand(BaseTool):
     def name(self) -> str:
         return "run_local_command"
 
+    @property
+    def mutates(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return "Run a command on the bastion server. Must match the bastion allowlist."
@@ -12,7 +12,12 @@ from typing import Any
 
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
-from agent.tools.docker_tools import _run_on_server
+from agent.tools.docker_tools import _stream_on_server
+
+# Per-source stdout budget. Most sources are already line-limited; this
+# guards against enormous lines (stack dumps, JSON blobs) and a long
+# dmesg. Log sources keep their newest lines when it is hit.
+_SOURCE_MAX_BYTES = 256 * 1024
 
 
 class LogCorrelate(BaseTool):
@@ -84,33 +89,37 @@ class LogCorrelate(BaseTool):
                 continue
 
             # System journal
-            tasks[f"{srv_name}:syslog"] = _run_on_server(
+            tasks[f"{srv_name}:syslog"] = _stream_on_server(
                 self._inventory, srv_name,
                 f"journalctl --no-pager -n 100 --since '{since} ago' 2>/dev/null",
-            )
+                max_bytes=_SOURCE_MAX_BYTES, tail=True,
+            ).collect()
 
             # Service-specific logs
             target_services = service_list or srv_info.definition.services
             for svc in target_services:
                 if svc == "docker":
                     continue
-                tasks[f"{srv_name}:svc:{svc}"] = _run_on_server(
+                tasks[f"{srv_name}:svc:{svc}"] = _stream_on_server(
                     self._inventory, srv_name,
                     f"journalctl -u {svc} --no-pager -n 50 --since '{since} ago' 2>/dev/null",
-                )
+                    max_bytes=_SOURCE_MAX_BYTES, tail=True,
+                ).collect()
 
             # Docker container logs
             if "docker" in srv_info.definition.services:
-                tasks[f"{srv_name}:docker"] = _run_on_server(
+                tasks[f"{srv_name}:docker"] = _stream_on_server(
                     self._inventory, srv_name,
                     f"docker ps --format '{{{{.Names}}}}' 2>/dev/null",
-                )
+                    max_bytes=_SOURCE_MAX_BYTES,
+                ).collect()
 
             # dmesg (kernel errors)
-            tasks[f"{srv_name}:dmesg"] = _run_on_server(
+            tasks[f"{srv_name}:dmesg"] = _stream_on_server(
                 self._inventory, srv_name,
                 f"dmesg -T --level=err,crit,alert,emerg --nopager 2>/dev/null",
-            )
+                max_bytes=_SOURCE_MAX_BYTES, tail=True,
+            ).collect()
 
         # Run all in parallel
         keys = list(tasks.keys())
@@ -126,10 +135,11 @@ class LogCorrelate(BaseTool):
                 for container in containers[:10]:
                     container = container.strip()
                     if container:
-                        docker_tasks[f"{srv_name}:container:{container}"] = _run_on_server(
+                        docker_tasks[f"{srv_name}:container:{container}"] = _stream_on_server(
                             self._inventory, srv_name,
                             f"docker logs --since {since} --tail 50 {container} 2>&1",
-                        )
+                            max_bytes=_SOURCE_MAX_BYTES, tail=True,
+                        ).collect()
 
         if docker_tasks:
             dk = list(docker_tasks.keys())
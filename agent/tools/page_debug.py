@@ -15,6 +15,7 @@ import asyncio
 import re
 from typing import Any
 
+from agent.domain_index import resolve_domain
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -45,18 +46,30 @@ class PageDebug(BaseTool):
             "properties": {
                 "server": {
                     "type": "string",
-                    "description": "Server to fetch from (for local network access).",
+                    "description": (
+                        "Server to fetch from (for local network access). Defaults "
+                        "to the server hosting the URL's domain."
+                    ),
                 },
                 "url": {
                     "type": "string",
                     "description": "Full URL to debug (e.g. 'https://example.com/page').",
                 },
             },
-            "required": ["server", "url"],
+            "required": ["url"],
         }
 
-    async def execute(self, *, server: str, url: str, **kwargs: Any) -> ToolResult:
+    async def execute(self, *, url: str, server: str | None = None, **kwargs: Any) -> ToolResult:
         """Fetch URL and analyze for rendering issues."""
+        if server is None:
+            owner = await resolve_domain(self._inventory, url)
+            if owner is None:
+                return ToolResult(
+                    error="The URL's domain is not in the domain index. Specify server.",
+                    exit_code=1,
+                )
+            server = owner.server
+
         # Fetch headers and body
         header_check = _run_on_server(
             self._inventory, server,
@@ -109,6 +109,10 @@ class PterodactylListServers(BaseTool):
     def name(self) -> str:
         return "pterodactyl_list_servers"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 60
+
     @property
     def description(self) -> str:
         return (
@@ -193,6 +197,14 @@ class PterodactylServerStatus(BaseTool):
     def name(self) -> str:
         return "pterodactyl_server_status"
 
+    @property
+    def delta(self) -> bool:
+        return True
+
+    @property
+    def cache_ttl(self) -> float:
+        return 15
+
     @property
     def description(self) -> str:
         return (
@@ -268,6 +280,10 @@ class PterodactylPowerAction(BaseTool):
     def name(self) -> str:
         return "pterodactyl_power"
 
+    @property
+    def mutates(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return (
@@ -334,6 +350,10 @@ class PterodactylConsoleCommand(BaseTool):
     def name(self) -> str:
         return "pterodactyl_command"
 
+    @property
+    def mutates(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return (
@@ -162,6 +162,18 @@ def _build_overview_report(
     Returns:
         Formatted multi-section report string.
     """
+    return _build_overview(results)[0]
+
+
+def _build_overview(
+    results: dict[str, dict[str, ToolResult]],
+) -> tuple[str, dict[str, Any]]:
+    """Build the dashboard and its compact form for the model.
+
+    Returns:
+        Tuple of (report, data) where data holds fleet ``metrics``,
+        flagged ``issues`` and one ``entities`` entry per node.
+    """
     # Accumulators
     total_containers = 0
     running = 0
@@ -174,8 +186,11 @@ def _build_overview_report(
     wings_down_nodes: list[str] = []
     disk_critical_nodes: list[str] = []
     node_sections: list[str] = []
+    issues: list[dict[str, Any]] = []
+    entities: list[dict[str, Any]] = []
 
     for node, checks in results.items():
+        entity: dict[str, Any] = {"node": node}
         section_lines: list[str] = []
         section_lines.append(f"## {node}")
 
@@ -186,6 +201,8 @@ def _build_overview_report(
             wings_status = wings_result.output.strip().splitlines()[-1].strip()
         if wings_status != "active":
             wings_down_nodes.append(f"{node} ({wings_status})")
+            issues.append({"sev": "critical", "msg": f"wings {wings_status}", "node": node})
+        entity["wings"] = wings_status
         section_lines.append(f"  Wings service: {wings_status}")
 
         # --- Wings config snippet ---
@@ -209,6 +226,13 @@ def _build_overview_report(
                 disk_critical_nodes.append(
                     f"{node} ({disk_info['use_pct']}% used, {disk_info['avail']} free)"
                 )
+                issues.append({
+                    "sev": "critical",
+                    "msg": f"disk {disk_info['use_pct']}% used, {disk_info['avail']} free",
+                    "node": node,
+                })
+            entity["disk_pct"] = use_pct
+            entity["disk_free"] = disk_info["avail"]
         else:
             section_lines.append("  Disk: unable to determine")
 
@@ -233,6 +257,10 @@ def _build_overview_report(
 
             if _recently_restarted(c["status"]):
                 recently_restarted_list.append(f"{node}/{c['name']} ({c['status']})")
+                issues.append({
+                    "sev": "info", "msg": f"recently restarted: {c['status']}",
+                    "node": node, "container": c["name"],
+                })
 
         total_containers += node_total
         running += node_running
@@ -243,6 +271,10 @@ def _build_overview_report(
             f"  Containers: {node_total} total "
             f"({node_running} running, {node_stopped} stopped, {node_errored} errored)"
         )
+        entity.update(
+            containers=node_total, running=node_running,
+            stopped=node_stopped, errored=node_errored,
+        )
 
         # --- Restart loops ---
         loop_result = checks.get("restarting")
@@ -251,6 +283,10 @@ def _build_overview_report(
                 restart_loop_containers.append(
                     f"{node}/{c['name']} (image: {c['image']})"
                 )
+                issues.append({
+                    "sev": "critical", "msg": "restart loop",
+                    "node": node, "container": c["name"], "image": c["image"],
+                })
 
         # --- Per-container resource usage ---
         stats_result = checks.get("docker_stats")
@@ -261,6 +297,8 @@ def _build_overview_report(
         node_ram_exceeded = False
         if stats_entries:
             section_lines.append("  Resource usage:")
+            # name -> [cpu %, memory % of limit]
+            entity["usage"] = {}
             for entry in stats_entries:
                 mem_pct = _pct_value(entry["mem_pct"])
                 cpu_pct = _pct_value(entry["cpu"])
@@ -271,6 +309,12 @@ def _build_overview_report(
                         f"{node}/{entry['name']} "
                         f"(CPU {entry['cpu']}, MEM {entry['mem_usage']} / {entry['mem_pct']})"
                     )
+                    issues.append({
+                        "sev": "warning",
+                        "msg": f"memory {entry['mem_pct']} of limit ({entry['mem_usage']})",
+                        "node": node, "container": entry["name"],
+                    })
+                entity["usage"][entry["name"]] = [cpu_pct, mem_pct]
                 if mem_pct >= _RAM_WARN_THRESHOLD:
                     node_ram_exceeded = True
                 section_lines.append(
@@ -286,8 +330,12 @@ def _build_overview_report(
             if disk_info and float(disk_info.get("use_pct", 0)) >= _DISK_WARN_THRESHOLD:
                 reason_parts.append("disk")
             nodes_at_capacity.append(f"{node} ({', '.join(reason_parts)})")
+            issues.append({
+                "sev": "warning", "msg": f"at capacity: {', '.join(reason_parts)}", "node": node,
+            })
 
         node_sections.append("\n".join(section_lines))
+        entities.append(entity)
 
     # --- Build aggregate summary ---
     report_parts: list[str] = []
@@ -353,7 +401,15 @@ def _build_overview_report(
     report_parts.append("")
     report_parts.append("\n\n".join(node_sections))
 
-    return "\n".join(report_parts)
+    data = {
+        "metrics": {
+            "nodes": len(results), "containers": total_containers,
+            "running": running, "stopped": stopped, "errored": errored,
+        },
+        "issues": issues,
+        "entities": entities,
+    }
+    return "\n".join(report_parts), data
 
 
 # ---------------------------------------------------------------------------
@@ -370,6 +426,10 @@ class PterodactylOverview(BaseTool):
     def name(self) -> str:
         return "pterodactyl_overview"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 30
+
     @property
     def description(self) -> str:
         return (
@@ -415,8 +475,8 @@ class PterodactylOverview(BaseTool):
             else:
                 results[server_name] = result
 
-        report = _build_overview_report(results)
-        return ToolResult(output=report, exit_code=0)
+        report, data = _build_overview(results)
+        return ToolResult(output=report, exit_code=0, data=data)
 
     async def _collect_node_data(
         self, server_name: str
@@ -8,6 +8,7 @@ calls through the security pipeline to the correct implementation.
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Collection
 from typing import Any
 
 import structlog
@@ -19,6 +20,10 @@ from agent.security.approval import request_approval, requires_approval
 from agent.security.audit import AuditLogger
 from agent.security.sanitizer import SanitizationError, sanitize
 from agent.tools.base import BaseTool, ToolResult
+from agent.tools.result_cache import ResultCache
+from agent.tools.result_delta import FULL_PARAM, DeltaTracker
+from agent.tools.router import FAMILIES, ToolSelection, family_of
+from agent.tools.ssh_pool import read_only_calls, track_reaped
 
 logger = structlog.get_logger()
 
@@ -43,6 +48,14 @@ class ToolRegistry:
         self._inventory = inventory
         self._audit = audit
         self._tools: dict[str, BaseTool] = {}
+        self._cache = ResultCache() if config.tool_cache else None
+        self._deltas = DeltaTracker(config.tool_delta_window) if config.tool_delta_window else None
+        # Families with no matching server in the inventory are never offered
+        available = [f for f in FAMILIES if f.available(inventory)]
+        self._available_families = {f.name for f in available}
+        self.selection: ToolSelection | None = (
+            ToolSelection(available) if config.tool_routing else None
+        )
 
     def register(self, tool: BaseTool) -> None:
         """Register a tool instance.
@@ -58,9 +71,29 @@ class ToolRegistry:
         self._tools[tool.name] = tool
         logger.debug("tool_registered", tool=tool.name)
 
-    def get_schemas(self) -> list[dict[str, Any]]:
-        """Return Anthropic API tool schemas for all registered tools."""
-        return [tool.to_schema() for tool in self._tools.values()]
+    def get_schemas(self, families: Collection[str] | None = None) -> list[dict[str, Any]]:
+        """Return Anthropic API tool schemas for the registered tools.
+
+        Tools of a family that no server in the inventory can use are
+        always left out.
+
+        Args:
+            families: If given, only core tools plus these families.
+        """
+        schemas: list[dict[str, Any]] = []
+        for tool in self._tools.values():
+            family = family_of(tool.name)
+            if family is not None and (
+                family not in self._available_families
+                or (families is not None and family not in families)
+            ):
+                continue
+            schema = tool.to_schema()
+            if tool.delta and self._deltas is not None:
+                input_schema = schema["input_schema"]
+                input_schema["properties"] = {**input_schema.get("properties", {}), "full": FULL_PARAM}
+            schemas.append(schema)
+        return schemas
 
     def get_tool(self, name: str) -> BaseTool | None:
         """Look up a tool by name."""
@@ -71,6 +104,14 @@ class ToolRegistry:
         """Return all registered tool names."""
         return list(self._tools.keys())
 
+    def clear_deltas(self) -> None:
+        """Forget remembered outputs, so the next poll of each is sent in full.
+
+        Called when the conversation history no longer holds them.
+        """
+        if self._deltas is not None:
+            self._deltas.clear()
+
     async def dispatch(self, tool_name: str, tool_input: dict[str, Any]) -> dict[str, Any]:
         """Execute a tool call through the full security pipeline.
 
@@ -79,8 +120,9 @@ class ToolRegistry:
         2. Log the attempt
         3. Check allowlist (for command/path tools)
         4. Check if human approval is required
-        5. Execute with timeout
+        5. Execute with timeout (or reuse a cached read-only result)
         6. Log the result
+        7. For a repeated poll, describe only what changed (see result_delta)
 
         Args:
             tool_name: Name of the tool to call.
@@ -94,6 +136,20 @@ class ToolRegistry:
         if tool is None:
             return {"error": f"Unknown tool: {tool_name!r}"}
 
+        if tool.delta:
+            # The registry's own parameter, not the tool's
+            tool_input = dict(tool_input)
+            full = bool(tool_input.pop("full", False))
+            result = await self._dispatch(tool, tool_input)
+            if self._deltas is not None:
+                result = self._deltas.apply(tool_name, tool_input, result, full=full)
+            return result
+        return await self._dispatch(tool, tool_input)
+
+    async def _dispatch(self, tool: BaseTool, tool_input: dict[str, Any]) -> dict[str, Any]:
+        """Steps 1-6 of ``dispatch`` for a known tool."""
+        tool_name = tool.name
+
         # 1. Sanitize inputs
         try:
             sanitized = sanitize(tool_name, tool_input)
@@ -156,29 +212,54 @@ class ToolRegistry:
                 self._audit.log_denied(tool_name, sanitized, reason="human_denied")
                 return {"error": "Operation denied by operator"}
 
-        # 5. Execute with timeout
+        # 5. Execute with timeout. Timeouts and cancellation kill the
+        #    remote processes the tool started; count them for the audit.
+        #    Read-only tools may be answered from the result cache, and
+        #    their commands may share an identical one already in flight;
+        #    a mutating tool drops what it may make stale, before and
+        #    after running (even if it fails part-way).
+        if self._cache is not None:
+            if tool.mutates:
+                self._cache.invalidate(sanitized)
+            elif tool.cache_ttl > 0:
+                cached = self._cache.get(tool_name, sanitized)
+                if cached is not None:
+                    self._audit.log_success(tool_name, sanitized, result=cached, cached=True)
+                    return cached
+
         timeout = self._config.command_timeout
-        try:
-            result = await asyncio.wait_for(
-                tool.execute(**sanitized),
-                timeout=timeout,
-            )
-        except asyncio.TimeoutError:
-            self._audit.log_timeout(tool_name, sanitized)
-            return {"error": f"Operation timed out ({timeout}s)"}
-        except Exception as e:
-            self._audit.log_error(tool_name, sanitized, error=str(e))
-            return {"error": f"Execution failed: {e}"}
+        with track_reaped() as reaped, read_only_calls(not tool.mutates):
+            try:
+                result = await asyncio.wait_for(
+                    tool.execute(**sanitized),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                self._audit.log_timeout(tool_name, sanitized, reaped=reaped[0])
+                return {"error": f"Operation timed out ({timeout}s)"}
+            except asyncio.CancelledError:
+                self._audit.log_cancelled(tool_name, sanitized, reaped=reaped[0])
+                raise
+            except Exception as e:
+                self._audit.log_error(tool_name, sanitized, error=str(e), reaped=reaped[0])
+                return {"error": f"Execution failed: {e}"}
+            finally:
+                if tool.mutates and self._cache is not None:
+                    # Reads that ran during the change may have cached stale state
+                    self._cache.invalidate(sanitized)
 
         # 6. Log result and return
         result_dict = result.to_dict()
         if result.success:
-            self._audit.log_success(tool_name, sanitized, result=result_dict)
+            if self._cache is not None and tool.cache_ttl > 0 and not tool.mutates:
+                self._cache.put(tool_name, sanitized, result_dict, tool.cache_ttl)
+            self._audit.log_success(tool_name, sanitized, result=result_dict, reaped=reaped[0])
         else:
             self._audit.log_error(
                 tool_name,
                 sanitized,
                 error=result.error or f"exit code {result.exit_code}",
+                reaped=reaped[0],
             )
         return result_dict
 
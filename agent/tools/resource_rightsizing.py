@@ -11,6 +11,7 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
+from agent.host_facts import get_host_facts
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
@@ -410,19 +411,23 @@ class ResourceRightsizing(BaseTool):
 
     async def _collect_host_data(self, server: str) -> dict[str, Any]:
         """Collect host-level resource usage data in parallel."""
+        facts = await get_host_facts(self._inventory, server)
         commands = {
             "memory": "free -b",
             "disk": "df -h",
             "uptime": "uptime",
-            "cpu_count": "nproc",
             "iostat": "iostat -x 1 1 2>/dev/null | tail -5",
         }
+        data: dict[str, Any] = {}
+        if facts is not None and facts.nproc:
+            data["cpu_count"] = facts.nproc
+        else:
+            commands["cpu_count"] = "nproc"
         results = await asyncio.gather(
             *[_run_on_server(self._inventory, server, cmd)
               for cmd in commands.values()]
         )
         result_map = dict(zip(commands.keys(), results))
-        data: dict[str, Any] = {}
         mem_result = result_map["memory"]
         if mem_result.success:
             data["memory"] = _parse_free_output(mem_result.output)
@@ -432,8 +437,8 @@ class ResourceRightsizing(BaseTool):
         uptime_result = result_map["uptime"]
         if uptime_result.success:
             data["load_avg"] = _parse_loadavg(uptime_result.output)
-        cpu_result = result_map["cpu_count"]
-        if cpu_result.success:
+        cpu_result = result_map.get("cpu_count")
+        if cpu_result is not None and cpu_result.success:
             data["cpu_count"] = _parse_cpu_count(cpu_result.output)
         iostat_result = result_map["iostat"]
         if iostat_result.success and iostat_result.output.strip():
@@ -442,6 +447,9 @@ class ResourceRightsizing(BaseTool):
 
     async def _collect_container_data(self, server: str) -> dict[str, Any]:
         """Collect Docker container resource usage data."""
+        facts = await get_host_facts(self._inventory, server)
+        if facts is not None and facts.has("docker") is False:
+            return {"containers": []}
         stats_cmd = (
             "docker stats --no-stream --format "
             "'{{.Name}}\t{{.MemUsage}}\t{{.MemPerc}}\t{{.CPUPerc}}'"
@@ -0,0 +1,104 @@
+"""TTL cache for read-only tool results, used by ``ToolRegistry.dispatch``.
+
+During one investigation the model often repeats ``docker_ps`` or
+``health_check`` with identical arguments, and every repeat re-ran the
+SSH commands. Results are cached by (tool, sanitized input) for the
+tool's ``cache_ttl``. Any call to a tool that ``mutates`` drops the
+entries for the server it names — plus fleet-wide entries, which may
+include that server — so a restart is never followed by a stale
+status.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+_MAX_ENTRIES = 256
+
+
+@dataclass
+class _Entry:
+    expires: float
+    server: str | None
+    result: dict[str, Any]
+
+
+def _scope(tool_input: dict[str, Any]) -> str | None:
+    """The server a call is about, or None for fleet-wide calls."""
+    server = tool_input.get("server")
+    return None if server in (None, "", "all") else str(server)
+
+
+def _key(tool_name: str, tool_input: dict[str, Any]) -> str:
+    return f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
+
+class ResultCache:
+    """Results keyed by (tool, input), expiring after the tool's TTL."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tool_name: str, tool_input: dict[str, Any]) -> dict[str, Any] | None:
+        """A fresh cached result, or None."""
+        key = _key(tool_name, tool_input)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry.result)
+
+    def put(
+        self,
+        tool_name: str,
+        tool_input: dict[str, Any],
+        result: dict[str, Any],
+        ttl: float,
+    ) -> None:
+        """Cache ``result`` for ``ttl`` seconds."""
+        key = _key(tool_name, tool_input)
+        self._entries[key] = _Entry(time.monotonic() + ttl, _scope(tool_input), dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tool_input: dict[str, Any]) -> int:
+        """Drop entries a mutating call with ``tool_input`` may have made stale.
+
+        A call naming no single server (e.g. ``self_update``) drops
+        everything.
+
+        Returns:
+            Number of entries dropped.
+        """
+        server = _scope(tool_input)
+        if server is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            stale = [k for k, e in self._entries.items() if e.server in (server, None)]
+            for key in stale:
+                del self._entries[key]
+            dropped = len(stale)
+        if dropped:
+            logger.debug("tool_cache_invalidated", server=server, entries=dropped)
+        return dropped
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
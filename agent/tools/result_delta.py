@@ -0,0 +1,157 @@
+"""Deltas for polling tools called again with the same input.
+
+During an incident the model re-polls ``docker_ps`` or
+``mysql_processlist`` to see whether anything changed, and every poll
+sent the whole table back. For tools that opt in (``BaseTool.delta``)
+the registry remembers the last output per (tool, input) in the
+session; a repeat call within the window sends the model only the rows
+that were added, removed or changed — or just ``unchanged`` — through
+the result's compact ``data`` payload. The operator still sees the full
+output, and the model can pass ``full=true`` to get it too.
+
+The model must still have the previous output for a delta to make
+sense, so the conversation loop clears the tracker whenever history is
+reset, trimmed or compacted.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+_MAX_ENTRIES = 128
+
+# Parameter added to the schema of delta tools
+FULL_PARAM = {
+    "type": "boolean",
+    "description": "Return the complete output. By default a repeat of an identical "
+    "call returns only the rows that changed since the previous one.",
+}
+
+# Rows made only of table borders carry no data
+_BORDER_RE = re.compile(r"^[\s+|\-=─│┼]*$")
+_FIELD_SPLIT_RE = re.compile(r"\s*\|\s*|\t|\s+")
+
+
+@dataclass
+class _Last:
+    output: str
+    at: float
+
+
+def _key(tool_name: str, tool_input: dict[str, Any]) -> str:
+    return f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
+
+def _rows(output: str) -> list[str]:
+    return [line.rstrip() for line in output.splitlines() if not _BORDER_RE.match(line)]
+
+
+def _row_key(row: str) -> str:
+    fields = [f for f in _FIELD_SPLIT_RE.split(row.strip().strip("|")) if f]
+    return fields[0] if fields else ""
+
+
+def diff_rows(before: str, after: str) -> dict[str, Any]:
+    """Rows added, removed and changed between two outputs.
+
+    Rows are matched on their first column (container ID, process ID,
+    ``**CPU:**`` label...). When that isn't unique the outputs are
+    compared line by line and changes show up as removed plus added.
+
+    Returns:
+        Dict with ``added``, ``removed``, ``changed`` (``{"was", "now"}``
+        pairs) and the count of ``unchanged_rows``.
+    """
+    old_rows, new_rows = _rows(before), _rows(after)
+    old_keys = [_row_key(r) for r in old_rows]
+    new_keys = [_row_key(r) for r in new_rows]
+    if len(set(old_keys)) == len(old_keys) and len(set(new_keys)) == len(new_keys):
+        old_by_key = dict(zip(old_keys, old_rows))
+        new_by_key = dict(zip(new_keys, new_rows))
+        changed = [
+            {"was": old_by_key[k], "now": new_by_key[k]}
+            for k in new_keys if k in old_by_key and old_by_key[k] != new_by_key[k]
+        ]
+        return {
+            "added": [new_by_key[k] for k in new_keys if k not in old_by_key],
+            "removed": [old_by_key[k] for k in old_keys if k not in new_by_key],
+            "changed": changed,
+            "unchanged_rows": sum(1 for k in new_keys if old_by_key.get(k) == new_by_key[k]),
+        }
+
+    old_count, new_count = Counter(old_rows), Counter(new_rows)
+    return {
+        "added": list((new_count - old_count).elements()),
+        "removed": list((old_count - new_count).elements()),
+        "changed": [],
+        "unchanged_rows": sum((old_count & new_count).values()),
+    }
+
+
+class DeltaTracker:
+    """Last output per (tool, input), for answering repeat calls with a delta.
+
+    Args:
+        window: Seconds after a call within which a repeat gets a delta.
+    """
+
+    def __init__(self, window: float, max_entries: int = _MAX_ENTRIES) -> None:
+        self.window = window
+        self.max_entries = max_entries
+        self._last: OrderedDict[str, _Last] = OrderedDict()
+
+    def apply(
+        self,
+        tool_name: str,
+        tool_input: dict[str, Any],
+        result: dict[str, Any],
+        *,
+        full: bool = False,
+    ) -> dict[str, Any]:
+        """Remember ``result`` and return what to send for this call.
+
+        Failed results and results that already carry a ``data`` payload
+        pass through unchanged (and reset the baseline).
+
+        Returns:
+            ``result``, or a copy with a ``data`` payload describing the
+            change since the previous identical call.
+        """
+        key = _key(tool_name, tool_input)
+        previous = self._last.pop(key, None)
+        if result.get("error") or result.get("exit_code", 0) != 0 or "data" in result:
+            return result
+
+        output = result.get("output", "")
+        now = time.monotonic()
+        self._last[key] = _Last(output, now)
+        while len(self._last) > self.max_entries:
+            self._last.popitem(last=False)
+
+        if full or previous is None or now - previous.at > self.window:
+            return result
+
+        since = round(now - previous.at)
+        if output == previous.output:
+            delta: dict[str, Any] = {"unchanged": True, "since_last_call_s": since}
+        else:
+            changes = diff_rows(previous.output, output)
+            if len(json.dumps(changes)) > len(output) // 2:
+                # Mostly different: the full output is as cheap and clearer
+                return result
+            delta = {"since_last_call_s": since, **{k: v for k, v in changes.items() if v}}
+        logger.debug("tool_result_delta", tool=tool_name, unchanged=delta.get("unchanged", False))
+        return {**result, "data": delta}
+
+    def clear(self) -> None:
+        """Forget all outputs (the model no longer has them in its history)."""
+        self._last.clear()
@@ -0,0 +1,257 @@
+"""Tool families and per-turn selection of which schemas to send.
+
+Every tool schema sent with an API call costs input tokens on every
+round. Specialized tools are grouped into families (cPanel, WordPress,
+web server, MySQL, game servers); everything else is core and always
+sent.
+
+Families are filtered twice:
+
+- Statically, a family is dropped when no server in the inventory has
+  one of its roles or services (no cPanel tools on a fleet without
+  cPanel).
+- Dynamically, a keyword router picks the families a user message
+  calls for. Selected families stay attached for the rest of the
+  session, so the tool list (the start of the cached prompt prefix)
+  only changes when a new family comes in. The ``load_tools`` tool
+  lets the model attach a family the router missed.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from agent.inventory import Inventory
+from agent.tools.base import BaseTool, ToolResult
+
+if TYPE_CHECKING:
+    from agent.tools.registry import ToolRegistry
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class ToolFamily:
+    """A group of tools attached together."""
+
+    name: str
+    description: str
+    tools: frozenset[str]
+    roles: frozenset[str] = frozenset()
+    services: frozenset[str] = frozenset()
+    keywords: tuple[str, ...] = ()
+
+    def available(self, inventory: Inventory) -> bool:
+        """Whether any server has one of the family's roles or services."""
+        for name in inventory.server_names:
+            defn = inventory.get_server(name).definition
+            if defn.role in self.roles or self.services.intersection(defn.services):
+                return True
+        return False
+
+    def matches(self, text: str) -> bool:
+        """Whether ``text`` (lowercased) mentions one of the family's keywords."""
+        return any(re.search(k, text) for k in self.keywords)
+
+
+_WEBHOST_ROLES = frozenset({"webhost", "cpanel"})
+
+FAMILIES: tuple[ToolFamily, ...] = (
+    ToolFamily(
+        name="cpanel",
+        description="cPanel/WHM accounts, domains, email, SSL, quotas",
+        tools=frozenset({
+            "cpanel_list_accounts", "cpanel_account_info", "cpanel_ssl_status",
+            "cpanel_backup_status", "cpanel_email_deliverability", "cpanel_mail_queue",
+            "cpanel_domain_lookup", "cpanel_list_domains", "cpanel_suspension_info",
+            "cpanel_disk_quota", "cpanel_php_version", "cpanel_email_diag",
+        }),
+        roles=_WEBHOST_ROLES,
+        services=frozenset({"cpanel"}),
+        keywords=(
+            r"cpanel", r"\bwhm\b", r"account", r"domain", r"e-?mail", r"\bmail",
+            r"smtp", r"inbox", r"spam", r"bounce", r"exim", r"quota", r"suspen",
+            r"php ?ver", r"\bssl\b", r"autossl", r"\bdns\b",
+        ),
+    ),
+    ToolFamily(
+        name="wordpress",
+        description="WordPress installs, plugins, core updates, Elementor, WP performance",
+        tools=frozenset({
+            "wp_sites", "wp_health", "wp_plugin_status", "wp_core_update", "wp_db_check",
+            "wp_cron_status", "wp_search_replace_dry", "wp_security_scan",
+            "wp_file_integrity", "wp_performance", "wp_cleanup_preview", "wp_scan_all",
+            "wp_deep_performance", "wp_elementor_diagnose",
+        }),
+        roles=_WEBHOST_ROLES,
+        services=frozenset({"cpanel", "wordpress"}),
+        keywords=(
+            r"wordpress", r"\bwp\b", r"wp-", r"plugin", r"theme", r"elementor",
+            r"woocommerce", r"white screen",
+        ),
+    ),
+    ToolFamily(
+        name="web",
+        description="Web server status, error/access logs, SSL certificates, DNS, page debugging",
+        tools=frozenset({
+            "ssl_cert_check", "apache_status", "web_error_log", "dns_check",
+            "access_log_analysis", "modsecurity_log", "diagnose_site", "page_debug",
+        }),
+        roles=_WEBHOST_ROLES,
+        services=frozenset({"cpanel", "httpd", "apache2", "nginx", "litespeed"}),
+        keywords=(
+            r"web ?site", r"\bsite\b", r"\bpage", r"https?://", r"\burl\b", r"domain",
+            r"\bssl\b", r"cert", r"apache", r"httpd", r"nginx", r"\b50[0-9]\b",
+            r"\b40[34]\b", r"error log", r"access log", r"modsec", r"\bwaf\b",
+            r"\bdns\b", r"\w\.(com|net|org|io|co)\b",
+        ),
+    ),
+    ToolFamily(
+        name="mysql",
+        description="MySQL/MariaDB status, process list, slow queries, table check/repair",
+        tools=frozenset({
+            "mysql_status", "mysql_processlist", "mysql_slow_queries",
+            "mysql_database_sizes", "mysql_table_check", "mysql_table_repair",
+            "mysql_table_optimize",
+        }),
+        roles=_WEBHOST_ROLES,
+        services=frozenset({"mysql", "mariadb"}),
+        keywords=(
+            r"mysql", r"mariadb", r"database", r"\bdb\b", r"quer(y|ies)", r"\btable",
+            r"innodb", r"deadlock",
+        ),
+    ),
+    ToolFamily(
+        name="game",
+        description="Pterodactyl game servers: status, power, console, lag and mod diagnosis",
+        tools=frozenset({
+            "pterodactyl_list_servers", "pterodactyl_server_status", "pterodactyl_power",
+            "pterodactyl_command", "pterodactyl_overview", "game_server_diagnose",
+            "mod_conflict_check",
+        }),
+        roles=frozenset({"game-server"}),
+        services=frozenset({"pterodactyl-wings", "wings", "pterodactyl"}),
+        keywords=(
+            # Bare "panel"/"plugin" would claim cPanel and WordPress requests
+            r"\bgame", r"\bpterodactyl\b", r"\bwings\b", r"minecraft", r"\brust\b",
+            r"\bark\b", r"valheim", r"\bcs2\b", r"terraria", r"\bplayers?\b", r"\btps\b",
+            r"\blag", r"rubber.?band", r"\bmods?\b", r"\b(mod|server) plugins?\b",
+            r"\bconsole\b", r"\begg\b",
+        ),
+    ),
+)
+
+_FAMILY_OF: dict[str, str] = {tool: f.name for f in FAMILIES for tool in f.tools}
+
+
+def family_of(tool_name: str) -> str | None:
+    """The family a tool belongs to, or None for core tools."""
+    return _FAMILY_OF.get(tool_name)
+
+
+def route(text: str, families: Iterable[ToolFamily]) -> set[str]:
+    """Names of the families a user message calls for."""
+    lowered = text.lower()
+    return {f.name for f in families if f.matches(lowered)}
+
+
+class ToolSelection:
+    """Families attached in the current session.
+
+    Args:
+        families: The families available for this inventory.
+    """
+
+    def __init__(self, families: Iterable[ToolFamily]) -> None:
+        self.families = {f.name: f for f in families}
+        self.active: set[str] = set()
+
+    def select(self, message: str) -> list[str]:
+        """Attach the families ``message`` calls for.
+
+        Returns:
+            Names of newly attached families.
+        """
+        return self.activate(route(message, self.families.values()))
+
+    def activate(self, names: Iterable[str]) -> list[str]:
+        """Attach families by name (unknown names are ignored).
+
+        Returns:
+            Names of newly attached families.
+        """
+        added = sorted(n for n in set(names) if n in self.families and n not in self.active)
+        if added:
+            self.active.update(added)
+            logger.info("tool_families_loaded", families=added, active=sorted(self.active))
+        return added
+
+    def activate_for_tools(self, tool_names: Iterable[str]) -> list[str]:
+        """Attach the families of tools already used (e.g. in a resumed history)."""
+        return self.activate(f for f in map(family_of, tool_names) if f is not None)
+
+    def reset(self) -> None:
+        """Detach all families (between sessions)."""
+        self.active.clear()
+
+
+class LoadTools(BaseTool):
+    """Attach a tool family the router didn't select for this turn."""
+
+    def __init__(self, registry: ToolRegistry) -> None:
+        self._registry = registry
+
+    @property
+    def name(self) -> str:
+        return "load_tools"
+
+    @property
+    def description(self) -> str:
+        families = self._registry.selection.families.values() if self._registry.selection else []
+        listing = "; ".join(f"{f.name}: {f.description}" for f in families)
+        return (
+            "Attach a family of specialized tools that is not currently available. "
+            "The tools can be called from the next step on. "
+            f"Families: {listing or 'none'}."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "properties": {
+                "families": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Family names to attach.",
+                },
+            },
+            "required": ["families"],
+        }
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        """Attach the requested families."""
+        selection = self._registry.selection
+        if selection is None:
+            return ToolResult(error="Tool routing is disabled; all tools are already available.")
+        requested = kwargs.get("families") or []
+        unknown = [n for n in requested if n not in selection.families]
+        if unknown:
+            return ToolResult(
+                error=f"Unknown tool families: {', '.join(unknown)}. "
+                f"Available: {', '.join(selection.families)}",
+                exit_code=1,
+            )
+        added = selection.activate(requested)
+        lines = []
+        for name in requested:
+            tools = sorted(
+                t for t in selection.families[name].tools if self._registry.get_tool(t)
+            )
+            state = "loaded" if name in added else "already loaded"
+            lines.append(f"{name} ({state}): {', '.join(tools)}")
+        return ToolResult(output="\n".join(lines))
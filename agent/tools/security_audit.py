@@ -7,13 +7,12 @@ Produces a scored security report.
 
 from __future__ import annotations
 
-import asyncio
 import re
 from typing import Any
 
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
-from agent.tools.docker_tools import _run_on_server
+from agent.tools.docker_tools import _run_batch_on_server
 
 
 class SecurityAudit(BaseTool):
@@ -26,6 +25,10 @@ class SecurityAudit(BaseTool):
     def name(self) -> str:
         return "security_audit"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 60
+
     @property
     def description(self) -> str:
         return (
@@ -48,71 +51,34 @@ class SecurityAudit(BaseTool):
 
     async def execute(self, *, server: str, **kwargs: Any) -> ToolResult:
         """Run security audit."""
-        checks: dict[str, Any] = {
+        checks: dict[str, str] = {
             # SSH config
-            "sshd_config": _run_on_server(
-                self._inventory, server,
-                "cat /etc/ssh/sshd_config 2>/dev/null",
-            ),
+            "sshd_config": "cat /etc/ssh/sshd_config 2>/dev/null",
             # Open ports
-            "open_ports": _run_on_server(
-                self._inventory, server, "ss -tlnp",
-            ),
+            "open_ports": "ss -tlnp",
             # Firewall rules
-            "iptables": _run_on_server(
-                self._inventory, server, "iptables -nL 2>/dev/null",
-            ),
-            "nft": _run_on_server(
-                self._inventory, server, "nft list ruleset 2>/dev/null",
-            ),
+            "iptables": "iptables -nL 2>/dev/null",
+            "nft": "nft list ruleset 2>/dev/null",
             # Failed login attempts (last 50)
-            "failed_logins": _run_on_server(
-                self._inventory, server,
-                "last -50 -f /var/log/btmp 2>/dev/null",
-            ),
+            "failed_logins": "last -50 -f /var/log/btmp 2>/dev/null",
             # Users with login shells
-            "login_users": _run_on_server(
-                self._inventory, server,
-                "cat /etc/passwd 2>/dev/null",
-            ),
+            "login_users": "cat /etc/passwd 2>/dev/null",
             # Kernel version
-            "kernel": _run_on_server(
-                self._inventory, server, "uname -r",
-            ),
+            "kernel": "uname -r",
             # Automatic updates
-            "auto_updates": _run_on_server(
-                self._inventory, server,
-                "systemctl is-active unattended-upgrades 2>/dev/null",
-            ),
+            "auto_updates": "systemctl is-active unattended-upgrades 2>/dev/null",
             # Pending security updates
-            "updates": _run_on_server(
-                self._inventory, server,
-                "apt list --upgradable 2>/dev/null",
-            ),
-            "yum_updates": _run_on_server(
-                self._inventory, server,
-                "yum check-update --security 2>/dev/null",
-            ),
+            "updates": "apt list --upgradable 2>/dev/null",
+            "yum_updates": "yum check-update --security 2>/dev/null",
             # World-writable files in sensitive locations
-            "world_writable": _run_on_server(
-                self._inventory, server,
-                "find /etc /usr/local/bin /var/www -type f -perm -o+w 2>/dev/null",
-            ),
+            "world_writable": "find /etc /usr/local/bin /var/www -type f -perm -o+w 2>/dev/null",
             # SUID binaries (potential privilege escalation)
-            "suid": _run_on_server(
-                self._inventory, server,
-                "find /usr -perm -4000 -type f 2>/dev/null",
-            ),
+            "suid": "find /usr -perm -4000 -type f 2>/dev/null",
             # Running as root
-            "root_procs": _run_on_server(
-                self._inventory, server,
-                "ps aux --no-headers -U root 2>/dev/null",
-            ),
+            "root_procs": "ps aux --no-headers -U root 2>/dev/null",
         }
 
-        keys = list(checks.keys())
-        results = await asyncio.gather(*[checks[k] for k in keys])
-        data = dict(zip(keys, results))
+        data = await _run_batch_on_server(self._inventory, server, checks)
 
         return ToolResult(output=_build_security_report(server, data))
 
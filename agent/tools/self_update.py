@@ -28,6 +28,10 @@ class SelfUpdate(BaseTool):
     def name(self) -> str:
         return "self_update"
 
+    @property
+    def mutates(self) -> bool:
+        return True
+
     @property
     def description(self) -> str:
         return (
@@ -50,6 +50,10 @@ class GetServerStatus(BaseTool):
     def name(self) -> str:
         return "get_server_status"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 15
+
     @property
     def description(self) -> str:
         return "Quick health summary: uptime, load, disk, memory. For deeper checks use health_check."
@@ -115,12 +119,13 @@ class GetServerStatus(BaseTool):
         return ToolResult(output="\n\n".join(sections), exit_code=0)
 
     async def _run_remote(self, server_info, commands: dict[str, str]) -> ToolResult:
-        """Run health checks on a remote server via SSH."""
-        from agent.tools.remote import run_remote_command
+        """Run health checks on a remote server via the shared SSH pool."""
+        from agent.tools.ssh_pool import get_ssh_pool
+
+        results = await get_ssh_pool().run_many(server_info, commands)
 
         sections: list[str] = []
-        for label, cmd in commands.items():
-            result = await run_remote_command(server_info, cmd)
+        for label, result in results.items():
             if result.success:
                 sections.append(f"=== {label.upper()} ===\n{result.output}")
             else:
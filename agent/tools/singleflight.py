@@ -0,0 +1,87 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+When the pulse, the anomaly scan and a model-triggered tool run at the
+same moment they often send the same ``docker ps -a`` or ``free -m`` to
+the same host. ``SingleFlight.do`` runs one execution per key and lets
+every concurrent caller await it; once it finishes the key is free, so
+nothing is cached beyond the flight itself.
+
+Cancellation is per caller: a caller that gives up stops waiting, and
+the shared execution is only cancelled (and, for SSH, its remote
+processes reaped) when no caller is left waiting on it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+        self.executed = 0  # executions started
+        self.coalesced = 0  # callers that joined an execution already in flight
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether an execution for ``key`` is in flight (a call would join it)."""
+        return key in self._flights
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()``, sharing one execution with concurrent callers of ``key``.
+
+        Returns:
+            The result of the shared execution; exceptions it raises are
+            raised to every caller.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t: self._finish(key, flight))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # The last caller gave up: stop the execution itself and
+                # let it finish cleaning up before the cancel propagates
+                flight.task.cancel()
+                await asyncio.wait([flight.task])
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            flight.task.exception()  # retrieved: no "never retrieved" warning
+
+    def stats(self) -> dict[str, int]:
+        """Execution and coalescing counters."""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+        }
@@ -0,0 +1,435 @@
+"""Cross-process SSH broker: one set of pooled connections per bastion.
+
+The daemon, the cron-driven ``bastion monitor``, ``anomaly-monitor`` and
+ad-hoc ``bastion run`` sessions used to each hold their own connections,
+so every cron tick paid a full handshake to the whole fleet. The daemon
+now hosts an ``SSHBroker`` on a unix socket (``ssh-broker.sock`` next to
+``socket_path`` by default) that runs commands on its long-lived pool on
+behalf of other bastion processes — ControlMaster-style multiplexing,
+without depending on OpenSSH's client.
+
+Other processes' pools hold a ``BrokerClient`` and forward ``run``,
+``run_many`` and ``run_batch`` through it. When no broker is listening,
+or it doesn't know the server (a different inventory), the pool falls
+back to its own connections. Streams stay local.
+
+Wire protocol (newline-delimited JSON, requests multiplexed by id):
+
+  Client -> Broker:
+    {"id": 1, "op": "run", "server": {...}, "command": "uptime", "timeout": 30,
+     "read_only": true}
+    {"id": 2, "op": "run_batch", "server": {...}, "commands": {...}, "timeout": 15,
+     "read_only": true}
+    {"id": 1, "op": "cancel"}
+
+  Broker -> Client:
+    {"id": 1, "result": {"output": ..., "error": ..., "exit_code": 0}, "reaped": 0}
+    {"id": 2, "results": {"label": {...}}, "reaped": 0}
+    {"id": 3, "unknown_server": true}
+    {"id": 4, "denied": "not allowed for role 'web'"}
+
+``server`` carries the name plus host/user/key so the broker only serves
+inventory entries that match the caller's. ``read_only`` carries the
+caller's ``read_only_calls`` scope, so identical read-only calls from
+different processes share one execution in the daemon's pool. A cancel
+(or the client disconnecting) cancels the broker-side call, which kills
+the remote processes as a local cancel would.
+
+The broker runs commands with the daemon's keys, so it must not widen
+who can reach the fleet: the socket is owner-only (0600), every command
+must pass the server's role allowlist, and each one is written to the
+audit log. A command the allowlist rejects is answered with
+``{"denied": ...}`` and the caller runs it on its own connections —
+with its own keys, if it has any.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agent.inventory import Inventory, ServerInfo
+from agent.security.allowlist import is_command_permitted
+from agent.security.audit import AuditLogger
+from agent.tools.base import ToolResult
+from agent.tools.ssh_pool import (
+    SSHPool,
+    coalescing_allowed,
+    note_reaped,
+    read_only_calls,
+    track_reaped,
+)
+
+logger = structlog.get_logger()
+
+# Batched output can be large; one JSON line must fit in the reader buffer.
+_MAX_MESSAGE = 64 * 1024 * 1024
+
+# After failing to reach the broker, use local connections for this long.
+_RETRY_AFTER = 30.0
+
+_OPS = frozenset({"run", "run_many", "run_batch"})
+
+
+def _server_spec(server_info: ServerInfo) -> dict[str, Any]:
+    defn = server_info.definition
+    return {
+        "name": server_info.name,
+        "host": defn.host,
+        "user": defn.user,
+        "key_path": defn.key_path,
+    }
+
+
+class SSHBroker:
+    """Serves pooled SSH execution to other bastion processes."""
+
+    def __init__(
+        self,
+        pool: SSHPool,
+        inventory: Inventory,
+        socket_path: str,
+        audit: AuditLogger | None = None,
+    ) -> None:
+        """Initialize the broker.
+
+        Args:
+            pool: The pool that owns the connections (never itself brokered).
+            inventory: Servers this broker is willing to run commands on.
+            socket_path: Filesystem path for the Unix domain socket.
+            audit: Audit log for every brokered command.
+        """
+        self._pool = pool
+        self._inventory = inventory
+        self._socket_path = socket_path
+        self._audit = audit
+        self._server: asyncio.AbstractServer | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._inflight: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        """Start listening on the socket."""
+        path = Path(self._socket_path)
+        if path.exists():
+            path.unlink()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=self._socket_path, limit=_MAX_MESSAGE,
+        )
+        # Owner only: the broker runs commands with the daemon's SSH keys
+        os.chmod(self._socket_path, 0o600)
+        logger.info("ssh_broker_listening", socket=self._socket_path)
+
+    async def stop(self) -> None:
+        """Stop listening, cancel in-flight calls and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            inflight = list(self._inflight)
+            for task in inflight:
+                task.cancel()
+            await asyncio.gather(*inflight, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        path = Path(self._socket_path)
+        if path.exists():
+            path.unlink()
+        logger.info("ssh_broker_stopped")
+
+    def _resolve(self, spec: dict[str, Any]) -> ServerInfo | None:
+        """The inventory entry matching the caller's server, if any."""
+        try:
+            server_info = self._inventory.get_server(spec.get("name", ""))
+        except KeyError:
+            return None
+        if not server_info.definition.ssh or _server_spec(server_info) != spec:
+            return None
+        return server_info
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+    ) -> None:
+        """Serve one client: run requests concurrently, answer by id."""
+        tasks: dict[Any, asyncio.Task[None]] = {}
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                req_id = request.get("id")
+                if request.get("op") == "cancel":
+                    task = tasks.get(req_id)
+                    if task is not None:
+                        task.cancel()
+                    continue
+                task = asyncio.ensure_future(self._answer(request, writer))
+                tasks[req_id] = task
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+                task.add_done_callback(lambda _t, i=req_id: tasks.pop(i, None))
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.debug("ssh_broker_client_error", error=str(e))
+        finally:
+            # Client went away: stop (and reap) whatever it was waiting on
+            for task in list(tasks.values()):
+                task.cancel()
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _answer(self, request: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        try:
+            response = await self._serve(request)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.exception("ssh_broker_request_failed", op=request.get("op"))
+            response = {"error": str(e)}
+        response["id"] = request.get("id")
+        if not writer.is_closing():
+            writer.write(json.dumps(response).encode() + b"\n")
+            try:
+                await writer.drain()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _serve(self, request: dict[str, Any]) -> dict[str, Any]:
+        op = request.get("op")
+        if op not in _OPS:
+            return {"error": f"unknown op {op!r}"}
+        server_info = self._resolve(request.get("server") or {})
+        if server_info is None:
+            return {"unknown_server": True}
+        commands = {"": request["command"]} if op == "run" else request["commands"]
+        permissions = server_info.permissions
+        denied = [c for c in commands.values() if not is_command_permitted(c, permissions)]
+        if denied:
+            reason = f"not allowed for role {server_info.definition.role!r}"
+            for command in denied:
+                self._log_denied(server_info, command, reason)
+            return {"denied": reason}
+        timeout = request.get("timeout", 30)
+        with track_reaped() as reaped, read_only_calls(bool(request.get("read_only"))):
+            if op == "run":
+                result = await self._pool.run(server_info, request["command"], timeout)
+                self._log_result(server_info, request["command"], result, reaped[0])
+                return {"result": asdict(result), "reaped": reaped[0]}
+            method = self._pool.run_many if op == "run_many" else self._pool.run_batch
+            results = await method(server_info, commands, timeout=timeout)
+        for label, result in results.items():
+            self._log_result(server_info, commands.get(label, ""), result, reaped[0])
+        return {
+            "results": {k: asdict(r) for k, r in results.items()},
+            "reaped": reaped[0],
+        }
+
+    def _log_denied(self, server_info: ServerInfo, command: str, reason: str) -> None:
+        logger.warning("ssh_broker_denied", server=server_info.name, command=command)
+        if self._audit is not None:
+            self._audit.log_denied(
+                "ssh_broker", {"server": server_info.name, "command": command},
+                reason=f"allowlist: {reason}",
+            )
+
+    def _log_result(
+        self, server_info: ServerInfo, command: str, result: ToolResult, reaped: int,
+    ) -> None:
+        if self._audit is None:
+            return
+        tool_input = {"server": server_info.name, "command": command}
+        if result.success:
+            self._audit.log_success(
+                "ssh_broker", tool_input, result=result.to_dict(), reaped=reaped,
+            )
+        else:
+            self._audit.log_error(
+                "ssh_broker", tool_input,
+                error=result.error or f"exit code {result.exit_code}", reaped=reaped,
+            )
+
+
+class BrokerClient:
+    """Connection from a bastion process to the broker hosted by the daemon."""
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _connect(self) -> bool:
+        """Connect if needed. False if the broker is unavailable."""
+        async with self._lock:
+            if self.connected:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    self.socket_path, limit=_MAX_MESSAGE,
+                )
+            except OSError as e:
+                self._retry_at = time.monotonic() + _RETRY_AFTER
+                logger.debug("ssh_broker_unavailable", socket=self.socket_path, error=str(e))
+                return False
+            self._reader_task = asyncio.ensure_future(self._read_responses(self._reader))
+            logger.debug("ssh_broker_connected", socket=self.socket_path)
+            return True
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.debug("ssh_broker_read_error", error=str(e))
+        finally:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is not None:
+            writer.close()
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("SSH broker connection lost"))
+
+    async def request(
+        self, op: str, server_info: ServerInfo, wait: float, **payload: Any,
+    ) -> dict[str, Any] | None:
+        """Send one request and wait for its response.
+
+        Returns:
+            The broker's response, or None if the broker is unavailable,
+            doesn't serve this server or won't run the command (the
+            caller runs it locally).
+
+        Raises:
+            ConnectionError: The broker went away mid-request.
+            asyncio.TimeoutError: No response within ``wait`` seconds.
+        """
+        if not await self._connect():
+            return None
+        req_id = next(self._ids)
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = future
+        message = {
+            "id": req_id, "op": op, "server": _server_spec(server_info),
+            "read_only": coalescing_allowed(), **payload,
+        }
+        try:
+            self._writer.write(json.dumps(message).encode() + b"\n")
+            await self._writer.drain()
+            response = await asyncio.wait_for(future, timeout=wait)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._pending.pop(req_id, None)
+            self._send_cancel(req_id)
+            raise
+        except (ConnectionError, OSError):
+            self._pending.pop(req_id, None)
+            self._disconnect()
+            raise ConnectionError("SSH broker connection lost") from None
+        if response.get("unknown_server"):
+            return None
+        if "denied" in response:
+            logger.debug("ssh_broker_denied", server=server_info.name, reason=response["denied"])
+            return None
+        note_reaped(response.get("reaped", 0))
+        return response
+
+    def _send_cancel(self, req_id: int) -> None:
+        if self.connected:
+            try:
+                self._writer.write(json.dumps({"id": req_id, "op": "cancel"}).encode() + b"\n")
+            except (ConnectionError, OSError):
+                pass
+
+    async def run(
+        self, server_info: ServerInfo, command: str, timeout: float, wait: float,
+    ) -> ToolResult | None:
+        """``SSHPool.run`` on the broker; None means "run it locally"."""
+        try:
+            response = await self.request(
+                "run", server_info, wait, command=command, timeout=timeout,
+            )
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            return ToolResult(error=_lost(server_info, e), exit_code=1)
+        if response is None:
+            return None
+        if "error" in response:
+            return ToolResult(error=f"SSH broker: {response['error']}", exit_code=1)
+        return ToolResult(**response["result"])
+
+    async def run_many(
+        self,
+        op: str,
+        server_info: ServerInfo,
+        commands: dict[str, str],
+        timeout: float,
+        wait: float,
+    ) -> dict[str, ToolResult] | None:
+        """``run_many``/``run_batch`` on the broker; None means "run locally"."""
+        try:
+            response = await self.request(
+                op, server_info, wait, commands=commands, timeout=timeout,
+            )
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            return {k: ToolResult(error=_lost(server_info, e), exit_code=1) for k in commands}
+        if response is None:
+            return None
+        if "error" in response:
+            return {k: ToolResult(error=f"SSH broker: {response['error']}", exit_code=1)
+                    for k in commands}
+        results = response["results"]
+        return {
+            k: ToolResult(**results[k]) if k in results
+            else ToolResult(error="No result from SSH broker", exit_code=1)
+            for k in commands
+        }
+
+    async def close(self) -> None:
+        """Close the connection to the broker."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader_task = None
+        self._disconnect()
+
+
+def _lost(server_info: ServerInfo, exc: BaseException) -> str:
+    if isinstance(exc, asyncio.TimeoutError):
+        return f"SSH broker did not answer in time for {server_info.name}"
+    return f"SSH broker connection lost while running on {server_info.name}"
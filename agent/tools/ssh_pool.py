@@ -1,21 +1,29 @@
-"""SSH connection pool for session-level reuse.
+"""SSH connection pool — the single transport for all remote execution.
 
 Instead of opening a fresh SSH connection for every tool call
 (1-2s handshake overhead each time), the pool maintains open
-connections keyed by server name. Connections are reused across
-tool calls within a conversation session.
+connections keyed by server name. Every remote code path — tools,
+``run_remote_command``, the health sweep, ``bastion monitor`` and
+``anomaly-monitor`` — goes through the process-wide pool returned by
+``get_ssh_pool()``, so a host is only handshaken once per process.
 
 Usage::
 
-    pool = SSHPool()
+    pool = get_ssh_pool()
     result = await pool.run(server_info, "uptime")
     result2 = await pool.run(server_info, "df -h")  # reuses connection
-    await pool.close_all()
+    await close_ssh_pool()
 """
 
 from __future__ import annotations
 
 import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
@@ -23,23 +31,653 @@ import structlog
 
 from agent.inventory import ServerInfo
 from agent.tools.base import ToolResult
+from agent.tools.circuit import BreakerState, CircuitBreaker
+from agent.tools.latency import LatencyTracker, get_latency_tracker
+from agent.tools.singleflight import SingleFlight
+from agent.tools.stream import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_LINES,
+    CommandStream,
+    cap_output_command,
+    drain_stderr,
+)
 
 logger = structlog.get_logger()
 
+# Connection timeout (seconds). Fail fast if the host is unreachable
+# rather than eating the entire command_timeout on a TCP SYN hang.
 _CONNECT_TIMEOUT = 10
 
+# Channel-open failures (sshd MaxSessions hit) are retried after the
+# host's limit has been lowered, so fan-outs degrade to queueing.
+_CHANNEL_OPEN_RETRIES = 3
+
+# AIMD: treat a channel-open slower than this multiple of the host's
+# best observed open latency (and above the floor) as congestion.
+_LATENCY_BACKOFF_FACTOR = 4.0
+_LATENCY_FLOOR = 0.5  # seconds
+
+# Pool lifecycle defaults — overridden from AgentConfig via configure_ssh_pool()
+_DEFAULT_IDLE_TTL = 900
+_DEFAULT_MAX_CONNECTIONS = 100
+_DEFAULT_HEALTH_INTERVAL = 60
+_DEFAULT_BREAKER_THRESHOLD = 1
+_DEFAULT_BREAKER_COOLDOWN = 60
+_PROBE_TIMEOUT = 10
+
+# Every pooled exec first prints the remote process group ID on stderr.
+# sshd starts each session with setsid(), so the login shell's $$ is
+# the group of everything the command spawns — what a timeout or
+# cancel has to kill, since closing the channel alone leaves a
+# non-pty command running.
+_PGID_MARKER = "__BASTION_PGID__"
+
+# Upper bound for the kill round trip after a timeout or cancel.
+_REAP_TIMEOUT = 5
+
+# Grace period between TERM and KILL for a reaped process group.
+_REAP_KILL_AFTER = 2
+
+# Margin on top of a brokered call's own timeout before giving up on
+# the broker's answer.
+_BROKER_GRACE = 30
+
+# Per-call counter of reaped processes, set by ``track_reaped``.
+_reaped_in_call: ContextVar[list[int] | None] = ContextVar("ssh_reaped_in_call", default=None)
+
+# Whether the running call only reads state, set by ``read_only_calls``.
+_read_only_call: ContextVar[bool] = ContextVar("ssh_read_only_call", default=False)
+
+
+class SSHConnectError(Exception):
+    """Raised when a pooled connection cannot be opened.
+
+    The message is operator-friendly (what failed and what to check),
+    so callers can surface it verbatim.
+    """
+
+
+class HostUnreachable(SSHConnectError):
+    """Raised without connecting while a host's circuit breaker is open."""
+
+
+def describe_connect_error(server_info: ServerInfo, exc: BaseException) -> str:
+    """Map an asyncssh/OS connect failure to an actionable error message."""
+    defn = server_info.definition
+    name = server_info.name
+
+    if isinstance(exc, SSHConnectError):
+        return str(exc)
+    if isinstance(exc, asyncio.TimeoutError):
+        return (
+            f"Cannot connect to {name} ({defn.host}:22) — connection timed out "
+            f"after {_CONNECT_TIMEOUT}s.\n"
+            f"Check: Is the IP correct in servers.yaml? Is SSH open on the target? "
+            f"Can the bastion reach it?"
+        )
+
+    try:
+        import asyncssh
+    except ImportError:
+        return f"SSH connect failed for {name}: {exc}"
+
+    if isinstance(exc, asyncssh.PermissionDenied):
+        return (
+            f"SSH permission denied on {name} ({defn.host}): {exc}\n"
+            f"Check: Does user {defn.user!r} exist on {name}? "
+            f"Is the public key in ~{defn.user}/.ssh/authorized_keys?"
+        )
+    if isinstance(exc, asyncssh.HostKeyNotVerifiable):
+        return (
+            f"SSH host key not trusted for {name} ({defn.host}): {exc}\n"
+            f"Fix: ssh-keyscan {defn.host} >> ~/.ssh/known_hosts  "
+            f"(as the claude-agent user), or set known_hosts_path in servers.yaml."
+        )
+    if isinstance(exc, asyncssh.KeyImportError):
+        return f"SSH key is invalid or corrupt ({defn.key_path}): {exc}"
+    if isinstance(exc, asyncssh.DisconnectError):
+        return f"SSH disconnected from {name}: {exc}"
+    if isinstance(exc, OSError):
+        return (
+            f"Cannot connect to {name} ({defn.host}): {exc}\n"
+            f"Check: Is the IP correct? Is the server online? Is port 22 open?"
+        )
+    return f"SSH connect failed for {name}: {exc}"
+
+
+class ChannelLimiter:
+    """FIFO-fair cap on concurrent SSH channels to one host.
+
+    Callers past the limit wait in arrival order. With ``adaptive``
+    enabled the limit follows AIMD: +1/limit per clean channel open,
+    halved on a channel-open failure or a latency spike, never above
+    the configured ``max_limit`` or below 1.
+    """
+
+    def __init__(self, max_limit: int, adaptive: bool = False) -> None:
+        self.max_limit = max(1, max_limit)
+        self.adaptive = adaptive
+        self._window = float(self.max_limit)
+        self._in_use = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._best_latency: float | None = None
+
+    @property
+    def limit(self) -> int:
+        """Current effective channel limit."""
+        return max(1, int(self._window))
+
+    @property
+    def in_use(self) -> int:
+        """Channels currently held."""
+        return self._in_use
+
+    @property
+    def queued(self) -> int:
+        """Callers waiting for a channel."""
+        return sum(1 for w in self._waiters if not w.done())
+
+    async def acquire(self) -> None:
+        """Wait (FIFO) until a channel slot is free, then take it."""
+        if self._in_use < self.limit and not self._waiters:
+            self._in_use += 1
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self._wake()  # a slot may be free behind already-woken waiters
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # If we were woken but cancelled before running, pass the slot on
+            if fut.done() and not fut.cancelled():
+                self._in_use -= 1
+                self._wake()
+            raise
+        finally:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        """Return a channel slot and wake the next waiter."""
+        self._in_use -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for fut in self._waiters:
+            if self._in_use >= self.limit:
+                break
+            if not fut.done():
+                self._in_use += 1
+                fut.set_result(None)
+
+    async def __aenter__(self) -> ChannelLimiter:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
+
+    def record_open(self, latency: float) -> None:
+        """Feed a successful channel-open latency into the AIMD window."""
+        if self._best_latency is None or latency < self._best_latency:
+            self._best_latency = latency
+        if not self.adaptive:
+            return
+        if (
+            latency > _LATENCY_FLOOR
+            and latency > self._best_latency * _LATENCY_BACKOFF_FACTOR
+        ):
+            self._decrease()
+        else:
+            self._window = min(float(self.max_limit), self._window + 1.0 / self._window)
+            self._wake()
+
+    def record_failure(self) -> None:
+        """Note a channel-open failure (e.g. sshd MaxSessions exceeded)."""
+        if self.adaptive:
+            self._decrease()
+
+    def _decrease(self) -> None:
+        old = self.limit
+        self._window = max(1.0, self._window / 2)
+        if self.limit != old:
+            logger.debug("ssh_channel_limit_decreased", old=old, new=self.limit)
+
+
+# Parsed private keys keyed by path, invalidated when the file's mtime changes.
+_key_cache: dict[str, tuple[float, Any]] = {}
+
+
+def load_client_key(key_path: str) -> Any:
+    """Read and parse a private key once, reusing it for later connects.
+
+    Parsing (and any KDF work for the key format) is otherwise repeated
+    on every handshake, which adds up when warming a whole fleet.
+
+    Raises:
+        asyncssh.KeyImportError: If the key is invalid.
+        OSError: If the file cannot be read.
+    """
+    import asyncssh
+
+    mtime = Path(key_path).stat().st_mtime
+    cached = _key_cache.get(key_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    key = asyncssh.read_private_key(key_path)
+    _key_cache[key_path] = (mtime, key)
+    return key
+
+
+def _is_alive(conn: Any) -> bool:
+    """Whether an asyncssh connection's transport is still open."""
+    try:
+        transport = conn._transport
+        return bool(transport) and not transport.is_closing()
+    except Exception:
+        return False
+
+
+def _is_channel_open_error(exc: BaseException) -> bool:
+    """Whether ``exc`` is asyncssh's ChannelOpenError."""
+    try:
+        import asyncssh
+    except ImportError:
+        return False
+    err_type = getattr(asyncssh, "ChannelOpenError", None)
+    return isinstance(err_type, type) and isinstance(exc, err_type)
+
+
+def report_pgid(command: str) -> str:
+    """Prefix ``command`` so the remote side reports its process group first."""
+    return f"echo {_PGID_MARKER}$$ >&2\n{command}"
+
+
+async def read_pgid(process: Any) -> tuple[int | None, str]:
+    """Read the process group line a ``report_pgid`` command prints first.
+
+    Returns:
+        Tuple of (PGID or None, any stderr text read that was not the
+        marker — the caller puts it back in front of the rest).
+    """
+    line = await process.stderr.readline()
+    if not line.startswith(_PGID_MARKER):
+        return None, line
+    try:
+        return int(line[len(_PGID_MARKER):].strip()), ""
+    except ValueError:
+        return None, ""
+
+
+def _reap_script(pgid: int) -> str:
+    """Shell that counts a process group, TERMs it, then KILLs stragglers."""
+    return (
+        f"n=$(ps -eo pgid= 2>/dev/null | awk '$1 == {pgid}' | wc -l); "
+        f'if [ "$n" -gt 0 ]; then kill -TERM -{pgid} 2>/dev/null; '
+        f"( sleep {_REAP_KILL_AFTER}; kill -KILL -{pgid} 2>/dev/null ) "
+        f"</dev/null >/dev/null 2>&1 & fi; echo $n"
+    )
+
+
+def note_reaped(count: int) -> None:
+    """Add ``count`` to the ``track_reaped`` block this call runs in, if any."""
+    counter = _reaped_in_call.get()
+    if counter is not None and count:
+        counter[0] += count
+
+
+def coalescing_allowed() -> bool:
+    """Whether identical commands of this call may share one execution."""
+    return _read_only_call.get()
+
+
+@contextmanager
+def read_only_calls(read_only: bool = True) -> Iterator[None]:
+    """Mark pool calls made inside this block as read-only (or not).
+
+    Only read-only calls join an identical command already in flight: two
+    identical mutating calls must both run. Like ``track_reaped`` the
+    setting is inherited by tasks spawned inside the block.
+    """
+    token = _read_only_call.set(read_only)
+    try:
+        yield
+    finally:
+        _read_only_call.reset(token)
+
+
+@contextmanager
+def track_reaped() -> Iterator[list[int]]:
+    """Count processes reaped by pool calls made inside this block.
+
+    The count is shared with tasks spawned inside the block (they copy
+    the context), so a tool's ``asyncio.gather`` fan-out is included.
+
+    Yields:
+        One-element list holding the running count.
+    """
+    counter = [0]
+    token = _reaped_in_call.set(counter)
+    try:
+        yield counter
+    finally:
+        _reaped_in_call.reset(token)
+
+
+@dataclass
+class PoolStats:
+    """Counters describing how well the pool is reusing connections."""
+
+    hits: int = 0  # reused an open connection
+    misses: int = 0  # first connection to a host
+    reconnects: int = 0  # reopened after a connection died or failed a probe
+    evictions: int = 0  # closed for idle TTL or the global connection cap
+    connect_failures: int = 0
+    reaped: int = 0  # remote processes killed after a timeout or cancel
+    short_circuits: int = 0  # calls failed fast by an open circuit breaker
+    brokered: int = 0  # calls served by another process's broker
+
+
+async def _collect(process: Any, job: dict[str, Any]) -> Any:
+    """Wait for a ``report_pgid`` process, noting its PGID in ``job`` first."""
+    job["pgid"], stderr_head = await read_pgid(process)
+    result = await process.wait(check=False)
+    if stderr_head:
+        result.stderr = stderr_head + (result.stderr or "")
+    return result
+
+
+class _SSHCommandStream(CommandStream):
+    """CommandStream over a pooled connection.
+
+    Holds one of the host's channel slots for as long as the stream is
+    open. The remote command is wrapped so it sends at most
+    ``max_bytes + 1`` bytes even before the local budget check closes
+    the channel.
+    """
+
+    def __init__(self, pool: SSHPool, server_info: ServerInfo, command: str, **kwargs: Any) -> None:
+        super().__init__(command, **kwargs)
+        self._pool = pool
+        self._server_info = server_info
+        self._limiter: ChannelLimiter | None = None
+        self._conn: Any = None
+        self._process: Any = None
+        self._pgid: int | None = None
+        self._stderr_head = ""
+        self._stderr_task: asyncio.Task[str] | None = None
+
+    async def _open(self) -> None:
+        name = self._server_info.name
+        if not self._server_info.definition.ssh:
+            self.error = f"Server {name!r} is local, not SSH."
+            return
+        conn, err = await self._pool._connect_or_error(self._server_info)
+        if conn is None:
+            self.error = err
+            return
+        limiter = self._pool._get_limiter(self._server_info)
+        await limiter.acquire()
+        self._limiter = limiter
+        start = time.monotonic()
+        try:
+            self._process = await conn.create_process(
+                report_pgid(cap_output_command(self.command, self.max_bytes, tail=self.tail)),
+            )
+        except Exception as e:
+            if _is_channel_open_error(e):
+                self._limiter.record_failure()
+            self._limiter.release()
+            self._limiter = None
+            self.error = f"SSH command failed on {name}: {e}"
+            return
+        self._limiter.record_open(time.monotonic() - start)
+        self._conn = conn
+        self._pgid, self._stderr_head = await read_pgid(self._process)
+        self._stderr_task = asyncio.ensure_future(drain_stderr(self._process.stderr))
+
+    async def _readline(self) -> str:
+        return await self._process.stdout.readline()
+
+    async def _wait(self) -> None:
+        completed = await self._process.wait(check=False)
+        self.exit_status = completed.exit_status or 0
+        if self._stderr_task is not None:
+            self.stderr = self._stderr_head + await self._stderr_task
+
+    async def _close(self, abort: bool) -> None:
+        if self._stderr_task is not None and not self._stderr_task.done():
+            self._stderr_task.cancel()
+        try:
+            if self._process is not None and abort:
+                self._process.close()
+                logger.debug(
+                    "ssh_stream_closed", server=self._server_info.name,
+                    truncated=self.truncated, timed_out=self.timed_out,
+                    lines=self.lines_read, bytes=self.bytes_read,
+                )
+                reason = "budget" if self.truncated else "timeout" if self.timed_out else "closed"
+                await self._pool._reap(self._server_info, self._conn, self._pgid, reason)
+        finally:
+            if self._limiter is not None:
+                self._limiter.release()
+                self._limiter = None
+            self._pool._touch(self._server_info.name)
+
 
 class SSHPool:
     """Maintains a pool of SSH connections keyed by server name.
 
     Thread-safe via asyncio locks. Connections are lazily opened on
     first use and reused for subsequent commands to the same server.
+    Idle connections are closed after ``idle_ttl``; beyond
+    ``max_connections`` the least recently used idle one is evicted.
+    ``start_maintenance()`` runs a background task that probes idle
+    connections and reopens broken ones before a tool needs them.
     """
 
-    def __init__(self) -> None:
-        self._connections: dict[str, Any] = {}
+    def __init__(
+        self,
+        idle_ttl: float = _DEFAULT_IDLE_TTL,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        health_interval: float = _DEFAULT_HEALTH_INTERVAL,
+        breaker_threshold: int = _DEFAULT_BREAKER_THRESHOLD,
+        breaker_cooldown: float = _DEFAULT_BREAKER_COOLDOWN,
+        latency: LatencyTracker | None = None,
+        broker_socket: str | None = None,
+    ) -> None:
+        self.idle_ttl = idle_ttl
+        self.max_connections = max_connections
+        self.health_interval = health_interval
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        # Learned per-host command latencies; decides effective timeouts
+        self.latency = latency if latency is not None else LatencyTracker()
+        # Daemon-hosted broker to run commands through (see ssh_broker)
+        self.broker_socket = broker_socket
+        self._broker: Any = None
+        # Identical (host, command) execs in flight share one channel
+        self._flights = SingleFlight()
+        # LRU order: least recently used first
+        self._connections: OrderedDict[str, Any] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        self._server_infos: dict[str, ServerInfo] = {}
         self._locks: dict[str, asyncio.Lock] = {}
+        self._limiters: dict[str, ChannelLimiter] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
         self._global_lock = asyncio.Lock()
+        self._stats = PoolStats()
+        self._maintenance_task: asyncio.Task[None] | None = None
+
+    def _get_breaker(self, name: str) -> CircuitBreaker:
+        """Get or create the circuit breaker for a server."""
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            self._breakers[name] = breaker
+        return breaker
+
+    def _get_broker(self) -> Any:
+        """The BrokerClient for ``broker_socket``, or None if not brokered."""
+        if not self.broker_socket:
+            return None
+        if self._broker is None or self._broker.socket_path != self.broker_socket:
+            from agent.tools.ssh_broker import BrokerClient
+            self._broker = BrokerClient(self.broker_socket)
+        return self._broker
+
+    def _broker_wait(self, timeout: float) -> float:
+        """How long to wait for a brokered call whose default is ``timeout``."""
+        return max(timeout, self.latency.max_timeout) + _BROKER_GRACE
+
+    def _get_limiter(self, server_info: ServerInfo) -> ChannelLimiter:
+        """Get or create the channel limiter for a server."""
+        limiter = self._limiters.get(server_info.name)
+        if limiter is None:
+            defn = server_info.definition
+            limiter = ChannelLimiter(defn.max_sessions, adaptive=defn.adaptive_sessions)
+            self._limiters[server_info.name] = limiter
+        return limiter
+
+    async def _exec(
+        self,
+        server_info: ServerInfo,
+        conn: Any,
+        command: str,
+        timeout: float,
+        input: str | None = None,
+        learn: bool = True,
+        default: float | None = None,
+    ) -> Any:
+        """Run one command, joining an identical one already in flight.
+
+        Concurrent read-only callers (see ``read_only_calls``) sending the
+        same command with the same ``input`` and timeout to the same host
+        share a single execution. Calls that may change state are never
+        coalesced. See ``_exec_once`` for the execution itself.
+        """
+        if not coalescing_allowed():
+            return await self._exec_once(
+                server_info, conn, command, timeout, input, learn, default,
+            )
+        key = (server_info.name, command, input, timeout)
+        if key in self._flights:
+            logger.debug("ssh_coalesced", server=server_info.name, command=command[:80])
+        return await self._flights.do(
+            key, lambda: self._exec_once(
+                server_info, conn, command, timeout, input, learn, default,
+            ),
+        )
+
+    async def _exec_once(
+        self,
+        server_info: ServerInfo,
+        conn: Any,
+        command: str,
+        timeout: float,
+        input: str | None = None,
+        learn: bool = True,
+        default: float | None = None,
+    ) -> Any:
+        """Run one command in its own channel, respecting the host's channel cap.
+
+        Queue time does not count against ``timeout``. Channel-open
+        failures are retried (after AIMD backoff) instead of surfacing.
+        On timeout or cancellation the command's remote process group
+        is killed before the exception propagates. With ``learn``, the
+        run time is recorded in the latency history, or on timeout the
+        caller's ``default`` timeout (before learning) at most.
+
+        Returns:
+            asyncssh SSHCompletedProcess.
+
+        Raises:
+            asyncio.TimeoutError: If the command exceeds ``timeout``.
+        """
+        limiter = self._get_limiter(server_info)
+        job: dict[str, Any] = {}
+        try:
+            for attempt in range(_CHANNEL_OPEN_RETRIES + 1):
+                async with limiter:
+                    start = time.monotonic()
+                    try:
+                        wrapped = report_pgid(command)
+                        if input is None:
+                            opening = conn.create_process(wrapped)
+                        else:
+                            opening = conn.create_process(wrapped, input=input)
+                        process = await asyncio.wait_for(opening, timeout=timeout)
+                    except Exception as e:
+                        if not _is_channel_open_error(e) or attempt >= _CHANNEL_OPEN_RETRIES:
+                            raise
+                        limiter.record_failure()
+                        logger.debug(
+                            "ssh_channel_open_retry",
+                            server=server_info.name, attempt=attempt + 1, error=str(e),
+                        )
+                        continue
+                    opened = time.monotonic() - start
+                    limiter.record_open(opened)
+                    job["started"] = True
+                    async with process:
+                        result = await asyncio.wait_for(
+                            _collect(process, job),
+                            timeout=max(0.1, timeout - opened),
+                        )
+                    if learn:
+                        self.latency.record(
+                            server_info.name, command, time.monotonic() - start,
+                        )
+                    return result
+            raise RuntimeError("channel retry loop exited unexpectedly")
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if learn and isinstance(e, asyncio.TimeoutError):
+                self.latency.record_timeout(
+                    server_info.name, command, timeout,
+                    timeout if default is None else default,
+                )
+            # The channel is closed by now, but a non-pty command keeps
+            # running on the host unless its process group is killed.
+            if job.get("started"):
+                reason = "cancelled" if isinstance(e, asyncio.CancelledError) else "timeout"
+                await self._reap(server_info, conn, job.get("pgid"), reason)
+            raise
+
+    async def _reap(
+        self, server_info: ServerInfo, conn: Any, pgid: int | None, reason: str,
+    ) -> int:
+        """Kill what is left of a timed-out or cancelled command on the host.
+
+        Runs on its own channel, outside the host's channel limiter (the
+        command's channel has already been closed). Failures are logged,
+        never raised: the caller is already reporting a timeout.
+
+        Returns:
+            Number of remote processes that were signalled.
+        """
+        if pgid is None or pgid <= 1 or conn is None:
+            return 0
+        try:
+            process = await asyncio.wait_for(
+                conn.create_process(_reap_script(pgid)), timeout=_REAP_TIMEOUT,
+            )
+            async with process:
+                result = await asyncio.wait_for(process.wait(check=False), timeout=_REAP_TIMEOUT)
+            count = int((result.stdout or "0").strip() or 0)
+        except Exception as e:
+            logger.warning(
+                "ssh_reap_failed", server=server_info.name, pgid=pgid, error=str(e),
+            )
+            return 0
+        if count:
+            self._stats.reaped += count
+            note_reaped(count)
+            logger.info(
+                "ssh_reaped", server=server_info.name, pgid=pgid, processes=count, reason=reason,
+            )
+        return count
 
     async def _get_lock(self, server_name: str) -> asyncio.Lock:
         """Get or create a per-server lock."""
@@ -49,11 +687,19 @@ class SSHPool:
             return self._locks[server_name]
 
     async def _get_connection(self, server_info: ServerInfo) -> Any:
-        """Get or create an SSH connection for a server."""
+        """Get or create an SSH connection for a server.
+
+        Raises:
+            HostUnreachable: If the host's circuit breaker is open.
+            SSHConnectError: For configuration problems (missing key,
+                asyncssh unavailable).
+            asyncio.TimeoutError, OSError, asyncssh.Error: For
+                connection failures — see ``describe_connect_error``.
+        """
         try:
             import asyncssh
         except ImportError:
-            raise RuntimeError("asyncssh not available")
+            raise SSHConnectError("asyncssh not available")
 
         name = server_info.name
         lock = await self._get_lock(name)
@@ -62,71 +708,302 @@ class SSHPool:
             # Check if existing connection is still alive
             conn = self._connections.get(name)
             if conn is not None:
-                try:
-                    # Quick check — if the transport is closed, discard
-                    if not conn._transport or conn._transport.is_closing():
-                        logger.debug("ssh_pool_stale", server=name)
-                        conn = None
-                        del self._connections[name]
-                    else:
-                        return conn
-                except Exception:
-                    conn = None
-                    self._connections.pop(name, None)
+                if _is_alive(conn):
+                    self._touch(name)
+                    self._stats.hits += 1
+                    return conn
+                logger.debug("ssh_pool_stale", server=name)
+                self._connections.pop(name, None)
+                conn = None
+
+            reconnect = name in self._server_infos
+            self._server_infos[name] = server_info
 
             # Open new connection
             defn = server_info.definition
 
             if not defn.key_path:
-                raise RuntimeError(f"No SSH key configured for {name}")
+                raise SSHConnectError(f"No SSH key configured for server {name!r}.")
 
+            # Pre-flight: check the SSH key file actually exists
             key_file = Path(defn.key_path)
             if not key_file.exists():
-                raise RuntimeError(f"SSH key not found: {defn.key_path}")
+                raise SSHConnectError(
+                    f"SSH key not found: {defn.key_path}\n"
+                    f"Generate keys: bastion-agent generate-ssh-keys, "
+                    f"or check key_path in servers.yaml for {name!r}."
+                )
+
+            client_key = load_client_key(defn.key_path)
+
+            # A host that just failed to connect fails fast until its
+            # breaker's cooldown passes; then one caller gets a single
+            # trial attempt (half-open) while the rest keep failing fast.
+            breaker = self._get_breaker(name)
+            if not breaker.allow():
+                self._stats.short_circuits += 1
+                raise HostUnreachable(breaker.describe(name))
+            attempts = 1 if breaker.is_trial else 3
 
             # Retry with exponential backoff for transient failures
             last_err: Exception | None = None
-            for attempt in range(3):
-                try:
-                    logger.debug(
-                        "ssh_pool_connect",
-                        server=name, host=defn.host, attempt=attempt + 1,
-                    )
-                    conn = await asyncio.wait_for(
-                        asyncssh.connect(
-                            defn.host,
-                            username=defn.user,
-                            client_keys=[defn.key_path],
-                            known_hosts=defn.known_hosts_path,
-                            keepalive_interval=30,
-                        ),
-                        timeout=_CONNECT_TIMEOUT,
-                    )
-                    self._connections[name] = conn
-                    return conn
-                except (asyncio.TimeoutError, OSError) as e:
-                    last_err = e
-                    if attempt < 2:
-                        delay = 2 ** attempt  # 1s, 2s
+            try:
+                for attempt in range(attempts):
+                    try:
                         logger.debug(
-                            "ssh_pool_retry",
-                            server=name, delay=delay, error=str(e),
+                            "ssh_pool_connect",
+                            server=name, host=defn.host, attempt=attempt + 1,
+                        )
+                        conn = await asyncio.wait_for(
+                            asyncssh.connect(
+                                defn.host,
+                                username=defn.user,
+                                client_keys=[client_key],
+                                known_hosts=defn.known_hosts_path,
+                                keepalive_interval=30,
+                            ),
+                            timeout=_CONNECT_TIMEOUT,
                         )
-                        await asyncio.sleep(delay)
-            raise last_err or RuntimeError(f"SSH connect failed for {name}")
+                        self._connections[name] = conn
+                        self._touch(name)
+                        if reconnect:
+                            self._stats.reconnects += 1
+                        else:
+                            self._stats.misses += 1
+                        self._mark_reachable(name, breaker)
+                        self._evict_over_capacity()
+                        return conn
+                    except (asyncio.TimeoutError, OSError) as e:
+                        last_err = e
+                        if attempt < attempts - 1:
+                            delay = 2 ** attempt  # 1s, 2s
+                            logger.debug(
+                                "ssh_pool_retry",
+                                server=name, delay=delay, error=str(e),
+                            )
+                            await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                breaker.abandon_trial()
+                raise
+            except Exception:
+                # The host answered (auth or host-key failure etc.) — that
+                # is a configuration problem, not an outage.
+                self._mark_reachable(name, breaker)
+                raise
+            self._stats.connect_failures += 1
+            error = str(last_err) or type(last_err).__name__
+            if breaker.record_failure(error):
+                logger.warning(
+                    "ssh_breaker_open",
+                    server=name, failures=breaker.failures,
+                    cooldown=breaker.cooldown, error=error,
+                )
+            raise last_err or SSHConnectError(f"SSH connect failed for {name}")
+
+    def _mark_reachable(self, name: str, breaker: CircuitBreaker) -> None:
+        if breaker.state is not BreakerState.CLOSED:
+            logger.info(
+                "ssh_breaker_closed", server=name,
+                down_for=round(time.time() - (breaker.down_since or time.time()), 1),
+            )
+        breaker.record_success()
+
+    async def warm_up(
+        self, servers: list[ServerInfo], concurrency: int = 10,
+    ) -> dict[str, str]:
+        """Open connections to many servers in parallel ahead of first use.
+
+        Handshakes are bounded by ``concurrency`` so a large fleet does
+        not spike CPU on the bastion. Local (non-SSH) servers are skipped.
+        A tool call that arrives mid-warm-up waits on the same per-host
+        lock instead of opening a second connection.
+
+        A brokered pool (``broker_socket`` set) opens nothing: its calls
+        go through the daemon's connections, and a direct connection to
+        the whole fleet from every monitor run is what brokering avoids.
+
+        Returns:
+            Dict of server name -> error message ("" when connected).
+        """
+        if self.broker_socket:
+            logger.debug("ssh_pool_warm_skipped", reason="brokered")
+            return {}
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def _warm(server_info: ServerInfo) -> tuple[str, str]:
+            async with sem:
+                _conn, err = await self._connect_or_error(server_info)
+                return server_info.name, err
+
+        start = time.monotonic()
+        pairs = await asyncio.gather(
+            *[_warm(s) for s in servers if s.definition.ssh]
+        )
+        results = dict(pairs)
+        logger.info(
+            "ssh_pool_warmed",
+            connected=sum(1 for e in results.values() if not e),
+            failed=[n for n, e in results.items() if e],
+            elapsed=round(time.monotonic() - start, 2),
+        )
+        return results
+
+    def _touch(self, name: str) -> None:
+        """Mark a connection as just used (moves it to the LRU tail)."""
+        self._last_used[name] = time.monotonic()
+        if name in self._connections:
+            self._connections.move_to_end(name)
+
+    def _is_busy(self, name: str) -> bool:
+        limiter = self._limiters.get(name)
+        return limiter is not None and (limiter.in_use > 0 or limiter.queued > 0)
+
+    def _drop(self, name: str) -> None:
+        """Remove a connection from the pool and close it without waiting."""
+        conn = self._connections.pop(name, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _evict(self, name: str, reason: str) -> None:
+        self._drop(name)
+        # A later connect to an evicted host counts as a miss, not a reconnect
+        self._server_infos.pop(name, None)
+        self._stats.evictions += 1
+        logger.debug("ssh_pool_evicted", server=name, reason=reason)
+
+    def _evict_over_capacity(self) -> None:
+        """Evict least recently used idle connections beyond max_connections."""
+        excess = len(self._connections) - self.max_connections
+        for name in list(self._connections):
+            if excess <= 0:
+                break
+            if self._is_busy(name):
+                continue
+            self._evict(name, "max_connections")
+            excess -= 1
+
+    def evict_idle(self) -> int:
+        """Close connections idle for longer than ``idle_ttl``.
+
+        Returns:
+            Number of connections evicted.
+        """
+        now = time.monotonic()
+        evicted = 0
+        for name in list(self._connections):
+            if self._is_busy(name):
+                continue
+            if now - self._last_used.get(name, now) > self.idle_ttl:
+                self._evict(name, "idle_ttl")
+                evicted += 1
+        return evicted
+
+    async def check_health(self) -> None:
+        """One maintenance pass: evict idle, probe quiet connections, reopen
+        broken ones, and give unreachable hosts their half-open trial."""
+        self.evict_idle()
+        now = time.monotonic()
+
+        async def _check(name: str, conn: Any) -> None:
+            server_info = self._server_infos.get(name)
+            if server_info is None or self._is_busy(name):
+                return
+            healthy = _is_alive(conn)
+            if healthy and now - self._last_used.get(name, now) >= self.health_interval:
+                try:
+                    result = await self._exec(
+                        server_info, conn, "true", _PROBE_TIMEOUT, learn=False,
+                    )
+                    healthy = result.exit_status == 0
+                except Exception:
+                    healthy = False
+            if healthy:
+                return
+            logger.info("ssh_pool_unhealthy", server=name)
+            if self._connections.get(name) is conn:
+                self._drop(name)
+            last_used = self._last_used.get(name)
+            try:
+                await self._get_connection(server_info)
+            except Exception as e:
+                logger.warning("ssh_pool_reopen_failed", server=name, error=str(e))
+            if last_used is not None:
+                # A background reopen is not "use" — keep the idle clock running
+                self._last_used[name] = last_used
+
+        await asyncio.gather(
+            *[_check(n, c) for n, c in list(self._connections.items())],
+            *[self._probe_unreachable(n) for n, b in list(self._breakers.items())
+              if b.probe_due() and n in self._server_infos],
+            return_exceptions=True,
+        )
+
+    async def _probe_unreachable(self, name: str) -> None:
+        """Half-open trial for a host whose breaker cooldown has passed."""
+        last_used = self._last_used.get(name)
+        conn, _err = await self._connect_or_error(self._server_infos[name])
+        if conn is not None and last_used is not None:
+            # Re-admitted in the background — not "use" for the idle clock
+            self._last_used[name] = last_used
+
+    def start_maintenance(self) -> None:
+        """Start the background health/eviction task (idempotent).
+
+        Must be called from a running event loop. The task stops when
+        ``close_all()`` is called.
+        """
+        if self._maintenance_task is not None and not self._maintenance_task.done():
+            return
+        self._maintenance_task = asyncio.get_running_loop().create_task(
+            self._maintenance_loop(),
+        )
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception:
+                logger.exception("ssh_pool_maintenance_error")
+            self.latency.save()
+            logger.debug("ssh_pool_stats", **self.stats())
+
+    async def _connect_or_error(self, server_info: ServerInfo) -> tuple[Any, str]:
+        """Get a connection, or a friendly error message if that fails.
+
+        Returns:
+            Tuple of (connection or None, error message or "").
+        """
+        try:
+            return await self._get_connection(server_info), ""
+        except HostUnreachable as e:
+            logger.debug("ssh_short_circuit", server=server_info.name)
+            return None, str(e)
+        except Exception as e:
+            logger.error(
+                "ssh_connect_failed",
+                server=server_info.name,
+                host=server_info.definition.host,
+                error=str(e) or type(e).__name__,
+            )
+            return None, describe_connect_error(server_info, e)
 
     async def run(
         self,
         server_info: ServerInfo,
         command: str,
-        timeout: int = 30,
+        timeout: float = 30,
     ) -> ToolResult:
         """Run a command on a remote server using a pooled connection.
 
         Args:
             server_info: Server to run on.
             command: Command string to execute.
-            timeout: Execution timeout in seconds.
+            timeout: Default execution timeout in seconds, used until the
+                host has latency history for this kind of command.
 
         Returns:
             ToolResult with output.
@@ -139,45 +1016,86 @@ class SSHPool:
                 exit_code=1,
             )
 
-        try:
-            conn = await self._get_connection(server_info)
-        except asyncio.TimeoutError:
-            return ToolResult(
-                error=f"SSH connect timeout to {name} ({server_info.definition.host})",
-                exit_code=1,
+        broker = self._get_broker()
+        if broker is not None:
+            brokered = await broker.run(
+                server_info, command, timeout, wait=self._broker_wait(timeout),
             )
-        except Exception as e:
-            return ToolResult(error=f"SSH connect failed for {name}: {e}", exit_code=1)
+            if brokered is not None:
+                self._stats.brokered += 1
+                return brokered
+
+        conn, err = await self._connect_or_error(server_info)
+        if conn is None:
+            return ToolResult(error=err, exit_code=1)
 
+        default, timeout = timeout, self.latency.timeout_for(name, command, timeout)
         try:
-            result = await asyncio.wait_for(
-                conn.run(command, check=False),
-                timeout=timeout,
-            )
+            result = await self._exec(server_info, conn, command, timeout, default=default)
             return ToolResult(
                 output=(result.stdout or "").rstrip(),
                 error=(result.stderr or "").rstrip(),
                 exit_code=result.exit_status or 0,
             )
         except asyncio.TimeoutError:
-            return ToolResult(error=f"Command timed out after {timeout}s on {name}", exit_code=1)
+            return ToolResult(error=f"Command timed out after {timeout:g}s on {name}", exit_code=1)
         except Exception as e:
             # Connection might have died — remove from pool
             self._connections.pop(name, None)
             return ToolResult(error=f"SSH command failed on {name}: {e}", exit_code=1)
 
+    def run_stream(
+        self,
+        server_info: ServerInfo,
+        command: str,
+        *,
+        timeout: float = 30,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_lines: int = DEFAULT_MAX_LINES,
+        tail: bool = False,
+    ) -> CommandStream:
+        """Run a command and stream its stdout line by line.
+
+        Unlike ``run``, stdout is never buffered in full: the returned
+        ``CommandStream`` yields lines as they arrive and closes the
+        channel once ``max_bytes`` or ``max_lines`` is used up. The
+        connection is opened lazily when iteration starts.
+
+        Args:
+            server_info: Server to run on.
+            command: Command string to execute.
+            timeout: Default overall timeout in seconds, including
+                reading; replaced by the learned one once there is history.
+            max_bytes: Stdout byte budget (also enforced remotely).
+            max_lines: Stdout line budget.
+            tail: Keep the newest output within budget instead of the
+                oldest (for ``tail``/``dmesg``-style sources).
+
+        Returns:
+            CommandStream to iterate inside ``async with``.
+        """
+        return _SSHCommandStream(
+            self, server_info, command,
+            timeout=self.latency.timeout_for(server_info.name, command, timeout),
+            max_bytes=max_bytes, max_lines=max_lines, tail=tail,
+        )
+
     async def run_many(
         self,
         server_info: ServerInfo,
         commands: dict[str, str],
-        timeout: int = 15,
+        timeout: float = 15,
     ) -> dict[str, ToolResult]:
         """Run multiple commands on one server in parallel over one connection.
 
+        Channels beyond the host's ``max_sessions`` queue FIFO rather
+        than failing, so large fan-outs are safe.
+
         Args:
             server_info: Server to run on.
             commands: Dict of label -> command string.
-            timeout: Per-command timeout.
+            timeout: Default per-command timeout; each command uses its
+                learned timeout once the host has history for it.
 
         Returns:
             Dict of label -> ToolResult.
@@ -185,15 +1103,19 @@ class SSHPool:
         if not server_info.definition.ssh:
             return {k: ToolResult(error="Local server", exit_code=1) for k in commands}
 
-        try:
-            conn = await self._get_connection(server_info)
-        except Exception as e:
-            return {k: ToolResult(error=f"SSH failed: {e}", exit_code=1) for k in commands}
+        brokered = await self._run_brokered("run_many", server_info, commands, timeout)
+        if brokered is not None:
+            return brokered
+
+        conn, err = await self._connect_or_error(server_info)
+        if conn is None:
+            return {k: ToolResult(error=err, exit_code=1) for k in commands}
 
         async def _run_one(label: str, cmd: str) -> tuple[str, ToolResult]:
+            cmd_timeout = self.latency.timeout_for(server_info.name, cmd, timeout)
             try:
-                result = await asyncio.wait_for(
-                    conn.run(cmd, check=False), timeout=timeout,
+                result = await self._exec(
+                    server_info, conn, cmd, cmd_timeout, default=timeout,
                 )
                 return label, ToolResult(
                     output=(result.stdout or "").rstrip(),
@@ -201,7 +1123,7 @@ class SSHPool:
                     exit_code=result.exit_status or 0,
                 )
             except asyncio.TimeoutError:
-                return label, ToolResult(error=f"Timed out ({timeout}s)", exit_code=1)
+                return label, ToolResult(error=f"Timed out ({cmd_timeout:g}s)", exit_code=1)
             except Exception as e:
                 return label, ToolResult(error=str(e), exit_code=1)
 
@@ -210,8 +1132,137 @@ class SSHPool:
         )
         return dict(pairs)
 
+    async def run_batch(
+        self,
+        server_info: ServerInfo,
+        commands: dict[str, str],
+        timeout: float = 30,
+    ) -> dict[str, ToolResult]:
+        """Run labelled commands in one SSH exec with framed output.
+
+        The commands run concurrently on the remote host inside a single
+        ``sh`` invocation (see ``agent.tools.batch_exec``), each under a
+        remote-side ``timeout``. One channel and one round trip replace
+        one per command. If the batch script itself cannot run there,
+        falls back to ``run_many``.
+
+        Args:
+            server_info: Server to run on.
+            commands: Dict of label -> command string.
+            timeout: Default per-command timeout, enforced on the remote
+                side; each command uses its learned timeout once the host
+                has history for it.
+
+        Returns:
+            Dict of label -> ToolResult, in the same shape as ``run_many``.
+        """
+        if not commands:
+            return {}
+        if not server_info.definition.ssh:
+            return {k: ToolResult(error="Local server", exit_code=1) for k in commands}
+        if not coalescing_allowed():
+            return await self._run_batch_once(server_info, commands, timeout)
+        # Each script carries a fresh boundary, so identical batches are
+        # joined here rather than by _exec
+        key = ("batch", server_info.name, tuple(commands.items()), timeout)
+        if key in self._flights:
+            logger.debug("ssh_coalesced", server=server_info.name, batch=len(commands))
+        results = await self._flights.do(
+            key, lambda: self._run_batch_once(server_info, commands, timeout),
+        )
+        return dict(results)
+
+    async def _run_batch_once(
+        self,
+        server_info: ServerInfo,
+        commands: dict[str, str],
+        timeout: float,
+    ) -> dict[str, ToolResult]:
+        """One ``run_batch`` execution (brokered, batched or via ``run_many``)."""
+        from agent.tools.batch_exec import (
+            build_batch_script,
+            new_boundary,
+            parse_batch_output,
+        )
+
+        brokered = await self._run_brokered("run_batch", server_info, commands, timeout)
+        if brokered is not None:
+            return brokered
+
+        conn, err = await self._connect_or_error(server_info)
+        if conn is None:
+            return {k: ToolResult(error=err, exit_code=1) for k in commands}
+
+        name = server_info.name
+        labels = list(commands)
+        boundary = new_boundary()
+        timeouts = [self.latency.timeout_for(name, commands[k], timeout) for k in labels]
+        script = build_batch_script([commands[k] for k in labels], timeouts, boundary)
+        try:
+            # Per-command times are learned from the frames, not the wrapper
+            result = await self._exec(
+                server_info, conn, "sh -s", max(timeouts) + 15, input=script, learn=False,
+            )
+        except asyncio.TimeoutError:
+            return {k: ToolResult(error=f"Timed out ({t:g}s)", exit_code=1)
+                    for k, t in zip(labels, timeouts)}
+        except Exception as e:
+            self._connections.pop(name, None)
+            return {k: ToolResult(error=f"SSH command failed on {name}: {e}", exit_code=1)
+                    for k in labels}
+
+        items = parse_batch_output(result.stdout or "", labels, boundary, timeouts)
+        if not items:
+            logger.warning(
+                "ssh_batch_unsupported", server=name,
+                exit_status=result.exit_status, stderr=(result.stderr or "")[:200],
+            )
+            return await self.run_many(server_info, commands, timeout=timeout)
+
+        limits = dict(zip(labels, timeouts))
+        for k, item in items.items():
+            if item.timed_out:
+                self.latency.record_timeout(name, commands[k], limits[k], timeout)
+            elif item.elapsed_ms is not None:
+                self.latency.record(name, commands[k], item.elapsed_ms / 1000)
+
+        slowest = max(items.values(), key=lambda it: it.elapsed_ms or 0)
+        logger.debug(
+            "ssh_batch_done", server=name, commands=len(labels),
+            slowest=slowest.label, slowest_ms=slowest.elapsed_ms,
+        )
+        return {
+            k: items[k].to_tool_result(limits[k]) if k in items
+            else ToolResult(error="No result from batched exec", exit_code=1)
+            for k in labels
+        }
+
+    async def _run_brokered(
+        self, op: str, server_info: ServerInfo, commands: dict[str, str], timeout: float,
+    ) -> dict[str, ToolResult] | None:
+        """Run a multi-command op through the broker; None means run locally."""
+        broker = self._get_broker()
+        if broker is None or not commands:
+            return None
+        results = await broker.run_many(
+            op, server_info, commands, timeout, wait=self._broker_wait(timeout),
+        )
+        if results is not None:
+            self._stats.brokered += 1
+        return results
+
     async def close_all(self) -> None:
-        """Close all pooled connections."""
+        """Close all pooled connections and stop background maintenance."""
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._maintenance_task = None
+        if self._broker is not None:
+            await self._broker.close()
+            self._broker = None
         for name, conn in list(self._connections.items()):
             try:
                 conn.close()
@@ -219,9 +1270,105 @@ class SSHPool:
             except Exception:
                 pass
         self._connections.clear()
+        self.latency.save()
         logger.debug("ssh_pool_closed")
 
     @property
     def active_connections(self) -> list[str]:
         """List of server names with active connections."""
         return list(self._connections.keys())
+
+    def stats(self) -> dict[str, Any]:
+        """Pool counters plus current connection and channel state."""
+        return {
+            **asdict(self._stats),
+            "coalesced": self._flights.coalesced,
+            "active": len(self._connections),
+            "max_connections": self.max_connections,
+            "channels": self.channel_stats(),
+            "unreachable": sorted(self.unreachable()),
+        }
+
+    def unreachable(self) -> dict[str, str]:
+        """Hosts whose circuit breaker is open, with the reason they are down."""
+        return {
+            name: breaker.describe(name)
+            for name, breaker in self._breakers.items()
+            if breaker.state is not BreakerState.CLOSED
+        }
+
+    def channel_stats(self) -> dict[str, dict[str, int]]:
+        """Per-server channel limiter state: limit, in_use, queued."""
+        return {
+            name: {"limit": lim.limit, "in_use": lim.in_use, "queued": lim.queued}
+            for name, lim in self._limiters.items()
+        }
+
+
+# ── Process-wide pool ────────────────────────────────────────────
+
+_ssh_pool: SSHPool | None = None
+_ssh_pool_loop: asyncio.AbstractEventLoop | None = None
+_pool_settings: dict[str, Any] = {}
+
+
+def configure_ssh_pool(
+    *,
+    idle_ttl: float | None = None,
+    max_connections: int | None = None,
+    health_interval: float | None = None,
+    breaker_threshold: int | None = None,
+    breaker_cooldown: float | None = None,
+    broker_socket: str | None = None,
+) -> None:
+    """Set lifecycle limits for the process-wide pool (e.g. from AgentConfig).
+
+    Applies to the existing pool immediately and to any pool created later.
+    ``broker_socket=""`` turns brokering off (the daemon is the broker).
+    """
+    updates = {
+        "idle_ttl": idle_ttl,
+        "max_connections": max_connections,
+        "health_interval": health_interval,
+        "breaker_threshold": breaker_threshold,
+        "breaker_cooldown": breaker_cooldown,
+        "broker_socket": broker_socket,
+    }
+    _pool_settings.update({k: v for k, v in updates.items() if v is not None})
+    if _ssh_pool is not None:
+        for key, value in _pool_settings.items():
+            setattr(_ssh_pool, key, value)
+
+
+def get_ssh_pool() -> SSHPool:
+    """Get or create the process-wide SSH connection pool.
+
+    Connections are bound to the event loop that opened them. If the
+    pool was created under a loop that is no longer running (e.g. a
+    previous ``asyncio.run()``), it is discarded and a fresh one built.
+    """
+    global _ssh_pool, _ssh_pool_loop
+    try:
+        loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _ssh_pool is not None and (loop is None or _ssh_pool_loop in (None, loop)):
+        if _ssh_pool_loop is None:
+            _ssh_pool_loop = loop
+        return _ssh_pool
+
+    if _ssh_pool is not None:
+        logger.debug("ssh_pool_loop_changed", dropped=_ssh_pool.active_connections)
+    _ssh_pool = SSHPool(**_pool_settings, latency=get_latency_tracker())
+    _ssh_pool_loop = loop
+    return _ssh_pool
+
+
+async def close_ssh_pool() -> None:
+    """Close the process-wide SSH pool. Call at process/session end."""
+    global _ssh_pool, _ssh_pool_loop
+    if _ssh_pool is not None:
+        await _ssh_pool.close_all()
+    _ssh_pool = None
+    _ssh_pool_loop = None
@@ -0,0 +1,276 @@
+"""Streaming command output with byte and line budgets.
+
+``SSHPool.run`` buffers a command's whole stdout before returning, so
+``tail -n 5000`` on a busy access log or ``docker logs`` on a chatty
+container pulls megabytes that are mostly thrown away later. A
+``CommandStream`` yields stdout line by line as it arrives and stops —
+closing the channel or killing the process — as soon as its budget is
+used up, so memory stays flat however large the log is.
+
+Usage::
+
+    async with get_ssh_pool().run_stream(server_info, "tail -n 5000 log") as stream:
+        async for line in stream:
+            stats.add(line)
+    result = stream.result(stats.report())
+
+Tail-style sources (``tail -n``, ``docker logs --tail``, ``dmesg``,
+``journalctl -n``) print their newest lines last, so cutting them at the
+budget would drop exactly the lines that matter. With ``tail=True`` the
+remote side keeps the last ``max_bytes + 1`` bytes instead of the first
+and the stream keeps a rolling window of the newest lines, yielding it
+once the command has finished.
+
+``SSHPool.run_stream`` returns the remote implementation;
+``docker_tools._stream_on_server`` picks local or remote by server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from agent.tools.base import ToolResult
+
+# Default budgets. Far above what a tool should hand to the model,
+# but low enough that a runaway log can't exhaust bastion memory.
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_MAX_LINES = 20_000
+
+# stderr is kept for error reporting only; anything beyond this is dropped.
+_MAX_STDERR_BYTES = 64 * 1024
+
+
+def cap_output_command(command: str, max_bytes: int, *, tail: bool = False) -> str:
+    """Wrap a shell command so the remote side sends at most ``max_bytes + 1``.
+
+    The extra byte lets the reader tell "exactly at budget" from
+    "truncated". The command's own exit status is preserved (``head``
+    would otherwise mask it); a command killed by SIGPIPE once the cap
+    is hit exits 141 as usual. With ``tail`` the last bytes are kept
+    instead of the first (and nothing is sent until the command exits).
+    """
+    cap = "tail" if tail else "head"
+    return (
+        f"exec 4>&1; rc=$( {{ {{ ( {command}\n); echo $? >&3; }} "
+        f"| {cap} -c {max_bytes + 1} >&4; }} 3>&1 ); "
+        f"exec 4>&-; exit ${{rc:-141}}"
+    )
+
+
+async def drain_stderr(reader: Any, limit: int = _MAX_STDERR_BYTES) -> str:
+    """Read a stderr stream to EOF, keeping at most ``limit`` characters.
+
+    Reading it concurrently keeps a noisy stderr from stalling the
+    channel while stdout is being consumed.
+    """
+    kept: list[str] = []
+    size = 0
+    while True:
+        chunk = await reader.read(8192)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8", errors="replace")
+        if size < limit:
+            kept.append(chunk[: limit - size])
+            size += len(kept[-1])
+    return "".join(kept)
+
+
+class CommandStream(ABC):
+    """A running command's stdout, yielded line by line within a budget.
+
+    Iterate with ``async for line in stream`` (lines have no trailing
+    newline). Iteration stops when the command exits, when
+    ``max_bytes`` or ``max_lines`` would be exceeded (``truncated`` is
+    set) or when ``timeout`` passes (``timed_out`` is set); in the last
+    two cases the command is closed so it stops producing output.
+    With ``tail`` the oldest lines are dropped instead: the newest ones
+    within budget are yielded after the command ends (or times out).
+
+    Use ``async with`` so the channel is released even when the
+    consumer stops early. After iteration, ``exit_status`` and
+    ``stderr`` describe how the command ended and ``error`` is set if
+    it could not be started. Subclasses implement the transport hooks.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        *,
+        timeout: float = 30,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_lines: int = DEFAULT_MAX_LINES,
+        tail: bool = False,
+    ) -> None:
+        self.command = command
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.tail = tail
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.truncated = False
+        self.timed_out = False
+        self.exit_status: int | None = None
+        self.stderr = ""
+        self.error = ""
+        self._started = False
+        self._closed = False
+
+    # ── Transport hooks ──────────────────────────────────────────
+
+    @abstractmethod
+    async def _open(self) -> None:
+        """Start the command. Set ``self.error`` instead of raising."""
+
+    @abstractmethod
+    async def _readline(self) -> str:
+        """Next stdout line including its newline, or "" at EOF."""
+
+    @abstractmethod
+    async def _wait(self) -> None:
+        """After EOF: set ``exit_status`` and ``stderr``."""
+
+    async def _close(self, abort: bool) -> None:
+        """Release the channel/process; ``abort`` if it may still be running."""
+
+    # ── Public API ───────────────────────────────────────────────
+
+    async def __aenter__(self) -> CommandStream:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._lines()
+
+    async def _lines(self) -> AsyncIterator[str]:
+        if self._started:
+            raise RuntimeError("CommandStream can only be iterated once")
+        self._started = True
+        deadline = time.monotonic() + self.timeout
+        try:
+            await asyncio.wait_for(self._open(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out = True
+        if self.error or self.timed_out:
+            await self.aclose()
+            return
+        # Newest lines and their sizes (tail mode)
+        window: deque[tuple[str, int]] = deque()
+        try:
+            try:
+                while True:
+                    line = await asyncio.wait_for(
+                        self._readline(), timeout=max(0.0, deadline - time.monotonic()),
+                    )
+                    if not line:
+                        break
+                    size = len(line.encode("utf-8", errors="replace"))
+                    if self.tail:
+                        self._keep_newest(window, line, size)
+                        continue
+                    if self.bytes_read + size > self.max_bytes or self.lines_read >= self.max_lines:
+                        self.truncated = True
+                        break
+                    self.bytes_read += size
+                    self.lines_read += 1
+                    yield line.rstrip("\r\n")
+                if self.tail or not self.truncated:
+                    await asyncio.wait_for(
+                        self._wait(), timeout=max(0.1, deadline - time.monotonic()),
+                    )
+            except asyncio.TimeoutError:
+                self.timed_out = True
+            for line, _size in window:
+                yield line.rstrip("\r\n")
+        finally:
+            await self.aclose()
+
+    def _keep_newest(self, window: deque[tuple[str, int]], line: str, size: int) -> None:
+        """Add a line to the tail window, dropping the oldest beyond budget."""
+        window.append((line, size))
+        self.bytes_read += size
+        self.lines_read += 1
+        while window and (self.bytes_read > self.max_bytes or self.lines_read > self.max_lines):
+            # When the remote cap cut the output, this also drops the
+            # partial first line
+            _, dropped = window.popleft()
+            self.bytes_read -= dropped
+            self.lines_read -= 1
+            self.truncated = True
+
+    async def aclose(self) -> None:
+        """Close the channel/process (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._started and not self.error:
+            await self._close(abort=self.exit_status is None)
+
+    def result(self, output: str | None = None) -> ToolResult:
+        """Build a ToolResult once the stream has been consumed.
+
+        Args:
+            output: Rendered output (e.g. a parser's report). Defaults
+                to nothing; ``collect()`` passes the raw lines.
+
+        Returns:
+            ToolResult with a truncation note appended when the budget
+            was hit, or the start/timeout error.
+        """
+        if self.error:
+            return ToolResult(error=self.error, exit_code=1)
+        text = output or ""
+        if self.truncated and self.tail:
+            text = (
+                f"... (earlier output dropped; last {self.lines_read} lines, "
+                f"{self.bytes_read} bytes) ...\n\n" + text
+            )
+        elif self.truncated:
+            text += (
+                f"\n\n... (output truncated after {self.lines_read} lines, "
+                f"{self.bytes_read} bytes) ..."
+            )
+        if self.timed_out:
+            return ToolResult(
+                output=text, error=f"Command timed out after {self.timeout}s", exit_code=1,
+            )
+        return ToolResult(
+            output=text,
+            error=self.stderr.rstrip(),
+            exit_code=0 if self.truncated and not self.tail else (self.exit_status or 0),
+        )
+
+    async def collect(self) -> ToolResult:
+        """Read the stream (within budget) into a ToolResult."""
+        async with self:
+            lines = [line async for line in self]
+        return self.result("\n".join(lines).rstrip())
+
+    @classmethod
+    def failed(cls, error: str) -> CommandStream:
+        """A stream that yields nothing and reports ``error``."""
+        return _FailedStream(error)
+
+
+class _FailedStream(CommandStream):
+    def __init__(self, error: str) -> None:
+        super().__init__("")
+        self.error = error
+
+    async def _open(self) -> None:
+        return None
+
+    async def _readline(self) -> str:
+        return ""
+
+    async def _wait(self) -> None:
+        return None
@@ -6,12 +6,11 @@ programmatically from validated service names.
 
 from __future__ import annotations
 
-import asyncio
-import shlex
 from typing import Any
 
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
+from agent.tools.docker_tools import _run_on_server
 
 
 class ServiceStatus(BaseTool):
@@ -24,6 +23,10 @@ class ServiceStatus(BaseTool):
     def name(self) -> str:
         return "service_status"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 15
+
     @property
     def description(self) -> str:
         return "Check systemd service status on a server."
@@ -104,38 +107,3 @@ class ServiceJournal(BaseTool):
             command += f" --since '{since}'"
 
         return await _run_on_server(self._inventory, server, command)
-
-
-async def _run_on_server(inventory: Inventory, server: str, command: str) -> ToolResult:
-    """Run a command locally or remotely depending on the server."""
-    try:
-        server_info = inventory.get_server(server)
-    except KeyError as e:
-        return ToolResult(error=str(e), exit_code=1)
-
-    if server == "localhost" or not server_info.definition.ssh:
-        return await _run_local(command)
-
-    from agent.tools.remote import run_remote_command
-    return await run_remote_command(server_info, command)
-
-
-async def _run_local(command: str) -> ToolResult:
-    """Run a command locally using subprocess."""
-    args = shlex.split(command)
-
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            *args,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-    except FileNotFoundError:
-        return ToolResult(error=f"Command not found: {args[0]}", exit_code=127)
-
-    return ToolResult(
-        output=stdout.decode("utf-8", errors="replace").rstrip(),
-        error=stderr.decode("utf-8", errors="replace").rstrip(),
-        exit_code=proc.returncode or 0,
-    )
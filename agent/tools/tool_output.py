@@ -0,0 +1,320 @@
+"""Store for full tool outputs too large to send back to the model.
+
+A tool result longer than the history limit used to be cut down to its
+first and last 1000 characters, and when the part the model needed was
+in the middle it re-ran the command. Now the full output is kept here
+under a short handle; the model gets a head/tail preview plus the
+handle, and ``read_tool_output`` pages through the stored text (line
+range, byte range or grep) without another SSH round trip.
+
+Outputs live in an LRU-bounded in-memory store; evicted ones spill to
+files in the state directory, which is bounded as well (oldest first).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agent.tools.base import BaseTool, ToolResult, model_view
+
+logger = structlog.get_logger()
+
+_STATE_DIR = Path(os.environ.get("BASTION_STATE_DIR", "./state"))
+OUTPUT_DIR = _STATE_DIR / "tool_outputs"
+
+_MEMORY_BYTES = 64 * 1024 * 1024
+_DISK_BYTES = 256 * 1024 * 1024
+
+_HANDLE_RE = re.compile(r"^out-[0-9a-f]{10}$")
+
+# Lines of a stored output shown to the model up front
+_PREVIEW_HEAD = 15
+_PREVIEW_TAIL = 15
+
+# read_tool_output replies stay under this so they are never stored again
+MAX_READ_CHARS = 6000
+
+
+class OutputStore:
+    """Full tool outputs by handle: LRU in memory, spilled to disk."""
+
+    def __init__(
+        self,
+        *,
+        path: Path | None = None,
+        memory_bytes: int = _MEMORY_BYTES,
+        disk_bytes: int = _DISK_BYTES,
+    ) -> None:
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_used = 0
+
+    def put(self, text: str) -> str:
+        """Store ``text`` and return its handle."""
+        handle = f"out-{uuid.uuid4().hex[:10]}"
+        self._remember(handle, text)
+        return handle
+
+    def get(self, handle: str) -> str | None:
+        """The stored text, or None if the handle is unknown or evicted."""
+        text = self._memory.get(handle)
+        if text is not None:
+            self._memory.move_to_end(handle)
+            return text
+        if self.path is None or not _HANDLE_RE.match(handle):
+            return None
+        try:
+            text = (self.path / f"{handle}.txt").read_text()
+        except OSError:
+            return None
+        self._remember(handle, text)
+        return text
+
+    def _remember(self, handle: str, text: str) -> None:
+        self._memory[handle] = text
+        self._memory_used += len(text.encode())
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            old, old_text = self._memory.popitem(last=False)
+            self._memory_used -= len(old_text.encode())
+            self._spill(old, old_text)
+
+    def _spill(self, handle: str, text: str) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            (self.path / f"{handle}.txt").write_text(text)
+            self._trim_disk()
+        except OSError as e:
+            logger.warning("tool_output_spill_failed", path=str(self.path), error=str(e))
+
+    def _trim_disk(self) -> None:
+        files = sorted(self.path.glob("out-*.txt"), key=lambda p: p.stat().st_mtime)
+        used = sum(p.stat().st_size for p in files)
+        for old in files:
+            if used <= self.disk_bytes:
+                break
+            used -= old.stat().st_size
+            old.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        """Entries and bytes held in memory."""
+        return {"entries": len(self._memory), "bytes": self._memory_used}
+
+
+def preview(text: str, max_chars: int) -> str:
+    """First and last lines of ``text``, within ``max_chars``."""
+    lines = text.splitlines()
+    if len(lines) > _PREVIEW_HEAD + _PREVIEW_TAIL:
+        omitted = len(lines) - _PREVIEW_HEAD - _PREVIEW_TAIL
+        lines = (
+            lines[:_PREVIEW_HEAD]
+            + [f"... ({omitted} lines omitted) ..."]
+            + lines[-_PREVIEW_TAIL:]
+        )
+    shown = "\n".join(lines)
+    if len(shown) > max_chars:
+        half = max_chars // 2
+        shown = shown[:half] + "\n...\n" + shown[-half:]
+    return shown
+
+
+def offload(
+    result: dict[str, Any], max_chars: int, *, compact: bool = False,
+) -> dict[str, Any]:
+    """Model-facing version of a large result, with the full text stored.
+
+    With ``compact``, a result carrying a ``data`` payload is previewed
+    and stored as its compact view (``model_view``) instead of the
+    formatted report, one entry per line (``data.issues[3] {...}``) so
+    read_tool_output can page and grep through it.
+
+    Returns:
+        The result with ``output`` replaced by a preview and a
+        ``full_output`` entry naming the handle, line and byte counts.
+    """
+    if compact and "data" in result:
+        view = model_view(result)
+        result = {"output": _view_lines(view), "exit_code": view.get("exit_code", 0)}
+    text = result.get("output", "") or ""
+    error = result.get("error", "")
+    if error:
+        text = f"{text}\n--- stderr ---\n{error}" if text else error
+    handle = _store.put(text)
+    slimmed: dict[str, Any] = {
+        "output": preview(result.get("output", "") or "", max_chars // 2),
+        "exit_code": result.get("exit_code", 0),
+        "full_output": {
+            "handle": handle,
+            "lines": text.count("\n") + 1,
+            "bytes": len(text.encode()),
+            "hint": "Call read_tool_output with this handle to read lines, "
+            "a byte range or grep matches.",
+        },
+    }
+    if error:
+        slimmed["error"] = preview(error, max_chars // 4)
+    return slimmed
+
+
+def _view_lines(view: dict[str, Any]) -> str:
+    """A compact view as one ``path json`` line per entry of its lists."""
+    lines: list[str] = []
+
+    def add(path: str, value: Any) -> None:
+        if isinstance(value, dict) and path == "data":
+            for key, item in value.items():
+                add(f"{path}.{key}", item)
+        elif isinstance(value, list) and path.startswith("data."):
+            lines.extend(
+                f"{path}[{i}] {json.dumps(item, separators=(',', ':'), ensure_ascii=False)}"
+                for i, item in enumerate(value)
+            )
+        else:
+            lines.append(f"{path} {json.dumps(value, separators=(',', ':'), ensure_ascii=False)}")
+
+    for key, value in view.items():
+        add(key, value)
+    return "\n".join(lines)
+
+
+# ── Process-wide store ───────────────────────────────────────────
+
+_store = OutputStore()
+
+
+def get_output_store() -> OutputStore:
+    """The process-wide store used by the conversation loop."""
+    return _store
+
+
+def configure_output_store(
+    *,
+    path: Path | None = OUTPUT_DIR,
+    memory_bytes: int = _MEMORY_BYTES,
+    disk_bytes: int = _DISK_BYTES,
+) -> OutputStore:
+    """Set the spill directory and size limits of the process-wide store."""
+    _store.path = path
+    _store.memory_bytes = memory_bytes
+    _store.disk_bytes = disk_bytes
+    return _store
+
+
+class ReadToolOutput(BaseTool):
+    """Read part of a stored tool output."""
+
+    @property
+    def name(self) -> str:
+        return "read_tool_output"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Read more of a large tool output that was shortened to a preview. "
+            "Pass the handle from its full_output field plus one of: lines "
+            "(e.g. '200-400'), offset/length in bytes, or pattern (regex, "
+            "returns matching lines with line numbers). No commands are re-run."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "properties": {
+                "handle": {"type": "string", "description": "Handle such as out-3f2a1c9b0d."},
+                "lines": {
+                    "type": "string",
+                    "description": "1-based inclusive line range 'start-end' or a single line.",
+                },
+                "offset": {"type": "integer", "description": "Byte offset to start at."},
+                "length": {"type": "integer", "description": "Bytes to read from offset."},
+                "pattern": {
+                    "type": "string",
+                    "description": "Regular expression (case-insensitive) to grep for.",
+                },
+                "context": {
+                    "type": "integer",
+                    "description": "Lines of context around grep matches (default 0).",
+                },
+            },
+            "required": ["handle"],
+        }
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        """Return the requested slice of the stored output."""
+        handle = kwargs.get("handle", "")
+        text = _store.get(handle)
+        if text is None:
+            return ToolResult(
+                error=f"No stored output {handle!r} (it may have been evicted). "
+                "Re-run the original tool.",
+                exit_code=1,
+            )
+
+        if kwargs.get("pattern"):
+            return _grep(text, kwargs["pattern"], int(kwargs.get("context") or 0))
+        if kwargs.get("lines"):
+            return _line_range(text, str(kwargs["lines"]))
+        offset = max(0, int(kwargs.get("offset") or 0))
+        length = int(kwargs.get("length") or MAX_READ_CHARS)
+        data = text.encode()
+        chunk = data[offset:offset + min(length, MAX_READ_CHARS)].decode(errors="replace")
+        end = offset + len(chunk.encode())
+        return ToolResult(output=f"[bytes {offset}-{end} of {len(data)}]\n{chunk}")
+
+
+def _clip(output: str) -> str:
+    if len(output) <= MAX_READ_CHARS:
+        return output
+    return output[:MAX_READ_CHARS] + "\n... (reply cut; request a narrower range)"
+
+
+def _line_range(text: str, spec: str) -> ToolResult:
+    lines = text.splitlines()
+    try:
+        if "-" in spec:
+            start_s, end_s = spec.split("-", 1)
+            start, end = int(start_s), int(end_s)
+        else:
+            start = end = int(spec)
+    except ValueError:
+        return ToolResult(error=f"Invalid line range {spec!r}; use 'start-end'.", exit_code=1)
+    start = max(1, start)
+    end = min(len(lines), end)
+    if start > end:
+        return ToolResult(error=f"Line range {spec!r} is outside 1-{len(lines)}.", exit_code=1)
+    body = "\n".join(lines[start - 1:end])
+    return ToolResult(output=_clip(f"[lines {start}-{end} of {len(lines)}]\n{body}"))
+
+
+def _grep(text: str, pattern: str, context: int) -> ToolResult:
+    try:
+        regex = re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        return ToolResult(error=f"Invalid pattern: {e}", exit_code=1)
+    lines = text.splitlines()
+    hits = [i for i, line in enumerate(lines) if regex.search(line)]
+    if not hits:
+        return ToolResult(output=f"No lines match {pattern!r} ({len(lines)} lines searched).")
+    context = max(0, min(context, 10))
+    shown: list[str] = []
+    last = -1
+    for i in hits:
+        lo, hi = max(0, i - context), min(len(lines), i + context + 1)
+        if lo > last + 1 and shown:
+            shown.append("--")
+        for j in range(max(lo, last + 1), hi):
+            shown.append(f"{j + 1}: {lines[j]}")
+        last = hi - 1
+    header = f"[{len(hits)} matching lines of {len(lines)}]"
+    return ToolResult(output=_clip(header + "\n" + "\n".join(shown)))
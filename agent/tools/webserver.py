@@ -8,11 +8,13 @@ server — not cPanel-specific.
 from __future__ import annotations
 
 import re
+from collections import deque
 from typing import Any
 
+from agent.host_facts import first_existing
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
-from agent.tools.docker_tools import _run_on_server
+from agent.tools.docker_tools import _run_on_server, _stream_on_server
 
 
 class SSLCertCheck(BaseTool):
@@ -25,6 +27,10 @@ class SSLCertCheck(BaseTool):
     def name(self) -> str:
         return "ssl_cert_check"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 300
+
     @property
     def description(self) -> str:
         return "Check SSL certificate for a domain: issuer, expiry, SANs, chain validity."
@@ -166,31 +172,30 @@ class WebErrorLog(BaseTool):
             path = log_path
         else:
             # Check which exists
-            for candidate in [
+            path = await first_existing(self._inventory, server, [
                 "/var/log/apache2/error_log",
                 "/etc/httpd/logs/error_log",
                 "/var/log/httpd/error_log",
                 "/usr/local/apache/logs/error_log",
                 "/var/log/nginx/error.log",
-            ]:
-                check = await _run_on_server(
-                    self._inventory, server, f"test -f {candidate}"
-                )
-                if check.exit_code == 0:
-                    path = candidate
-                    break
-            else:
+            ])
+            if path is None:
                 return ToolResult(
                     error="Could not find error log. Specify log_path.",
                     exit_code=1,
                 )
 
-        cmd = f"tail -n {lines} {path}"
-        result = await _run_on_server(self._inventory, server, cmd)
+        summary = _ErrorLogSummary(domain)
+        async with _stream_on_server(
+            self._inventory, server, f"tail -n {lines} {path}", tail=True,
+        ) as stream:
+            async for line in stream:
+                summary.add(line)
+        result = stream.result()
         if not result.success:
             return result
 
-        return ToolResult(output=_summarize_errors(result.output, domain))
+        return stream.result(summary.report())
 
 
 class DNSCheck(BaseTool):
@@ -203,6 +208,10 @@ class DNSCheck(BaseTool):
     def name(self) -> str:
         return "dns_check"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 60
+
     @property
     def description(self) -> str:
         return "Check DNS records (A, MX, NS, TXT/SPF) for a domain."
@@ -317,22 +326,25 @@ class AccessLogAnalysis(BaseTool):
                 "/usr/local/apache/logs/access_log",
                 "/var/log/nginx/access.log",
             ])
-            for candidate in candidates:
-                check = await _run_on_server(self._inventory, server, f"test -f {candidate}")
-                if check.exit_code == 0:
-                    path = candidate
-                    break
-            else:
+            path = await first_existing(self._inventory, server, candidates)
+            if path is None:
                 return ToolResult(error="Access log not found. Specify log_path.", exit_code=1)
 
         # Get top IPs, status codes, and request counts in one pass
         # using awk for efficiency on large logs
-        cmd = f"tail -n {lines} {path}"
-        result = await _run_on_server(self._inventory, server, cmd)
+        # Parsed incrementally as lines arrive, so memory stays flat
+        # however many lines are requested.
+        stats = _AccessLogStats()
+        async with _stream_on_server(
+            self._inventory, server, f"tail -n {lines} {path}", tail=True,
+        ) as stream:
+            async for line in stream:
+                stats.add(line)
+        result = stream.result()
         if not result.success:
             return result
 
-        return ToolResult(output=_analyze_access_log(result.output))
+        return stream.result(stats.report())
 
 
 class ModSecurityLog(BaseTool):
@@ -375,17 +387,13 @@ class ModSecurityLog(BaseTool):
     ) -> ToolResult:
         """Parse ModSecurity entries from error log."""
         # Try common error log paths
-        for candidate in [
+        path = await first_existing(self._inventory, server, [
             "/var/log/apache2/error_log",
             "/etc/httpd/logs/error_log",
             "/var/log/httpd/error_log",
             "/usr/local/apache/logs/error_log",
-        ]:
-            check = await _run_on_server(self._inventory, server, f"test -f {candidate}")
-            if check.exit_code == 0:
-                path = candidate
-                break
-        else:
+        ])
+        if path is None:
             return ToolResult(error="Error log not found.", exit_code=1)
 
         cmd = f"tail -n {lines} {path}"
@@ -399,93 +407,107 @@ class ModSecurityLog(BaseTool):
 # ── Helpers ──────────────────────────────────────────────────────
 
 
-def _analyze_access_log(log_text: str) -> str:
-    """Analyze access log and produce forensics report."""
-    lines = log_text.strip().splitlines()
-    if not lines:
-        return "No log entries to analyze."
+# Combined Log Format:
+# IP ident user [date] "METHOD URI PROTO" STATUS SIZE "referer" "UA"
+# The quoted request makes naive split() unreliable for field positions.
+# Use regex to extract key fields reliably.
+_ACCESS_LOG_RE = re.compile(
+    r'^(\S+)'                    # IP
+    r'\s+\S+\s+\S+'             # ident, user
+    r'\s+\[[^\]]+\]'            # [date]
+    r'\s+"(?:\S+)\s+(\S+)'      # "METHOD URI
+    r'[^"]*"'                   # rest of request line"
+    r'\s+(\d{3})'              # STATUS
+)
 
-    ip_counts: dict[str, int] = {}
-    status_counts: dict[str, int] = {}
-    uri_counts: dict[str, int] = {}
-    total = 0
-
-    # Combined Log Format:
-    # IP ident user [date] "METHOD URI PROTO" STATUS SIZE "referer" "UA"
-    # The quoted request makes naive split() unreliable for field positions.
-    # Use regex to extract key fields reliably.
-    log_pattern = re.compile(
-        r'^(\S+)'                    # IP
-        r'\s+\S+\s+\S+'             # ident, user
-        r'\s+\[[^\]]+\]'            # [date]
-        r'\s+"(?:\S+)\s+(\S+)'      # "METHOD URI
-        r'[^"]*"'                   # rest of request line"
-        r'\s+(\d{3})'              # STATUS
-    )
-
-    for line in lines:
-        total += 1
-        m = log_pattern.match(line)
-        if not m:
-            continue
 
-        ip, uri, status = m.group(1), m.group(2), m.group(3)
-        ip_counts[ip] = ip_counts.get(ip, 0) + 1
-        status_counts[status] = status_counts.get(status, 0) + 1
-        uri_counts[uri] = uri_counts.get(uri, 0) + 1
-
-    report: list[str] = [f"Analyzed {total} requests:\n"]
-
-    # Top IPs
-    top_ips = sorted(ip_counts.items(), key=lambda x: -x[1])[:15]
-    report.append("**Top IPs by request count:**")
-    for ip, count in top_ips:
-        pct = (count / total) * 100
-        flag = " ⚠" if count > total * 0.2 else ""
-        report.append(f"  {count:>6} ({pct:4.1f}%) {ip}{flag}")
-
-    # Status code breakdown
-    report.append("\n**HTTP Status Codes:**")
-    for code in sorted(status_counts.keys()):
-        count = status_counts[code]
-        pct = (count / total) * 100
-        icon = ""
-        if code.startswith("4"):
-            icon = " ⚠" if count > 100 else ""
-        elif code.startswith("5"):
-            icon = " ✗"
-        report.append(f"  {code}: {count:>6} ({pct:4.1f}%){icon}")
-
-    # Most requested URIs (potential scanning)
-    top_uris = sorted(uri_counts.items(), key=lambda x: -x[1])[:10]
-    suspicious_uris = [
-        u for u, c in top_uris
-        if any(kw in u.lower() for kw in (
-            "wp-login", "xmlrpc", ".env", "wp-admin/admin-ajax",
-            "phpmyadmin", "/.git", "/config", "eval-stdin",
-            "wp-cron", "wp-json",
-        ))
-    ]
-    if suspicious_uris:
-        report.append("\n**Frequently targeted URIs:**")
-        for uri in suspicious_uris:
-            report.append(f"  {uri_counts[uri]:>6} {uri}")
-
-    # Detect potential brute force (high wp-login/xmlrpc hits from single IP)
-    login_ips: dict[str, int] = {}
-    for line in lines:
+class _AccessLogStats:
+    """Incremental access log counters — feed lines with ``add()``."""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.ip_counts: dict[str, int] = {}
+        self.status_counts: dict[str, int] = {}
+        self.uri_counts: dict[str, int] = {}
+        self.login_ips: dict[str, int] = {}
+
+    def add(self, line: str) -> None:
+        self.total += 1
+
+        # Potential brute force (high wp-login/xmlrpc hits from single IP)
         if "wp-login" in line or "xmlrpc" in line:
             parts = line.split()
             ip = parts[0] if parts else ""
             if ip and re.match(r'\d+\.\d+\.\d+\.\d+', ip):
-                login_ips[ip] = login_ips.get(ip, 0) + 1
-    brute_force = [(ip, c) for ip, c in login_ips.items() if c > 20]
-    if brute_force:
-        report.append("\n**⚠ Potential brute force attempts:**")
-        for ip, count in sorted(brute_force, key=lambda x: -x[1])[:5]:
-            report.append(f"  {ip}: {count} login/xmlrpc requests")
+                self.login_ips[ip] = self.login_ips.get(ip, 0) + 1
 
-    return "\n".join(report)
+        m = _ACCESS_LOG_RE.match(line)
+        if not m:
+            return
+
+        ip, uri, status = m.group(1), m.group(2), m.group(3)
+        self.ip_counts[ip] = self.ip_counts.get(ip, 0) + 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.uri_counts[uri] = self.uri_counts.get(uri, 0) + 1
+
+    def report(self) -> str:
+        """Produce the forensics report."""
+        total = self.total
+        if not total:
+            return "No log entries to analyze."
+
+        report: list[str] = [f"Analyzed {total} requests:\n"]
+
+        # Top IPs
+        top_ips = sorted(self.ip_counts.items(), key=lambda x: -x[1])[:15]
+        report.append("**Top IPs by request count:**")
+        for ip, count in top_ips:
+            pct = (count / total) * 100
+            flag = " ⚠" if count > total * 0.2 else ""
+            report.append(f"  {count:>6} ({pct:4.1f}%) {ip}{flag}")
+
+        # Status code breakdown
+        report.append("\n**HTTP Status Codes:**")
+        for code in sorted(self.status_counts.keys()):
+            count = self.status_counts[code]
+            pct = (count / total) * 100
+            icon = ""
+            if code.startswith("4"):
+                icon = " ⚠" if count > 100 else ""
+            elif code.startswith("5"):
+                icon = " ✗"
+            report.append(f"  {code}: {count:>6} ({pct:4.1f}%){icon}")
+
+        # Most requested URIs (potential scanning)
+        top_uris = sorted(self.uri_counts.items(), key=lambda x: -x[1])[:10]
+        suspicious_uris = [
+            u for u, c in top_uris
+            if any(kw in u.lower() for kw in (
+                "wp-login", "xmlrpc", ".env", "wp-admin/admin-ajax",
+                "phpmyadmin", "/.git", "/config", "eval-stdin",
+                "wp-cron", "wp-json",
+            ))
+        ]
+        if suspicious_uris:
+            report.append("\n**Frequently targeted URIs:**")
+            for uri in suspicious_uris:
+                report.append(f"  {self.uri_counts[uri]:>6} {uri}")
+
+        brute_force = [(ip, c) for ip, c in self.login_ips.items() if c > 20]
+        if brute_force:
+            report.append("\n**⚠ Potential brute force attempts:**")
+            for ip, count in sorted(brute_force, key=lambda x: -x[1])[:5]:
+                report.append(f"  {ip}: {count} login/xmlrpc requests")
+
+        return "\n".join(report)
+
+
+def _analyze_access_log(log_text: str) -> str:
+    """Analyze access log and produce forensics report."""
+    stats = _AccessLogStats()
+    for line in log_text.strip().splitlines():
+        stats.add(line)
+    return stats.report()
 
 
 def _analyze_modsec(log_text: str, domain_filter: str | None) -> str:
@@ -555,62 +577,78 @@ def _analyze_modsec(log_text: str, domain_filter: str | None) -> str:
     return "\n".join(report)
 
 
-def _summarize_errors(log_text: str, domain_filter: str | None) -> str:
-    """Group error log lines by type and summarize."""
-    lines = log_text.strip().splitlines()
-
-    if domain_filter:
-        lines = [l for l in lines if domain_filter.lower() in l.lower()]
+class _ErrorLogSummary:
+    """Incremental error log grouping — feed lines with ``add()``."""
 
-    if not lines:
-        return "No errors found in the log."
+    def __init__(self, domain_filter: str | None) -> None:
+        self.domain_filter = domain_filter.lower() if domain_filter else None
+        self.total = 0
+        self.categories: dict[str, int] = {}
+        self.tail: deque[str] = deque(maxlen=20)
 
-    # Count error types
-    categories: dict[str, int] = {}
-    recent: list[str] = []
-
-    for line in lines:
+    def add(self, line: str) -> None:
         lower = line.lower()
+        if self.domain_filter and self.domain_filter not in lower:
+            return
+        self.total += 1
+        self.tail.append(line)
+
         if "php fatal" in lower or "php parse" in lower:
-            categories["PHP Fatal/Parse"] = categories.get("PHP Fatal/Parse", 0) + 1
+            cat = "PHP Fatal/Parse"
         elif "php warning" in lower or "php notice" in lower:
-            categories["PHP Warning/Notice"] = categories.get("PHP Warning/Notice", 0) + 1
+            cat = "PHP Warning/Notice"
         elif "segfault" in lower or "segmentation fault" in lower:
-            categories["Segfault"] = categories.get("Segfault", 0) + 1
+            cat = "Segfault"
         elif "permission denied" in lower:
-            categories["Permission denied"] = categories.get("Permission denied", 0) + 1
+            cat = "Permission denied"
         elif "file not found" in lower or "not exist" in lower:
-            categories["File not found"] = categories.get("File not found", 0) + 1
+            cat = "File not found"
         elif "modsecurity" in lower:
-            categories["ModSecurity"] = categories.get("ModSecurity", 0) + 1
+            cat = "ModSecurity"
         elif "out of memory" in lower:
-            categories["Out of memory"] = categories.get("Out of memory", 0) + 1
+            cat = "Out of memory"
         elif "timeout" in lower or "timed out" in lower:
-            categories["Timeout"] = categories.get("Timeout", 0) + 1
+            cat = "Timeout"
         elif "error" in lower or "crit" in lower:
-            categories["Other errors"] = categories.get("Other errors", 0) + 1
-
-    parts = [f"Analyzed {len(lines)} lines:"]
-
-    if categories:
-        parts.append("")
-        parts.append("**Error Summary:**")
-        for cat, count in sorted(categories.items(), key=lambda x: -x[1]):
-            icon = "✗" if count > 10 else "⚠"
-            parts.append(f"  {icon} {cat}: {count}")
-
-    # Show last 10 actual error lines
-    error_lines = [
-        l for l in lines[-20:]
-        if any(kw in l.lower() for kw in ("error", "fatal", "crit", "segfault", "denied"))
-    ]
-    if error_lines:
-        parts.append("")
-        parts.append("**Recent errors (last few):**")
-        for el in error_lines[-10:]:
-            # Truncate long lines
-            if len(el) > 200:
-                el = el[:200] + "..."
-            parts.append(f"  {el}")
-
-    return "\n".join(parts)
+            cat = "Other errors"
+        else:
+            return
+        self.categories[cat] = self.categories.get(cat, 0) + 1
+
+    def report(self) -> str:
+        """Summarize error types and the most recent error lines."""
+        if not self.total:
+            return "No errors found in the log."
+
+        parts = [f"Analyzed {self.total} lines:"]
+
+        if self.categories:
+            parts.append("")
+            parts.append("**Error Summary:**")
+            for cat, count in sorted(self.categories.items(), key=lambda x: -x[1]):
+                icon = "✗" if count > 10 else "⚠"
+                parts.append(f"  {icon} {cat}: {count}")
+
+        # Show last 10 actual error lines
+        error_lines = [
+            l for l in self.tail
+            if any(kw in l.lower() for kw in ("error", "fatal", "crit", "segfault", "denied"))
+        ]
+        if error_lines:
+            parts.append("")
+            parts.append("**Recent errors (last few):**")
+            for el in error_lines[-10:]:
+                # Truncate long lines
+                if len(el) > 200:
+                    el = el[:200] + "..."
+                parts.append(f"  {el}")
+
+        return "\n".join(parts)
+
+
+def _summarize_errors(log_text: str, domain_filter: str | None) -> str:
+    """Group error log lines by type and summarize."""
+    summary = _ErrorLogSummary(domain_filter)
+    for line in log_text.strip().splitlines():
+        summary.add(line)
+    return summary.report()
@@ -12,12 +12,11 @@ This tool checks for recent changes across the infrastructure:
 
 from __future__ import annotations
 
-import asyncio
 from typing import Any
 
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
-from agent.tools.docker_tools import _run_on_server
+from agent.tools.docker_tools import _run_batch_on_server
 
 
 class WhatChanged(BaseTool):
@@ -57,82 +56,63 @@ class WhatChanged(BaseTool):
 
     async def execute(self, *, server: str, hours: int = 24, **kwargs: Any) -> ToolResult:
         """Check for recent changes."""
-        checks: dict[str, Any] = {
+        checks: dict[str, str] = {
             # Package updates (apt)
-            "apt_history": _run_on_server(
-                self._inventory, server,
+            "apt_history": (
                 f"grep -h 'Upgrade\\|Install\\|Remove' /var/log/apt/history.log "
-                f"/var/log/dpkg.log 2>/dev/null | tail -30",
+                f"/var/log/dpkg.log 2>/dev/null | tail -30"
             ),
             # Package updates (yum/dnf)
-            "yum_history": _run_on_server(
-                self._inventory, server,
+            "yum_history": (
                 "yum history list 2>/dev/null | head -15 || "
-                "dnf history list 2>/dev/null | head -15",
+                "dnf history list 2>/dev/null | head -15"
             ),
             # Recently modified config files
-            "config_changes": _run_on_server(
-                self._inventory, server,
+            "config_changes": (
                 f"find /etc -maxdepth 3 -type f -mmin -{hours * 60} "
                 f"-not -path '*/ssl/*' -not -name '*.dpkg-*' "
-                f"2>/dev/null | head -20",
+                f"2>/dev/null | head -20"
             ),
             # Docker: recently created/updated containers
-            "docker_events": _run_on_server(
-                self._inventory, server,
+            "docker_events": (
                 f"docker events --since {hours}h --until 0s "
                 f"--filter 'type=container' "
                 f"--filter 'event=create' --filter 'event=destroy' "
                 f"--filter 'event=start' --filter 'event=stop' "
                 f"--filter 'event=restart' --filter 'event=die' "
                 f"--format '{{{{.Time}}}} {{{{.Action}}}} {{{{.Actor.Attributes.name}}}}' "
-                f"2>/dev/null | tail -30",
+                f"2>/dev/null | tail -30"
             ),
             # Docker: recently pulled images
-            "docker_images": _run_on_server(
-                self._inventory, server,
+            "docker_images": (
                 f"docker images --format '{{{{.Repository}}}}:{{{{.Tag}}}}  {{{{.CreatedAt}}}}' "
-                f"2>/dev/null | head -15",
+                f"2>/dev/null | head -15"
             ),
             # Service state changes (systemd)
-            "service_changes": _run_on_server(
-                self._inventory, server,
+            "service_changes": (
                 f"journalctl --no-pager -n 50 --since '{hours}h ago' "
                 f"-t systemd 2>/dev/null | "
-                f"grep -i 'start\\|stop\\|restart\\|fail' | tail -20",
+                f"grep -i 'start\\|stop\\|restart\\|fail' | tail -20"
             ),
             # Crontab modifications
-            "cron_changes": _run_on_server(
-                self._inventory, server,
+            "cron_changes": (
                 f"find /etc/cron.d /etc/crontab /var/spool/cron "
-                f"-type f -mmin -{hours * 60} 2>/dev/null",
+                f"-type f -mmin -{hours * 60} 2>/dev/null"
             ),
             # Login history
-            "logins": _run_on_server(
-                self._inventory, server,
-                "last -20 2>/dev/null | head -15",
-            ),
+            "logins": "last -20 2>/dev/null | head -15",
             # Pterodactyl Wings changes
-            "wings_version": _run_on_server(
-                self._inventory, server,
-                "wings version 2>/dev/null",
-            ),
+            "wings_version": "wings version 2>/dev/null",
             # Recently modified files in key directories
-            "pterodactyl_changes": _run_on_server(
-                self._inventory, server,
+            "pterodactyl_changes": (
                 f"find /etc/pterodactyl /srv/pterodactyl -type f "
-                f"-mmin -{hours * 60} 2>/dev/null | head -10",
+                f"-mmin -{hours * 60} 2>/dev/null | head -10"
             ),
             # System reboots
-            "reboots": _run_on_server(
-                self._inventory, server,
-                "last reboot 2>/dev/null | head -5",
-            ),
+            "reboots": "last reboot 2>/dev/null | head -5",
         }
 
-        keys = list(checks.keys())
-        results = await asyncio.gather(*[checks[k] for k in keys])
-        data = dict(zip(keys, results))
+        data = await _run_batch_on_server(self._inventory, server, checks)
 
         return ToolResult(output=_build_changes_report(server, hours, data))
 
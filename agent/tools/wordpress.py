@@ -18,6 +18,7 @@ from typing import Any
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
+from agent.wp_index import wp_installs
 
 
 class WpSites(BaseTool):
@@ -30,9 +31,17 @@ class WpSites(BaseTool):
     def name(self) -> str:
         return "wp_sites"
 
+    @property
+    def cache_ttl(self) -> float:
+        return 120
+
     @property
     def description(self) -> str:
-        return "Find WordPress installations on a cPanel server. Scans /home/*/public_html."
+        return (
+            "Find WordPress installations (path, owner, version) on a cPanel "
+            "server under /home/*/public_html. Served from an incrementally "
+            "updated index; set refresh to force a full rescan."
+        )
 
     @property
     def parameters(self) -> dict[str, Any]:
@@ -42,28 +51,29 @@ class WpSites(BaseTool):
                     "type": "string",
                     "description": "Server name.",
                 },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Rescan every account instead of only changed ones.",
+                    "default": False,
+                },
             },
             "required": ["server"],
         }
 
-    async def execute(self, *, server: str, **kwargs: Any) -> ToolResult:
-        """Find WordPress installs by looking for wp-config.php."""
-        cmd = "find /home/*/public_html -maxdepth 2 -name wp-config.php -type f 2>/dev/null"
-        result = await _run_on_server(self._inventory, server, cmd)
-        if not result.success:
-            return result
+    async def execute(self, *, server: str, refresh: bool = False, **kwargs: Any) -> ToolResult:
+        """List WordPress installs from the install index."""
+        try:
+            installs = await wp_installs(self._inventory, server, refresh=refresh)
+        except (KeyError, RuntimeError) as e:
+            return ToolResult(error=str(e), exit_code=1)
 
-        if not result.output.strip():
+        if not installs:
             return ToolResult(output="No WordPress installations found.")
 
-        paths = result.output.strip().splitlines()
-        lines = [f"Found {len(paths)} WordPress installation(s):"]
-        for path in paths:
-            # Extract username from /home/<user>/public_html/...
-            parts = path.split("/")
-            user = parts[2] if len(parts) > 2 else "?"
-            wp_dir = "/".join(parts[:-1])
-            lines.append(f"  {user}: {wp_dir}")
+        lines = [f"Found {len(installs)} WordPress installation(s):"]
+        for inst in installs:
+            version = f" (WordPress {inst.version})" if inst.version else ""
+            lines.append(f"  {inst.user}: {inst.path}{version}")
 
         return ToolResult(output="\n".join(lines))
 
@@ -12,8 +12,10 @@ import asyncio
 import re
 from typing import Any
 
+from agent.domain_index import resolve_domain
 from agent.inventory import Inventory
-from agent.tools.base import BaseTool, ToolResult
+from agent.tools.base import BaseTool, ToolResult, parse_issue
+from agent.tools.diagnose import _extract_owner
 from agent.tools.docker_tools import _run_on_server
 
 
@@ -42,7 +44,7 @@ class WpDeepPerformance(BaseTool):
             "properties": {
                 "server": {
                     "type": "string",
-                    "description": "Webhost server name.",
+                    "description": "Webhost server name (looked up from the domain if omitted).",
                 },
                 "domain": {
                     "type": "string",
@@ -50,20 +52,59 @@ class WpDeepPerformance(BaseTool):
                 },
                 "path": {
                     "type": "string",
-                    "description": "WordPress install path (e.g. '/home/user/public_html').",
+                    "description": (
+                        "WordPress install path (e.g. '/home/user/public_html'). "
+                        "Defaults to the domain's document root; requires server."
+                    ),
                 },
                 "user": {
                     "type": "string",
-                    "description": "cPanel/system username (for WP-CLI).",
+                    "description": "cPanel/system username for WP-CLI (defaults to the domain's owner).",
                 },
             },
-            "required": ["server", "domain", "path", "user"],
+            "required": ["domain"],
         }
 
     async def execute(
-        self, *, server: str, domain: str, path: str, user: str, **kwargs: Any,
+        self,
+        *,
+        domain: str,
+        server: str | None = None,
+        path: str | None = None,
+        user: str | None = None,
+        **kwargs: Any,
     ) -> ToolResult:
         """Run deep WordPress performance analysis."""
+        if path and not server:
+            # An explicit path is only allowlist-checked against a named server
+            return ToolResult(error="path requires server.", exit_code=1)
+        if not (server and path and user):
+            owner = await resolve_domain(self._inventory, domain)
+            if owner is not None and server in (None, owner.server):
+                server = owner.server
+                path = path or owner.docroot or f"/home/{owner.user}/public_html"
+                user = user or owner.user
+            elif server is None:
+                return ToolResult(
+                    error=f"{domain} is not in the domain index. Specify server.",
+                    exit_code=1,
+                )
+            else:
+                # The index doesn't place the domain on the named server:
+                # trust the operator and ask that server for the owner
+                if not user:
+                    owner_result = await _run_on_server(
+                        self._inventory, server,
+                        f"whmapi1 getdomainowner domain={domain} --output=json",
+                    )
+                    user = _extract_owner(owner_result.output if owner_result.success else "")
+                if not user:
+                    return ToolResult(
+                        error=f"Could not find the cPanel owner of {domain} on {server}. "
+                        "Specify user.",
+                        exit_code=1,
+                    )
+                path = path or f"/home/{user}/public_html"
         wp = f"runuser -u {user} -- wp --path={path}"
 
         checks: dict[str, Any] = {
@@ -176,7 +217,8 @@ class WpDeepPerformance(BaseTool):
         results = await asyncio.gather(*[checks[k] for k in keys])
         data = dict(zip(keys, results))
 
-        return ToolResult(output=_build_wp_report(domain, path, data))
+        report, summary = _build_wp(domain, path, data)
+        return ToolResult(output=report, data=summary)
 
 
 def _v(data: dict[str, ToolResult], key: str) -> str:
@@ -184,10 +226,39 @@ def _v(data: dict[str, ToolResult], key: str) -> str:
     return r.output.strip() if r and r.success else ""
 
 
+def _key_values(text: str) -> dict[str, str]:
+    """Parse ``key:value`` lines (OPcache and PHP config output)."""
+    pairs = (line.split(":", 1) for line in text.splitlines() if ":" in line)
+    return {k.strip(): v.strip() for k, v in pairs}
+
+
+def _headline(finding: str) -> dict[str, Any]:
+    """A finding as a structured issue, keeping its first sentence.
+
+    The rest of a finding is remediation advice for the operator.
+    """
+    parsed = parse_issue(finding)
+    parsed["msg"] = re.split(r"(?<=[^\d])\. ", parsed["msg"], maxsplit=1)[0].rstrip(".")
+    return parsed
+
+
 def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str:
     """Build WordPress performance report."""
+    return _build_wp(domain, path, data)[0]
+
+
+def _build_wp(
+    domain: str, path: str, data: dict[str, ToolResult],
+) -> tuple[str, dict[str, Any]]:
+    """Build the report and its compact form for the model.
+
+    Returns:
+        Tuple of (report, summary) where summary holds the findings as
+        ``issues`` and the measured values as ``metrics``.
+    """
     sections: list[str] = [f"# WordPress Performance: {domain}\n"]
     findings: list[str] = []
+    metrics: dict[str, Any] = {"domain": domain, "path": path}
 
     # ── TTFB ──
     sections.append("## Page Load Timing")
@@ -199,6 +270,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
                 k, v = part.split(":", 1)
                 timing[k] = v
 
+        metrics["timing"] = timing
         ttfb = timing.get("ttfb", "?")
         total = timing.get("total", "?")
         code = timing.get("code", "?")
@@ -235,6 +307,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
             size_bytes = int(autoload.strip())
             size_mb = size_bytes / (1024 * 1024)
             sections.append(f"Total autoloaded: {size_mb:.2f} MB")
+            metrics["autoload_mb"] = round(size_mb, 2)
             if size_mb > 2:
                 findings.append(
                     f"✗ AUTOLOAD BLOAT: {size_mb:.1f} MB of autoloaded options. "
@@ -252,6 +325,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
         sections.append("**Largest autoloaded options:**")
         for line in autoload_top.strip().splitlines()[:7]:
             sections.append(f"  {line}")
+        metrics["autoload_top"] = autoload_top.strip().splitlines()[:7]
 
     # ── Object Cache ──
     sections.append("\n## Object Cache")
@@ -260,11 +334,15 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     if obj_cache:
         if "redis" in cache_type.lower():
             sections.append("✓ Redis object cache active")
+            metrics["object_cache"] = "redis"
         elif "memcache" in cache_type.lower():
             sections.append("✓ Memcached object cache active")
+            metrics["object_cache"] = "memcached"
         else:
             sections.append(f"Object cache drop-in: {cache_type[:100]}")
+            metrics["object_cache"] = cache_type[:100]
     else:
+        metrics["object_cache"] = None
         findings.append(
             "✗ NO OBJECT CACHE: Every page load hits the database for "
             "everything. Install Redis or Memcached object cache — this "
@@ -277,6 +355,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     opcache = _v(data, "opcache")
     if opcache and "not available" not in opcache.lower():
         sections.append(opcache)
+        metrics["opcache"] = _key_values(opcache)
         hit_match = re.search(r'hit_rate:([\d.]+)', opcache)
         if hit_match:
             hit_rate = float(hit_match.group(1))
@@ -286,6 +365,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
                     f"PHP is recompiling scripts unnecessarily. Increase opcache.memory_consumption."
                 )
     elif opcache:
+        metrics["opcache"] = None
         findings.append(
             "✗ OPCACHE DISABLED: PHP recompiles every file on every request. "
             "This wastes massive CPU. Enable OPcache in php.ini."
@@ -304,6 +384,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
         p for p in page_cache_plugins
         if p in plugins_raw.lower()
     ]
+    metrics["page_cache"] = found_cache
     if found_cache:
         sections.append(f"✓ Page cache plugin: {', '.join(found_cache)}")
     else:
@@ -319,6 +400,8 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     if headers:
         has_gzip = "gzip" in headers.lower() or "br" in headers.lower()
         has_cache = "cache-control" in headers.lower() or "expires" in headers.lower()
+        metrics["compression"] = has_gzip
+        metrics["cache_headers"] = has_cache
         if has_gzip:
             sections.append("✓ Response compression enabled")
         else:
@@ -332,6 +415,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     # ── WP-Cron ──
     sections.append("\n## WP-Cron")
     cron_disabled = _v(data, "cron_constant")
+    metrics["wp_cron_on_page_loads"] = bool(cron_disabled and cron_disabled.strip() == "0")
     if cron_disabled and cron_disabled.strip() == "0":
         findings.append(
             "⚠ WP-CRON ON PAGE LOADS: WordPress runs scheduled tasks on random "
@@ -349,6 +433,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
         try:
             count = int(plugin_count)
             sections.append(f"\n**Active plugins:** {count}")
+            metrics["active_plugins"] = count
             if count > 30:
                 findings.append(
                     f"⚠ {count} active plugins — each adds PHP load time. "
@@ -362,6 +447,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     if bloat:
         sections.append("\n## Database Bloat")
         sections.append(bloat)
+        metrics["db_bloat"] = bloat
 
     # ── Images ──
     large_images = _v(data, "large_images")
@@ -369,6 +455,7 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     if large_images:
         try:
             count = int(large_images.strip())
+            metrics["large_images"] = count
             if count > 0:
                 findings.append(
                     f"⚠ {count} images over 2MB in uploads — these slow down page "
@@ -379,11 +466,13 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
             pass
     if uploads_size:
         sections.append(f"**Uploads directory:** {uploads_size}")
+        metrics["uploads_size"] = uploads_size.split()[0]
 
     # ── PHP Config ──
     php_config = _v(data, "php_config")
     if php_config:
         sections.append(f"\n## PHP Configuration\n{php_config}")
+        metrics["php"] = _key_values(php_config)
 
     # ── Verdict ──
     sections.append("\n---")
@@ -398,4 +487,5 @@ def _build_wp_report(domain: str, path: str, data: dict[str, ToolResult]) -> str
     else:
         sections.append("\n✓ WordPress performance looks good. No major issues found.")
 
-    return "\n".join(sections)
+    issues = sorted((_headline(f) for f in findings), key=lambda i: i["sev"] != "critical")
+    return "\n".join(sections), {"issues": issues, "metrics": metrics}
@@ -13,6 +13,7 @@ from typing import Any
 from agent.inventory import Inventory
 from agent.tools.base import BaseTool, ToolResult
 from agent.tools.docker_tools import _run_on_server
+from agent.wp_index import wp_installs
 
 
 class WpScanAll(BaseTool):
@@ -49,40 +50,35 @@ class WpScanAll(BaseTool):
                     ),
                     "default": "all",
                 },
+                "refresh": {
+                    "type": "boolean",
+                    "description": (
+                        "Rescan every account for installs first instead of "
+                        "using the install index (default false)."
+                    ),
+                    "default": False,
+                },
             },
             "required": ["server"],
         }
 
-    async def execute(self, *, server: str, checks: str = "all", **kwargs: Any) -> ToolResult:
+    async def execute(
+        self, *, server: str, checks: str = "all", refresh: bool = False, **kwargs: Any,
+    ) -> ToolResult:
         """Discover WP installs and scan them all in parallel."""
-        # Step 1: Find all wp-config.php files
-        discover = await _run_on_server(
-            self._inventory, server,
-            "find /home/*/public_html -maxdepth 3 -name wp-config.php -type f 2>/dev/null",
-        )
-        if not discover.success:
-            return discover
-
-        wp_configs = [
-            line.strip() for line in discover.output.strip().splitlines()
-            if line.strip()
+        # Step 1-2: Install paths, owners and versions from the install index
+        try:
+            indexed = await wp_installs(self._inventory, server, refresh=refresh)
+        except (KeyError, RuntimeError) as e:
+            return ToolResult(error=str(e), exit_code=1)
+
+        installs: list[dict[str, str]] = [
+            {"user": inst.user, "path": inst.path, "version": inst.version}
+            for inst in indexed if inst.user != "?"
         ]
 
-        if not wp_configs:
-            return ToolResult(output="No WordPress installations found on this server.")
-
-        # Step 2: Parse install paths and owners
-        installs: list[dict[str, str]] = []
-        for config_path in wp_configs:
-            # /home/USERNAME/public_html[/subdir]/wp-config.php
-            parts = config_path.split("/")
-            if len(parts) >= 4 and parts[1] == "home":
-                username = parts[2]
-                wp_path = "/".join(parts[:-1])  # Remove wp-config.php
-                installs.append({"user": username, "path": wp_path})
-
         if not installs:
-            return ToolResult(output="Found wp-config.php files but could not parse paths.")
+            return ToolResult(output="No WordPress installations found on this server.")
 
         do_updates = checks in ("all", "updates")
         do_security = checks in ("all", "security")
@@ -186,9 +182,12 @@ async def _scan_one_install(
     result: dict[str, Any] = {}
 
     try:
-        # Version (always)
-        ver = await _run_on_server(inventory, server, f"{wp} core version")
-        result["version"] = ver.output.strip() if ver.success else "?"
+        # Version (always; the install index usually knows it already)
+        if inst.get("version"):
+            result["version"] = inst["version"]
+        else:
+            ver = await _run_on_server(inventory, server, f"{wp} core version")
+            result["version"] = ver.output.strip() if ver.success else "?"
 
         checks: dict[str, Any] = {}
 
@@ -14,9 +14,14 @@ Wire protocol (newline-delimited JSON):
   Server -> Client:
     {"type": "tool_call", "tool": "run_remote_command", "input": {...}}
     {"type": "tool_result", "tool": "run_remote_command", "result": {...}}
+    {"type": "response_delta", "text": "The disk usage on "}
     {"type": "response", "text": "The disk usage on gameserver-01 is..."}
     {"type": "cancelled"}
     {"type": "done"}
+
+  ``response_delta`` events stream a text block as Claude writes it; the
+  ``response`` event that follows carries the complete block, so clients
+  that ignore deltas still see every answer.
 """
 
 from __future__ import annotations
@@ -267,6 +272,10 @@ class DaemonUI:
         """Send Claude's text response to the client."""
         self._send_event({"type": "response", "text": text})
 
+    def display_response_delta(self, text: str) -> None:
+        """Send a fragment of a response that is still being streamed."""
+        self._send_event({"type": "response_delta", "text": text})
+
     def display_tool_call(self, tool_name: str, tool_input: dict[str, Any]) -> None:
         """Send a tool call notification to the client."""
         self._send_event({"type": "tool_call", "tool": tool_name, "input": tool_input})
@@ -11,6 +11,7 @@ import json
 from typing import Any
 
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.syntax import Syntax
@@ -22,6 +23,8 @@ class TerminalUI:
 
     def __init__(self, console: Console | None = None) -> None:
         self._console = console or Console()
+        self._live: Live | None = None
+        self._streamed = ""
 
     def display_banner(self, version: str, model: str, servers: list[str]) -> None:
         """Show the startup banner."""
@@ -41,6 +44,7 @@ class TerminalUI:
         Returns:
             The user's input string, stripped.
         """
+        self._finish_stream()
         loop = asyncio.get_running_loop()
         try:
             raw = await loop.run_in_executor(
@@ -51,13 +55,41 @@ class TerminalUI:
         except (EOFError, KeyboardInterrupt):
             return "/quit"
 
+    def display_response_delta(self, text: str) -> None:
+        """Render a streamed response as it arrives, re-drawing the markdown."""
+        if self._live is None:
+            self._console.print()
+            self._streamed = ""
+            self._live = Live(
+                Markdown(""), console=self._console,
+                refresh_per_second=8, vertical_overflow="visible",
+            )
+            self._live.start()
+        self._streamed += text
+        self._live.update(Markdown(self._streamed))
+
     def display_response(self, text: str) -> None:
-        """Display Claude's text response as rendered markdown."""
+        """Display Claude's text response as rendered markdown.
+
+        Finishes the live view when the text was already streamed.
+        """
+        if self._live is not None:
+            self._live.update(Markdown(text))
+            self._finish_stream()
+            return
         self._console.print()
         self._console.print(Markdown(text))
 
+    def _finish_stream(self) -> None:
+        """Stop the live view of a streamed response, if one is open."""
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+            self._streamed = ""
+
     def display_tool_call(self, tool_name: str, tool_input: dict[str, Any]) -> None:
         """Display a tool call being made — compact one-liner for simple inputs."""
+        self._finish_stream()
         if tool_input and all(isinstance(v, (str, int, bool)) for v in tool_input.values()):
             # Build with Text to avoid Rich markup parsing of user values
             text = Text("  ")
@@ -139,6 +171,7 @@ class TerminalUI:
 
     def display_error(self, message: str) -> None:
         """Display an error message."""
+        self._finish_stream()
         self._console.print(f"[bold red]Error:[/] {message}")
 
     def display_info(self, message: str) -> None:
@@ -147,4 +180,5 @@ class TerminalUI:
 
     def display_goodbye(self) -> None:
         """Show session end message."""
+        self._finish_stream()
         self._console.print("\n[dim]Session ended. Goodbye.[/]")
@@ -0,0 +1,275 @@
+"""Per-server index of WordPress installations, refreshed incrementally.
+
+Finding WordPress installs means walking ``/home/*/public_html`` for
+``wp-config.php``, which on a large cPanel box is a long ``find``
+before any real work starts. The index remembers each account's
+``public_html`` mtime and the installs found under it; an update stats
+every ``public_html`` in one pass and only re-walks those whose mtime
+changed. Known installs are re-checked cheaply (does ``wp-config.php``
+still exist, what does ``version.php`` say) in the same exec.
+
+Adding a site in an existing subdirectory doesn't touch
+``public_html``'s mtime, so the index does a full rescan once it is a
+day old; ``refresh`` on the WP tools forces one.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agent.inventory import Inventory
+from agent.tools.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+_STATE_DIR = Path(os.environ.get("BASTION_STATE_DIR", "./state"))
+WP_INDEX_FILE = _STATE_DIR / "wp_index.json"
+
+_MAX_AGE = 300  # reuse without asking the server at all
+_FULL_RESCAN = 86400
+
+_VERSION_FN = (
+    "v() { grep -o \"wp_version = '[^']*'\" \"$1/wp-includes/version.php\" "
+    "2>/dev/null | head -n1 | cut -d\"'\" -f2; }"
+)
+
+
+@dataclass
+class WpInstall:
+    """One WordPress installation."""
+
+    path: str
+    user: str
+    version: str = ""
+    last_seen: float = 0.0
+
+
+@dataclass
+class _ServerEntry:
+    host: str
+    updated_at: float = 0.0
+    full_scan_at: float = 0.0
+    homes: dict[str, int] = field(default_factory=dict)  # user -> public_html mtime
+    installs: dict[str, WpInstall] = field(default_factory=dict)  # path -> install
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["installs"] = [asdict(i) for i in self.installs.values()]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> _ServerEntry | None:
+        try:
+            installs = [WpInstall(**i) for i in data.get("installs", [])]
+            return cls(
+                host=data["host"],
+                updated_at=float(data.get("updated_at", 0)),
+                full_scan_at=float(data.get("full_scan_at", 0)),
+                homes={u: int(m) for u, m in data.get("homes", {}).items()},
+                installs={i.path: i for i in installs},
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def scan_script(homes: dict[str, int], known_paths: list[str]) -> str:
+    """Shell script listing homes, new installs under changed homes, and known installs.
+
+    Output lines are tab-separated:
+    ``H user mtime``, ``C path version`` (found by walking a changed
+    home) and ``V path version`` (a known install that still exists).
+    """
+    known = "\n" + "".join(f"{u} {m}\n" for u, m in homes.items())
+    paths = " ".join(shlex.quote(p) for p in known_paths)
+    return "\n".join([
+        f"known={shlex.quote(known)}",
+        _VERSION_FN,
+        "for d in /home/*/public_html; do",
+        '  [ -d "$d" ] || continue',
+        '  u=${d#/home/}; u=${u%/public_html}',
+        '  m=$(stat -c %Y "$d" 2>/dev/null)',
+        "  printf 'H\\t%s\\t%s\\n' \"$u\" \"$m\"",
+        '  case "$known" in *"',
+        '$u $m',
+        '"*) continue ;; esac',
+        '  find "$d" -maxdepth 3 -name wp-config.php -type f 2>/dev/null | while read -r c; do',
+        "    p=${c%/wp-config.php}; printf 'C\\t%s\\t%s\\n' \"$p\" \"$(v \"$p\")\"",
+        "  done",
+        "done",
+        f"for p in {paths}; do",
+        "  [ -f \"$p/wp-config.php\" ] && printf 'V\\t%s\\t%s\\n' \"$p\" \"$(v \"$p\")\"",
+        "done",
+        "true",
+    ])
+
+
+def _owner(path: str) -> str:
+    parts = path.split("/")
+    return parts[2] if len(parts) > 2 and parts[1] == "home" else "?"
+
+
+def apply_scan(entry: _ServerEntry, output: str, *, now: float | None = None) -> int:
+    """Merge a scan's output into ``entry``.
+
+    Installs of homes that were re-walked are replaced by what the walk
+    found; other installs are kept if they still exist. Installs of
+    accounts whose ``public_html`` is gone are dropped.
+
+    Returns:
+        Number of homes that were re-walked.
+    """
+    now = time.time() if now is None else now
+    homes: dict[str, int] = {}
+    found: dict[str, str] = {}
+    still_there: dict[str, str] = {}
+    for line in output.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 3:
+            continue
+        kind, key, value = parts
+        if kind == "H":
+            homes[key] = int(value) if value.isdigit() else 0
+        elif kind == "C":
+            found[key] = value.strip()
+        elif kind == "V":
+            still_there[key] = value.strip()
+
+    walked = {u for u, m in homes.items() if entry.homes.get(u) != m}
+    installs: dict[str, WpInstall] = {}
+    for path, inst in entry.installs.items():
+        if inst.user in homes and inst.user not in walked and path in still_there:
+            inst.version = still_there[path] or inst.version
+            inst.last_seen = now
+            installs[path] = inst
+    for path, version in found.items():
+        installs[path] = WpInstall(path=path, user=_owner(path), version=version, last_seen=now)
+
+    entry.homes = homes
+    entry.installs = dict(sorted(installs.items()))
+    entry.updated_at = now
+    return len(walked)
+
+
+class WpIndex:
+    """WordPress installs per server, persisted as JSON."""
+
+    def __init__(
+        self, *, path: Path | None = None, max_age: float = _MAX_AGE,
+        full_rescan: float = _FULL_RESCAN,
+    ) -> None:
+        self.path = path
+        self.max_age = max_age
+        self.full_rescan = full_rescan
+        self._entries: dict[str, _ServerEntry] = {}
+        self._flights = SingleFlight()
+
+    async def installs(
+        self, inventory: Inventory, server: str, *, refresh: bool = False,
+    ) -> list[WpInstall]:
+        """WordPress installs on ``server``, updating the index if it is stale.
+
+        Args:
+            refresh: Rescan every home instead of only changed ones.
+
+        Raises:
+            RuntimeError: If the scan fails and nothing is indexed yet.
+        """
+        host = inventory.get_server(server).definition.host
+        entry = self._entries.get(server)
+        if entry is None or entry.host != host:
+            entry = self._entries[server] = _ServerEntry(host=host)
+        now = time.time()
+        full = refresh or now - entry.full_scan_at > self.full_rescan
+        if full or now - entry.updated_at > self.max_age:
+            await self._flights.do(
+                (server, full), lambda: self._update(inventory, server, entry, full),
+            )
+        return list(entry.installs.values())
+
+    async def _update(
+        self, inventory: Inventory, server: str, entry: _ServerEntry, full: bool,
+    ) -> None:
+        from agent.tools.docker_tools import _run_on_server
+
+        homes = {} if full else entry.homes
+        script = scan_script(homes, [] if full else list(entry.installs))
+        start = time.monotonic()
+        result = await _run_on_server(inventory, server, f"sh -c {shlex.quote(script)}")
+        if not result.success:
+            if not entry.updated_at:
+                raise RuntimeError(result.error or f"WordPress scan failed (exit {result.exit_code})")
+            logger.warning("wp_index_update_failed", server=server, error=result.error)
+            return
+        if full:
+            entry.homes = {}
+        walked = apply_scan(entry, result.output)
+        if full:
+            entry.full_scan_at = entry.updated_at
+        logger.info(
+            "wp_index_updated", server=server, full=full,
+            installs=len(entry.installs), homes=len(entry.homes), walked=walked,
+            elapsed_ms=round((time.monotonic() - start) * 1000),
+        )
+        self.save()
+
+    def load(self) -> None:
+        """Load the persisted index (missing or corrupt file = empty)."""
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for server, raw in data.get("servers", {}).items():
+            entry = _ServerEntry.from_dict(raw) if isinstance(raw, dict) else None
+            if entry is not None:
+                self._entries[server] = entry
+
+    def save(self) -> None:
+        """Persist the index atomically."""
+        if self.path is None:
+            return
+        data = {
+            "saved_at": time.time(),
+            "servers": {s: e.to_dict() for s, e in self._entries.items()},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data))
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning("wp_index_save_failed", path=str(self.path), error=str(e))
+
+
+# ── Process-wide index ───────────────────────────────────────────
+
+_index = WpIndex()
+
+
+def get_wp_index() -> WpIndex:
+    """The process-wide index used by the WordPress tools."""
+    return _index
+
+
+def configure_wp_index(*, path: Path | None = WP_INDEX_FILE) -> WpIndex:
+    """Point the process-wide index at its state file and load it."""
+    if path != _index.path:
+        _index.path = path
+        _index.load()
+    return _index
+
+
+async def wp_installs(
+    inventory: Inventory, server: str, *, refresh: bool = False,
+) -> list[WpInstall]:
+    """WordPress installs on ``server`` from the process-wide index."""
+    return await _index.installs(inventory, server, refresh=refresh)
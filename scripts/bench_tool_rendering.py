@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Compare the tokens of a tool's formatted report and its compact payload.
+
+Tools that set ``ToolResult.data`` send the model a compact JSON summary
+instead of the report shown to the operator. This builds both renderings
+for those tools from representative fleet fixtures and prints their
+size, so a change to either form can be checked for token cost.
+
+Usage:
+    python scripts/bench_tool_rendering.py            # estimated tokens
+    python scripts/bench_tool_rendering.py --exact    # API token counts
+                                                      # (needs ANTHROPIC_API_KEY)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agent.config import AgentConfig, PermissionsConfig, ServerDefinition, ServersConfig  # noqa: E402
+from agent.inventory import Inventory  # noqa: E402
+from agent.tools.base import ToolResult, model_view  # noqa: E402
+
+# Same ratio the conversation loop uses for its history estimate
+_CHARS_PER_TOKEN = 3.5
+
+
+def _ok(output: str) -> ToolResult:
+    return ToolResult(output=output)
+
+
+def health_check() -> ToolResult:
+    """health_check over six servers, two of them with problems."""
+    from agent.tools.health import _analyze
+
+    servers = {
+        f"web-0{i}": ServerDefinition(host=f"10.0.0.{i}", role="webhost", services=["mysql", "exim"])
+        for i in range(1, 4)
+    } | {
+        f"game-0{i}": ServerDefinition(host=f"10.0.1.{i}", role="game-server", services=["docker"])
+        for i in range(1, 4)
+    }
+    inventory = Inventory(ServersConfig(servers=servers), PermissionsConfig())
+    sections: list[str] = []
+    issues: list[dict[str, Any]] = []
+    entities: list[dict[str, Any]] = []
+    for n, name in enumerate(servers):
+        disk_pct = 91 if n == 1 else 42
+        raw = {
+            "uptime": " 10:41:03 up 31 days,  2:14,  1 user,  load average: 0.52, 0.61, 0.70",
+            "nproc": "8",
+            "disk": (
+                "Filesystem Size Used Avail Use% Mounted on\n"
+                f"/dev/sda1 200G {disk_pct * 2}G {200 - disk_pct * 2}G {disk_pct}% /\n"
+                "tmpfs 16G 0 16G 0% /dev/shm"
+            ),
+            "memory": "              total used free\nMem: 32000 12000 20000",
+            "cpu": "%Cpu(s):  3.1 us,  1.0 sy,  0.0 ni, 95.0 id,  0.9 wa",
+            "dmesg": "",
+            "connections": "TCP:   312 (estab 250, closed 40)",
+        }
+        if servers[name].role == "webhost":
+            raw |= {
+                "svc:mysql:mysqld": "inactive", "svc:mysql:mariadb": "active",
+                "svc:exim": "active",
+                "mysql_status": "Uptime: 86400  Threads: 12  Questions: 9000000  Slow queries: 3",
+                "mail_queue": "640" if n == 2 else "12",
+                "apache_procs": "85",
+                "cpanel_version": "11.118.0.12",
+            }
+        else:
+            raw["containers"] = "NAMES STATUS STATE\nmc-1 Up 3 days running\nrust-1 Up 2 hours running"
+        report, has_issues, summary = _analyze(inventory.get_server(name), raw)
+        sections.append(f"## {name}\n{report}")
+        issues.extend(dict(i, server=name) for i in summary["issues"])
+        entities.append({"server": name, "ok": not has_issues, **summary["metrics"]})
+    return ToolResult(
+        output="\n\n".join(sections), exit_code=1,
+        data={"issues": issues, "entities": entities},
+    )
+
+
+def pterodactyl_overview() -> ToolResult:
+    """pterodactyl_overview over three nodes of twelve containers."""
+    from agent.tools.pterodactyl_overview import _build_overview
+
+    results: dict[str, dict[str, ToolResult]] = {}
+    for n in range(1, 4):
+        ps = [f"srv-{n}-{c:02d}|Up {c} days|ghcr.io/pterodactyl/yolks:java_17" for c in range(1, 12)]
+        ps.append(f"srv-{n}-12|Up 12 minutes|ghcr.io/pterodactyl/yolks:java_17")
+        stats = [
+            f"srv-{n}-{c:02d}\t{c * 3.1:.2f}%\t{c * 300}MiB / 4GiB\t{min(c * 7.5, 95):.2f}%"
+            for c in range(1, 13)
+        ]
+        results[f"game-0{n}"] = {
+            "wings_service": _ok("active"),
+            "wings_config": _ok("  port: 8080\nsftp:\n  port: 2022\nremote: https://panel.example.com"),
+            "disk": _ok(f"Filesystem Size Used Avail Use% Mounted on\n/dev/sdb1 1T {n * 280}G "
+                        f"{1000 - n * 280}G {n * 28}% /srv/pterodactyl"),
+            "docker_ps": _ok("\n".join(ps)),
+            "docker_stats": _ok("\n".join(stats)),
+            "restarting": _ok(""),
+        }
+    report, data = _build_overview(results)
+    return ToolResult(output=report, data=data)
+
+
+def wp_deep_performance() -> ToolResult:
+    """wp_deep_performance for a slow site without an object cache."""
+    from agent.tools.wp_deep_scan import _build_wp
+
+    checks = {
+        "ttfb": _ok("dns:0.004|connect:0.021|ttfb:2.412|total:2.903|size:184233|code:200"),
+        "autoload_size": _ok("2621440"),
+        "autoload_top": _ok("\n".join(
+            f"option_{i}\t{400000 // i}" for i in range(1, 11)
+        )),
+        "object_cache": _ok(""),
+        "cache_type": _ok(""),
+        "opcache": _ok("hit_rate:84.2\ncached:2210\nmemory_used:126.4MB"),
+        "plugins": _ok("38"),
+        "page_cache": _ok("elementor,active,none,3.20\nwoocommerce,active,none,8.6"),
+        "db_size": _ok("Name,Size\nwp_db,412MB"),
+        "bloat": _ok("transients\trevisions\tspam\ttrash\n1840\t9120\t412\t38"),
+        "php_config": _ok("memory_limit:256M\nmax_execution_time:30\nupload_max_filesize:64M\n"
+                          "post_max_size:64M\nmax_input_vars:3000"),
+        "cron_constant": _ok("0"),
+        "large_images": _ok("57"),
+        "uploads_size": _ok("6.1G\t/home/shop/public_html/wp-content/uploads"),
+        "headers": _ok("HTTP/2 200\ncontent-type: text/html; charset=UTF-8\nserver: Apache"),
+        "wp_http": _ok("412"),
+    }
+    report, summary = _build_wp("shop.example.com", "/home/shop/public_html", checks)
+    return ToolResult(output=report, data=summary)
+
+
+FIXTURES: dict[str, Callable[[], ToolResult]] = {
+    "health_check": health_check,
+    "pterodactyl_overview": pterodactyl_overview,
+    "wp_deep_performance": wp_deep_performance,
+}
+
+
+def renderings(result: ToolResult) -> tuple[str, str]:
+    """The tool_result content sent with and without the compact payload."""
+    as_dict = result.to_dict()
+    report = json.dumps({k: v for k, v in as_dict.items() if k != "data"})
+    compact = json.dumps(model_view(as_dict), separators=(",", ":"), ensure_ascii=False)
+    return report, compact
+
+
+def _counter(exact: bool) -> Callable[[str], int]:
+    if not exact:
+        return lambda text: round(len(text) / _CHARS_PER_TOKEN)
+
+    import anthropic
+
+    client = anthropic.Anthropic()
+    model = AgentConfig().model
+
+    def count(text: str) -> int:
+        response = client.messages.count_tokens(
+            model=model, messages=[{"role": "user", "content": text or "."}],
+        )
+        return response.input_tokens
+
+    base = count("")
+    return lambda text: count(text) - base
+
+
+def main() -> None:
+    """Print the size of both renderings for every fixture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--exact", action="store_true", help="Count tokens with the API.")
+    args = parser.parse_args()
+    count = _counter(args.exact)
+
+    unit = "tokens" if args.exact else "~tokens"
+    print(f"{'tool':<24}{'report chars':>14}{'compact chars':>15}"
+          f"{'report ' + unit:>16}{'compact ' + unit:>17}{'saved':>8}")
+    totals = [0, 0]
+    for name, build in FIXTURES.items():
+        report, compact = renderings(build())
+        report_tokens, compact_tokens = count(report), count(compact)
+        totals[0] += report_tokens
+        totals[1] += compact_tokens
+        saved = 1 - compact_tokens / report_tokens if report_tokens else 0.0
+        print(f"{name:<24}{len(report):>14}{len(compact):>15}"
+              f"{report_tokens:>16}{compact_tokens:>17}{saved:>8.0%}")
+    saved = 1 - totals[1] / totals[0] if totals[0] else 0.0
+    print(f"{'total':<24}{'':>14}{'':>15}{totals[0]:>16}{totals[1]:>17}{saved:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
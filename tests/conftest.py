@@ -1,3 +1,32 @@
 """Shared test fixtures for bastion-agent tests."""
 
 from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+
+from agent.config import PermissionsConfig, ServerDefinition, ServersConfig
+from agent.inventory import Inventory
+
+
+@pytest.fixture
+def make_inventory() -> Callable[..., Inventory]:
+    """Factory for an Inventory, with no role permissions by default.
+
+    ``make_inventory()`` is a single cPanel webhost, web-01 at 10.0.0.5;
+    pass ``host`` to move it, ``servers`` for a different fleet, or
+    ``permissions`` for role allowlists.
+    """
+
+    def _make(
+        servers: dict[str, ServerDefinition] | None = None,
+        *,
+        host: str = "10.0.0.5",
+        permissions: PermissionsConfig | None = None,
+    ) -> Inventory:
+        if servers is None:
+            servers = {"web-01": ServerDefinition(host=host, role="webhost")}
+        return Inventory(ServersConfig(servers=servers), permissions or PermissionsConfig())
+
+    return _make
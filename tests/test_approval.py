@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
 import pytest
 
+from agent.config import ApprovalMode
 from agent.security.approval import (
     ALWAYS_SAFE_TOOLS,
     _extract_string_values,
+    request_approval,
     requires_approval,
 )
 
@@ -198,3 +205,38 @@ class TestExtractStringValues:
 
     def test_string_input(self) -> None:
         assert _extract_string_values("hello") == ["hello"]
+
+
+# --- request_approval ---
+
+
+class TestRequestApproval:
+    """Tests for prompting the operator."""
+
+    async def test_auto_deny_never_prompts(self) -> None:
+        with patch("builtins.input") as fake_input:
+            assert not await request_approval("x", {}, ApprovalMode.AUTO_DENY)
+        fake_input.assert_not_called()
+
+    async def test_concurrent_prompts_are_serialized(self) -> None:
+        active = 0
+        overlap = False
+        lock = threading.Lock()
+
+        def _input(prompt: str) -> str:
+            nonlocal active, overlap
+            with lock:
+                active += 1
+                overlap = overlap or active > 1
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return "y"
+
+        with patch("builtins.input", _input):
+            results = await asyncio.gather(*(
+                request_approval(f"tool{i}", {}, ApprovalMode.INTERACTIVE, MagicMock())
+                for i in range(3)
+            ))
+        assert results == [True, True, True]
+        assert not overlap
@@ -77,6 +77,15 @@ class TestAuditLogger:
 
         entry = json.loads(log_file.read_text().strip())
         assert entry["event"] == "tool_timeout"
+        assert "reaped_processes" not in entry
+
+    def test_log_timeout_with_reaped(self, tmp_path: Path) -> None:
+        log_file = tmp_path / "audit.jsonl"
+        with AuditLogger(str(log_file)) as audit:
+            audit.log_timeout("slow_tool", {"command": "find /"}, reaped=4)
+
+        entry = json.loads(log_file.read_text().strip())
+        assert entry["reaped_processes"] == 4
 
     def test_multiple_entries(self, tmp_path: Path) -> None:
         log_file = tmp_path / "audit.jsonl"
@@ -0,0 +1,75 @@
+"""Tests for batched remote execution framing."""
+
+from __future__ import annotations
+
+import base64
+
+from agent.tools.batch_exec import (
+    build_batch_script,
+    new_boundary,
+    parse_batch_output,
+)
+
+
+def _frame(boundary: str, idx: int, rc: int, out: str, err: str = "",
+           start: int = 1_000_000_000, end: int = 1_500_000_000) -> str:
+    enc = lambda s: base64.b64encode(s.encode()).decode()  # noqa: E731
+    return f"{boundary} {idx} {rc} {start} {end}\n{enc(out)}\n{enc(err)}\n"
+
+
+class TestParseBatchOutput:
+
+    def test_maps_frames_to_labels(self):
+        b = new_boundary()
+        output = _frame(b, 0, 0, "up 3 days\n") + _frame(b, 1, 2, "", "no such file")
+        items = parse_batch_output(output, ["uptime", "cat"], b, timeout=30)
+
+        assert items["uptime"].stdout == "up 3 days\n"
+        assert items["uptime"].elapsed_ms == 500
+        assert items["cat"].exit_status == 2
+        assert items["cat"].to_tool_result(30).error == "no such file"
+
+    def test_output_cannot_forge_frames(self):
+        b = new_boundary()
+        forged = f"{b} 1 0 0 0\nAAAA\nAAAA\n"
+        items = parse_batch_output(_frame(b, 0, 0, forged), ["a", "b"], b, timeout=30)
+
+        assert items["a"].stdout == forged
+        assert "b" not in items
+
+    def test_timeout_exit_code_after_deadline(self):
+        b = new_boundary()
+        output = _frame(b, 0, 124, "", start=0, end=0) + _frame(
+            b, 1, 124, "", start=1, end=2_000_000_001,
+        )
+        items = parse_batch_output(output, ["a", "b"], b, timeout=2)
+
+        assert items["a"].timed_out  # no timing info: trust the exit code
+        assert items["b"].timed_out
+        assert "Timed out" in items["b"].to_tool_result(2).error
+
+    def test_fast_124_is_not_a_timeout(self):
+        b = new_boundary()
+        items = parse_batch_output(_frame(b, 0, 124, "x"), ["a"], b, timeout=30)
+        assert not items["a"].timed_out
+        assert items["a"].to_tool_result(30).exit_code == 124
+
+    def test_ignores_unknown_and_malformed_frames(self):
+        b = new_boundary()
+        output = "motd banner\n" + f"{b} x y\n" + _frame(b, 7, 0, "stray") + _frame(b, 0, 0, "ok")
+        items = parse_batch_output(output, ["a"], b, timeout=30)
+        assert list(items) == ["a"]
+        assert items["a"].stdout == "ok"
+
+
+class TestBuildBatchScript:
+
+    def test_commands_are_quoted(self):
+        script = build_batch_script(["echo 'it''s' | wc -c"], 10, "B")
+        assert "timeout -k 2 10" in script
+        assert "for i in 0; do" in script
+
+    def test_each_command_gets_an_index(self):
+        script = build_batch_script(["a", "b", "c"], 5, "B")
+        assert "for i in 0 1 2; do" in script
+        assert script.count(") &") == 3
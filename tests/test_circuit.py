@@ -0,0 +1,62 @@
+"""Tests for the per-host circuit breaker."""
+
+from __future__ import annotations
+
+from agent.tools.circuit import BreakerState, CircuitBreaker
+
+
+class TestCircuitBreaker:
+
+    def test_closed_allows(self):
+        breaker = CircuitBreaker()
+        assert breaker.allow()
+        assert not breaker.is_trial
+
+    def test_opens_at_threshold(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        assert not breaker.record_failure("timed out")
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.record_failure("timed out")
+        assert breaker.state is BreakerState.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_single_trial(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure("refused")
+        assert breaker.allow()
+        assert breaker.is_trial
+        # Everyone else keeps failing fast while the trial is in flight
+        assert not breaker.allow()
+
+    def test_trial_success_closes(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure("refused")
+        breaker.allow()
+        breaker.record_success()
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.down_since is None
+
+    def test_trial_failure_reopens_and_keeps_down_since(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure("refused")
+        since = breaker.down_since
+        breaker.allow()
+        assert breaker.record_failure("still refused")
+        assert breaker.state is BreakerState.OPEN
+        assert breaker.down_since == since
+
+    def test_abandoned_trial_is_due_again(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure("refused")
+        breaker.allow()
+        breaker.abandon_trial()
+        assert breaker.state is BreakerState.OPEN
+        assert breaker.probe_due()
+
+    def test_describe(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        breaker.record_failure("Connection refused")
+        msg = breaker.describe("web-01")
+        assert "'web-01' unreachable since" in msg
+        assert "Connection refused" in msg
+        assert "next reconnect probe in" in msg
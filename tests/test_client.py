@@ -0,0 +1,411 @@
+"""Tests for the conversation client's streaming and tool-call loop.
+
+The Anthropic client is replaced by a fake whose ``messages.stream``
+plays back scripted events, so the tests drive the real
+``_stream_round`` / ``_api_call_with_retry`` code without the network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from anthropic.types import TextBlock, ToolUseBlock
+
+from agent.client import (
+    CancelledByUser,
+    ConversationClient,
+    _message_tokens,
+    _with_cache_breakpoint,
+)
+from agent.config import AgentConfig
+from agent.ui.daemon import DaemonUI
+
+
+def _text(text: str) -> SimpleNamespace:
+    return SimpleNamespace(type="text", text=text)
+
+
+def _stop(block: Any) -> SimpleNamespace:
+    return SimpleNamespace(type="content_block_stop", content_block=block)
+
+
+def _tool_use(tool_id: str, name: str = "docker_ps", **tool_input: Any) -> ToolUseBlock:
+    return ToolUseBlock(id=tool_id, name=name, input=tool_input, type="tool_use")
+
+
+def _message(*blocks: Any, stop_reason: str = "tool_use", input_tokens: int = 100) -> Any:
+    usage = SimpleNamespace(
+        input_tokens=input_tokens, output_tokens=20,
+        cache_read_input_tokens=None, cache_creation_input_tokens=None,
+    )
+    return SimpleNamespace(content=list(blocks), stop_reason=stop_reason, usage=usage)
+
+
+class _FakeStream:
+    """``messages.stream(...)`` context: plays events, then the final message.
+
+    An ``asyncio.Event`` in the script pauses the stream until it is set;
+    an exception in the script is raised as a dropped stream would.
+    """
+
+    def __init__(self, script: list[Any], final: Any) -> None:
+        self._script = script
+        self._final = final
+        self.closed = False
+
+    async def __aenter__(self) -> _FakeStream:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.closed = True
+
+    async def __aiter__(self):
+        for item in self._script:
+            if isinstance(item, asyncio.Event):
+                await item.wait()
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+
+    async def get_final_message(self) -> Any:
+        return self._final
+
+
+class _FakeAnthropic:
+    """Stands in for ``anthropic.AsyncAnthropic``; one scripted stream per call."""
+
+    def __init__(self) -> None:
+        self.responses: list[tuple[list[Any], Any]] = []
+        self.requests: list[dict[str, Any]] = []
+        self.streams: list[_FakeStream] = []
+        self.messages = SimpleNamespace(
+            stream=self._stream,
+            count_tokens=AsyncMock(return_value=SimpleNamespace(input_tokens=0)),
+        )
+
+    def respond(self, final: Any, *script: Any) -> None:
+        self.responses.append((list(script), final))
+
+    def _stream(self, **kwargs: Any) -> _FakeStream:
+        # Copy: the request must be inspected as sent, not as mutated later
+        self.requests.append(json.loads(json.dumps(kwargs, default=str)))
+        script, final = self.responses.pop(0)
+        stream = _FakeStream(script, final)
+        self.streams.append(stream)
+        return stream
+
+
+def _registry(mutating: tuple[str, ...] = (), dispatch: Any = None) -> MagicMock:
+    registry = MagicMock()
+    registry.selection = None
+    registry.get_schemas.side_effect = lambda families=None: [
+        {"name": "docker_ps", "description": "", "input_schema": {"type": "object"}},
+        {"name": "docker_restart", "description": "", "input_schema": {"type": "object"}},
+    ]
+    registry.get_tool.side_effect = lambda name: SimpleNamespace(mutates=name in mutating)
+    registry.dispatch = dispatch or AsyncMock(return_value={"output": "ok", "exit_code": 0})
+    return registry
+
+
+def _client(
+    registry: MagicMock | None = None, ui: Any = None, **config: Any,
+) -> tuple[ConversationClient, _FakeAnthropic]:
+    fake = _FakeAnthropic()
+    with patch("agent.client.anthropic.AsyncAnthropic", return_value=fake):
+        client = ConversationClient(
+            AgentConfig(**config), registry or _registry(), "You are a test.", ui or MagicMock(),
+        )
+    client._append_message({"role": "user", "content": "check web-01"})
+    return client, fake
+
+
+class TestStreamRound:
+    async def test_tool_runs_before_message_finishes(self):
+        started = asyncio.Event()
+
+        async def dispatch(name, tool_input):
+            started.set()
+            return {"output": "ok", "exit_code": 0}
+
+        client, fake = _client(_registry(dispatch=dispatch))
+        block = _tool_use("t1")
+        # The stream only ends once the tool is running
+        fake.respond(_message(block), _stop(block), started)
+
+        response, results = await asyncio.wait_for(client._stream_round(), timeout=2)
+        assert response.stop_reason == "tool_use"
+        assert [r["tool_use_id"] for r in results] == ["t1"]
+
+    async def test_truncated_tool_use_still_gets_a_result(self):
+        registry = _registry()
+        client, fake = _client(registry)
+        done, cut = _tool_use("t1"), _tool_use("t2", container="web")
+        # t2 was cut off by max_tokens: no content_block_stop for it
+        fake.respond(_message(done, cut, stop_reason="max_tokens"), _stop(done))
+
+        _, results = await client._stream_round()
+        assert [r["tool_use_id"] for r in results] == ["t1", "t2"]
+        assert registry.dispatch.await_count == 2
+
+    async def test_mutating_tool_waits_for_complete_message(self):
+        registry = _registry(mutating=("docker_restart",))
+        client, fake = _client(registry)
+        read, restart = _tool_use("t1"), _tool_use("t2", "docker_restart", container="web")
+        started = asyncio.Event()
+        registry.dispatch.side_effect = lambda name, tool_input: (
+            started.set(), {"output": "ok", "exit_code": 0},
+        )[1]
+        # The read starts mid-stream; the restart only once the message is final
+        fake.respond(_message(read, restart), _stop(read), started, _stop(restart))
+
+        _, results = await asyncio.wait_for(client._stream_round(), timeout=2)
+        assert [r["tool_use_id"] for r in results] == ["t1", "t2"]
+        assert [c.args[0] for c in registry.dispatch.await_args_list] == [
+            "docker_ps", "docker_restart",
+        ]
+
+    async def test_stream_failure_after_mutating_block_runs_nothing(self):
+        registry = _registry(mutating=("docker_restart",))
+        client, fake = _client(registry)
+        restart, read = _tool_use("t1", "docker_restart", container="web"), _tool_use("t2")
+        fake.respond(
+            _message(restart, read), _stop(restart), _stop(read),
+            RuntimeError("connection dropped"),
+        )
+
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(client._stream_round(), timeout=2)
+        registry.dispatch.assert_not_awaited()
+
+    async def test_cancel_aborts_stream(self):
+        registry = _registry()
+        client, fake = _client(registry)
+        cancel, never = asyncio.Event(), asyncio.Event()
+        client.set_cancel_event(cancel)
+        fake.respond(_message(stop_reason="end_turn"), _text("Checking"), never)
+
+        round_task = asyncio.ensure_future(client._stream_round())
+        await asyncio.sleep(0.01)
+        cancel.set()
+        with pytest.raises(CancelledByUser):
+            await asyncio.wait_for(round_task, timeout=2)
+        assert fake.streams[0].closed
+        registry.dispatch.assert_not_awaited()
+
+    async def test_response_deltas_reach_daemon_ui(self):
+        ui = DaemonUI("/tmp/unused.sock")
+        ui._writer = MagicMock()
+        ui._writer.is_closing.return_value = False
+        client, fake = _client(ui=ui)
+        text = TextBlock(type="text", text="Disk is at 40%.")
+        fake.respond(
+            _message(text, stop_reason="end_turn"),
+            _text("Disk is "), _text("at 40%."), _stop(text),
+        )
+
+        await client._stream_round()
+        events = [json.loads(c.args[0]) for c in ui._writer.write.call_args_list]
+        assert events == [
+            {"type": "response_delta", "text": "Disk is "},
+            {"type": "response_delta", "text": "at 40%."},
+            {"type": "response", "text": "Disk is at 40%."},
+        ]
+
+
+class TestRunToolCalls:
+    """Parallel tool execution: ordering, the mutating barrier and the limit."""
+
+    @staticmethod
+    async def _run(client: ConversationClient, *blocks: Any) -> list[dict[str, Any]]:
+        queue: asyncio.Queue[Any] = asyncio.Queue()
+        for block in blocks:
+            queue.put_nowait(block)
+        queue.put_nowait(None)
+        return await asyncio.wait_for(client._run_tool_calls(queue), timeout=5)
+
+    @staticmethod
+    def _timed_registry(
+        log: list[tuple[str, str]], delays: dict[str, float], mutating: tuple[str, ...] = (),
+    ) -> MagicMock:
+        async def dispatch(name, tool_input):
+            call = tool_input["call"]
+            log.append(("start", call))
+            await asyncio.sleep(delays.get(call, 0.01))
+            log.append(("end", call))
+            return {"output": call, "exit_code": 0}
+
+        return _registry(mutating, dispatch)
+
+    async def test_results_in_call_order(self):
+        log: list[tuple[str, str]] = []
+        registry = self._timed_registry(log, {"a": 0.05, "b": 0.03, "c": 0.0})
+        client, _ = _client(registry)
+
+        results = await self._run(client, *[_tool_use(c, call=c) for c in "abc"])
+        assert [r["tool_use_id"] for r in results] == ["a", "b", "c"]
+        assert [json.loads(r["content"])["output"] for r in results] == ["a", "b", "c"]
+        # They did run concurrently: the last call finished first
+        assert [c for kind, c in log if kind == "end"] == ["c", "b", "a"]
+
+    async def test_mutating_call_is_a_barrier(self):
+        log: list[tuple[str, str]] = []
+        registry = self._timed_registry(
+            log, {"read1": 0.05, "restart": 0.03}, mutating=("docker_restart",),
+        )
+        client, _ = _client(registry)
+
+        await self._run(
+            client,
+            _tool_use("1", call="read1"),
+            _tool_use("2", "docker_restart", call="restart"),
+            _tool_use("3", call="read2"),
+        )
+        assert log.index(("end", "read1")) < log.index(("start", "restart"))
+        assert log.index(("end", "restart")) < log.index(("start", "read2"))
+
+    async def test_concurrency_limit(self):
+        active = peak = 0
+
+        async def dispatch(name, tool_input):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"output": "ok", "exit_code": 0}
+
+        client, _ = _client(_registry(dispatch=dispatch), max_parallel_tools=2)
+        results = await self._run(client, *[_tool_use(str(i)) for i in range(6)])
+        assert len(results) == 6
+        assert peak == 2
+
+
+class TestCacheBreakpoints:
+    """Prompt-cache breakpoints go on the request, never into the history."""
+
+    async def _two_rounds(self, client: ConversationClient, fake: _FakeAnthropic) -> None:
+        for i in range(2):
+            block = _tool_use(f"t{i}")
+            fake.respond(_message(block), _stop(block))
+        fake.respond(_message(TextBlock(type="text", text="Done."), stop_reason="end_turn"))
+        await client._tool_rounds()
+
+    async def test_history_never_gains_cache_control(self):
+        client, fake = _client()
+        await self._two_rounds(client, fake)
+        assert len(client._messages) == 6
+        assert "cache_control" not in json.dumps(client._messages, default=str)
+
+    async def test_request_uses_at_most_four_breakpoints(self):
+        client, fake = _client()
+        await self._two_rounds(client, fake)
+        assert len(fake.requests) == 3
+        for request in fake.requests:
+            breakpoints = json.dumps(request).count('"cache_control"')
+            # System prompt, last tool schema, newest message
+            assert breakpoints == 3
+            assert "cache_control" in request["messages"][-1]["content"][-1]
+        # Tool schemas are built once and reused unchanged
+        assert fake.requests[0]["tools"] == fake.requests[-1]["tools"]
+
+    async def test_disabled(self):
+        client, fake = _client(prompt_cache=False)
+        fake.respond(_message(stop_reason="end_turn"))
+        await client._stream_round()
+        assert "cache_control" not in json.dumps(fake.requests[0])
+
+    def test_string_content_becomes_text_block(self):
+        history = [{"role": "user", "content": "is web-01 up?"}]
+        marked = _with_cache_breakpoint(history)
+        assert marked[-1]["content"] == [
+            {"type": "text", "text": "is web-01 up?", "cache_control": {"type": "ephemeral"}},
+        ]
+        assert history == [{"role": "user", "content": "is web-01 up?"}]
+
+
+class TestTokenBookkeeping:
+    """``_history_tokens`` tracks the history through every mutation."""
+
+    @staticmethod
+    def _assert_consistent(client: ConversationClient) -> None:
+        expected = [_message_tokens(m) for m in client._messages]
+        assert client._token_counts == expected
+        assert client._history_tokens == sum(expected)
+
+    @staticmethod
+    def _fill(client: ConversationClient, pairs: int) -> None:
+        for i in range(pairs):
+            client._append_message({"role": "assistant", "content": [
+                {"type": "text", "text": f"Finding {i}: " + "load is high " * 40},
+            ]})
+            client._append_message({"role": "user", "content": f"and now server {i}? " * 30})
+
+    def test_append_insert_pop(self):
+        client, _ = _client()
+        self._fill(client, 3)
+        self._assert_consistent(client)
+        client._insert_message(1, {"role": "user", "content": "inserted"})
+        self._assert_consistent(client)
+        client._pop_message(1)
+        client._pop_message()
+        self._assert_consistent(client)
+
+    async def test_trim(self):
+        client, _ = _client(max_conversation_tokens=1000, compact_history=False)
+        self._fill(client, 20)
+        before = len(client._messages)
+        await client._trim_history()
+        assert len(client._messages) < before
+        assert client._history_estimate() <= 1000
+        self._assert_consistent(client)
+
+    async def test_compact(self):
+        client, _ = _client(max_conversation_tokens=2000)
+        self._fill(client, 20)
+        await client._compact_history()
+        assert client.get_compactions()
+        self._assert_consistent(client)
+
+    def test_restore_and_reset(self):
+        client, _ = _client()
+        self._fill(client, 3)
+        saved = client.get_messages()
+        other, _ = _client()
+        other.restore_messages(saved)
+        self._assert_consistent(other)
+        assert other._history_tokens == client._history_tokens
+        other.reset()
+        assert (other._token_counts, other._history_tokens) == ([], 0)
+
+
+class TestTokenCalibration:
+    async def test_scale_from_usage_and_count_tokens(self):
+        client, fake = _client(exact_token_counts=True)
+        fake.messages.count_tokens.return_value = SimpleNamespace(input_tokens=500)
+        history = client._history_tokens
+        # The API saw the 500-token overhead plus twice the estimated
+        # history, part of it read from the cache
+        response = _message(stop_reason="end_turn", input_tokens=300)
+        response.usage.cache_read_input_tokens = 500 + 2 * history - 300
+        fake.respond(response)
+
+        await client._stream_round()
+        assert client._token_scale == pytest.approx(2.0)
+        assert client._history_estimate() == 2 * history
+        # System prompt and tool schemas are counted once per tool set
+        fake.respond(_message(stop_reason="end_turn", input_tokens=500 + 2 * history))
+        await client._stream_round()
+        fake.messages.count_tokens.assert_awaited_once()
+
+    async def test_disabled_keeps_estimate(self):
+        client, fake = _client()
+        fake.respond(_message(stop_reason="end_turn", input_tokens=10_000))
+        await client._stream_round()
+        assert client._token_scale == 1.0
+        fake.messages.count_tokens.assert_not_awaited()
@@ -0,0 +1,122 @@
+"""Tests for compacting old conversation turns into a summary."""
+
+from __future__ import annotations
+
+import json
+
+from agent.compaction import (
+    SUMMARY_HEADER,
+    Digest,
+    build_digest,
+    summary_message,
+    summary_text,
+)
+
+
+def _call(call_id: str, name: str, **inp: object) -> dict:
+    return {"type": "tool_use", "id": call_id, "name": name, "input": inp}
+
+
+def _result(call_id: str, **result: object) -> dict:
+    return {"type": "tool_result", "tool_use_id": call_id, "content": json.dumps(result)}
+
+
+_SPAN = [
+    {"role": "user", "content": "web-01 is slow, check it"},
+    {"role": "assistant", "content": [
+        {"type": "text", "text": "Checking."},
+        _call("a", "health_check", server="web-01"),
+        _call("b", "disk_usage", server="web-01"),
+    ]},
+    {"role": "user", "content": [
+        _result("a", output="load 0.4\n⚠ Memory 91% used\nuptime 20d"),
+        _result("b", error="Permission denied", exit_code=1),
+    ]},
+    {"role": "assistant", "content": [_call("c", "docker_restart", server="web-01", container="php")]},
+    {"role": "user", "content": [_result("c", output="php")]},
+    {"role": "assistant", "content": [{"type": "text", "text": "Restarted php; memory was the issue."}]},
+]
+
+
+def _mutates(name: str) -> bool:
+    return name == "docker_restart"
+
+
+class TestBuildDigest:
+    def test_sections(self):
+        digest = build_digest(_SPAN, _mutates)
+        assert digest.servers == ["web-01"]
+        assert digest.requests == ["web-01 is slow, check it"]
+        assert digest.actions == ["docker_restart server=web-01 container=php -> ok"]
+        assert digest.findings == [
+            "health_check server=web-01: ⚠ Memory 91% used",
+            "disk_usage server=web-01: error: Permission denied",
+        ]
+        assert digest.conclusions == ["Checking.", "Restarted php; memory was the issue."]
+
+    def test_truncated_result_still_summarized(self):
+        span = [
+            {"role": "assistant", "content": [_call("a", "web_error_log", server="web-02")]},
+            {"role": "user", "content": [{
+                "type": "tool_result", "tool_use_id": "a",
+                "content": '{"output": "ok line\\nERROR upstream timed out\\n... (900 chars truncated',
+            }]},
+        ]
+        assert build_digest(span).findings == [
+            "web_error_log server=web-02: ERROR upstream timed out",
+        ]
+
+    def test_compact_payload_issues_are_findings(self):
+        span = [
+            {"role": "assistant", "content": [_call("a", "health_check")]},
+            {"role": "user", "content": [_result("a", exit_code=0, data={"issues": [
+                {"sev": "warning", "msg": "Disk /: 91% used", "server": "web-01"},
+            ]})]},
+        ]
+        assert build_digest(span).findings == ["health_check: warning Disk /: 91% used"]
+
+    def test_previous_summary_is_folded_in(self):
+        earlier = summary_message(build_digest(_SPAN, _mutates).render())
+        later = [
+            earlier,
+            {"role": "assistant", "content": [_call("d", "docker_ps", server="web-02")]},
+            {"role": "user", "content": [_result("d", output="php Up 2 minutes")]},
+        ]
+        digest = build_digest(later, _mutates)
+        assert digest.servers == ["web-01", "web-02"]
+        assert digest.actions == ["docker_restart server=web-01 container=php -> ok"]
+        assert digest.findings[-1] == "docker_ps server=web-02: php Up 2 minutes"
+
+
+class TestDigest:
+    def test_render_parse_round_trip(self):
+        digest = build_digest(_SPAN, _mutates)
+        assert Digest.parse(digest.render()) == digest
+
+    def test_render_fits_max_chars(self):
+        digest = Digest()
+        for i in range(25):
+            digest.add("findings", f"finding {i} " + "x" * 150)
+        digest.add("actions", "restart php -> ok")
+        text = digest.render(max_chars=1000)
+        assert len(text) <= 1000
+        assert "finding 24" in text
+        assert "finding 0 " not in text
+        assert "restart php -> ok" in text
+
+    def test_section_limits_keep_newest(self):
+        digest = Digest()
+        for i in range(15):
+            digest.add("requests", f"request {i}")
+        assert len(digest.requests) == 10
+        assert digest.requests[-1] == "request 14"
+
+
+class TestSummaryMessage:
+    def test_detected(self):
+        message = summary_message(f"{SUMMARY_HEADER}\nFindings:\n- x")
+        assert summary_text(message).startswith(SUMMARY_HEADER)
+
+    def test_other_messages_ignored(self):
+        assert summary_text({"role": "user", "content": SUMMARY_HEADER}) is None
+        assert summary_text(_SPAN[2]) is None
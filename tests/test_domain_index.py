@@ -0,0 +1,223 @@
+"""Tests for the domain → account → server index."""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agent.config import ServerDefinition
+from agent.domain_index import (
+    DomainIndex,
+    cpanel_servers,
+    normalize_domain,
+    parse_accounts,
+    parse_domains,
+)
+from agent.tools.base import ToolResult
+
+_LISTACCTS = json.dumps({"data": {"acct": [
+    {"user": "alice", "domain": "alice.com", "plan": "basic", "suspended": 0},
+    {"user": "bob", "domain": "bob.net", "plan": "pro", "suspended": 1},
+]}})
+
+_DOMAIN_INFO = json.dumps({"data": {"domains": [
+    {"domain": "alice.com", "user": "alice", "docroot": "/home/alice/public_html",
+     "domain_type": "main"},
+    {"domain": "shop.example", "user": "alice", "docroot": "/home/alice/shop",
+     "domain_type": "addon", "parent_domain": "alice.com"},
+]}})
+
+
+_FLEET = {
+    "web-01": ServerDefinition(host="10.0.0.5", role="webhost"),
+    "web-02": ServerDefinition(host="10.0.0.6", role="general", services=["cpanel"]),
+    "game-01": ServerDefinition(host="10.0.0.7", role="game-server"),
+}
+
+
+def _batch(accounts: str = _LISTACCTS, domains: str = _DOMAIN_INFO) -> AsyncMock:
+    return AsyncMock(return_value={
+        "accounts": ToolResult(output=accounts),
+        "domains": ToolResult(output=domains),
+    })
+
+
+class TestParsing:
+    def test_normalize_domain(self):
+        assert normalize_domain("HTTPS://Shop.Example:8443/cart?x=1") == "shop.example"
+        assert normalize_domain("example.com.") == "example.com"
+
+    def test_parse_accounts(self):
+        accounts = parse_accounts(_LISTACCTS)
+        assert [a["user"] for a in accounts] == ["alice", "bob"]
+        assert accounts[1]["suspended"] == 1
+
+    def test_parse_domains(self):
+        domains = parse_domains(_DOMAIN_INFO)
+        assert domains[1]["main_domain"] == "alice.com"
+        assert domains[1]["docroot"] == "/home/alice/shop"
+
+    def test_bad_json(self):
+        assert parse_accounts("not json") == []
+        assert parse_domains("") == []
+
+    def test_cpanel_servers(self, make_inventory):
+        assert cpanel_servers(make_inventory(_FLEET)) == ["web-01", "web-02"]
+
+    @pytest.mark.parametrize(("definition", "indexed"), [
+        (ServerDefinition(host="10.0.0.5", role="webhost"), True),
+        (ServerDefinition(host="10.0.0.5", role="cpanel"), True),
+        (ServerDefinition(host="10.0.0.5", role="general", services=["cpanel"]), True),
+        (ServerDefinition(host="10.0.0.5", role="game-server"), False),
+    ])
+    def test_cpanel_server_detection(self, make_inventory, definition, indexed):
+        assert cpanel_servers(make_inventory({"srv-01": definition})) == (
+            ["srv-01"] if indexed else []
+        )
+
+
+class TestDomainIndex:
+    def test_store_and_lookup(self):
+        index = DomainIndex()
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), parse_domains(_DOMAIN_INFO))
+
+        owner = index.lookup("https://www.shop.example/page")
+        assert owner is not None
+        assert (owner.server, owner.user, owner.docroot) == ("web-01", "alice", "/home/alice/shop")
+        # Main domain known only from listaccts
+        assert index.lookup("bob.net").user == "bob"
+        assert index.lookup("unknown.org") is None
+
+    def test_store_replaces_server_entries(self):
+        index = DomainIndex()
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), parse_domains(_DOMAIN_INFO))
+        index.store("web-01", "10.0.0.5", [], [])
+        assert index.lookup("alice.com") is None
+        assert index.accounts("web-01") == []
+
+    def test_accounts_and_domain_map(self):
+        index = DomainIndex()
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), parse_domains(_DOMAIN_INFO))
+        assert index.accounts("web-01") == ["alice", "bob"]
+        assert index.domain_map("web-01")["shop.example"] == "alice"
+        assert index.stats() == {"servers": 1, "accounts": 2, "domains": 3}
+
+    def test_freshness(self):
+        index = DomainIndex(interval=60)
+        assert not index.is_fresh("web-01")
+        index.store("web-01", "10.0.0.5", [], [])
+        assert index.is_fresh("web-01")
+        index._conn().execute("UPDATE servers SET refreshed_at = ?", (time.time() - 120,))
+        assert not index.is_fresh("web-01")
+
+    def test_persisted(self, tmp_path):
+        path = tmp_path / "domains.sqlite3"
+        index = DomainIndex(path=path)
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), parse_domains(_DOMAIN_INFO))
+        index.close()
+
+        reopened = DomainIndex(path=path)
+        assert reopened.lookup("alice.com").server == "web-01"
+        reopened.close()
+
+    def test_disabled(self):
+        index = DomainIndex(enabled=False)
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), [])
+        assert index.lookup("alice.com") is None
+
+
+class TestRefresh:
+    async def test_refresh_indexes_cpanel_servers(self, make_inventory):
+        index = DomainIndex()
+        batch = _batch()
+        with patch("agent.tools.docker_tools._run_batch_on_server", batch):
+            assert await index.refresh(make_inventory(_FLEET)) == 2
+        servers = sorted(call.args[1] for call in batch.await_args_list)
+        assert servers == ["web-01", "web-02"]
+
+    async def test_failed_refresh_keeps_entries(self, make_inventory):
+        index = DomainIndex()
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), [])
+        failed = AsyncMock(return_value={
+            "accounts": ToolResult(error="timeout", exit_code=124),
+            "domains": ToolResult(error="timeout", exit_code=124),
+        })
+        with patch("agent.tools.docker_tools._run_batch_on_server", failed):
+            assert not await index.refresh_server(make_inventory(_FLEET), "web-01")
+        assert index.lookup("alice.com") is not None
+
+    async def test_resolve_refreshes_stale_on_miss(self, make_inventory):
+        index = DomainIndex()
+        batch = _batch()
+        with patch("agent.tools.docker_tools._run_batch_on_server", batch):
+            owner = await index.resolve(make_inventory(_FLEET), "shop.example")
+            assert owner is not None and owner.user == "alice"
+            # Fresh index: a miss doesn't re-fetch
+            assert await index.resolve(make_inventory(_FLEET), "nope.example") is None
+        assert batch.await_count == 2
+
+    async def test_hit_needs_no_ssh(self, make_inventory):
+        index = DomainIndex()
+        index.store("web-01", "10.0.0.5", [], parse_domains(_DOMAIN_INFO))
+        batch = _batch()
+        with patch("agent.tools.docker_tools._run_batch_on_server", batch):
+            assert (await index.resolve(make_inventory(_FLEET), "alice.com")).server == "web-01"
+        batch.assert_not_awaited()
+
+    async def test_stale_hit_follows_migrated_domain(self, make_inventory):
+        index = DomainIndex(interval=60)
+        index.store("web-01", "10.0.0.5", [], parse_domains(_DOMAIN_INFO))
+        index._conn().execute("UPDATE servers SET refreshed_at = ?", (time.time() - 120,))
+
+        async def batch(inventory, server, commands, timeout=30):
+            # shop.example now lives on web-02
+            domains = _DOMAIN_INFO if server == "web-02" else json.dumps({"data": {"domains": []}})
+            return {
+                "accounts": ToolResult(output=json.dumps({"data": {"acct": []}})),
+                "domains": ToolResult(output=domains),
+            }
+
+        with patch("agent.tools.docker_tools._run_batch_on_server", batch):
+            owner = await index.resolve(make_inventory(_FLEET), "shop.example")
+        assert owner is not None and owner.server == "web-02"
+
+    async def test_stale_hit_that_cannot_refresh_is_a_miss(self, make_inventory):
+        index = DomainIndex(interval=60)
+        index.store("web-01", "10.0.0.5", [], parse_domains(_DOMAIN_INFO))
+        index._conn().execute("UPDATE servers SET refreshed_at = ?", (time.time() - 120,))
+        failed = AsyncMock(return_value={
+            "accounts": ToolResult(error="timeout", exit_code=124),
+            "domains": ToolResult(error="timeout", exit_code=124),
+        })
+        with patch("agent.tools.docker_tools._run_batch_on_server", failed):
+            assert await index.resolve(make_inventory(_FLEET), "alice.com") is None
+        # The entries are kept for when the server answers again
+        assert index.lookup("alice.com").server == "web-01"
+
+    async def test_refresh_purges_removed_servers(self, make_inventory):
+        index = DomainIndex()
+        index.store("web-09", "10.0.0.99", parse_accounts(_LISTACCTS), parse_domains(_DOMAIN_INFO))
+        with patch("agent.tools.docker_tools._run_batch_on_server", _batch()):
+            await index.refresh(make_inventory(_FLEET), stale_only=True)
+        assert index.refreshed_at("web-09") is None
+        assert index.accounts("web-09") == []
+        assert index.domain_map("web-09") == {}
+        assert index.lookup("alice.com").server in ("web-01", "web-02")
+
+    async def test_partial_failure_keeps_entries_stale(self, make_inventory):
+        index = DomainIndex(interval=60)
+        index.store("web-01", "10.0.0.5", parse_accounts(_LISTACCTS), parse_domains(_DOMAIN_INFO))
+        index._conn().execute("UPDATE servers SET refreshed_at = ?", (time.time() - 120,))
+        half = AsyncMock(return_value={
+            "accounts": ToolResult(error="timeout", exit_code=124),
+            "domains": ToolResult(output=_DOMAIN_INFO),
+        })
+        with patch("agent.tools.docker_tools._run_batch_on_server", half):
+            assert not await index.refresh_server(make_inventory(_FLEET), "web-01")
+        assert index.accounts("web-01") == ["alice", "bob"]
+        assert index.domain_map("web-01")["bob.net"] == "bob"
+        # Not marked fresh, so customer_impact won't trust it
+        assert not index.is_fresh("web-01")
@@ -4,7 +4,10 @@ from __future__ import annotations
 
 import pytest
 
+from agent.config import PermissionsConfig, ServerDefinition, ServersConfig
+from agent.inventory import Inventory
 from agent.tools.health import (
+    _analyze,
     _analyze_webhost,
     _count_oom,
     _parse_containers,
@@ -234,3 +237,27 @@ class TestAnalyzeWebhost:
         _analyze_webhost({}, lines, issues)
         assert lines == []
         assert issues == []
+
+
+class TestAnalyzeSummary:
+    def _server(self):
+        servers = ServersConfig(servers={"web-01": ServerDefinition(host="10.0.0.5", role="webhost")})
+        return Inventory(servers, PermissionsConfig()).get_server("web-01")
+
+    def test_issues_and_readings(self):
+        raw = {
+            "uptime": " 10:41:03 up 31 days,  2:14,  1 user,  load average: 0.52, 0.61, 0.70",
+            "disk": "Filesystem Size Used Avail Use% Mounted on\n/dev/sda1 50G 45G 3.5G 91% /",
+            "memory": "              total used free\nMem: 32000 12000 20000",
+            "mail_queue": "12",
+        }
+        report, has_issues, summary = _analyze(self._server(), raw)
+        assert has_issues
+        assert "⚠ Disk /: 91% used" in report
+        assert summary["issues"] == [
+            {"sev": "warning", "msg": "Disk /: 91% used (3.5G free of 50G)"},
+        ]
+        # "Memory: OK" is implied by the absence of an issue
+        assert summary["metrics"] == {
+            "up": "31 days, 2:14", "load": "0.52 0.61 0.70", "mail_queue": "12",
+        }
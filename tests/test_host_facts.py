@@ -0,0 +1,152 @@
+"""Tests for the per-host facts cache."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+from agent.host_facts import HostFactsStore, first_existing, parse_probe_output
+from agent.tools.base import ToolResult
+
+_PROBE_OUTPUT = """\
+nproc=8
+os=AlmaLinux 8.9 (Midnight Oncilla)
+bin=whmapi1
+bin=mysql
+cgroup=cgroup2fs
+cpanel=118.0.12
+path=/usr/local/apache/logs/access_log
+path=/etc/httpd/domlogs
+path=/usr/local/cpanel/cpanel.config
+"""
+
+
+class TestParseProbeOutput:
+    def test_fields(self):
+        facts = parse_probe_output("10.0.0.5", _PROBE_OUTPUT)
+        assert facts.nproc == 8
+        assert facts.os.startswith("AlmaLinux")
+        assert facts.cgroup_version == 2
+        assert facts.cpanel_version == "118.0.12"
+        assert facts.is_cpanel and not facts.is_wings
+
+    def test_binaries(self):
+        facts = parse_probe_output("10.0.0.5", _PROBE_OUTPUT)
+        assert facts.has("mysql") is True
+        assert facts.has("docker") is False
+        assert facts.has("kubectl") is None  # not probed
+
+    def test_exists(self):
+        facts = parse_probe_output("10.0.0.5", _PROBE_OUTPUT)
+        assert facts.exists("/usr/local/apache/logs/access_log") is True
+        assert facts.exists("/var/log/nginx/access.log") is False
+        # Under a probed directory: present dir = unknown, absent dir = absent
+        assert facts.exists("/etc/httpd/domlogs/example.com") is None
+        assert facts.exists("/var/log/apache2/domlogs/example.com") is False
+        assert facts.exists("/opt/elsewhere/log") is None
+
+    def test_garbage_tolerated(self):
+        facts = parse_probe_output("h", "nproc=\nnoise\ncgroup=tmpfs\n")
+        assert facts.nproc is None
+        assert facts.cgroup_version == 1
+
+
+class TestHostFactsStore:
+    async def test_probes_once_within_ttl(self, make_inventory):
+        store = HostFactsStore()
+        run = AsyncMock(return_value=ToolResult(output=_PROBE_OUTPUT))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            first = await store.get(make_inventory(), "web-01")
+            second = await store.get(make_inventory(), "web-01")
+        assert first is second
+        assert run.await_count == 1
+
+    async def test_concurrent_callers_share_probe(self, make_inventory):
+        store = HostFactsStore()
+
+        async def slow(*_args):
+            await asyncio.sleep(0.01)
+            return ToolResult(output=_PROBE_OUTPUT)
+
+        run = AsyncMock(side_effect=slow)
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            results = await asyncio.gather(
+                *[store.get(make_inventory(), "web-01") for _ in range(5)]
+            )
+        assert run.await_count == 1
+        assert all(r is results[0] for r in results)
+
+    async def test_expired_or_moved_host_reprobes(self, make_inventory):
+        store = HostFactsStore(ttl=60)
+        run = AsyncMock(return_value=ToolResult(output=_PROBE_OUTPUT))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            facts = await store.get(make_inventory(), "web-01")
+            facts.gathered_at = time.time() - 120
+            await store.get(make_inventory(), "web-01")
+            await store.get(make_inventory(host="10.0.0.9"), "web-01")
+            await store.get(make_inventory(host="10.0.0.9"), "web-01", refresh=True)
+        assert run.await_count == 4
+
+    async def test_failed_probe_not_cached(self, make_inventory):
+        store = HostFactsStore()
+        run = AsyncMock(return_value=ToolResult(error="Connection refused", exit_code=255))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            assert await store.get(make_inventory(), "web-01") is None
+            assert await store.get(make_inventory(), "web-01") is None
+        assert run.await_count == 2
+
+    async def test_disabled(self, make_inventory):
+        store = HostFactsStore(ttl=0)
+        run = AsyncMock(return_value=ToolResult(output=_PROBE_OUTPUT))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            assert await store.get(make_inventory(), "web-01") is None
+        run.assert_not_awaited()
+
+    async def test_persisted_across_instances(self, make_inventory, tmp_path):
+        path = tmp_path / "host_facts.json"
+        store = HostFactsStore(path=path)
+        run = AsyncMock(return_value=ToolResult(output=_PROBE_OUTPUT))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            await store.get(make_inventory(), "web-01")
+
+        reloaded = HostFactsStore(path=path)
+        reloaded.load()
+        facts = reloaded.cached("web-01", "10.0.0.5")
+        assert facts is not None
+        assert facts.nproc == 8
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        path = tmp_path / "host_facts.json"
+        path.write_text("{not json")
+        store = HostFactsStore(path=path)
+        store.load()
+        assert store.cached("web-01", "10.0.0.5") is None
+
+
+class TestFirstExisting:
+    async def test_answers_from_facts(self, make_inventory):
+        store = HostFactsStore()
+        store._facts["web-01"] = parse_probe_output("10.0.0.5", _PROBE_OUTPUT)
+        run = AsyncMock()
+        with patch("agent.host_facts._store", store), \
+                patch("agent.tools.docker_tools._run_on_server", run):
+            path = await first_existing(make_inventory(), "web-01", [
+                "/var/log/apache2/domlogs/example.com",
+                "/var/log/apache2/access_log",
+                "/usr/local/apache/logs/access_log",
+            ])
+        assert path == "/usr/local/apache/logs/access_log"
+        run.assert_not_awaited()
+
+    async def test_unknown_paths_fall_back_to_test(self, make_inventory):
+        store = HostFactsStore()
+        store._facts["web-01"] = parse_probe_output("10.0.0.5", _PROBE_OUTPUT)
+        run = AsyncMock(return_value=ToolResult(exit_code=0))
+        with patch("agent.host_facts._store", store), \
+                patch("agent.tools.docker_tools._run_on_server", run):
+            path = await first_existing(make_inventory(), "web-01", [
+                "/etc/httpd/domlogs/example.com",
+            ])
+        assert path == "/etc/httpd/domlogs/example.com"
+        run.assert_awaited_once()
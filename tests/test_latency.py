@@ -0,0 +1,153 @@
+"""Tests for latency histograms and adaptive timeouts."""
+
+from __future__ import annotations
+
+import json
+
+from agent.tools.latency import (
+    LatencyHistogram,
+    LatencyTracker,
+    command_class,
+)
+
+
+class TestCommandClass:
+    def test_plain_command_uses_basename(self):
+        assert command_class("/usr/bin/du -sh /home") == "du"
+
+    def test_subcommand_tools(self):
+        assert command_class("docker logs --tail 100 web") == "docker logs"
+        assert command_class("systemctl status nginx") == "systemctl status"
+        assert command_class("wp --path=/var/www plugin list") == "wp plugin"
+
+    def test_wrappers_and_env_skipped(self):
+        assert command_class("sudo LANG=C timeout 5 df -h") == "df"
+
+    def test_user_switch_options_skipped(self):
+        assert command_class("sudo -u bob wp --path=/home/bob plugin list") == "wp plugin"
+        assert command_class("runuser -u bob -- wp --path=/home/bob db size") == "wp db"
+        assert command_class("timeout -s KILL 5 du -sh /home") == "du"
+
+    def test_cd_prefix_skipped(self):
+        assert command_class("cd /home/bob && wp core version") == "wp core"
+
+    def test_shell_script_classified_by_its_command(self):
+        assert command_class("sh -c 'find /home -name wp-config.php'") == "find"
+        assert command_class("bash -c 'cd /srv && du -sh .'") == "du"
+
+    def test_empty(self):
+        assert command_class("  ") == "?"
+
+
+class TestLatencyHistogram:
+    def test_quantile_is_bucket_upper_bound(self):
+        hist = LatencyHistogram()
+        for _ in range(99):
+            hist.add(0.08)
+        hist.add(4.0)
+        assert hist.quantile(0.5) == 0.1
+        assert hist.quantile(0.99) == 0.1
+        assert hist.quantile(1.0) == 5
+
+    def test_overflow_bucket_reports_max_seen(self):
+        hist = LatencyHistogram()
+        hist.add(900.0)
+        assert hist.quantile(0.99) == 900.0
+
+    def test_decays_instead_of_growing_forever(self):
+        hist = LatencyHistogram()
+        for _ in range(5000):
+            hist.add(1.0)
+        assert hist.total < 2000
+
+    def test_round_trip(self):
+        hist = LatencyHistogram()
+        hist.add(0.3)
+        again = LatencyHistogram.from_dict(json.loads(json.dumps(hist.to_dict())))
+        assert again is not None and again.counts == hist.counts
+
+    def test_rejects_foreign_bucket_layout(self):
+        assert LatencyHistogram.from_dict({"counts": [1, 2, 3]}) is None
+
+
+class TestLatencyTracker:
+    def _tracker(self, **kwargs) -> LatencyTracker:
+        kwargs.setdefault("min_samples", 5)
+        return LatencyTracker(**kwargs)
+
+    def test_default_until_enough_history(self):
+        tracker = self._tracker()
+        for _ in range(4):
+            tracker.record("web-01", "uptime", 0.05)
+        assert tracker.timeout_for("web-01", "uptime", 15) == 15
+
+    def test_fast_class_gets_shorter_timeout(self):
+        tracker = self._tracker(min_timeout=2)
+        for _ in range(10):
+            tracker.record("web-01", "sh -c 'uptime'", 0.05)
+        # A hung uptime fails after 2s instead of the caller's 15s
+        assert tracker.timeout_for("web-01", "sh -c 'uptime'", 15) == 2
+
+    def test_short_history_ignores_one_outlier(self):
+        tracker = self._tracker(min_timeout=1)
+        for _ in range(19):
+            tracker.record("web-01", "uptime", 0.4)
+        tracker.record("web-01", "uptime", 60)
+        # p95 of 20 samples: the 0.5s bucket, not the outlier
+        assert tracker.timeout_for("web-01", "uptime", 15) == 1.5
+
+    def test_slow_host_gets_longer_timeout(self):
+        tracker = self._tracker(factor=3.0, max_timeout=120)
+        for _ in range(10):
+            tracker.record("nfs-01", "du -sh /home", 11.0)
+        assert tracker.timeout_for("nfs-01", "du -sh /srv", 15) == 39
+        # Other hosts and other commands are unaffected
+        assert tracker.timeout_for("web-01", "du -sh /home", 15) == 15
+        assert tracker.timeout_for("nfs-01", "uptime", 15) == 15
+
+    def test_clamped_to_max(self):
+        tracker = self._tracker(max_timeout=30)
+        for _ in range(10):
+            tracker.record("nfs-01", "du /", 50)
+        assert tracker.timeout_for("nfs-01", "du /", 15) == 30
+
+    def test_repeated_timeouts_do_not_ratchet(self):
+        tracker = self._tracker(max_timeout=120)
+        for _ in range(10):
+            tracker.record_timeout("nfs-01", "du /", 15, 15)
+        learned = tracker.timeout_for("nfs-01", "du /", 15)
+        assert learned == 60  # the 20s bucket x 3
+        for _ in range(50):
+            # Timing out at the learned value records the default, not 60s
+            tracker.record_timeout("nfs-01", "du /", learned, 15)
+        assert tracker.timeout_for("nfs-01", "du /", 15) == 60
+
+    def test_disabled_returns_default(self):
+        tracker = self._tracker(enabled=False)
+        for _ in range(10):
+            tracker.record("web-01", "uptime", 0.05)
+        assert tracker.timeout_for("web-01", "uptime", 15) == 15
+
+    def test_persists_across_restarts(self, tmp_path):
+        path = tmp_path / "ssh_latency.json"
+        tracker = self._tracker(path=path)
+        for _ in range(10):
+            tracker.record("web-01", "uptime", 7.0)
+        tracker.save()
+
+        restarted = self._tracker(path=path)
+        restarted.load()
+        assert restarted.timeout_for("web-01", "uptime", 15) == 24
+        assert restarted.snapshot()["web-01"]["uptime"]["samples"] == 10
+
+    def test_save_without_changes_writes_nothing(self, tmp_path):
+        path = tmp_path / "ssh_latency.json"
+        self._tracker(path=path).save()
+        assert not path.exists()
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        path = tmp_path / "ssh_latency.json"
+        path.write_text("{not json")
+        tracker = self._tracker(path=path)
+        tracker.load()
+        assert tracker.snapshot() == {}
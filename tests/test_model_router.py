@@ -0,0 +1,148 @@
+"""Tests for choosing the fast or main model per turn."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from agent.config import AgentConfig
+from agent.model_router import DEEP, FAST, ModelRouter, classify
+
+
+def _router(**overrides: object) -> ModelRouter:
+    config = AgentConfig(
+        model="big-model", fast_model="small-model", fast_model_max_iterations=2,
+        **overrides,
+    )
+    return ModelRouter(config)
+
+
+def _response(stop_reason: str = "end_turn", input_tokens: int = 100, output_tokens: int = 20):
+    usage = SimpleNamespace(
+        input_tokens=input_tokens, output_tokens=output_tokens,
+        cache_read_input_tokens=50, cache_creation_input_tokens=None,
+    )
+    return SimpleNamespace(stop_reason=stop_reason, usage=usage)
+
+
+class TestClassify:
+    @pytest.mark.parametrize("message", [
+        "is gameserver-01 up?",
+        "list the containers on web-02",
+        "what's the disk usage on db-01",
+        "write the customer a short reply saying the server is back online",
+    ])
+    def test_quick(self, message: str) -> None:
+        assert classify(message) == FAST
+
+    @pytest.mark.parametrize("message", [
+        "why is the elementor editor slow on example.com?",
+        "players report lag on gameserver-01",
+        "site returns 502 intermittently",
+        "and web-02?",
+        "can you restart nginx on web-01",
+        "do a cleanup of /tmp on game-02",
+        "is it ok to kill pid 4242 on web-01?",
+    ])
+    def test_deep(self, message: str) -> None:
+        assert classify(message) == DEEP
+
+    def test_long_message_is_deep(self) -> None:
+        assert classify("is it up? " + "details " * 60) == DEEP
+
+
+class TestModelRouter:
+    def test_disabled_without_fast_model(self) -> None:
+        router = ModelRouter(AgentConfig(model="big-model"))
+        assert not router.enabled
+        router.start_turn("is web-01 up?")
+        assert router.model == "big-model"
+        assert not router.escalate("api_error")
+
+    def test_quick_turn_uses_fast_model(self) -> None:
+        router = _router()
+        assert router.start_turn("is web-01 up?") == FAST
+        router.start_round()
+        assert router.model == "small-model"
+
+    def test_deep_turn_uses_main_model(self) -> None:
+        router = _router()
+        router.start_turn("why is web-01 slow?")
+        router.start_round()
+        assert router.model == "big-model"
+
+    def test_deep_tool_escalates(self) -> None:
+        router = _router()
+        router.start_turn("is example.com up?")
+        router.observe_tool("diagnose_site", failed=False)
+        assert router.tier == DEEP
+
+    def test_tool_failure_escalates(self) -> None:
+        router = _router()
+        router.start_turn("is web-01 up?")
+        router.observe_tool("health_check", failed=False)
+        assert router.tier == FAST
+        router.observe_tool("health_check", failed=True)
+        assert router.tier == DEEP
+
+    def test_long_turn_escalates(self) -> None:
+        router = _router()
+        router.start_turn("list containers on web-01")
+        router.start_round()
+        router.start_round()
+        assert router.tier == FAST
+        router.start_round()
+        assert router.tier == DEEP
+
+    def test_max_tokens_escalates(self) -> None:
+        router = _router()
+        router.start_turn("is web-01 up?")
+        router.observe_response(_response(stop_reason="max_tokens"))
+        assert router.tier == DEEP
+
+    def test_escalation_lasts_until_next_turn(self) -> None:
+        router = _router()
+        router.start_turn("is web-01 up?")
+        assert router.escalate("api_error")
+        assert not router.escalate("api_error")
+        router.start_turn("is web-02 up?")
+        assert router.tier == FAST
+
+    def test_mutating_call_from_fast_round_is_held(self) -> None:
+        router = _router()
+        router.start_turn("is web-01 up?")
+        router.start_round()
+
+        assert router.hold_mutation("docker_restart")
+        # The other calls of the same fast round are held too
+        assert router.hold_mutation("service_restart")
+        assert router.tier == DEEP
+
+        router.start_round()
+        assert not router.hold_mutation("docker_restart")
+
+    def test_mutating_call_on_main_model_runs(self) -> None:
+        router = _router()
+        router.start_turn("why is web-01 slow?")
+        router.start_round()
+        assert not router.hold_mutation("docker_restart")
+
+    def test_record_accumulates_per_tier(self) -> None:
+        router = _router()
+        router.start_turn("is web-01 up?")
+        router.start_round()
+        # Escalated by a tool while the response streamed: still a fast call
+        router.observe_tool("diagnose_site", failed=False)
+        router.record(_response(), 0.5)
+        router.start_round()
+        router.record(_response(input_tokens=300, output_tokens=80), 2.0)
+        router.start_round()
+        router.record(_response(), 1.0)
+
+        assert router.stats[FAST].calls == 1
+        assert router.stats[FAST].latency_s == 0.5
+        assert router.stats[DEEP].calls == 2
+        assert router.stats[DEEP].input_tokens == 400
+        assert router.stats[DEEP].output_tokens == 100
+        assert router.stats[DEEP].cache_read_input_tokens == 100
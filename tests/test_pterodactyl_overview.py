@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from agent.tools.base import ToolResult
 from agent.tools.pterodactyl_overview import (
+    _build_overview,
     _build_overview_report,
     _classify_status,
     _parse_docker_ps,
@@ -149,3 +150,20 @@ class TestBuildOverviewReport:
         report = _build_overview_report(results)
         assert "broken-node" in report
         assert "Wings service: unknown" in report
+
+    def test_compact_data(self):
+        results = {
+            "node-01": self._node_checks(),
+            "node-02": self._node_checks(
+                wings_service=_ok("inactive"),
+                restarting=_ok("rust_01|Restarting (1) 5 seconds ago|rust:latest\n"),
+            ),
+        }
+        report, data = _build_overview(results)
+        assert report == _build_overview_report(results)
+        assert data["metrics"]["nodes"] == 2
+        assert {"sev": "critical", "msg": "wings inactive", "node": "node-02"} in data["issues"]
+        assert any(i["msg"] == "restart loop" and i["container"] == "rust_01" for i in data["issues"])
+        node = data["entities"][0]
+        assert node["wings"] == "active"
+        assert node["usage"]["mc_02"] == [8.0, 25.0]
@@ -0,0 +1,47 @@
+"""Tests for the read-only tool result cache."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from agent.tools.result_cache import ResultCache
+
+
+class TestResultCache:
+    def test_hit_within_ttl(self):
+        cache = ResultCache()
+        cache.put("docker_ps", {"server": "web-01"}, {"output": "x"}, ttl=30)
+        assert cache.get("docker_ps", {"server": "web-01"}) == {"output": "x"}
+        assert cache.stats()["hits"] == 1
+
+    def test_key_ignores_argument_order(self):
+        cache = ResultCache()
+        cache.put("docker_ps", {"server": "web-01", "all": True}, {"output": "x"}, ttl=30)
+        assert cache.get("docker_ps", {"all": True, "server": "web-01"}) is not None
+
+    def test_expires(self):
+        cache = ResultCache()
+        with patch("agent.tools.result_cache.time.monotonic", return_value=100.0):
+            cache.put("docker_ps", {"server": "web-01"}, {"output": "x"}, ttl=30)
+        with patch("agent.tools.result_cache.time.monotonic", return_value=131.0):
+            assert cache.get("docker_ps", {"server": "web-01"}) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_returned_result_is_a_copy(self):
+        cache = ResultCache()
+        cache.put("docker_ps", {"server": "web-01"}, {"output": "x"}, ttl=30)
+        cache.get("docker_ps", {"server": "web-01"})["output"] = "changed"
+        assert cache.get("docker_ps", {"server": "web-01"}) == {"output": "x"}
+
+    def test_invalidate_without_server_drops_everything(self):
+        cache = ResultCache()
+        cache.put("docker_ps", {"server": "web-01"}, {"output": "x"}, ttl=30)
+        cache.put("docker_ps", {"server": "web-02"}, {"output": "y"}, ttl=30)
+        assert cache.invalidate({}) == 2
+
+    def test_bounded(self):
+        cache = ResultCache(max_entries=2)
+        for i in range(3):
+            cache.put("docker_ps", {"server": f"web-{i}"}, {"output": ""}, ttl=30)
+        assert cache.get("docker_ps", {"server": "web-0"}) is None
+        assert cache.stats()["entries"] == 2
@@ -0,0 +1,105 @@
+"""Tests for deltas between repeated polling tool results."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from agent.tools.result_delta import DeltaTracker, diff_rows
+
+_PS = (
+    "CONTAINER ID   NAMES   STATUS         IMAGE\n"
+    "a1b2c3         mc-1    Up 3 days      itzg/minecraft\n"
+    "d4e5f6         rust-1  Up 2 hours     rust:latest\n"
+)
+
+_PROCESSLIST = (
+    "+----+------+-----------+----+---------+------+-------+------------------+\n"
+    "| Id | User | Host      | db | Command | Time | State | Info             |\n"
+    "+----+------+-----------+----+---------+------+-------+------------------+\n"
+    "| 12 | wp   | localhost | wp | Query   | {t}  | Sending data | SELECT 1  |\n"
+    "+----+------+-----------+----+---------+------+-------+------------------+\n"
+)
+
+
+class TestDiffRows:
+    def test_rows_matched_on_first_column(self):
+        after = _PS.replace("Up 2 hours", "Restarting (1)") + "g7h8i9 valheim-1 Up 1 minute lloesche/valheim\n"
+        changes = diff_rows(_PS, after)
+        assert changes["added"] == ["g7h8i9 valheim-1 Up 1 minute lloesche/valheim"]
+        assert changes["removed"] == []
+        assert changes["changed"] == [{
+            "was": "d4e5f6         rust-1  Up 2 hours     rust:latest",
+            "now": "d4e5f6         rust-1  Restarting (1)     rust:latest",
+        }]
+        assert changes["unchanged_rows"] == 2
+
+    def test_table_borders_ignored(self):
+        changes = diff_rows(_PROCESSLIST.format(t=5), _PROCESSLIST.format(t=9))
+        assert len(changes["changed"]) == 1
+        assert changes["unchanged_rows"] == 1
+
+    def test_duplicate_keys_fall_back_to_lines(self):
+        before = "ok a\nok b\n"
+        after = "ok a\nok c\n"
+        changes = diff_rows(before, after)
+        assert changes["added"] == ["ok c"]
+        assert changes["removed"] == ["ok b"]
+        assert changes["changed"] == []
+
+
+class TestDeltaTracker:
+    def test_first_call_is_full(self):
+        tracker = DeltaTracker(window=600)
+        result = {"output": _PS, "exit_code": 0}
+        assert tracker.apply("docker_ps", {"server": "game-01"}, result) is result
+
+    def test_unchanged_repeat(self):
+        tracker = DeltaTracker(window=600)
+        tracker.apply("docker_ps", {"server": "game-01"}, {"output": _PS, "exit_code": 0})
+        repeat = tracker.apply("docker_ps", {"server": "game-01"}, {"output": _PS, "exit_code": 0})
+        assert repeat["output"] == _PS
+        assert repeat["data"]["unchanged"] is True
+
+    def test_changed_repeat_sends_rows(self):
+        tracker = DeltaTracker(window=600)
+        before = _PS + "".join(f"ff{i:04d}   mc-{i}  Up 5 days   itzg/minecraft\n" for i in range(10))
+        tracker.apply("docker_ps", {"server": "game-01"}, {"output": before, "exit_code": 0})
+        after = before.replace("Up 2 hours", "Exited (137)")
+        repeat = tracker.apply("docker_ps", {"server": "game-01"}, {"output": after, "exit_code": 0})
+        assert list(repeat["data"]) == ["since_last_call_s", "changed", "unchanged_rows"]
+        assert repeat["data"]["unchanged_rows"] == 12
+
+    def test_full_and_other_input_bypass(self):
+        tracker = DeltaTracker(window=600)
+        result = {"output": _PS, "exit_code": 0}
+        tracker.apply("docker_ps", {"server": "game-01"}, result)
+        assert "data" not in tracker.apply("docker_ps", {"server": "game-01"}, result, full=True)
+        assert "data" not in tracker.apply("docker_ps", {"server": "game-02"}, result)
+
+    def test_outside_window_is_full(self):
+        tracker = DeltaTracker(window=60)
+        result = {"output": _PS, "exit_code": 0}
+        with patch("agent.tools.result_delta.time.monotonic", return_value=100.0):
+            tracker.apply("docker_ps", {}, result)
+        with patch("agent.tools.result_delta.time.monotonic", return_value=161.0):
+            assert "data" not in tracker.apply("docker_ps", {}, result)
+
+    def test_mostly_changed_output_is_full(self):
+        tracker = DeltaTracker(window=600)
+        tracker.apply("docker_ps", {}, {"output": _PS, "exit_code": 0})
+        other = "CONTAINER ID NAMES\nzzz1 new-1\nzzz2 new-2\n"
+        assert "data" not in tracker.apply("docker_ps", {}, {"output": other, "exit_code": 0})
+
+    def test_errors_reset_baseline(self):
+        tracker = DeltaTracker(window=600)
+        result = {"output": _PS, "exit_code": 0}
+        tracker.apply("docker_ps", {}, result)
+        tracker.apply("docker_ps", {}, {"error": "ssh failed"})
+        assert "data" not in tracker.apply("docker_ps", {}, result)
+
+    def test_clear(self):
+        tracker = DeltaTracker(window=600)
+        result = {"output": _PS, "exit_code": 0}
+        tracker.apply("docker_ps", {}, result)
+        tracker.clear()
+        assert "data" not in tracker.apply("docker_ps", {}, result)
@@ -0,0 +1,154 @@
+"""Tests for tool families, per-message routing and load_tools."""
+
+from __future__ import annotations
+
+import tempfile
+from typing import Any
+
+import pytest
+
+from agent.config import AgentConfig, ServerDefinition
+from agent.inventory import Inventory
+from agent.security.audit import AuditLogger
+from agent.tools.base import BaseTool, ToolResult
+from agent.tools.registry import ToolRegistry
+from agent.tools.router import FAMILIES, LoadTools, ToolSelection, family_of, route
+
+
+class _Named(BaseTool):
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._name
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"properties": {}}
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        return ToolResult(output="ok")
+
+
+_WEB_AND_GAME = {
+    "web-01": ServerDefinition(host="10.0.0.5", role="webhost", services=["cpanel", "mysql"]),
+    "game-01": ServerDefinition(host="10.0.0.7", role="game-server"),
+}
+
+
+@pytest.fixture
+def audit_logger():
+    tmp = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+    logger = AuditLogger(tmp.name)
+    yield logger
+    logger.close()
+
+
+def _registry(audit_logger, inventory: Inventory, *, routing: bool = True) -> ToolRegistry:
+    registry = ToolRegistry(AgentConfig(tool_routing=routing), inventory, audit_logger)
+    for name in ("health_check", "cpanel_list_accounts", "wp_sites", "mysql_status",
+                 "pterodactyl_server_status"):
+        registry.register(_Named(name))
+    if registry.selection is not None:
+        registry.register(LoadTools(registry))
+    return registry
+
+
+def _names(schemas: list[dict[str, Any]]) -> list[str]:
+    return [s["name"] for s in schemas]
+
+
+class TestFamilies:
+    def test_family_of(self):
+        assert family_of("cpanel_list_accounts") == "cpanel"
+        assert family_of("pterodactyl_power") == "game"
+        assert family_of("health_check") is None
+
+    def test_families_disjoint(self):
+        seen: set[str] = set()
+        for family in FAMILIES:
+            assert not seen & family.tools, family.name
+            seen |= family.tools
+
+    def test_route(self):
+        assert route("Players report rubber-banding on the Rust server", FAMILIES) == {"game"}
+        assert route("WordPress site example.com shows a 500", FAMILIES) >= {"wordpress", "web"}
+        assert route("slow queries on the database", FAMILIES) == {"mysql"}
+        assert route("is everything up?", FAMILIES) == set()
+
+    def test_cpanel_and_wp_plugins_are_not_game(self):
+        assert "game" not in route("can't log in to cpanel for example.com", FAMILIES)
+        assert "game" not in route("update the contact form plugin", FAMILIES)
+        assert route("the game panel shows the server offline", FAMILIES) == {"game"}
+        assert "game" in route("a server plugin broke after the update", FAMILIES)
+
+    def test_availability_by_role_or_service(self, make_inventory):
+        game = next(f for f in FAMILIES if f.name == "game")
+        assert not game.available(make_inventory({
+            "web": ServerDefinition(host="h", role="webhost"),
+        }))
+        assert game.available(make_inventory({
+            "node": ServerDefinition(host="h", role="general", services=["pterodactyl-wings"]),
+        }))
+
+
+class TestRegistrySchemas:
+    def test_static_filter_drops_unavailable_families(self, audit_logger, make_inventory):
+        registry = _registry(audit_logger, make_inventory({
+            "game": ServerDefinition(host="h", role="game-server"),
+        }))
+        assert _names(registry.get_schemas()) == [
+            "health_check", "pterodactyl_server_status", "load_tools",
+        ]
+
+    def test_families_subset(self, audit_logger, make_inventory):
+        registry = _registry(audit_logger, make_inventory(_WEB_AND_GAME))
+        assert _names(registry.get_schemas(set())) == ["health_check", "load_tools"]
+        assert _names(registry.get_schemas({"mysql"})) == [
+            "health_check", "mysql_status", "load_tools",
+        ]
+
+    def test_routing_disabled(self, audit_logger, make_inventory):
+        registry = _registry(audit_logger, make_inventory(_WEB_AND_GAME), routing=False)
+        assert registry.selection is None
+        assert len(registry.get_schemas()) == 5
+
+
+class TestSelection:
+    def test_select_is_sticky(self):
+        selection = ToolSelection(FAMILIES)
+        assert selection.select("check the mysql slow log") == ["mysql"]
+        assert selection.select("now the minecraft server") == ["game"]
+        assert selection.active == {"mysql", "game"}
+        selection.reset()
+        assert selection.active == set()
+
+    def test_only_available_families(self):
+        game = [f for f in FAMILIES if f.name == "game"]
+        selection = ToolSelection(game)
+        assert selection.select("wordpress plugin update on the minecraft panel") == ["game"]
+
+    def test_activate_for_tools(self):
+        selection = ToolSelection(FAMILIES)
+        assert selection.activate_for_tools(["health_check", "wp_sites"]) == ["wordpress"]
+
+
+class TestLoadTools:
+    async def test_loads_family(self, audit_logger, make_inventory):
+        registry = _registry(audit_logger, make_inventory(_WEB_AND_GAME))
+        result = await registry.dispatch("load_tools", {"families": ["cpanel"]})
+        assert result["output"] == "cpanel (loaded): cpanel_list_accounts"
+        assert registry.selection.active == {"cpanel"}
+
+    async def test_unknown_family(self, audit_logger, make_inventory):
+        registry = _registry(audit_logger, make_inventory({
+            "game": ServerDefinition(host="h", role="game-server"),
+        }))
+        result = await registry.dispatch("load_tools", {"families": ["cpanel"]})
+        assert "Unknown tool families: cpanel" in result["error"]
+        assert registry.selection.active == set()
@@ -107,6 +107,20 @@ class TestSessionStore:
         sessions = store.list_sessions()
         assert sessions[0].turns == 2
 
+    def test_compactions_saved(self, store, sample_messages):
+        record = {"at": 1700000000.0, "mode": "digest", "removed_messages": 6}
+        sid = store.create_id()
+        store.save(sid, sample_messages, compactions=[record])
+        assert store.load_compactions(sid) == [record]
+
+    def test_compactions_missing_in_old_files(self, store, sample_messages):
+        sid = store.create_id()
+        path = store.save(sid, sample_messages)
+        data = json.loads(path.read_text())
+        del data["compactions"]
+        path.write_text(json.dumps(data))
+        assert store.load_compactions(sid) == []
+
     def test_corrupt_file_skipped_in_list(self, store, sample_messages, tmp_path):
         """A corrupt JSON file should not crash list_sessions."""
         sid = store.create_id()
@@ -0,0 +1,83 @@
+"""Tests for single-flight coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from agent.tools.singleflight import SingleFlight
+
+
+class _Counter:
+    def __init__(self, delay: float = 0.05, fail: bool = False) -> None:
+        self.calls = 0
+        self.cancelled = False
+        self._delay = delay
+        self._fail = fail
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self._fail:
+            raise RuntimeError("boom")
+        return f"result {self.calls}"
+
+
+class TestSingleFlight:
+    async def test_concurrent_callers_share_one_execution(self):
+        flights = SingleFlight()
+        fn = _Counter()
+        results = await asyncio.gather(*[flights.do("k", fn) for _ in range(5)])
+        assert results == ["result 1"] * 5
+        assert fn.calls == 1
+        assert flights.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+    async def test_different_keys_run_separately(self):
+        flights = SingleFlight()
+        fn = _Counter()
+        await asyncio.gather(flights.do("a", fn), flights.do("b", fn))
+        assert fn.calls == 2
+
+    async def test_nothing_kept_after_completion(self):
+        flights = SingleFlight()
+        fn = _Counter(delay=0)
+        assert await flights.do("k", fn) == "result 1"
+        assert await flights.do("k", fn) == "result 2"
+
+    async def test_exception_raised_to_every_caller(self):
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *[flights.do("k", _Counter(fail=True)) for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_one_caller_cancelling_leaves_the_rest(self):
+        flights = SingleFlight()
+        fn = _Counter(delay=0.1)
+        quitter = asyncio.ensure_future(flights.do("k", fn))
+        stayer = asyncio.ensure_future(flights.do("k", fn))
+        await asyncio.sleep(0.01)
+        quitter.cancel()
+
+        assert await stayer == "result 1"
+        assert not fn.cancelled
+        with pytest.raises(asyncio.CancelledError):
+            await quitter
+
+    async def test_execution_cancelled_when_every_caller_gives_up(self):
+        flights = SingleFlight()
+        fn = _Counter(delay=10)
+        callers = [asyncio.ensure_future(flights.do("k", fn)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+
+        assert fn.cancelled
+        assert flights.in_flight == 0
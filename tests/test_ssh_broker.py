@@ -0,0 +1,224 @@
+"""Tests for the cross-process SSH broker."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import stat
+from collections.abc import Callable
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agent.config import PermissionsConfig, RolePermissions, ServerDefinition
+from agent.inventory import Inventory
+from agent.tools.ssh_broker import BrokerClient, SSHBroker
+from agent.tools.ssh_pool import _PGID_MARKER, SSHPool, read_only_calls
+
+
+_PERMISSIONS = PermissionsConfig(roles={
+    "web": RolePermissions(allowed_commands=["uptime", "df -h", "free -m", "sleep *"]),
+})
+
+
+@pytest.fixture
+def inventory(make_inventory) -> Callable[..., Inventory]:
+    """web-01 with a key and a web allowlist; ``host`` moves it."""
+
+    def _make(host: str = "10.0.0.5") -> Inventory:
+        return make_inventory({
+            "web-01": ServerDefinition(host=host, role="web", key_path="/keys/id"),
+        }, permissions=_PERMISSIONS)
+
+    return _make
+
+
+class _Process:
+    def __init__(self, stdout: str, delay: float, events: list[str]) -> None:
+        self._stdout = stdout
+        self._delay = delay
+        self._events = events
+        lines = [f"{_PGID_MARKER}4242\n", ""]
+        self.stderr = MagicMock()
+        self.stderr.readline = AsyncMock(side_effect=lambda: lines.pop(0) if lines else "")
+
+    async def wait(self, check: bool = False):
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self._events.append("cancelled")
+            raise
+        return MagicMock(stdout=self._stdout, stderr="", exit_status=0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+def _conn(stdout: str = "from broker", delay: float = 0.0) -> MagicMock:
+    events: list[str] = []
+    conn = MagicMock()
+    conn.events = events
+    conn._transport.is_closing.return_value = False
+    conn.create_process = AsyncMock(
+        # The post-cancel reap must not wait out the delay
+        side_effect=lambda cmd, input=None: _Process(
+            stdout, 0 if "kill -TERM" in cmd else delay, events,
+        ),
+    )
+    return conn
+
+
+@pytest.fixture
+async def broker(tmp_path, inventory):
+    pool = SSHPool()
+    conn = _conn()
+    pool._connections["web-01"] = conn
+    socket_path = str(tmp_path / "b.sock")
+    broker = SSHBroker(pool, inventory(), socket_path, audit=MagicMock())
+    await broker.start()
+    yield socket_path, pool, conn, broker._audit
+    await broker.stop()
+    await pool.close_all()
+
+
+class TestBroker:
+    async def test_run_goes_through_broker(self, broker, inventory):
+        socket_path, _pool, conn, _audit = broker
+        client_pool = SSHPool(broker_socket=socket_path)
+        server_info = inventory().get_server("web-01")
+
+        result = await client_pool.run(server_info, "uptime")
+
+        assert result.output == "from broker"
+        assert conn.create_process.await_count == 1
+        assert client_pool.active_connections == []
+        assert client_pool.stats()["brokered"] == 1
+        await client_pool.close_all()
+
+    async def test_requests_multiplex_on_one_connection(self, broker, inventory):
+        socket_path, _pool, _conn_, _audit = broker
+        client_pool = SSHPool(broker_socket=socket_path)
+        server_info = inventory().get_server("web-01")
+
+        results = await asyncio.gather(
+            client_pool.run(server_info, "uptime"),
+            client_pool.run_batch(server_info, {"a": "df -h", "b": "free -m"}),
+        )
+
+        assert results[0].output == "from broker"
+        assert set(results[1]) == {"a", "b"}
+        await client_pool.close_all()
+
+    async def test_read_only_calls_coalesce_across_clients(self, broker, inventory):
+        socket_path, pool, conn, _audit = broker
+        conn.create_process.side_effect = lambda cmd, input=None: _Process(
+            "from broker", 0.05, conn.events,
+        )
+        clients = [SSHPool(broker_socket=socket_path) for _ in range(2)]
+        server_info = inventory().get_server("web-01")
+
+        with read_only_calls():
+            results = await asyncio.gather(
+                *(c.run(server_info, "uptime") for c in clients),
+            )
+
+        assert [r.output for r in results] == ["from broker"] * 2
+        assert conn.create_process.await_count == 1
+        assert pool.stats()["coalesced"] == 1
+        for client in clients:
+            await client.close_all()
+
+    async def test_mutating_calls_not_coalesced_across_clients(self, broker, inventory):
+        socket_path, pool, conn, _audit = broker
+        conn.create_process.side_effect = lambda cmd, input=None: _Process(
+            "from broker", 0.05, conn.events,
+        )
+        clients = [SSHPool(broker_socket=socket_path) for _ in range(2)]
+        server_info = inventory().get_server("web-01")
+
+        await asyncio.gather(*(c.run(server_info, "uptime") for c in clients))
+
+        assert conn.create_process.await_count == 2
+        assert pool.stats()["coalesced"] == 0
+        for client in clients:
+            await client.close_all()
+
+    async def test_mismatched_server_runs_locally(self, broker, inventory):
+        socket_path, _pool, conn, _audit = broker
+        client = BrokerClient(socket_path)
+        # Same name, different host: not the broker's server
+        server_info = inventory(host="10.9.9.9").get_server("web-01")
+
+        assert await client.run(server_info, "uptime", 30, wait=5) is None
+        assert conn.create_process.await_count == 0
+        await client.close()
+
+    async def test_no_broker_means_local(self, tmp_path, inventory):
+        client = BrokerClient(str(tmp_path / "missing.sock"))
+        server_info = inventory().get_server("web-01")
+
+        assert await client.run(server_info, "uptime", 30, wait=5) is None
+        # Not retried on every call while the broker is away
+        assert not await client._connect()
+
+    async def test_cancel_reaches_broker(self, broker, inventory):
+        socket_path, pool, _conn_, _audit = broker
+        slow = _conn(delay=30)
+        pool._connections["web-01"] = slow
+        client = BrokerClient(socket_path)
+        server_info = inventory().get_server("web-01")
+
+        task = asyncio.ensure_future(client.run(server_info, "sleep 30", 60, wait=90))
+        for _ in range(50):
+            if slow.create_process.await_count:
+                break
+            await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        for _ in range(50):
+            if slow.events:
+                break
+            await asyncio.sleep(0.02)
+
+        assert slow.events == ["cancelled"]
+        await client.close()
+
+    async def test_socket_is_owner_only(self, broker):
+        socket_path, _pool, _conn_, _audit = broker
+
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+    async def test_command_outside_allowlist_runs_locally(self, broker, inventory):
+        socket_path, _pool, conn, audit = broker
+        client = BrokerClient(socket_path)
+        server_info = inventory().get_server("web-01")
+
+        assert await client.run(server_info, "rm -rf /tmp/x", 30, wait=5) is None
+        results = await client.run_many(
+            "run_batch", server_info, {"a": "uptime", "b": "cat /etc/shadow"}, 30, wait=5,
+        )
+
+        assert results is None
+        assert conn.create_process.await_count == 0
+        assert audit.log_denied.call_count == 2
+        await client.close()
+
+    async def test_brokered_commands_are_audited(self, broker, inventory):
+        socket_path, _pool, _conn_, audit = broker
+        client = BrokerClient(socket_path)
+        server_info = inventory().get_server("web-01")
+
+        await client.run(server_info, "uptime", 30, wait=5)
+        await client.run_many("run_batch", server_info, {"a": "df -h", "b": "free -m"}, 30, wait=5)
+
+        logged = [c.args[1] for c in audit.log_success.call_args_list]
+        assert logged == [
+            {"server": "web-01", "command": "uptime"},
+            {"server": "web-01", "command": "df -h"},
+            {"server": "web-01", "command": "free -m"},
+        ]
+        await client.close()
@@ -8,7 +8,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from agent.tools.ssh_pool import SSHPool
+from agent.tools.ssh_pool import SSHPool, read_only_calls
 
 
 class TestSSHPoolUnit:
@@ -71,3 +71,900 @@ class TestSSHPoolUnit:
         lock1_again = await pool._get_lock("server1")
         assert lock1 is lock1_again
         assert lock1 is not lock2
+
+
+def _server(
+    name: str = "web-01", ssh: bool = True, max_sessions: int = 8, adaptive: bool = False,
+) -> MagicMock:
+    server_info = MagicMock()
+    server_info.name = name
+    server_info.definition.ssh = ssh
+    server_info.definition.host = "10.0.0.5"
+    server_info.definition.user = "claude-agent"
+    server_info.definition.key_path = "/nonexistent/key"
+    server_info.definition.max_sessions = max_sessions
+    server_info.definition.adaptive_sessions = adaptive
+    return server_info
+
+
+def _marker_stderr(pgid: int = 4242, rest: str = "") -> MagicMock:
+    """stderr reader that starts with the pool's PGID report line."""
+    from agent.tools.ssh_pool import _PGID_MARKER
+
+    chunks = [f"{_PGID_MARKER}{pgid}\n", rest]
+    reader = MagicMock()
+    reader.readline = AsyncMock(side_effect=lambda: chunks.pop(0) if chunks else "")
+    reader.read = AsyncMock(
+        side_effect=lambda n=-1: "".join(chunks.pop(0) for _ in range(len(chunks))),
+    )
+    return reader
+
+
+class _FakeProcess:
+    """Minimal stand-in for asyncssh.SSHClientProcess."""
+
+    def __init__(
+        self, stdout: str, exit_status: int, delay: float = 0.0, pgid: int = 4242,
+    ) -> None:
+        self._result = MagicMock(stdout=stdout, stderr="", exit_status=exit_status)
+        self._delay = delay
+        self.stderr = _marker_stderr(pgid)
+
+    async def wait(self, check: bool = False):
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        return self._result
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+def _fake_conn(stdout: str = "ok", exit_status: int = 0, delay: float = 0.0) -> MagicMock:
+    conn = MagicMock()
+    conn._transport.is_closing.return_value = False
+    conn.create_process = AsyncMock(
+        side_effect=lambda cmd: _FakeProcess(stdout, exit_status, delay),
+    )
+    return conn
+
+
+class _ShellProcess:
+    """Runs the command's stdin through a real local ``sh -s``."""
+
+    def __init__(self, input: str | None) -> None:
+        self._input = input or ""
+        self.stderr = _marker_stderr()
+
+    async def wait(self, check: bool = False):
+        import subprocess
+
+        proc = await asyncio.to_thread(
+            subprocess.run, ["sh", "-s"], input=self._input,
+            capture_output=True, text=True,
+        )
+        return MagicMock(stdout=proc.stdout, stderr=proc.stderr, exit_status=proc.returncode)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+def _shell_conn() -> MagicMock:
+    conn = MagicMock()
+    conn._transport.is_closing.return_value = False
+    conn.create_process = AsyncMock(
+        side_effect=lambda cmd, input=None: _ShellProcess(input),
+    )
+    return conn
+
+
+class TestConnectErrorMapping:
+    """Friendly error messages carried over from run_remote_command."""
+
+    def test_timeout(self):
+        from agent.tools.ssh_pool import describe_connect_error
+        msg = describe_connect_error(_server(), asyncio.TimeoutError())
+        assert "timed out" in msg
+        assert "servers.yaml" in msg
+
+    def test_permission_denied(self):
+        import asyncssh
+
+        from agent.tools.ssh_pool import describe_connect_error
+        msg = describe_connect_error(_server(), asyncssh.PermissionDenied("nope"))
+        assert "permission denied" in msg
+        assert "authorized_keys" in msg
+
+    def test_host_key_not_verifiable(self):
+        import asyncssh
+
+        from agent.tools.ssh_pool import describe_connect_error
+        msg = describe_connect_error(_server(), asyncssh.HostKeyNotVerifiable("bad"))
+        assert "ssh-keyscan 10.0.0.5" in msg
+
+    def test_os_error(self):
+        from agent.tools.ssh_pool import describe_connect_error
+        msg = describe_connect_error(_server(), OSError("No route to host"))
+        assert "port 22" in msg
+
+    @pytest.mark.asyncio
+    async def test_missing_key_file_reported(self):
+        pool = SSHPool()
+        result = await pool.run(_server(), "uptime")
+        assert result.exit_code == 1
+        assert "SSH key not found" in result.error
+
+
+class TestSharedPool:
+    """All remote paths share one process-wide pool."""
+
+    @pytest.mark.asyncio
+    async def test_get_ssh_pool_is_singleton(self):
+        from agent.tools.ssh_pool import close_ssh_pool, get_ssh_pool
+        try:
+            assert get_ssh_pool() is get_ssh_pool()
+        finally:
+            await close_ssh_pool()
+
+    @pytest.mark.asyncio
+    async def test_docker_tools_reexports_shared_pool(self):
+        from agent.tools import docker_tools
+        from agent.tools.ssh_pool import close_ssh_pool, get_ssh_pool
+        try:
+            assert docker_tools.get_ssh_pool() is get_ssh_pool()
+        finally:
+            await close_ssh_pool()
+
+    @pytest.mark.asyncio
+    async def test_run_remote_command_reuses_connection(self):
+        from agent.tools.remote import run_remote_command
+        from agent.tools.ssh_pool import close_ssh_pool, get_ssh_pool
+
+        server_info = _server()
+        conn = _fake_conn("up 3 days")
+        pool = get_ssh_pool()
+        pool._connections[server_info.name] = conn
+        try:
+            with patch.dict("sys.modules", {"asyncssh": MagicMock()}):
+                r1 = await run_remote_command(server_info, "uptime")
+                r2 = await run_remote_command(server_info, "uptime")
+            assert r1.output == "up 3 days"
+            assert r2.success
+            assert conn.create_process.await_count == 2
+        finally:
+            pool._connections.clear()
+            await close_ssh_pool()
+
+    @pytest.mark.asyncio
+    async def test_health_uses_pool_run_batch(self):
+        from agent.tools.health import _run_remote_parallel
+        from agent.tools.ssh_pool import close_ssh_pool, get_ssh_pool
+
+        server_info = _server()
+        pool = get_ssh_pool()
+        conn = _shell_conn()
+        pool._connections[server_info.name] = conn
+        try:
+            with patch.dict("sys.modules", {"asyncssh": MagicMock()}):
+                raw = await _run_remote_parallel(
+                    server_info, {"nproc": "echo 4", "bad": "echo boom >&2; exit 3"},
+                )
+            assert raw == {"nproc": "4", "bad": "ERROR:boom"}
+            assert conn.create_process.await_count == 1
+        finally:
+            pool._connections.clear()
+            await close_ssh_pool()
+
+
+class TestChannelLimiter:
+    """Per-host channel caps with a FIFO queue."""
+
+    @pytest.mark.asyncio
+    async def test_fifo_order(self):
+        from agent.tools.ssh_pool import ChannelLimiter
+
+        limiter = ChannelLimiter(1)
+        order: list[int] = []
+
+        async def worker(i: int) -> None:
+            async with limiter:
+                order.append(i)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*[worker(i) for i in range(5)])
+        assert order == [0, 1, 2, 3, 4]
+        assert limiter.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        from agent.tools.ssh_pool import ChannelLimiter
+
+        limiter = ChannelLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+        assert limiter.in_use == 0
+        assert limiter.queued == 0
+
+    def test_aimd_halves_on_failure_and_recovers(self):
+        from agent.tools.ssh_pool import ChannelLimiter
+
+        limiter = ChannelLimiter(8, adaptive=True)
+        limiter.record_failure()
+        assert limiter.limit == 4
+        for _ in range(50):
+            limiter.record_open(0.01)
+        assert limiter.limit == 8  # capped at max_sessions
+
+    def test_aimd_backs_off_on_latency_spike(self):
+        from agent.tools.ssh_pool import ChannelLimiter
+
+        limiter = ChannelLimiter(8, adaptive=True)
+        limiter.record_open(0.05)
+        limiter.record_open(2.0)
+        assert limiter.limit == 4
+
+    def test_static_limit_ignores_failures(self):
+        from agent.tools.ssh_pool import ChannelLimiter
+
+        limiter = ChannelLimiter(8)
+        limiter.record_failure()
+        assert limiter.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_run_many_respects_max_sessions(self):
+        pool = SSHPool()
+        server_info = _server(max_sessions=3)
+        peak = 0
+        active = 0
+
+        class _Tracking(_FakeProcess):
+            async def wait(self, check: bool = False):
+                nonlocal peak, active
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                return self._result
+
+        conn = _fake_conn()
+        conn.create_process = AsyncMock(side_effect=lambda cmd: _Tracking("ok", 0))
+        pool._connections[server_info.name] = conn
+        with patch.dict("sys.modules", {"asyncssh": MagicMock()}):
+            results = await pool.run_many(
+                server_info, {f"c{i}": f"uptime {i}" for i in range(20)},
+            )
+        assert all(r.success for r in results.values())
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_channel_open_failure_is_retried(self):
+        import asyncssh
+
+        pool = SSHPool()
+        server_info = _server(adaptive=True)
+        conn = _fake_conn("fine")
+        calls = 0
+
+        async def _create(cmd):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise asyncssh.ChannelOpenError(1, "administratively prohibited")
+            return _FakeProcess("fine", 0)
+
+        conn.create_process = AsyncMock(side_effect=_create)
+        pool._connections[server_info.name] = conn
+        result = await pool.run(server_info, "uptime")
+        assert result.output == "fine"
+        assert pool.channel_stats()["web-01"]["limit"] == 4
+
+
+class TestPoolLifecycle:
+    """Idle TTL, LRU cap, background health, and stats."""
+
+    def _seed(self, pool: SSHPool, name: str, conn: MagicMock | None = None) -> MagicMock:
+        conn = conn or _fake_conn()
+        pool._connections[name] = conn
+        pool._server_infos[name] = _server(name)
+        pool._touch(name)
+        return conn
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_counted(self, tmp_path):
+        import asyncssh
+
+        key = tmp_path / "key"
+        key.write_text("x")
+        server_info = _server()
+        server_info.definition.key_path = str(key)
+        pool = SSHPool()
+        with patch.object(asyncssh, "connect", AsyncMock(return_value=_fake_conn())), \
+                patch.object(asyncssh, "read_private_key", MagicMock()):
+            await pool.run(server_info, "uptime")
+            await pool.run(server_info, "uptime")
+        stats = pool.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["active"] == 1
+
+    def test_idle_ttl_eviction(self):
+        pool = SSHPool(idle_ttl=60)
+        conn = self._seed(pool, "old")
+        self._seed(pool, "fresh")
+        pool._last_used["old"] -= 120
+        assert pool.evict_idle() == 1
+        assert pool.active_connections == ["fresh"]
+        conn.close.assert_called_once()
+        assert pool.stats()["evictions"] == 1
+
+    def test_busy_connection_not_evicted(self):
+        pool = SSHPool(idle_ttl=60)
+        self._seed(pool, "busy")
+        pool._last_used["busy"] -= 120
+        pool._get_limiter(_server("busy"))._in_use = 1
+        assert pool.evict_idle() == 0
+
+    def test_lru_cap_evicts_least_recent(self):
+        pool = SSHPool(max_connections=2)
+        for name in ("a", "b", "c"):
+            self._seed(pool, name)
+        pool._touch("a")  # a is now most recent; b is LRU
+        pool._evict_over_capacity()
+        assert sorted(pool.active_connections) == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_check_health_reopens_broken_connection(self):
+        pool = SSHPool()
+        broken = self._seed(pool, "web-01")
+        broken._transport.is_closing.return_value = True
+        replacement = _fake_conn()
+
+        async def _reconnect(server_info):
+            pool._connections[server_info.name] = replacement
+            pool._stats.reconnects += 1
+            return replacement
+
+        with patch.object(pool, "_get_connection", side_effect=_reconnect):
+            await pool.check_health()
+        assert pool._connections["web-01"] is replacement
+        assert pool.stats()["reconnects"] == 1
+
+    @pytest.mark.asyncio
+    async def test_check_health_probes_quiet_connection(self):
+        pool = SSHPool(health_interval=30)
+        conn = self._seed(pool, "web-01")
+        pool._last_used["web-01"] -= 60
+        await pool.check_health()
+        conn.create_process.assert_awaited_once()
+        assert conn.create_process.await_args.args[0].endswith("\ntrue")
+        assert pool.active_connections == ["web-01"]
+
+    @pytest.mark.asyncio
+    async def test_maintenance_task_stopped_by_close_all(self):
+        pool = SSHPool(health_interval=3600)
+        pool.start_maintenance()
+        task = pool._maintenance_task
+        assert task is not None and not task.done()
+        await pool.close_all()
+        assert task.done()
+
+    @pytest.mark.asyncio
+    async def test_configure_ssh_pool_applies_settings(self):
+        from agent.tools import ssh_pool as mod
+
+        try:
+            mod.configure_ssh_pool(idle_ttl=123, max_connections=7)
+            pool = mod.get_ssh_pool()
+            assert pool.idle_ttl == 123
+            assert pool.max_connections == 7
+        finally:
+            mod._pool_settings.clear()
+            await mod.close_ssh_pool()
+
+
+class TestPrewarm:
+    """Parallel warm-up and one-time key parsing."""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_connects_ssh_servers_only(self):
+        pool = SSHPool()
+        opened: list[str] = []
+
+        async def _connect(server_info):
+            opened.append(server_info.name)
+            return MagicMock(), ""
+
+        servers = [_server("a"), _server("b"), _server("local", ssh=False)]
+        with patch.object(pool, "_connect_or_error", side_effect=_connect):
+            results = await pool.warm_up(servers, concurrency=1)
+        assert sorted(opened) == ["a", "b"]
+        assert results == {"a": "", "b": ""}
+
+    @pytest.mark.asyncio
+    async def test_warm_up_skipped_when_brokered(self):
+        pool = SSHPool(broker_socket="/run/bastion-agent/ssh-broker.sock")
+        connect = AsyncMock(return_value=(MagicMock(), ""))
+        with patch.object(pool, "_connect_or_error", connect):
+            assert await pool.warm_up([_server("a"), _server("b")]) == {}
+        connect.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_bounds_concurrency(self):
+        pool = SSHPool()
+        active = 0
+        peak = 0
+
+        async def _connect(server_info):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return MagicMock(), ""
+
+        servers = [_server(f"s{i}") for i in range(12)]
+        with patch.object(pool, "_connect_or_error", side_effect=_connect):
+            await pool.warm_up(servers, concurrency=4)
+        assert peak == 4
+
+    def test_client_key_parsed_once(self, tmp_path):
+        import asyncssh
+
+        from agent.tools import ssh_pool as mod
+
+        key = tmp_path / "id_ed25519"
+        key.write_text("x")
+        reader = MagicMock(return_value="parsed")
+        with patch.object(asyncssh, "read_private_key", reader):
+            assert mod.load_client_key(str(key)) == "parsed"
+            assert mod.load_client_key(str(key)) == "parsed"
+        assert reader.call_count == 1
+        mod._key_cache.clear()
+
+
+class TestRunBatch:
+    """Labelled commands packed into one exec."""
+
+    @pytest.mark.asyncio
+    async def test_one_exec_for_all_commands(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = _shell_conn()
+        pool._connections[server_info.name] = conn
+
+        results = await pool.run_batch(
+            server_info, {"a": "echo one", "b": "printf 'two\\nlines'", "c": "exit 5"},
+        )
+
+        assert conn.create_process.await_count == 1
+        assert conn.create_process.await_args.args[0].endswith("\nsh -s")
+        assert results["a"].output == "one"
+        assert results["b"].output == "two\nlines"
+        assert results["c"].exit_code == 5
+
+    @pytest.mark.asyncio
+    async def test_remote_timeout_reported_per_command(self):
+        pool = SSHPool()
+        server_info = _server()
+        pool._connections[server_info.name] = _shell_conn()
+
+        results = await pool.run_batch(
+            server_info, {"slow": "sleep 5", "fast": "echo hi"}, timeout=1,
+        )
+
+        assert "Timed out" in results["slow"].error
+        assert results["fast"].success
+        assert results["fast"].output == "hi"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_run_many_without_frames(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = MagicMock()
+        conn._transport.is_closing.return_value = False
+        conn.create_process = AsyncMock(
+            side_effect=lambda cmd, input=None: _FakeProcess("garbage", 0),
+        )
+        pool._connections[server_info.name] = conn
+
+        results = await pool.run_batch(server_info, {"a": "uptime", "b": "df"})
+
+        # One batch attempt, then one exec per command.
+        assert conn.create_process.await_count == 3
+        assert all(r.output == "garbage" for r in results.values())
+
+    @pytest.mark.asyncio
+    async def test_local_server_rejected(self):
+        pool = SSHPool()
+        results = await pool.run_batch(_server(ssh=False), {"a": "uptime"})
+        assert results["a"].exit_code == 1
+
+
+class _FakeStreamProcess:
+    """asyncssh-style process with line-readable stdout."""
+
+    def __init__(self, lines: list[str], exit_status: int = 0, stderr: str = "") -> None:
+        self._lines = list(lines)
+        self.stdout = MagicMock()
+        self.stdout.readline = AsyncMock(side_effect=self._readline)
+        self.stderr = _marker_stderr(rest=stderr)
+        self.exit_status = exit_status
+        self.close = MagicMock()
+
+    async def _readline(self) -> str:
+        return self._lines.pop(0) if self._lines else ""
+
+    async def wait(self, check: bool = False):
+        return MagicMock(exit_status=self.exit_status)
+
+
+class TestRunStream:
+    """Line streaming with byte/line budgets."""
+
+    def _pool_with(self, process: _FakeStreamProcess) -> tuple[SSHPool, MagicMock]:
+        pool = SSHPool()
+        server_info = _server()
+        conn = MagicMock()
+        conn._transport.is_closing.return_value = False
+        conn.create_process = AsyncMock(return_value=process)
+        pool._connections[server_info.name] = conn
+        return pool, conn
+
+    @pytest.mark.asyncio
+    async def test_streams_lines_and_exit_status(self):
+        process = _FakeStreamProcess(["a\n", "b\n"], exit_status=0, stderr="warn\n")
+        pool, conn = self._pool_with(process)
+        stream = pool.run_stream(_server(), "tail -n 5 log")
+
+        async with stream:
+            lines = [line async for line in stream]
+
+        assert lines == ["a", "b"]
+        assert stream.exit_status == 0
+        assert stream.stderr == "warn\n"
+        process.close.assert_not_called()
+        # The remote side enforces the byte cap too
+        assert "head -c" in conn.create_process.await_args.args[0]
+        assert pool._limiters["web-01"].in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_line_budget_closes_channel(self):
+        process = _FakeStreamProcess([f"{i}\n" for i in range(1000)])
+        pool, _conn = self._pool_with(process)
+
+        result = await pool.run_stream(_server(), "cat big", max_lines=5).collect()
+
+        assert result.output.splitlines()[:5] == ["0", "1", "2", "3", "4"]
+        assert "truncated" in result.output
+        process.close.assert_called_once()
+        assert pool._limiters["web-01"].in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_holds_channel_slot_while_open(self):
+        process = _FakeStreamProcess(["x\n", "y\n"])
+        pool, _conn = self._pool_with(process)
+        stream = pool.run_stream(_server(max_sessions=1), "cat")
+
+        async with stream:
+            async for _line in stream:
+                assert pool._limiters["web-01"].in_use == 1
+                break
+        assert pool._limiters["web-01"].in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_local_server_rejected(self):
+        result = await SSHPool().run_stream(_server(ssh=False), "uptime").collect()
+        assert result.exit_code == 1
+        assert "local" in result.error.lower()
+
+
+class TestReaping:
+    """Remote processes are killed on timeout or cancel."""
+
+    def _pool_with_slow_command(self) -> tuple[SSHPool, MagicMock]:
+        pool = SSHPool()
+        conn = MagicMock()
+        conn._transport.is_closing.return_value = False
+        processes = iter([_FakeProcess("", 0, delay=5, pgid=777), _FakeProcess("2\n", 0)])
+        conn.create_process = AsyncMock(side_effect=lambda cmd: next(processes))
+        pool._connections["web-01"] = conn
+        return pool, conn
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process_group(self):
+        from agent.tools.ssh_pool import track_reaped
+
+        pool, conn = self._pool_with_slow_command()
+        with track_reaped() as reaped:
+            result = await pool.run(_server(), "find / -name core", timeout=0.2)
+
+        assert "timed out" in result.error
+        reap_cmd = conn.create_process.await_args_list[1].args[0]
+        assert "kill -TERM -777" in reap_cmd
+        assert reaped[0] == 2
+        assert pool.stats()["reaped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_process_group(self):
+        pool, conn = self._pool_with_slow_command()
+        task = asyncio.ensure_future(pool.run(_server(), "du -sh /"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert conn.create_process.await_count == 2
+        assert pool.stats()["reaped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stderr_before_marker_kept(self):
+        from agent.tools.ssh_pool import read_pgid
+
+        process = MagicMock()
+        process.stderr.readline = AsyncMock(return_value="fish: $$ is not supported\n")
+        pgid, head = await read_pgid(process)
+        assert pgid is None
+        assert head.startswith("fish")
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="needs procps ps and kill -- -PGID")
+    def test_reap_script_kills_group(self):
+        import subprocess
+
+        from agent.tools.ssh_pool import _reap_script
+
+        victim = subprocess.Popen(
+            ["sh", "-c", "sleep 30 & sleep 30; wait"], start_new_session=True,
+        )
+        try:
+            import time
+            time.sleep(0.2)
+            out = subprocess.run(
+                ["sh", "-c", _reap_script(victim.pid)], capture_output=True, text=True,
+            )
+            assert int(out.stdout.strip()) >= 2
+            assert victim.wait(timeout=5) != 0
+        finally:
+            if victim.poll() is None:
+                victim.kill()
+
+
+
+class TestCircuitBreakerIntegration:
+    """A down host fails fast instead of costing every call the connect timeout."""
+
+    def _key_server(self, tmp_path) -> MagicMock:
+        key = tmp_path / "key"
+        key.write_text("x")
+        server_info = _server()
+        server_info.definition.key_path = str(key)
+        return server_info
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast(self, tmp_path):
+        import asyncssh
+
+        server_info = self._key_server(tmp_path)
+        pool = SSHPool(breaker_cooldown=60)
+        connect = AsyncMock(side_effect=OSError("Connection refused"))
+        with patch.object(asyncssh, "connect", connect), \
+                patch.object(asyncssh, "read_private_key", MagicMock()), \
+                patch("agent.tools.ssh_pool.asyncio.sleep", AsyncMock()):
+            first = await pool.run(server_info, "uptime")
+            second = await pool.run(server_info, "uptime")
+
+        assert "Connection refused" in first.error
+        assert connect.await_count == 3  # first call retried, second never connected
+        assert "unreachable since" in second.error
+        assert pool.stats()["short_circuits"] == 1
+        assert pool.stats()["unreachable"] == ["web-01"]
+
+    @pytest.mark.asyncio
+    async def test_half_open_trial_readmits_host(self, tmp_path):
+        import asyncssh
+
+        server_info = self._key_server(tmp_path)
+        pool = SSHPool(breaker_cooldown=0)
+        connect = AsyncMock(side_effect=[OSError("refused")] * 3 + [_fake_conn("up")])
+        with patch.object(asyncssh, "connect", connect), \
+                patch.object(asyncssh, "read_private_key", MagicMock()), \
+                patch("agent.tools.ssh_pool.asyncio.sleep", AsyncMock()):
+            await pool.run(server_info, "uptime")
+            result = await pool.run(server_info, "uptime")
+
+        assert result.output == "up"
+        assert connect.await_count == 4  # trial is a single attempt
+        assert pool.unreachable() == {}
+
+    @pytest.mark.asyncio
+    async def test_auth_failure_does_not_open_breaker(self, tmp_path):
+        import asyncssh
+
+        server_info = self._key_server(tmp_path)
+        pool = SSHPool()
+        denied = asyncssh.PermissionDenied("denied")
+        with patch.object(asyncssh, "connect", AsyncMock(side_effect=denied)), \
+                patch.object(asyncssh, "read_private_key", MagicMock()):
+            await pool.run(server_info, "uptime")
+        assert pool.unreachable() == {}
+
+    @pytest.mark.asyncio
+    async def test_maintenance_probes_open_breaker(self, tmp_path):
+        import asyncssh
+
+        server_info = self._key_server(tmp_path)
+        pool = SSHPool(breaker_cooldown=0)
+        connect = AsyncMock(side_effect=[OSError("refused")] * 3 + [_fake_conn()])
+        with patch.object(asyncssh, "connect", connect), \
+                patch.object(asyncssh, "read_private_key", MagicMock()), \
+                patch("agent.tools.ssh_pool.asyncio.sleep", AsyncMock()):
+            await pool.run(server_info, "uptime")
+            assert pool.unreachable()
+            await pool.check_health()
+
+        assert pool.unreachable() == {}
+        assert pool.active_connections == ["web-01"]
+
+
+class TestAdaptiveTimeouts:
+    """Timeouts learned from per-host latency history."""
+
+    @pytest.mark.asyncio
+    async def test_run_records_latency(self):
+        pool = SSHPool()
+        server_info = _server()
+        pool._connections[server_info.name] = _fake_conn()
+
+        await pool.run(server_info, "uptime")
+
+        assert pool.latency.snapshot()["web-01"]["uptime"]["samples"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_host_gets_longer_timeout(self):
+        from agent.tools.latency import LatencyTracker
+
+        pool = SSHPool(latency=LatencyTracker(min_timeout=0.1, min_samples=3))
+        server_info = _server()
+        for _ in range(3):
+            pool.latency.record(server_info.name, "uptime", 0.2)
+        pool._connections[server_info.name] = _fake_conn(delay=0.3)
+
+        result = await pool.run(server_info, "uptime", timeout=0.1)
+
+        assert result.output == "ok"
+        assert pool.latency.snapshot()["web-01"]["uptime"]["samples"] == 4
+
+    @pytest.mark.asyncio
+    async def test_hung_command_fails_fast_on_fast_host(self):
+        from agent.tools.latency import LatencyTracker
+
+        pool = SSHPool(latency=LatencyTracker(min_timeout=0.2, min_samples=3))
+        server_info = _server()
+        for _ in range(3):
+            pool.latency.record(server_info.name, "uptime", 0.01)
+        pool._connections[server_info.name] = _fake_conn(delay=5)
+
+        result = await pool.run(server_info, "uptime", timeout=30)
+
+        assert "timed out after 0.2s" in result.error
+        # The timeout itself becomes history
+        assert pool.latency.snapshot()["web-01"]["uptime"]["samples"] == 4
+
+    @pytest.mark.asyncio
+    async def test_batch_learns_per_command(self):
+        pool = SSHPool()
+        server_info = _server()
+        pool._connections[server_info.name] = _shell_conn()
+
+        await pool.run_batch(server_info, {"a": "echo one", "b": "true"})
+
+        learned = pool.latency.snapshot()["web-01"]
+        assert set(learned) == {"echo", "true"}  # not the "sh -s" wrapper
+
+    @pytest.mark.asyncio
+    async def test_close_all_persists_history(self, tmp_path):
+        from agent.tools.latency import LatencyTracker
+
+        path = tmp_path / "ssh_latency.json"
+        pool = SSHPool(latency=LatencyTracker(path=path))
+        pool.latency.record("web-01", "uptime", 0.1)
+        await pool.close_all()
+        assert path.exists()
+
+
+class TestCoalescing:
+    """Identical commands in flight on one host share an exec."""
+
+    @pytest.mark.asyncio
+    async def test_identical_commands_share_one_channel(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = _fake_conn(stdout="up 3 days", delay=0.05)
+        pool._connections[server_info.name] = conn
+
+        with read_only_calls():
+            results = await asyncio.gather(
+                pool.run(server_info, "uptime"),
+                pool.run(server_info, "uptime"),
+                pool.run(server_info, "free -m"),
+            )
+
+        assert [r.output for r in results] == ["up 3 days"] * 3
+        assert conn.create_process.await_count == 2
+        assert pool.stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_calls_that_may_mutate_not_coalesced(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = _fake_conn(delay=0.05)
+        pool._connections[server_info.name] = conn
+
+        with read_only_calls(False):
+            await asyncio.gather(
+                pool.run(server_info, "systemctl restart nginx"),
+                pool.run(server_info, "systemctl restart nginx"),
+            )
+        # Outside any tool call (read-only unknown) nothing is shared either
+        await asyncio.gather(pool.run(server_info, "uptime"), pool.run(server_info, "uptime"))
+
+        assert conn.create_process.await_count == 4
+        assert pool.stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_identical_batches_share_one_exec(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = _shell_conn()
+        pool._connections[server_info.name] = conn
+        batch = {"a": "echo one", "b": "echo two"}
+
+        with read_only_calls():
+            first, second, other = await asyncio.gather(
+                pool.run_batch(server_info, batch),
+                pool.run_batch(server_info, dict(batch)),
+                pool.run_batch(server_info, {"a": "echo three"}),
+            )
+
+        assert first["a"].output == second["a"].output == "one"
+        assert first is not second  # each caller gets its own dict
+        assert other["a"].output == "three"
+        assert conn.create_process.await_count == 2
+        assert pool.stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_mutating_batches_not_coalesced(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = _shell_conn()
+        pool._connections[server_info.name] = conn
+        batch = {"a": "echo one"}
+
+        with read_only_calls(False):
+            await asyncio.gather(
+                pool.run_batch(server_info, batch), pool.run_batch(server_info, batch),
+            )
+
+        assert conn.create_process.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_commands_not_coalesced(self):
+        pool = SSHPool()
+        server_info = _server()
+        conn = _fake_conn()
+        pool._connections[server_info.name] = conn
+
+        await pool.run(server_info, "uptime")
+        await pool.run(server_info, "uptime")
+
+        assert conn.create_process.await_count == 2
+        assert pool.stats()["coalesced"] == 0
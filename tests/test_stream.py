@@ -0,0 +1,144 @@
+"""Tests for streaming command output with budgets."""
+
+from __future__ import annotations
+
+import subprocess
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent.tools.docker_tools import _stream_on_server
+from agent.tools.stream import CommandStream, cap_output_command
+
+
+def _local_inventory() -> MagicMock:
+    inventory = MagicMock()
+    inventory.get_server.return_value.definition.ssh = False
+    return inventory
+
+
+class TestCapOutputCommand:
+
+    def _sh(self, command: str, max_bytes: int, tail: bool = False) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["sh", "-c", cap_output_command(command, max_bytes, tail=tail)],
+            capture_output=True, text=True,
+        )
+
+    def test_tail_keeps_last_bytes(self):
+        proc = self._sh("seq 1 100000; exit 2", 12, tail=True)
+        assert proc.stdout == "99999\n100000\n"
+        assert proc.returncode == 2
+
+    def test_output_capped_remotely(self):
+        proc = self._sh("seq 1 100000", 20)
+        assert len(proc.stdout) == 21
+
+    def test_exit_status_preserved(self):
+        proc = self._sh("echo hello; exit 3", 100)
+        assert proc.stdout == "hello\n"
+        assert proc.returncode == 3
+
+    def test_stderr_untouched(self):
+        proc = self._sh("echo oops >&2; false", 100)
+        assert proc.stderr == "oops\n"
+        assert proc.returncode == 1
+
+
+def test_transport_hooks_are_abstract():
+    with pytest.raises(TypeError):
+        CommandStream("true")  # type: ignore[abstract]
+
+
+class TestLocalStream:
+
+    @pytest.mark.asyncio
+    async def test_tail_keeps_newest_lines(self):
+        stream = _stream_on_server(
+            _local_inventory(), "localhost", "seq 1 100000", max_lines=3, tail=True,
+        )
+        result = await stream.collect()
+        assert result.output.splitlines()[-3:] == ["99998", "99999", "100000"]
+        assert result.output.startswith("... (earlier output dropped; last 3 lines")
+        assert stream.exit_status == 0
+
+    @pytest.mark.asyncio
+    async def test_tail_byte_budget_drops_oldest(self):
+        stream = _stream_on_server(
+            _local_inventory(), "localhost", "seq 1 100000", max_bytes=14, tail=True,
+        )
+        async with stream:
+            lines = [line async for line in stream]
+        assert lines == ["99999", "100000"]
+        assert stream.truncated
+
+    @pytest.mark.asyncio
+    async def test_lines_yielded_until_eof(self):
+        stream = _stream_on_server(_local_inventory(), "localhost", "seq 1 5")
+        async with stream:
+            lines = [line async for line in stream]
+        assert lines == ["1", "2", "3", "4", "5"]
+        assert stream.exit_status == 0
+        assert not stream.truncated
+
+    @pytest.mark.asyncio
+    async def test_line_budget_stops_command(self):
+        stream = _stream_on_server(
+            _local_inventory(), "localhost", "seq 1 10000000", max_lines=10,
+        )
+        result = await stream.collect()
+        assert result.success
+        assert result.output.splitlines()[:10] == [str(i) for i in range(1, 11)]
+        assert "truncated after 10 lines" in result.output
+        assert stream._proc.returncode is not None  # killed, not left running
+
+    @pytest.mark.asyncio
+    async def test_byte_budget(self):
+        stream = _stream_on_server(
+            _local_inventory(), "localhost", "seq 1 100000", max_bytes=100,
+        )
+        async with stream:
+            async for _line in stream:
+                pass
+        assert stream.truncated
+        assert stream.bytes_read <= 100
+
+    @pytest.mark.asyncio
+    async def test_early_exit_closes_process(self):
+        stream = _stream_on_server(_local_inventory(), "localhost", "seq 1 10000000")
+        async with stream:
+            async for line in stream:
+                if line == "3":
+                    break
+        assert stream._proc.returncode is not None
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        stream = _stream_on_server(_local_inventory(), "localhost", "sleep 5", timeout=0.3)
+        result = await stream.collect()
+        assert stream.timed_out
+        assert "timed out" in result.error
+
+    @pytest.mark.asyncio
+    async def test_nonzero_exit_reported(self):
+        result = await _stream_on_server(
+            _local_inventory(), "localhost", "ls /nonexistent-path",
+        ).collect()
+        assert result.exit_code != 0
+        assert "nonexistent" in result.error
+
+    @pytest.mark.asyncio
+    async def test_command_not_found(self):
+        result = await _stream_on_server(
+            _local_inventory(), "localhost", "no-such-binary-xyz",
+        ).collect()
+        assert result.exit_code == 1
+        assert "Command not found" in result.error
+
+    @pytest.mark.asyncio
+    async def test_unknown_server(self):
+        inventory = MagicMock()
+        inventory.get_server.side_effect = KeyError("Unknown server 'nope'")
+        result = await _stream_on_server(inventory, "nope", "uptime").collect()
+        assert result.exit_code == 1
+        assert "nope" in result.error
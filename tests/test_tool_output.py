@@ -0,0 +1,136 @@
+"""Tests for the tool output store and read_tool_output."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from agent.tools.tool_output import (
+    MAX_READ_CHARS,
+    OutputStore,
+    ReadToolOutput,
+    get_output_store,
+    offload,
+    preview,
+)
+
+_LOG = "\n".join(f"line {i} {'ERROR disk full' if i == 500 else 'ok'}" for i in range(1, 1001))
+
+
+class TestOutputStore:
+    def test_put_and_get(self):
+        store = OutputStore()
+        handle = store.put("hello")
+        assert handle.startswith("out-")
+        assert store.get(handle) == "hello"
+        assert store.get("out-0000000000") is None
+
+    def test_memory_only_eviction_forgets(self):
+        store = OutputStore(memory_bytes=10)
+        first = store.put("a" * 8)
+        store.put("b" * 8)
+        assert store.get(first) is None
+        assert store.stats()["entries"] == 1
+
+    def test_memory_counts_encoded_bytes(self):
+        store = OutputStore(memory_bytes=10)
+        first = store.put("é" * 4)
+        assert store.stats() == {"entries": 1, "bytes": 8}
+        # Six characters, but twelve bytes: over the limit
+        store.put("é" * 2)
+        assert store.get(first) is None
+        assert store.stats() == {"entries": 1, "bytes": 4}
+
+    def test_evicted_outputs_spill_to_disk(self, tmp_path):
+        store = OutputStore(path=tmp_path, memory_bytes=10)
+        first = store.put("a" * 8)
+        store.put("b" * 8)
+        assert (tmp_path / f"{first}.txt").exists()
+        assert store.get(first) == "a" * 8
+
+    def test_disk_bounded(self, tmp_path):
+        store = OutputStore(path=tmp_path, memory_bytes=1, disk_bytes=20)
+        for _ in range(6):
+            store.put("x" * 8)
+        assert sum(p.stat().st_size for p in tmp_path.glob("out-*.txt")) <= 20
+
+    def test_handle_must_be_well_formed_for_disk(self, tmp_path):
+        store = OutputStore(path=tmp_path)
+        assert store.get("../secrets") is None
+
+
+class TestOffload:
+    def test_preview_keeps_head_and_tail(self):
+        shown = preview(_LOG, 5000)
+        assert "line 1 ok" in shown
+        assert "line 1000 ok" in shown
+        assert "lines omitted" in shown
+
+    def test_result_replaced_by_preview_and_handle(self):
+        result = {"output": _LOG, "error": "warning: slow", "exit_code": 0}
+        slimmed = offload(result, 2000)
+        assert len(json.dumps(slimmed)) < 3000
+        full = slimmed["full_output"]
+        assert full["lines"] == 1002
+        stored = get_output_store().get(full["handle"])
+        assert stored.startswith("line 1 ok")
+        assert stored.endswith("warning: slow")
+
+    def test_compact_payload_is_what_gets_previewed(self):
+        issues = [{"sev": "warning", "msg": f"server-{i} disk 91%"} for i in range(80)]
+        result = {
+            "output": "PTERODACTYL FLEET OVERVIEW\n" + "█ row\n" * 500,
+            "exit_code": 0,
+            "data": {"issues": issues},
+        }
+        slimmed = offload(result, 2000, compact=True)
+
+        assert "FLEET OVERVIEW" not in slimmed["output"]
+        assert "server-0 disk 91%" in slimmed["output"]
+        stored = get_output_store().get(slimmed["full_output"]["handle"]).splitlines()
+        assert len(stored) == 81
+        assert stored[3] == 'data.issues[3] {"sev":"warning","msg":"server-3 disk 91%"}'
+        assert stored[-1] == "exit_code 0"
+
+    def test_report_previewed_without_compact(self):
+        result = {"output": _LOG, "exit_code": 0, "data": {"issues": []}}
+        assert offload(result, 2000)["output"].startswith("line 1 ok")
+
+
+class TestReadToolOutput:
+    @pytest.fixture
+    def handle(self):
+        return get_output_store().put(_LOG)
+
+    async def test_line_range(self, handle):
+        result = await ReadToolOutput().execute(handle=handle, lines="499-501")
+        assert result.output.splitlines() == [
+            "[lines 499-501 of 1000]",
+            "line 499 ok",
+            "line 500 ERROR disk full",
+            "line 501 ok",
+        ]
+
+    async def test_byte_range(self, handle):
+        result = await ReadToolOutput().execute(handle=handle, offset=0, length=9)
+        assert result.output.endswith("\nline 1 ok")
+
+    async def test_grep_with_context(self, handle):
+        result = await ReadToolOutput().execute(handle=handle, pattern="error", context=1)
+        assert "[1 matching lines of 1000]" in result.output
+        assert "500: line 500 ERROR disk full" in result.output
+        assert "499: line 499 ok" in result.output
+
+    async def test_reply_is_bounded(self, handle):
+        result = await ReadToolOutput().execute(handle=handle, lines="1-1000")
+        assert len(result.output) <= MAX_READ_CHARS + 100
+
+    async def test_unknown_handle(self):
+        result = await ReadToolOutput().execute(handle="out-ffffffffff")
+        assert result.exit_code == 1
+        assert "evicted" in result.error
+
+    async def test_bad_pattern(self, handle):
+        result = await ReadToolOutput().execute(handle=handle, pattern="(")
+        assert "Invalid pattern" in result.error
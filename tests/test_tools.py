@@ -18,7 +18,7 @@ from agent.config import (
 )
 from agent.inventory import Inventory
 from agent.security.audit import AuditLogger
-from agent.tools.base import BaseTool, ToolResult
+from agent.tools.base import BaseTool, ToolResult, model_view, parse_issue
 from agent.tools.registry import ToolRegistry
 
 
@@ -83,6 +83,91 @@ class SlowTool(BaseTool):
         return ToolResult(output="done")
 
 
+class CountingReadTool(BaseTool):
+    """Read-only tool with a cache TTL that counts its executions."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "counting_read"
+
+    @property
+    def cache_ttl(self) -> float:
+        return 60
+
+    @property
+    def description(self) -> str:
+        return "Counts calls"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"properties": {"server": {"type": "string"}}, "required": []}
+
+    async def execute(self, *, server: str = "all", **kwargs: Any) -> ToolResult:
+        self.calls += 1
+        return ToolResult(output=f"{server} call {self.calls}")
+
+
+class PollingTool(CountingReadTool):
+    """Read-only tool whose repeat calls may be answered with a delta."""
+
+    @property
+    def name(self) -> str:
+        return "polling"
+
+    @property
+    def cache_ttl(self) -> float:
+        return 0
+
+    @property
+    def delta(self) -> bool:
+        return True
+
+    async def execute(self, *, server: str = "all", **kwargs: Any) -> ToolResult:
+        self.calls += 1
+        rows = "".join(f"c{i} Up {i} days\n" for i in range(20))
+        return ToolResult(output="ID STATUS\n" + rows + ("c99 Restarting\n" if self.calls > 2 else ""))
+
+
+class MutatingTool(DummyTool):
+    """Changes server state."""
+
+    @property
+    def name(self) -> str:
+        return "mutating_tool"
+
+    @property
+    def mutates(self) -> bool:
+        return True
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"properties": {"server": {"type": "string"}}, "required": []}
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        return ToolResult(output="changed")
+
+
+class ReapingSlowTool(SlowTool):
+    """Times out; on cancel reports reaped remote processes like the SSH pool."""
+
+    @property
+    def name(self) -> str:
+        return "reaping_slow_tool"
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        from agent.tools.ssh_pool import _reaped_in_call
+
+        try:
+            await asyncio.sleep(100)
+        except asyncio.CancelledError:
+            _reaped_in_call.get()[0] += 3
+            raise
+        return ToolResult(output="done")
+
+
 @pytest.fixture
 def agent_config() -> AgentConfig:
     return AgentConfig(command_timeout=2)  # Short timeout for tests
@@ -147,6 +232,24 @@ class TestToolResult:
         assert d["error"] == "warn"
         assert d["exit_code"] == 0
 
+    def test_to_dict_carries_data(self):
+        r = ToolResult(output="## web-01\n⚠ Disk", data={"issues": []})
+        assert r.to_dict()["data"] == {"issues": []}
+        assert "data" not in ToolResult(output="x").to_dict()
+
+    def test_model_view_sends_data_instead_of_output(self):
+        d = ToolResult(output="report", error="partial", exit_code=1, data={"metrics": {}}).to_dict()
+        assert model_view(d) == {"data": {"metrics": {}}, "error": "partial", "exit_code": 1}
+        plain = ToolResult(output="x").to_dict()
+        assert model_view(plain) is plain
+
+    def test_parse_issue(self):
+        assert parse_issue("  ⚠ Disk /: 91% used", server="web-01") == {
+            "sev": "warning", "msg": "Disk /: 91% used", "server": "web-01",
+        }
+        assert parse_issue("✗ OOM kills")["sev"] == "critical"
+        assert parse_issue("Mail queue: 12")["sev"] == "info"
+
     def test_to_dict_omits_empty_error(self):
         """output is always present; error is omitted when empty."""
         r = ToolResult(exit_code=0)
@@ -228,3 +331,167 @@ class TestToolDispatch:
         result = await registry.dispatch("slow_tool", {})
         assert "error" in result
         assert "timed out" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_audits_reaped_processes(self, registry, audit_logger):
+        import json
+
+        registry.register(ReapingSlowTool())
+        result = await registry.dispatch("reaping_slow_tool", {})
+        assert "timed out" in result["error"]
+
+        entries = [json.loads(l) for l in audit_logger._log_path.read_text().splitlines()]
+        timeout_entry = next(e for e in entries if e["event"] == "tool_timeout")
+        assert timeout_entry["reaped_processes"] == 3
+
+    @pytest.mark.asyncio
+    async def test_cancel_is_audited_and_propagates(self, registry, audit_logger):
+        import json
+
+        registry.register(SlowTool())
+        task = asyncio.ensure_future(registry.dispatch("slow_tool", {}))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        entries = [json.loads(l) for l in audit_logger._log_path.read_text().splitlines()]
+        assert entries[-1]["event"] == "tool_cancelled"
+        assert "reaped_processes" not in entries[-1]
+
+
+class TestResultCache:
+    """Read-only results reused within their TTL; mutations invalidate."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_call_served_from_cache_and_audited(self, registry, audit_logger):
+        import json
+
+        tool = CountingReadTool()
+        registry.register(tool)
+        first = await registry.dispatch("counting_read", {"server": "web-01"})
+        second = await registry.dispatch("counting_read", {"server": "web-01"})
+
+        assert first == second
+        assert tool.calls == 1
+        entries = [json.loads(l) for l in audit_logger._log_path.read_text().splitlines()]
+        successes = [e for e in entries if e["event"] == "tool_success"]
+        assert "cached" not in successes[0]
+        assert successes[1]["cached"] is True
+
+    @pytest.mark.asyncio
+    async def test_different_input_is_a_miss(self, registry):
+        tool = CountingReadTool()
+        registry.register(tool)
+        await registry.dispatch("counting_read", {"server": "web-01"})
+        await registry.dispatch("counting_read", {"server": "web-02"})
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_mutation_invalidates_same_server_and_fleet_wide(self, registry):
+        tool = CountingReadTool()
+        registry.register(tool)
+        registry.register(MutatingTool())
+        for server in ("web-01", "web-02", "all"):
+            await registry.dispatch("counting_read", {"server": server})
+
+        await registry.dispatch("mutating_tool", {"server": "web-01"})
+        for server in ("web-01", "web-02", "all"):
+            await registry.dispatch("counting_read", {"server": server})
+
+        # web-01 and the fleet-wide entry re-ran; web-02 was still cached
+        assert tool.calls == 5
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_config(self, inventory, audit_logger):
+        registry = ToolRegistry(AgentConfig(tool_cache=False), inventory, audit_logger)
+        tool = CountingReadTool()
+        registry.register(tool)
+        await registry.dispatch("counting_read", {"server": "web-01"})
+        await registry.dispatch("counting_read", {"server": "web-01"})
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, registry):
+        class _Flaky(CountingReadTool):
+            async def execute(self, **kwargs: Any) -> ToolResult:
+                self.calls += 1
+                return ToolResult(error="boom", exit_code=1)
+
+        tool = _Flaky()
+        registry.register(tool)
+        await registry.dispatch("counting_read", {})
+        await registry.dispatch("counting_read", {})
+        assert tool.calls == 2
+
+
+class TestCoalescingScope:
+    """Only read-only tools may share an identical command in flight."""
+
+    @pytest.mark.asyncio
+    async def test_read_only_tool_may_coalesce(self, registry):
+        from agent.tools.ssh_pool import coalescing_allowed
+
+        seen: list[bool] = []
+
+        class _Probe(CountingReadTool):
+            async def execute(self, **kwargs: Any) -> ToolResult:
+                seen.append(coalescing_allowed())
+                return ToolResult(output="ok")
+
+        class _MutatingProbe(MutatingTool):
+            async def execute(self, **kwargs: Any) -> ToolResult:
+                seen.append(coalescing_allowed())
+                return ToolResult(output="changed")
+
+        registry.register(_Probe())
+        registry.register(_MutatingProbe())
+        await registry.dispatch("counting_read", {})
+        await registry.dispatch("mutating_tool", {})
+
+        assert seen == [True, False]
+        assert not coalescing_allowed()
+
+
+class TestResultDelta:
+    """Repeat polls of delta tools send the model what changed."""
+
+    def test_full_parameter_in_schema(self, registry):
+        registry.register(PollingTool())
+        registry.register(CountingReadTool())
+        schemas = {s["name"]: s for s in registry.get_schemas()}
+        assert "full" in schemas["polling"]["input_schema"]["properties"]
+        assert "full" not in schemas["counting_read"]["input_schema"]["properties"]
+
+    @pytest.mark.asyncio
+    async def test_repeat_poll(self, registry):
+        registry.register(PollingTool())
+        first = await registry.dispatch("polling", {"server": "web-01"})
+        second = await registry.dispatch("polling", {"server": "web-01"})
+        third = await registry.dispatch("polling", {"server": "web-01"})
+        assert "data" not in first
+        assert second["data"]["unchanged"] is True
+        assert third["data"]["added"] == ["c99 Restarting"]
+        # The operator still sees everything
+        assert "c99 Restarting" in third["output"]
+
+    @pytest.mark.asyncio
+    async def test_full_opts_out(self, registry):
+        tool = PollingTool()
+        registry.register(tool)
+        await registry.dispatch("polling", {"server": "web-01"})
+        result = await registry.dispatch("polling", {"server": "web-01", "full": True})
+        assert "data" not in result
+
+    @pytest.mark.asyncio
+    async def test_cleared_and_disabled(self, inventory, audit_logger, registry):
+        registry.register(PollingTool())
+        await registry.dispatch("polling", {})
+        registry.clear_deltas()
+        assert "data" not in await registry.dispatch("polling", {})
+
+        disabled = ToolRegistry(AgentConfig(tool_delta_window=0), inventory, audit_logger)
+        disabled.register(PollingTool())
+        await disabled.dispatch("polling", {})
+        assert "data" not in await disabled.dispatch("polling", {})
+        assert "full" not in disabled.get_schemas()[0]["input_schema"]["properties"]
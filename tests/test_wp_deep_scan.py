@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from agent.domain_index import DomainOwner
 from agent.tools.base import ToolResult
-from agent.tools.wp_deep_scan import _build_wp_report
+from agent.tools.wp_deep_scan import WpDeepPerformance, _build_wp, _build_wp_report
 
 
 def _ok(output: str = "") -> ToolResult:
@@ -94,3 +97,60 @@ class TestBuildWpReport:
             headers=_ok("Content-Type: text/html"),
         ))
         assert "compression" in report.lower()
+
+    def test_compact_summary(self):
+        report, summary = _build_wp("slow.com", "/home/u/public_html", self._base_data(
+            ttfb=_ok("dns:0.001|connect:0.010|ttfb:3.500|total:4.000|size:25000|code:200"),
+            cron_constant=_ok("0"),
+        ))
+        assert "✗ TTFB 3.50s" in report
+        # Critical first, advice trimmed to the first sentence
+        assert summary["issues"][0] == {"sev": "critical", "msg": "TTFB 3.50s — extremely slow"}
+        assert summary["issues"][1]["msg"].startswith("WP-CRON ON PAGE LOADS")
+        metrics = summary["metrics"]
+        assert metrics["timing"]["ttfb"] == "3.500"
+        assert metrics["object_cache"] == "redis"
+        assert metrics["php"]["memory_limit"] == "256M"
+        assert metrics["active_plugins"] == 12
+
+
+class TestResolveTarget:
+    """Where execute() runs: index owner, explicit server, or an error."""
+
+    _OWNER = DomainOwner(
+        domain="example.com", server="web-01", user="alice",
+        docroot="/home/alice/public_html", domain_type="main", main_domain="",
+        refreshed_at=0.0,
+    )
+
+    async def _run(self, owner, run_output="", **kwargs):
+        run = AsyncMock(return_value=_ok(run_output))
+        with patch("agent.tools.wp_deep_scan.resolve_domain", AsyncMock(return_value=owner)), \
+                patch("agent.tools.wp_deep_scan._run_on_server", run):
+            result = await WpDeepPerformance(MagicMock()).execute(domain="example.com", **kwargs)
+        return result, [(c.args[1], c.args[2]) for c in run.await_args_list]
+
+    async def test_uses_index_owner(self):
+        result, calls = await self._run(self._OWNER)
+        assert result.exit_code == 0
+        assert {server for server, _ in calls} == {"web-01"}
+        assert any("runuser -u alice -- wp --path=/home/alice/public_html" in c for _, c in calls)
+
+    async def test_not_indexed_needs_server(self):
+        result, calls = await self._run(None)
+        assert result.error == "example.com is not in the domain index. Specify server."
+        assert calls == []
+
+    async def test_explicit_server_overrides_index(self):
+        result, calls = await self._run(
+            self._OWNER, server="web-02", path="/home/bob/site", run_output='{"data": {"user": "bob"}}',
+        )
+        assert result.exit_code == 0
+        assert {server for server, _ in calls} == {"web-02"}
+        assert calls[0][1].startswith("whmapi1 getdomainowner domain=example.com")
+        assert any("runuser -u bob -- wp --path=/home/bob/site" in c for _, c in calls)
+
+    async def test_explicit_server_with_unknown_owner(self):
+        result, calls = await self._run(None, server="web-02", run_output="{}")
+        assert "Could not find the cPanel owner of example.com on web-02" in result.error
+        assert len(calls) == 1
@@ -0,0 +1,138 @@
+"""Tests for the incremental WordPress install index."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agent.tools.base import ToolResult
+from agent.wp_index import WpIndex, WpInstall, _ServerEntry, apply_scan, scan_script
+
+_FIRST_SCAN = (
+    "H\talice\t100\n"
+    "C\t/home/alice/public_html\t6.4.2\n"
+    "C\t/home/alice/public_html/blog\t6.3.1\n"
+    "H\tbob\t200\n"
+    "C\t/home/bob/public_html\t6.4.2\n"
+)
+
+
+class TestScanScript:
+    def test_known_homes_and_paths_embedded(self):
+        script = scan_script({"alice": 100}, ["/home/alice/public_html"])
+        assert "alice 100" in script
+        assert "for p in /home/alice/public_html; do" in script
+
+    def test_full_scan_has_no_known_state(self):
+        script = scan_script({}, [])
+        assert "known='\n'" in script
+
+
+class TestApplyScan:
+    def test_first_scan(self):
+        entry = _ServerEntry(host="h")
+        assert apply_scan(entry, _FIRST_SCAN) == 2
+        assert sorted(entry.installs) == [
+            "/home/alice/public_html",
+            "/home/alice/public_html/blog",
+            "/home/bob/public_html",
+        ]
+        assert entry.installs["/home/alice/public_html/blog"].user == "alice"
+        assert entry.homes == {"alice": 100, "bob": 200}
+
+    def test_unchanged_homes_keep_installs_and_update_version(self):
+        entry = _ServerEntry(host="h")
+        apply_scan(entry, _FIRST_SCAN)
+        walked = apply_scan(entry, (
+            "H\talice\t100\n"
+            "H\tbob\t200\n"
+            "V\t/home/alice/public_html\t6.5.0\n"
+            "V\t/home/bob/public_html\t6.4.2\n"
+        ))
+        assert walked == 0
+        assert entry.installs["/home/alice/public_html"].version == "6.5.0"
+        # The blog's wp-config.php vanished
+        assert "/home/alice/public_html/blog" not in entry.installs
+
+    def test_changed_home_is_replaced_by_walk(self):
+        entry = _ServerEntry(host="h")
+        apply_scan(entry, _FIRST_SCAN)
+        apply_scan(entry, (
+            "H\talice\t150\n"
+            "C\t/home/alice/public_html/shop\t6.5.0\n"
+            "H\tbob\t200\n"
+            "V\t/home/bob/public_html\t6.4.2\n"
+        ))
+        assert sorted(entry.installs) == [
+            "/home/alice/public_html/shop",
+            "/home/bob/public_html",
+        ]
+
+    def test_removed_account_dropped(self):
+        entry = _ServerEntry(host="h")
+        apply_scan(entry, _FIRST_SCAN)
+        apply_scan(entry, "H\talice\t100\nV\t/home/alice/public_html\t6.4.2\n")
+        assert all(i.user == "alice" for i in entry.installs.values())
+
+
+class TestWpIndex:
+    async def test_recent_index_needs_no_ssh(self, make_inventory):
+        index = WpIndex()
+        run = AsyncMock(return_value=ToolResult(output=_FIRST_SCAN))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            first = await index.installs(make_inventory(), "web-01")
+            second = await index.installs(make_inventory(), "web-01")
+        assert len(first) == len(second) == 3
+        assert run.await_count == 1
+
+    async def test_stale_index_updates_incrementally(self, make_inventory):
+        index = WpIndex(max_age=0)
+        run = AsyncMock(return_value=ToolResult(output=_FIRST_SCAN))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            await index.installs(make_inventory(), "web-01")
+            await index.installs(make_inventory(), "web-01")
+        incremental = run.await_args_list[1].args[2]
+        assert "alice 100" in incremental
+        assert "/home/bob/public_html" in incremental
+
+    async def test_refresh_forces_full_scan(self, make_inventory):
+        index = WpIndex()
+        run = AsyncMock(return_value=ToolResult(output=_FIRST_SCAN))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            await index.installs(make_inventory(), "web-01")
+            await index.installs(make_inventory(), "web-01", refresh=True)
+        assert run.await_count == 2
+        assert "alice 100" not in run.await_args_list[1].args[2]
+
+    async def test_first_scan_failure_raises(self, make_inventory):
+        index = WpIndex()
+        run = AsyncMock(return_value=ToolResult(error="Permission denied", exit_code=1))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            with pytest.raises(RuntimeError, match="Permission denied"):
+                await index.installs(make_inventory(), "web-01")
+
+    async def test_later_failure_serves_last_known(self, make_inventory):
+        index = WpIndex(max_age=0)
+        ok = ToolResult(output=_FIRST_SCAN)
+        failed = ToolResult(error="timeout", exit_code=124)
+        run = AsyncMock(side_effect=[ok, failed])
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            await index.installs(make_inventory(), "web-01")
+            installs = await index.installs(make_inventory(), "web-01")
+        assert len(installs) == 3
+
+    async def test_persisted(self, make_inventory, tmp_path):
+        path = tmp_path / "wp_index.json"
+        index = WpIndex(path=path)
+        run = AsyncMock(return_value=ToolResult(output=_FIRST_SCAN))
+        with patch("agent.tools.docker_tools._run_on_server", run):
+            await index.installs(make_inventory(), "web-01")
+
+        reloaded = WpIndex(path=path)
+        reloaded.load()
+        entry = reloaded._entries["web-01"]
+        assert entry.homes == {"alice": 100, "bob": 200}
+        assert isinstance(entry.installs["/home/bob/public_html"], WpInstall)
+        assert entry.full_scan_at <= time.time()